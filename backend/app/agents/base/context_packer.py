@@ -0,0 +1,314 @@
+"""
+Context Packing for Agent Prompts
+
+This module turns agent input dictionaries into compact prompt text that fits
+a per-model token budget. Evidence lists (search results, collected items)
+are ranked by relevance to the investigation request and the least relevant
+entries are truncated or dropped first.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+import json
+import logging
+import re
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+
+# Input tokens we allow for the serialized agent input, per model family.
+# Leaves headroom in the context window for the system prompt and the answer.
+MODEL_CONTEXT_BUDGETS: Dict[str, int] = {
+    "gpt-4-turbo": 96000,
+    "gpt-4o": 96000,
+    "gpt-4": 6000,
+    "gpt-3.5-turbo": 12000,
+    "moonshotai/kimi-k2": 96000,
+    "meta-llama/llama-3.2-3b-instruct": 96000,
+    "llama3.2": 6000,
+}
+DEFAULT_CONTEXT_BUDGET = 12000
+
+# Keys whose values are lists of evidence items that may be ranked and cut.
+EVIDENCE_KEYS = (
+    "search_results",
+    "collection_results",
+    "results",
+    "raw_data",
+    "patterns",
+    "fused_entities",
+)
+
+# Keys that describe what the investigation is about, used for ranking.
+QUERY_KEYS = ("user_request", "query", "target", "search_query", "objective")
+
+# Per-field character cap applied to long free-text values in evidence items.
+MAX_FIELD_CHARS = 1500
+
+_WORD_RE = re.compile(r"[a-z0-9]{3,}")
+
+
+def get_context_budget(model: Optional[str]) -> int:
+    """Return the input token budget for a model name."""
+    if not model:
+        return DEFAULT_CONTEXT_BUDGET
+    if model in MODEL_CONTEXT_BUDGETS:
+        return MODEL_CONTEXT_BUDGETS[model]
+    # Match on prefix so tagged variants (":free", "-0125") share a budget
+    for name, budget in sorted(MODEL_CONTEXT_BUDGETS.items(), key=lambda kv: -len(kv[0])):
+        if model.startswith(name):
+            return budget
+    return DEFAULT_CONTEXT_BUDGET
+
+
+class TokenCounter:
+    """
+    Local token counter.
+
+    Uses tiktoken when it is installed and its encoding can be loaded, and
+    falls back to a character-based estimate (about four characters per
+    token) otherwise. tiktoken downloads encodings on first use, so offline
+    hosts take the fallback.
+    """
+
+    def __init__(self, model: Optional[str] = None, use_tiktoken: bool = True):
+        self.model = model
+        self._encoding = None
+        if TIKTOKEN_AVAILABLE and use_tiktoken:
+            try:
+                try:
+                    self._encoding = tiktoken.encoding_for_model(model or "")
+                except KeyError:
+                    self._encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                logger.warning(f"tiktoken encoding unavailable, estimating tokens from length: {e}")
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return (len(text) + 3) // 4
+
+
+@dataclass
+class PackedContext:
+    """Result of packing an agent input into prompt text."""
+    text: str
+    token_count: int
+    original_token_count: int
+    budget: int
+    items_total: int = 0
+    items_kept: int = 0
+    truncated_fields: int = 0
+
+    @property
+    def items_dropped(self) -> int:
+        return self.items_total - self.items_kept
+
+    def to_stats(self) -> Dict[str, Any]:
+        """Prompt size report suitable for logs and result metadata."""
+        return {
+            "prompt_tokens": self.token_count,
+            "original_tokens": self.original_token_count,
+            "budget_tokens": self.budget,
+            "prompt_chars": len(self.text),
+            "evidence_items_total": self.items_total,
+            "evidence_items_kept": self.items_kept,
+            "truncated_fields": self.truncated_fields,
+        }
+
+
+def compact_json(data: Any) -> str:
+    """Serialize data as JSON without insignificant whitespace."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+@dataclass
+class _Evidence:
+    path: Tuple[str, ...]
+    index: int
+    item: Any
+    score: float = 0.0
+    tokens: int = 0
+    keep: bool = True
+
+
+class ContextPacker:
+    """
+    Packs agent input into compact JSON within a token budget.
+
+    Non-evidence fields (task type, objectives, request) are always kept.
+    Evidence items are ranked by term overlap with the investigation request,
+    weighted by any relevance/confidence score already attached to the item,
+    and then kept greedily by rank until the budget is spent.
+    """
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        budget: Optional[int] = None,
+        max_field_chars: int = MAX_FIELD_CHARS,
+        counter: Optional[TokenCounter] = None
+    ):
+        self.model = model
+        self.budget = budget or get_context_budget(model)
+        self.max_field_chars = max_field_chars
+        self.counter = counter if counter is not None else TokenCounter(model)
+
+    def pack(self, input_data: Dict[str, Any], query: Optional[str] = None) -> PackedContext:
+        """Pack input_data into prompt text that fits the token budget."""
+        full_text = compact_json(input_data)
+        original_tokens = self.counter.count(full_text)
+        if original_tokens <= self.budget:
+            return PackedContext(
+                text=full_text,
+                token_count=original_tokens,
+                original_token_count=original_tokens,
+                budget=self.budget
+            )
+
+        query_terms = self._terms(query if query is not None else self._extract_query(input_data))
+        data = json.loads(full_text)  # detached copy with JSON-native values
+
+        truncated = 0
+        evidence: List[_Evidence] = []
+        for key in EVIDENCE_KEYS:
+            if key in data:
+                truncated += self._collect(data[key], (key,), evidence)
+
+        for ev in evidence:
+            ev.score = self._score(ev.item, query_terms)
+            ev.tokens = self.counter.count(compact_json(ev.item))
+
+        # Everything that is not evidence is kept unconditionally
+        skeleton = self._rebuild(data, evidence, include_kept=False)
+        used = self.counter.count(compact_json(skeleton))
+
+        for ev in sorted(evidence, key=lambda e: e.score, reverse=True):
+            if used + ev.tokens <= self.budget:
+                used += ev.tokens
+            else:
+                ev.keep = False
+
+        packed = self._rebuild(data, evidence, include_kept=True)
+        text = compact_json(packed)
+        result = PackedContext(
+            text=text,
+            token_count=self.counter.count(text),
+            original_token_count=original_tokens,
+            budget=self.budget,
+            items_total=len(evidence),
+            items_kept=sum(1 for ev in evidence if ev.keep),
+            truncated_fields=truncated
+        )
+        logger.info(
+            f"Packed agent context from {original_tokens} to {result.token_count} tokens "
+            f"(budget {self.budget}, kept {result.items_kept}/{result.items_total} evidence items)"
+        )
+        return result
+
+    def _extract_query(self, input_data: Dict[str, Any]) -> str:
+        parts = []
+        for key in QUERY_KEYS:
+            value = input_data.get(key)
+            if isinstance(value, str):
+                parts.append(value)
+        objectives = input_data.get("objectives")
+        if isinstance(objectives, dict):
+            for key in ("primary_objectives", "target_entities", "key_intelligence_requirements"):
+                value = objectives.get(key)
+                if isinstance(value, list):
+                    parts.extend(str(v) for v in value)
+        return " ".join(parts)
+
+    @staticmethod
+    def _terms(text: str) -> set:
+        return set(_WORD_RE.findall(text.lower())) if text else set()
+
+    def _collect(self, value: Any, path: Tuple[str, ...], out: List[_Evidence]) -> int:
+        """Register evidence items under value and truncate their long strings."""
+        truncated = 0
+        if isinstance(value, list):
+            for i, item in enumerate(value):
+                truncated += self._truncate(item)
+                out.append(_Evidence(path=path, index=i, item=item))
+        elif isinstance(value, dict):
+            # Source-keyed buckets, e.g. {"surface_web": [...], "social_media": [...]}
+            for key, sub in value.items():
+                if isinstance(sub, list):
+                    truncated += self._collect(sub, path + (key,), out)
+        return truncated
+
+    def _truncate(self, item: Any) -> int:
+        truncated = 0
+        if isinstance(item, dict):
+            for key, value in item.items():
+                if isinstance(value, str) and len(value) > self.max_field_chars:
+                    item[key] = value[:self.max_field_chars] + "…"
+                    truncated += 1
+                elif isinstance(value, (dict, list)):
+                    truncated += self._truncate(value)
+        elif isinstance(item, list):
+            for i, value in enumerate(item):
+                if isinstance(value, str) and len(value) > self.max_field_chars:
+                    item[i] = value[:self.max_field_chars] + "…"
+                    truncated += 1
+                else:
+                    truncated += self._truncate(value)
+        return truncated
+
+    def _score(self, item: Any, query_terms: set) -> float:
+        if isinstance(item, dict):
+            text = " ".join(str(v) for v in item.values() if isinstance(v, (str, int, float)))
+            prior = 1.0
+            for key in ("relevance_score", "relevance", "confidence", "score"):
+                value = item.get(key)
+                if isinstance(value, (int, float)):
+                    prior = 0.5 + min(max(float(value), 0.0), 1.0)
+                    break
+        else:
+            text = str(item)
+            prior = 1.0
+        if not query_terms:
+            return prior
+        overlap = len(query_terms & self._terms(text)) / len(query_terms)
+        return prior * (0.1 + overlap)
+
+    def _rebuild(
+        self,
+        data: Dict[str, Any],
+        evidence: List[_Evidence],
+        include_kept: bool
+    ) -> Dict[str, Any]:
+        """Rebuild data with evidence lists filtered down to the kept items."""
+        kept: Dict[Tuple[str, ...], List[Any]] = {}
+        for ev in evidence:
+            kept.setdefault(ev.path, [])
+            if include_kept and ev.keep:
+                kept[ev.path].append(ev.item)
+
+        rebuilt = dict(data)
+        for path, items in kept.items():
+            if len(path) == 1:
+                rebuilt[path[0]] = items
+            else:
+                bucket = dict(rebuilt[path[0]]) if isinstance(rebuilt[path[0]], dict) else {}
+                rebuilt[path[0]] = bucket
+                self._set_path(bucket, path[1:], items)
+        return rebuilt
+
+    @staticmethod
+    def _set_path(container: Dict[str, Any], path: Tuple[str, ...], items: List[Any]) -> None:
+        for key in path[:-1]:
+            child = container.get(key)
+            container[key] = dict(child) if isinstance(child, dict) else {}
+            container = container[key]
+        container[path[-1]] = items
@@ -0,0 +1,192 @@
+"""
+Bounded Agent Execution History
+
+Agents are pooled and long-lived, so their execution history must not grow
+with every call. This module keeps a fixed-size ring buffer of compact
+execution records plus running aggregates (count, success rate, latency
+percentiles) that cover the agent's whole lifetime. Records evicted from the
+buffer can optionally be spilled to persistent storage.
+"""
+
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable, Iterator
+import json
+import logging
+import math
+
+
+logger = logging.getLogger(__name__)
+
+# Maximum length of error messages kept in compact records
+MAX_ERROR_CHARS = 300
+
+
+class ExecutionRecord:
+    """Compact record of one agent execution (no payloads or inputs)."""
+
+    __slots__ = (
+        "timestamp", "success", "execution_time", "confidence",
+        "sources_count", "prompt_tokens", "error_message"
+    )
+
+    def __init__(
+        self,
+        timestamp: datetime,
+        success: bool,
+        execution_time: float,
+        confidence: float = 0.0,
+        sources_count: int = 0,
+        prompt_tokens: Optional[int] = None,
+        error_message: Optional[str] = None
+    ):
+        self.timestamp = timestamp
+        self.success = success
+        self.execution_time = execution_time
+        self.confidence = confidence
+        self.sources_count = sources_count
+        self.prompt_tokens = prompt_tokens
+        self.error_message = error_message[:MAX_ERROR_CHARS] if error_message else None
+
+    @classmethod
+    def from_result(cls, result: Any) -> "ExecutionRecord":
+        """Build a compact record from an AgentResult."""
+        prompt_stats = (result.metadata or {}).get("prompt_stats") or {}
+        return cls(
+            timestamp=result.timestamp,
+            success=result.success,
+            execution_time=result.execution_time,
+            confidence=result.confidence,
+            sources_count=len(result.sources),
+            prompt_tokens=prompt_stats.get("prompt_tokens"),
+            error_message=result.error_message
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "timestamp": self.timestamp.isoformat(),
+            "success": self.success,
+            "execution_time": self.execution_time,
+            "confidence": self.confidence,
+            "sources_count": self.sources_count,
+            "prompt_tokens": self.prompt_tokens,
+            "error_message": self.error_message
+        }
+
+
+class LatencySketch:
+    """
+    Streaming quantile sketch with bounded relative error.
+
+    Values are counted in logarithmic buckets (DDSketch style), so memory
+    depends on the range of latencies seen, not on the number of samples.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-4):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+
+    def add(self, value: float):
+        key = math.ceil(math.log(max(value, self.min_value)) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+
+class JsonlSpillHandler:
+    """Appends evicted execution records to a JSON Lines file."""
+
+    def __init__(self, path: str, agent_id: Optional[str] = None):
+        self.path = Path(path)
+        self.agent_id = agent_id
+
+    def __call__(self, record: ExecutionRecord):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            entry = record.to_dict()
+            if self.agent_id:
+                entry["agent_id"] = self.agent_id
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        except Exception as e:
+            logger.warning(f"Failed to spill execution record: {e}")
+
+
+class ExecutionHistory:
+    """
+    Ring buffer of recent execution records with lifetime aggregates.
+
+    Supports ``len()``, iteration and indexing over the retained records;
+    aggregates in ``summary()`` cover every execution ever recorded.
+    """
+
+    def __init__(
+        self,
+        max_records: int = 100,
+        spill_handler: Optional[Callable[[ExecutionRecord], None]] = None
+    ):
+        self.records: deque = deque(maxlen=max_records)
+        self.spill_handler = spill_handler
+        self.total_count = 0
+        self.success_count = 0
+        self.total_execution_time = 0.0
+        self.latency = LatencySketch()
+
+    def append(self, result: Any) -> ExecutionRecord:
+        """Record an AgentResult (or a ready-made ExecutionRecord)."""
+        record = result if isinstance(result, ExecutionRecord) else ExecutionRecord.from_result(result)
+
+        if self.spill_handler and len(self.records) == self.records.maxlen:
+            self.spill_handler(self.records[0])
+        self.records.append(record)
+
+        self.total_count += 1
+        if record.success:
+            self.success_count += 1
+        self.total_execution_time += record.execution_time
+        self.latency.add(record.execution_time)
+        return record
+
+    def recent(self, limit: int = 10) -> List[ExecutionRecord]:
+        if limit <= 0:
+            return []
+        return list(self.records)[-limit:]
+
+    def summary(self) -> Dict[str, Any]:
+        """Lifetime aggregates, computed in O(1) apart from the percentiles."""
+        count = self.total_count
+        return {
+            "execution_count": count,
+            "success_rate": self.success_count / count if count else 0,
+            "average_execution_time": self.total_execution_time / count if count else 0,
+            "latency_p50": self.latency.quantile(0.5),
+            "latency_p95": self.latency.quantile(0.95),
+            "latency_p99": self.latency.quantile(0.99),
+            "last_execution": self.records[-1].timestamp if self.records else None
+        }
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[ExecutionRecord]:
+        return iter(self.records)
+
+    def __getitem__(self, index: int) -> ExecutionRecord:
+        return self.records[index]
+
+    def __bool__(self) -> bool:
+        return bool(self.records)
@@ -15,6 +15,10 @@ import logging
 
 from pydantic import BaseModel, Field
 
+from .context_packer import ContextPacker, compact_json
+from .structured_output import StructuredOutputParser, StructuredOutputError
+from .execution_history import ExecutionHistory, ExecutionRecord, JsonlSpillHandler
+
 
 class AgentConfig(BaseModel):
     """Configuration for OSINT agents"""
@@ -27,6 +31,9 @@ class AgentConfig(BaseModel):
     retry_attempts: int = 3
     llm_model: str = "gpt-4-turbo"  # Default model
     temperature: float = 0.1
+    context_token_budget: Optional[int] = None  # Defaults to the model's budget
+    history_size: int = 100  # Execution records kept in memory
+    history_spill_path: Optional[str] = None  # JSONL file for evicted records
 
 
 class AgentResult(BaseModel):
@@ -74,7 +81,20 @@ class OSINTAgent(ABC):
         # Agent state
         self.is_active = False
         self.current_task = None
-        self.execution_history: List[AgentResult] = []
+        self.execution_history = ExecutionHistory(
+            max_records=config.history_size,
+            spill_handler=(
+                JsonlSpillHandler(config.history_spill_path, agent_id=config.agent_id)
+                if config.history_spill_path else None
+            )
+        )
+        
+        # Prompt packing
+        self.context_packer = ContextPacker(
+            model=config.llm_model,
+            budget=config.context_token_budget
+        )
+        self.last_prompt_stats: Dict[str, Any] = {}
         
         self.logger.info(f"Initialized {self.config.role} agent with ID: {self.config.agent_id}")
     
@@ -145,7 +165,8 @@ class OSINTAgent(ABC):
                     "agent_id": self.config.agent_id,
                     "agent_role": self.config.role,
                     "execution_time": execution_time,
-                    "input_data": input_data
+                    "input_data": input_data,
+                    "prompt_stats": self.last_prompt_stats
                 },
                 execution_time=execution_time
             )
@@ -158,22 +179,26 @@ class OSINTAgent(ABC):
         except asyncio.TimeoutError:
             error_msg = f"Execution timed out after {self.config.timeout} seconds"
             self.logger.error(error_msg)
-            return AgentResult(
+            agent_result = AgentResult(
                 success=False,
                 data={},
                 error_message=error_msg,
                 execution_time=(datetime.utcnow() - start_time).total_seconds()
             )
+            self.execution_history.append(agent_result)
+            return agent_result
             
         except Exception as e:
             error_msg = f"Execution failed: {str(e)}"
             self.logger.error(error_msg, exc_info=True)
-            return AgentResult(
+            agent_result = AgentResult(
                 success=False,
                 data={},
                 error_message=error_msg,
                 execution_time=(datetime.utcnow() - start_time).total_seconds()
             )
+            self.execution_history.append(agent_result)
+            return agent_result
             
         finally:
             self.is_active = False
@@ -190,6 +215,8 @@ class OSINTAgent(ABC):
             try:
                 agent_input = self._prepare_agent_input(input_data)
                 result = await self._execute_agent(agent_input)
+                if isinstance(result, str):
+                    result = await self._repair_structured_output(result)
                 structured_result = self._process_output(
                     result if isinstance(result, str) else str(result), 
                     None
@@ -205,6 +232,8 @@ class OSINTAgent(ABC):
                 
                 # Execute the agent with actual LLM call
                 result = await self._execute_agent(agent_input)
+                if isinstance(result, str):
+                    result = await self._repair_structured_output(result)
                 
                 # Process the output
                 structured_result = self._process_output(
@@ -241,13 +270,54 @@ class OSINTAgent(ABC):
         # this would be overridden by each specific agent to use the actual LLM
         return f"Processed input: {input_data}"
     
+    async def _repair_structured_output(self, raw_output: str) -> str:
+        """
+        Repair near-valid JSON output before agent-specific processing.
+        
+        Valid output and plain text are returned unchanged; JSON inside
+        prose is only looked for when the agent declares required output
+        fields. Repaired output is re-serialized as JSON; if the response
+        was cut off, the model is asked only for the missing required keys
+        instead of a full retry.
+        """
+        required_fields = self._get_required_output_fields()
+        parser = StructuredOutputParser(required_fields, expect_json=bool(required_fields))
+        try:
+            parsed = await parser.parse_and_complete(raw_output, ask=self._request_output_fragment)
+        except StructuredOutputError:
+            return raw_output
+        
+        if not parsed.repaired:
+            return raw_output
+        
+        self.logger.info(
+            f"Repaired structured output for {self.config.role} "
+            f"(truncated={parsed.truncated}, completed_keys={parsed.completed_keys}, "
+            f"missing_keys={parsed.missing_keys})"
+        )
+        return compact_json(parsed.data)
+    
+    async def _request_output_fragment(self, prompt: str) -> Optional[str]:
+        """
+        Ask the model for a missing fragment of its previous answer.
+        
+        Base implementation has no model to ask; LLM-backed agents override it.
+        """
+        return None
+    
     def _prepare_agent_input(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Prepare input data for the agent.
+        
+        The input is serialized as compact JSON and evidence is ranked and
+        trimmed to fit the model's token budget.
         """
-        # Convert the input data to a format suitable for the agent
+        packed = self.context_packer.pack(input_data)
+        self.last_prompt_stats = packed.to_stats()
+        self.logger.debug(f"Prompt size for {self.config.role}: {self.last_prompt_stats}")
+        
         return {
-            "input": json.dumps(input_data, indent=2),
+            "input": packed.text,
             "task_type": input_data.get("task_type", "general")
         }
     
@@ -300,10 +370,8 @@ class OSINTAgent(ABC):
             "role": self.config.role,
             "is_active": self.is_active,
             "current_task": self.current_task,
-            "execution_count": len(self.execution_history),
-            "last_execution": self.execution_history[-1].timestamp if self.execution_history else None,
-            "average_execution_time": sum(r.execution_time for r in self.execution_history) / len(self.execution_history) if self.execution_history else 0,
-            "success_rate": sum(1 for r in self.execution_history if r.success) / len(self.execution_history) if self.execution_history else 0
+            **self.execution_history.summary(),
+            "last_prompt_stats": self.last_prompt_stats
         }
     
     def reset_memory(self):
@@ -312,9 +380,9 @@ class OSINTAgent(ABC):
             self.memory.clear()
         self.logger.info(f"Memory cleared for {self.config.role} agent")
     
-    def get_execution_history(self, limit: int = 10) -> List[AgentResult]:
-        """Get recent execution history"""
-        return self.execution_history[-limit:] if self.execution_history else []
+    def get_execution_history(self, limit: int = 10) -> List[ExecutionRecord]:
+        """Get recent execution history as compact records"""
+        return self.execution_history.recent(limit)
 
 
  # Simple agent config with actual LLM execution
@@ -323,16 +391,22 @@ class LLMOSINTAgent(OSINTAgent):
     An OSINT agent that actually connects to an LLM service.
     """
     
+    # Request JSON mode from providers that support it when the prompt asks for JSON
+    json_mode: bool = True
+    
     def __init__(self, config: AgentConfig, tools: Optional[List[Any]] = None, memory: Optional[Any] = None, logger: Optional[logging.Logger] = None):
         super().__init__(config=config, tools=tools, memory=memory, logger=logger)
         # Store the original tools before LangChain processing
         self.original_tools = tools or []
+        self._json_mode_supported = True
+        self._last_exchange: Optional[tuple] = None
     
     async def _execute_agent(self, input_data: Dict[str, Any]) -> str:
         """
         Execute the agent with actual LLM call, potentially using tools.
         This implementation includes the LLM logic with optional tool usage.
         """
+        self._last_exchange = None
         try:
             # Import here to avoid circular dependencies and make optional
             from langchain_core.messages import SystemMessage, HumanMessage
@@ -362,10 +436,21 @@ class LLMOSINTAgent(OSINTAgent):
                 HumanMessage(content=input_data.get("input", str(input_data)))
             ]
             
-            # Execute the LLM call
-            response = await llm.ainvoke(messages)
+            # Execute the LLM call, in JSON mode when the prompt asks for JSON
+            if self.json_mode and self._json_mode_supported and "json" in system_prompt.lower():
+                try:
+                    response = await llm.bind(response_format={"type": "json_object"}).ainvoke(messages)
+                except Exception as e:
+                    if "response_format" not in str(e).lower() and "json_object" not in str(e).lower():
+                        raise
+                    self.logger.info(f"Provider rejected JSON mode, continuing without it: {e}")
+                    self._json_mode_supported = False
+                    response = await llm.ainvoke(messages)
+            else:
+                response = await llm.ainvoke(messages)
             # Ensure we return a string
             content = response.content if hasattr(response, 'content') else str(response)
+            self._last_exchange = (llm, messages, str(content))
             return str(content)
             
         except ImportError:
@@ -383,6 +468,19 @@ class LLMOSINTAgent(OSINTAgent):
                 self.logger.error(f"LLM execution failed: {e}")
                 raise
 
+    async def _request_output_fragment(self, prompt: str) -> Optional[str]:
+        """Continue the last exchange, asking only for the missing fragment."""
+        if not self._last_exchange:
+            return None
+        
+        from langchain_core.messages import AIMessage, HumanMessage
+        
+        llm, messages, partial_output = self._last_exchange
+        response = await llm.ainvoke(
+            list(messages) + [AIMessage(content=partial_output), HumanMessage(content=prompt)]
+        )
+        return response.content if hasattr(response, 'content') else str(response)
+    
     async def _execute_local_fallback(self, input_data: Dict[str, Any]) -> str:
         """
         Execute a local fallback when LLM is unavailable.
@@ -0,0 +1,299 @@
+"""
+Structured Output Parsing for Agent Responses
+
+This module provides a shared layer for turning LLM text into JSON:
+
+- extraction of the JSON payload from markdown fences and surrounding prose
+- a single-pass repairing scanner for near-valid JSON (trailing commas,
+  single quotes, Python literals, comments, unquoted keys, truncated output)
+- completion of missing top-level keys by re-asking the model only for the
+  missing fragment instead of repeating the whole request
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable
+import json
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class StructuredOutputError(ValueError):
+    """Raised when no JSON value can be recovered from an LLM response."""
+    pass
+
+
+_BARE_LITERALS = {
+    "true": "true", "false": "false", "null": "null",
+    "True": "true", "False": "false", "None": "null",
+    "NaN": "null", "Infinity": "null", "undefined": "null",
+}
+
+
+@dataclass
+class ParsedOutput:
+    """Result of parsing an LLM response into JSON."""
+    data: Any
+    repaired: bool = False
+    truncated: bool = False
+    missing_keys: List[str] = field(default_factory=list)
+    completed_keys: List[str] = field(default_factory=list)
+
+
+def extract_json_text(raw_output: str, expect_json: bool = False) -> str:
+    """
+    Extract the JSON payload from an LLM response.
+
+    Output is treated as JSON when it starts with ``{`` or ``[`` or
+    contains a ```json fence; only when the caller asked the model for JSON
+    (``expect_json``) is prose before the first ``{`` or ``[`` stripped, so
+    ordinary text with brackets in it is returned unchanged. Trailing prose
+    is left in place; the repairing scanner stops at the end of the first
+    complete value.
+    """
+    cleaned = raw_output.strip()
+
+    fence = cleaned.find('```json')
+    if fence != -1:
+        cleaned = cleaned[fence + 7:]
+    elif cleaned.startswith('```'):
+        cleaned = cleaned[3:]
+    elif not expect_json:
+        return cleaned
+
+    # Closing fence, unless it sits inside the JSON value itself
+    fence = cleaned.rfind('```')
+    if fence != -1 and fence > max(cleaned.rfind('}'), cleaned.rfind(']')):
+        cleaned = cleaned[:fence]
+
+    starts = [i for i in (cleaned.find('{'), cleaned.find('[')) if i != -1]
+    if starts:
+        cleaned = cleaned[min(starts):]
+
+    return cleaned.strip()
+
+
+def repair_json(text: str) -> Tuple[str, bool]:
+    """
+    Repair near-valid JSON in a single pass.
+
+    Returns:
+        Tuple of (repaired JSON text, whether the input was truncated)
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    # (len(out), open containers) at each comma, used to drop an incomplete tail
+    commas: List[Tuple[int, Tuple[str, ...]]] = []
+    quote: Optional[str] = None
+    escape = False
+    i = 0
+    n = len(text)
+
+    while i < n:
+        ch = text[i]
+
+        if quote is not None:
+            if escape:
+                # \' is valid only in single-quoted strings; JSON has no such escape
+                out.append(ch if ch == "'" else '\\' + ch)
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == quote:
+                out.append('"')
+                quote = None
+            elif ch == '"':
+                out.append('\\"')  # only reachable inside single-quoted strings
+            elif ch == '\n':
+                out.append('\\n')
+            elif ch == '\t':
+                out.append('\\t')
+            elif ch == '\r':
+                pass
+            else:
+                out.append(ch)
+            i += 1
+            continue
+
+        if ch in '"\'':
+            quote = ch
+            out.append('"')
+        elif ch in '{[':
+            stack.append('}' if ch == '{' else ']')
+            out.append(ch)
+        elif ch in '}]':
+            _strip_trailing_comma(out)
+            if stack and stack[-1] == ch:
+                stack.pop()
+                out.append(ch)
+            elif stack:
+                # Mismatched closer: close the innermost container instead
+                out.append(stack.pop())
+            if not stack:
+                return "".join(out), False
+        elif ch == ',':
+            _strip_trailing_comma(out)
+            commas.append((len(out), tuple(stack)))
+            out.append(ch)
+        elif ch == '/' and i + 1 < n and text[i + 1] in '/*':
+            if text[i + 1] == '/':
+                end = text.find('\n', i)
+                i = n if end == -1 else end
+            else:
+                end = text.find('*/', i + 2)
+                i = n if end == -1 else end + 2
+            continue
+        elif ch.isdigit() or ch == '-':
+            j = i + 1
+            while j < n and (text[j].isdigit() or text[j] in '.eE+-'):
+                j += 1
+            out.append(text[i:j])
+            i = j
+            continue
+        elif ch.isalpha() or ch == '_':
+            j = i
+            while j < n and (text[j].isalnum() or text[j] in '_-'):
+                j += 1
+            word = text[i:j]
+            if word in _BARE_LITERALS:
+                out.append(_BARE_LITERALS[word])
+            else:
+                # Unquoted key or bare string value
+                out.append(json.dumps(word))
+            i = j
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    # Input ended before the top-level value was closed
+    if escape:
+        out.append('\\\\')
+    if quote is not None:
+        out.append('"')
+    candidate = _close(out, stack)
+    try:
+        json.loads(candidate)
+        return candidate, True
+    except ValueError:
+        pass
+
+    # Drop the incomplete last member and close again
+    for position, open_containers in reversed(commas):
+        candidate = _close(out[:position], list(open_containers))
+        try:
+            json.loads(candidate)
+            return candidate, True
+        except ValueError:
+            continue
+
+    return candidate, True
+
+
+def _strip_trailing_comma(out: List[str]):
+    k = len(out) - 1
+    while k >= 0 and out[k].isspace():
+        k -= 1
+    if k >= 0 and out[k] == ',':
+        del out[k]
+
+
+def _close(out: List[str], stack: List[str]) -> str:
+    tail = "".join(out).rstrip()
+    if tail.endswith(','):
+        tail = tail[:-1]
+    if tail.endswith(':'):
+        tail += 'null'
+    return tail + "".join(reversed(stack))
+
+
+def parse_json_lenient(raw_output: str, expect_json: bool = False) -> ParsedOutput:
+    """
+    Parse JSON from an LLM response, repairing it if needed.
+
+    See ``extract_json_text`` for when prose is searched for JSON.
+
+    Raises:
+        StructuredOutputError: If no JSON value can be recovered
+    """
+    text = extract_json_text(raw_output, expect_json)
+    if not text or text[0] not in '{[':
+        raise StructuredOutputError("No JSON object found in output")
+
+    try:
+        return ParsedOutput(data=json.loads(text))
+    except ValueError:
+        pass
+
+    repaired, truncated = repair_json(text)
+    try:
+        data = json.loads(repaired)
+    except ValueError as e:
+        raise StructuredOutputError(f"Could not repair JSON output: {e}") from e
+
+    return ParsedOutput(data=data, repaired=True, truncated=truncated)
+
+
+def build_fragment_prompt(present_keys: List[str], missing_keys: List[str]) -> str:
+    """Prompt asking the model for only the missing part of its answer."""
+    return (
+        "Your previous JSON answer was cut off or malformed. "
+        f"It already contains these keys: {', '.join(present_keys) or 'none'}. "
+        "Return ONLY a JSON object containing the missing keys "
+        f"{', '.join(missing_keys)}, in the same format as requested before. "
+        "Do not repeat the keys that are already present."
+    )
+
+
+class StructuredOutputParser:
+    """
+    Parses agent output into JSON with repair and fragment completion.
+
+    When a response had to be repaired (typically because it was cut off)
+    and required top-level keys are missing, ``ask`` is called with a short
+    prompt requesting only those keys; the answer is parsed the same way and
+    merged into the original object.
+    """
+
+    def __init__(self, required_keys: Optional[List[str]] = None, max_fragment_requests: int = 1,
+                 expect_json: bool = False):
+        self.required_keys = required_keys or []
+        self.max_fragment_requests = max_fragment_requests
+        self.expect_json = expect_json
+
+    def parse(self, raw_output: str) -> ParsedOutput:
+        parsed = parse_json_lenient(raw_output, self.expect_json)
+        if isinstance(parsed.data, dict):
+            parsed.missing_keys = [k for k in self.required_keys if k not in parsed.data]
+        return parsed
+
+    async def parse_and_complete(
+        self,
+        raw_output: str,
+        ask: Optional[Callable[[str], Awaitable[Optional[str]]]] = None
+    ) -> ParsedOutput:
+        parsed = self.parse(raw_output)
+        if not ask or not isinstance(parsed.data, dict):
+            return parsed
+
+        attempts = 0
+        while parsed.repaired and parsed.missing_keys and attempts < self.max_fragment_requests:
+            attempts += 1
+            prompt = build_fragment_prompt(list(parsed.data.keys()), parsed.missing_keys)
+            try:
+                fragment_text = await ask(prompt)
+                fragment = parse_json_lenient(fragment_text or "", expect_json=True).data
+            except Exception as e:
+                logger.warning(f"Fragment completion failed: {e}")
+                break
+            if not isinstance(fragment, dict):
+                break
+
+            for key in parsed.missing_keys:
+                if key in fragment:
+                    parsed.data[key] = fragment[key]
+                    parsed.completed_keys.append(key)
+            parsed.missing_keys = [k for k in self.required_keys if k not in parsed.data]
+
+        return parsed
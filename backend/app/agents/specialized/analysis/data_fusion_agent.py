@@ -12,6 +12,7 @@ import re
 import hashlib
 
 from ...base.osint_agent import OSINTAgent, LLMOSINTAgent, AgentConfig, AgentResult
+from ...base.structured_output import extract_json_text, parse_json_lenient, StructuredOutputError
 
 
 class DataFusionAgent(LLMOSINTAgent):
@@ -59,17 +60,14 @@ class DataFusionAgent(LLMOSINTAgent):
             # Clean the raw output - remove markdown formatting, extra whitespace, etc.
             cleaned_output = self._clean_raw_output(raw_output)
             
-            # Try to parse JSON output
-            if cleaned_output.strip().startswith('{'):
-                structured_data = json.loads(cleaned_output)
-            else:
-                # Extract JSON from text if embedded
-                json_match = re.search(r'\{.*\}', cleaned_output, re.DOTALL)
-                if json_match:
-                    structured_data = json.loads(json_match.group())
-                else:
-                    # Fallback: parse text manually
-                    structured_data = self._parse_text_output(cleaned_output)
+            # Parse JSON output, repairing near-valid JSON
+            try:
+                structured_data = parse_json_lenient(cleaned_output, expect_json=True).data
+            except StructuredOutputError:
+                # Fallback: parse text manually
+                structured_data = self._parse_text_output(cleaned_output)
+            if not isinstance(structured_data, dict):
+                structured_data = self._parse_text_output(cleaned_output)
             
             # Validate and enhance the structured data
             return self._validate_and_enhance_data(structured_data)
@@ -89,26 +87,7 @@ class DataFusionAgent(LLMOSINTAgent):
 
     def _clean_raw_output(self, raw_output: str) -> str:
         """Clean raw output to extract valid JSON."""
-        cleaned = raw_output.strip()
-        
-        # Remove markdown code block formatting
-        if cleaned.startswith('```json'):
-            cleaned = cleaned[7:]  # Remove ```json
-        elif cleaned.startswith('```'):
-            cleaned = cleaned[3:]   # Remove ```
-        
-        if cleaned.endswith('```'):
-            cleaned = cleaned[:-3]  # Remove trailing ```
-        
-        # Remove any leading/trailing text that might be around the JSON
-        # Find the first { and last }
-        first_brace = cleaned.find('{')
-        last_brace = cleaned.rfind('}')
-        
-        if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
-            cleaned = cleaned[first_brace:last_brace+1]
-        
-        return cleaned
+        return extract_json_text(raw_output, expect_json=True)
 
     def _validate_and_enhance_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Validate and enhance the data fusion results."""
@@ -3,12 +3,14 @@ Dark Web Collector Agent for OSINT investigations.
 """
 
 import asyncio
+import os
 import time
 from typing import Dict, List, Any, Optional
 import hashlib
 from datetime import datetime, timedelta
 
 from ...base.osint_agent import LLMOSINTAgent, AgentConfig
+from app.utils.lazy_import import load_module_from_path
 
 class DarkWebCollectorAgent(LLMOSINTAgent):
     """
@@ -25,23 +27,12 @@ class DarkWebCollectorAgent(LLMOSINTAgent):
             role="Dark Web Collector",
             description="Collects information from dark web sources including onion services, forums, marketplaces, and leak sites"
         )
-        # Dynamically import the tool manager classes to avoid import issues
-        import importlib.util
-        import os
-        
-        # Import the tool module dynamically
+        # Shared, cached load of the tool module (executed once per process)
         tool_module_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'agents', 'tools', 'langchain_tools.py')
-        spec = importlib.util.spec_from_file_location("langchain_tools", tool_module_path)
-        if spec is not None and spec.loader is not None:
-            tool_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(tool_module)
-            ToolManager = tool_module.ToolManager
-            get_global_tool_manager = tool_module.get_global_tool_manager
-        else:
-            raise ImportError("Could not load langchain tools module")
+        tool_module = load_module_from_path("langchain_tools", tool_module_path)
         
         super().__init__(config=config, tools=tools)
-        self.tool_manager = ToolManager() if not tools else get_global_tool_manager()
+        self.tool_manager = tool_module.ToolManager() if not tools else tool_module.get_global_tool_manager()
         
         self.supported_platforms = [
             "tor_network", "i2p_network", "freenet", "zero_net",
@@ -10,19 +10,13 @@ from datetime import datetime, timedelta
 
 from ...base.osint_agent import LLMOSINTAgent, AgentConfig
 
-import importlib.util
 import os
 
-# Dynamically import the tool manager classes to avoid import issues
+from app.utils.lazy_import import lazy_module_from_path
+
+# The tool module (and LangChain behind it) loads when the first agent is created
 tool_module_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'agents', 'tools', 'langchain_tools.py')
-tool_spec = importlib.util.spec_from_file_location("langchain_tools", tool_module_path)
-if tool_spec is not None and tool_spec.loader is not None:
-    tool_module = importlib.util.module_from_spec(tool_spec)
-    tool_spec.loader.exec_module(tool_module)
-    ToolManager = tool_module.ToolManager
-    get_global_tool_manager = tool_module.get_global_tool_manager
-else:
-    raise ImportError("Could not load langchain tools module")
+tool_module = lazy_module_from_path("langchain_tools", tool_module_path)
 
 # Note: This agent now uses LangChain tools approach through the tool manager
 # Direct adapter initialization is no longer needed
@@ -42,7 +36,7 @@ class SocialMediaCollectorAgent(LLMOSINTAgent):
         )
         # Initialize with tools
         super().__init__(config=config, tools=tools)
-        self.tool_manager = ToolManager() if not tools else get_global_tool_manager()
+        self.tool_manager = tool_module.ToolManager() if not tools else tool_module.get_global_tool_manager()
         self.supported_platforms = [
             "twitter", "facebook", "instagram", "linkedin", 
             "tiktok", "reddit", "youtube", "telegram"
@@ -3,8 +3,9 @@ Surface Web Collector Agent for OSINT investigations.
 """
 
 import asyncio
+import re
 import time
-from typing import Dict, List, Any, Optional
+from typing import Awaitable, Callable, Dict, List, Any, Optional
 from urllib.parse import urljoin, urlparse
 
 # Optional imports for web scraping
@@ -22,21 +23,21 @@ except ImportError:
 
 from ...base.osint_agent import LLMOSINTAgent, AgentConfig
 
-# Dynamically import the tool manager classes to avoid import issues
-import importlib.util
 import os
 
-# Import the tool module dynamically
+from app.config import settings
+from app.services.dns_resolver import get_dns_resolver
+from app.services.subdomain_enumerator import SubdomainCallback, SubdomainEnumerator, SubdomainResult, load_wordlist
+from app.services.tech_fingerprint import Page, get_fingerprinter
+from app.services.tls_certificates import get_certificate_grabber
+from app.utils.lazy_import import lazy_module_from_path
+
+# The tool module (and LangChain behind it) loads when the first agent is created
 tool_module_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'agents', 'tools', 'langchain_tools.py')
-spec = importlib.util.spec_from_file_location("langchain_tools", tool_module_path)
-if spec is not None and spec.loader is not None:
-    tool_module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(tool_module)
-    ToolManager = tool_module.ToolManager
-    get_global_tool_manager = tool_module.get_global_tool_manager
-else:
-    raise ImportError("Could not load langchain tools module")
+tool_module = lazy_module_from_path("langchain_tools", tool_module_path)
 
+# Receives (kind, payload) for findings reported while a task is still running
+ProgressSink = Callable[[str, Dict[str, Any]], Awaitable[None]]
 
 
 class SurfaceWebCollectorAgent(LLMOSINTAgent):
@@ -45,7 +46,12 @@ class SurfaceWebCollectorAgent(LLMOSINTAgent):
     Handles search engines, public websites, and openly accessible content.
     """
     
-    def __init__(self, agent_id: str = "surface_web_collector", tools: Optional[List[Any]] = None):
+    def __init__(
+        self,
+        agent_id: str = "surface_web_collector",
+        tools: Optional[List[Any]] = None,
+        progress_sink: Optional[ProgressSink] = None
+    ):
         config = AgentConfig(
             agent_id=agent_id,
             role="Surface Web Collector",
@@ -60,7 +66,7 @@ class SurfaceWebCollectorAgent(LLMOSINTAgent):
             
         # Initialize with tools
         super().__init__(config=config, tools=tools)
-        self.tool_manager = ToolManager() if not tools else get_global_tool_manager()
+        self.tool_manager = tool_module.ToolManager() if not tools else tool_module.get_global_tool_manager()
         self.supported_search_engines = [
             "google", "bing", "duckduckgo", "yahoo", "yandex"
         ]
@@ -69,6 +75,7 @@ class SurfaceWebCollectorAgent(LLMOSINTAgent):
             "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         )
         self.request_delay = 1.0  # Delay between requests to avoid rate limiting
+        self.progress_sink = progress_sink
     
     def _get_system_prompt(self) -> str:
         """
@@ -280,6 +287,7 @@ class SurfaceWebCollectorAgent(LLMOSINTAgent):
                     "status_code": response.status_code,
                     "content_type": response.headers.get("content-type", ""),
                     "content": content_data,
+                    "technologies": [match.name for match in get_fingerprinter().fingerprint(Page.from_response(response))],
                     "scraped_successfully": True
                 }
                 
@@ -295,12 +303,13 @@ class SurfaceWebCollectorAgent(LLMOSINTAgent):
                 "scraped_successfully": False
             }
     
-    async def collect_domain_info(self, domain: str) -> Dict[str, Any]:
+    async def collect_domain_info(self, domain: str, on_subdomain: Optional[SubdomainCallback] = None) -> Dict[str, Any]:
         """
         Collect real information about a domain using DNS lookups and web scraping.
         
         Args:
             domain: Domain name to investigate
+            on_subdomain: Optional coroutine called with each subdomain as it resolves
             
         Returns:
             Dictionary containing domain information
@@ -308,16 +317,19 @@ class SurfaceWebCollectorAgent(LLMOSINTAgent):
         self.logger.info(f"Collecting domain info for: {domain}")
         
         try:
+            # The homepage is fetched once and shared by technology detection and scraping
+            homepage = await self._fetch_homepage(domain)
+            
             # Perform real domain information collection
             domain_info = {
                 "domain": domain,
                 "timestamp": time.time(),
                 "whois_info": await self._get_whois_info(domain),
                 "dns_records": await self._get_dns_records(domain),
-                "subdomains": await self._discover_subdomains(domain),
-                "technologies": await self._detect_technologies(domain),
+                "subdomains": await self._discover_subdomains(domain, on_subdomain),
+                "technologies": await self._detect_technologies(domain, homepage),
                 "ssl_info": await self._get_ssl_certificate(domain),
-                "domain_data": await self._scrape_domain_data(domain)
+                "domain_data": await self._scrape_domain_data(domain, homepage)
             }
             
             collection_data = {
@@ -409,7 +421,7 @@ class SurfaceWebCollectorAgent(LLMOSINTAgent):
             domains = task.get("domains", [])
             
             for domain in domains:
-                result = await self.collect_domain_info(domain)
+                result = await self.collect_domain_info(domain, self._subdomain_reporter(domain))
                 results.append(result)
                 await asyncio.sleep(self.request_delay)
         
@@ -422,6 +434,25 @@ class SurfaceWebCollectorAgent(LLMOSINTAgent):
             "status": "completed"
         }
 
+    def _subdomain_reporter(self, domain: str) -> Optional[SubdomainCallback]:
+        """Callback streaming each resolved subdomain of ``domain`` to the progress sink."""
+        if self.progress_sink is None:
+            return None
+        
+        async def report(result: SubdomainResult):
+            try:
+                await self.progress_sink("subdomain_found", {
+                    "agent_id": self.config.agent_id,
+                    "domain": domain,
+                    "subdomain": result.name,
+                    "addresses": result.addresses
+                })
+            except Exception as e:
+                # A failing sink must not stop the enumeration
+                self.logger.warning(f"Progress sink failed for {result.name}: {e}")
+        
+        return report
+
     async def _use_smart_scraper_tool(self, url: str, user_prompt: str) -> Dict[str, Any]:
         """
         Use the smart scraper tool to extract data from a website.
@@ -536,48 +567,57 @@ class SurfaceWebCollectorAgent(LLMOSINTAgent):
                 "tool_used": "markdownify"
             }
     
-    async def _scrape_domain_data(self, domain: str) -> Dict[str, Any]:
-        """Scrape additional domain data from the website."""
+    async def _fetch_homepage(self, domain: str) -> Optional[Page]:
+        """Fetch https://<domain>, following redirects; None if unreachable."""
+        try:
+            async with httpx.AsyncClient(timeout=15.0, follow_redirects=True) as client:
+                response = await client.get(f"https://{domain}", headers={"User-Agent": self.user_agent})
+                return Page.from_response(response)
+        except Exception as e:
+            self.logger.debug(f"Homepage fetch failed for {domain}: {e}")
+            return None
+    
+    async def _scrape_domain_data(self, domain: str, page: Optional[Page] = None) -> Dict[str, Any]:
+        """Scrape additional domain data from the website (``page`` if already fetched)."""
         try:
             domain_data = {}
-            url = f"https://{domain}"
-            
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                response = await client.get(url)
-                if response.status_code == 200:
-                    html = response.text
-                    
-                    # Extract page title
-                    from bs4 import BeautifulSoup
-                    soup = BeautifulSoup(html, 'html.parser')
-                    title_tag = soup.find('title')
-                    if title_tag:
-                        domain_data["page_title"] = title_tag.get_text().strip()
-                    
-                    # Extract meta description
-                    meta_desc = soup.find('meta', attrs={'name': 'description'})
-                    if meta_desc:
-                        domain_data["meta_description"] = meta_desc.get('content', '')
-                    
-                    # Count pages/links
-                    links = soup.find_all('a', href=True)
-                    domain_data["internal_links"] = len([link for link in links 
-                                                    if domain in link.get('href', '')])
-                    domain_data["external_links"] = len([link for link in links 
-                                                    if domain not in link.get('href', '') and 
-                                                    link.get('href', '').startswith('http')])
-                    
-                    # Check for contact information
-                    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-                    emails = re.findall(email_pattern, html)
-                    if emails:
-                        domain_data["emails_found"] = list(set(emails))[:5]  # First 5 unique emails
-                    
-                    # Phone number pattern (basic)
-                    phone_pattern = r'\b(?:\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})\b'
-                    phones = re.findall(phone_pattern, html)
-                    if phones:
-                        domain_data["phones_found"] = [f"{p[0]}-{p[1]}-{p[2]}" for p in list(set(phones))[:3]]
+            if page is None:
+                page = await self._fetch_homepage(domain)
+            
+            if page is not None and page.status == 200:
+                html = page.html
+                
+                # Extract page title
+                from bs4 import BeautifulSoup
+                soup = BeautifulSoup(html, 'html.parser')
+                title_tag = soup.find('title')
+                if title_tag:
+                    domain_data["page_title"] = title_tag.get_text().strip()
+                
+                # Extract meta description
+                meta_desc = soup.find('meta', attrs={'name': 'description'})
+                if meta_desc:
+                    domain_data["meta_description"] = meta_desc.get('content', '')
+                
+                # Count pages/links
+                links = soup.find_all('a', href=True)
+                domain_data["internal_links"] = len([link for link in links 
+                                                if domain in link.get('href', '')])
+                domain_data["external_links"] = len([link for link in links 
+                                                if domain not in link.get('href', '') and 
+                                                link.get('href', '').startswith('http')])
+                
+                # Check for contact information
+                email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+                emails = re.findall(email_pattern, html)
+                if emails:
+                    domain_data["emails_found"] = list(set(emails))[:5]  # First 5 unique emails
+                
+                # Phone number pattern (basic)
+                phone_pattern = r'\b(?:\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})\b'
+                phones = re.findall(phone_pattern, html)
+                if phones:
+                    domain_data["phones_found"] = [f"{p[0]}-{p[1]}-{p[2]}" for p in list(set(phones))[:3]]
             
             domain_data["scrape_timestamp"] = time.time()
             return domain_data
@@ -656,15 +696,14 @@ class SurfaceWebCollectorAgent(LLMOSINTAgent):
         """Get real WHOIS information for domain."""
         try:
             # Use Python's whois library if available, otherwise use web scraping
-            import socket
             whois_info = {"status": "lookup_attempted"}
             
             # Basic domain registration check
-            try:
-                ip = socket.gethostbyname(domain)
+            ip = await get_dns_resolver().gethostbyname(domain)
+            if ip:
                 whois_info["resolves_to"] = ip
                 whois_info["status"] = "active"
-            except socket.gaierror:
+            else:
                 whois_info["status"] = "no_dns_resolution"
             
             # Try to get WHOIS data via web service
@@ -702,135 +741,44 @@ class SurfaceWebCollectorAgent(LLMOSINTAgent):
     async def _get_dns_records(self, domain: str) -> Dict[str, Any]:
         """Get real DNS records for domain."""
         try:
-            import socket
-            import subprocess
-            
-            dns_records = {}
+            records = await get_dns_resolver().resolve_many(domain, ["A", "AAAA", "MX", "NS", "TXT"])
             
-            # A record (IP address)
-            try:
-                ip = socket.gethostbyname(domain)
-                dns_records["A"] = [ip]
-            except socket.gaierror:
-                dns_records["A"] = []
-            
-            # Try to get additional DNS records using system commands
-            try:
-                # MX records
-                try:
-                    result = subprocess.run(['dig', 'MX', domain], capture_output=True, text=True, timeout=10)
-                    if result.returncode == 0:
-                        mx_records = []
-                        for line in result.stdout.split('\n'):
-                            if domain in line and 'MX' in line:
-                                parts = line.split()
-                                if len(parts) >= 5:
-                                    mx_records.append(parts[4])
-                        if mx_records:
-                            dns_records["MX"] = mx_records
-                except (subprocess.TimeoutExpired, FileNotFoundError):
-                    pass
-                
-                # NS records
-                try:
-                    result = subprocess.run(['dig', 'NS', domain], capture_output=True, text=True, timeout=10)
-                    if result.returncode == 0:
-                        ns_records = []
-                        for line in result.stdout.split('\n'):
-                            if domain in line and 'NS' in line:
-                                parts = line.split()
-                                if len(parts) >= 5:
-                                    ns_records.append(parts[4])
-                        if ns_records:
-                            dns_records["NS"] = ns_records
-                except (subprocess.TimeoutExpired, FileNotFoundError):
-                    pass
-                    
-            except Exception as e:
-                self.logger.debug(f"DNS lookup error for {domain}: {e}")
+            # A is always reported; other types only when present
+            dns_records = {"A": [record.value for record in records.pop("A")]}
+            for record_type, answers in records.items():
+                if answers:
+                    dns_records[record_type] = [record.value for record in answers]
             
             return dns_records
             
         except Exception as e:
             return {"error": f"DNS lookup failed: {str(e)}"}
     
-    async def _discover_subdomains(self, domain: str) -> List[str]:
-        """Discover subdomains using web search techniques."""
+    async def _discover_subdomains(self, domain: str, on_subdomain: Optional[SubdomainCallback] = None) -> List[str]:
+        """Discover subdomains by resolving a wordlist concurrently, streaming hits to ``on_subdomain``."""
         try:
-            subdomains = []
-            
-            # Common subdomain patterns
-            common_subdomains = [
-                "www", "mail", "api", "blog", "shop", "store", "admin",
-                "dev", "staging", "test", "app", "news", "support",
-                "help", "docs", "files", "media", "assets", "cdn",
-                "ftp", "ssh", "vpn", "remote", "portal", "dashboard"
-            ]
-            
-            # Test a few common subdomains
-            import socket
-            test_count = 0
-            for subdomain in common_subdomains[:10]:  # Limit to first 10 for speed
-                full_domain = f"{subdomain}.{domain}"
-                try:
-                    socket.gethostbyname(full_domain)
-                    subdomains.append(full_domain)
-                    test_count += 1
-                    if test_count >= 5:  # Limit to 5 found subdomains
-                        break
-                except socket.gaierror:
-                    continue
-            
-            return subdomains
+            enumerator = SubdomainEnumerator()
+            results = await enumerator.enumerate_all(
+                domain,
+                load_wordlist(settings.SUBDOMAIN_WORDLIST_PATH),
+                on_result=on_subdomain
+            )
+            self.logger.info(f"Subdomain enumeration for {domain}: {enumerator.last_stats.to_dict()}")
+            return [result.name for result in results]
             
         except Exception as e:
             self.logger.error(f"Subdomain discovery failed: {e}")
             return []
     
-    async def _detect_technologies(self, domain: str) -> List[str]:
-        """Detect technologies used by the domain."""
+    async def _detect_technologies(self, domain: str, page: Optional[Page] = None) -> List[str]:
+        """Detect technologies used by the domain (from ``page`` if already fetched)."""
         try:
-            technologies = []
-            url = f"https://{domain}"
-            
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                response = await client.get(url)
-                if response.status_code == 200:
-                    headers = dict(response.headers)
-                    html = response.text
-                    
-                    # Check server headers
-                    server = headers.get('server', '').lower()
-                    if 'nginx' in server:
-                        technologies.append('Nginx')
-                    elif 'apache' in server:
-                        technologies.append('Apache')
-                    elif 'iis' in server:
-                        technologies.append('IIS')
-                    
-                    # Check for common CMS and frameworks
-                    if 'wp-content' in html or 'wordpress' in html.lower():
-                        technologies.append('WordPress')
-                    elif 'drupal' in html.lower():
-                        technologies.append('Drupal')
-                    elif 'joomla' in html.lower():
-                        technologies.append('Joomla')
-                    
-                    # Check for JavaScript frameworks
-                    if 'react' in html.lower() or 'reactjs' in html.lower():
-                        technologies.append('React')
-                    elif 'vue' in html.lower() or 'vuejs' in html.lower():
-                        technologies.append('Vue.js')
-                    elif 'angular' in html.lower():
-                        technologies.append('Angular')
-                    
-                    # Check for analytics
-                    if 'google-analytics' in html or 'ga.js' in html:
-                        technologies.append('Google Analytics')
-                    elif 'facebook-pixel' in html or 'fbq(' in html:
-                        technologies.append('Facebook Pixel')
-            
-            return technologies
+            if page is None:
+                page = await self._fetch_homepage(domain)
+            if page is None or page.status != 200:
+                return []
+            
+            return [match.name for match in get_fingerprinter().fingerprint(page)]
             
         except Exception as e:
             self.logger.debug(f"Technology detection failed for {domain}: {e}")
@@ -839,41 +787,30 @@ class SurfaceWebCollectorAgent(LLMOSINTAgent):
     async def _get_ssl_certificate(self, domain: str) -> Dict[str, Any]:
         """Get SSL certificate information."""
         try:
-            import ssl
-            import socket
-            from datetime import datetime
+            result = await get_certificate_grabber().grab(domain, 443)
             
-            ssl_info = {}
-            
-            # Get SSL certificate
-            context = ssl.create_default_context()
-            try:
-                with socket.create_connection((domain, 443), timeout=10) as sock:
-                    with context.wrap_socket(sock, server_hostname=domain) as ssock:
-                        cert = ssock.getpeercert()
-                        
-                        ssl_info = {
-                            "issuer": dict(x[0] for x in cert.get('issuer', [])),
-                            "subject": dict(x[0] for x in cert.get('subject', [])),
-                            "version": cert.get('version'),
-                            "serial_number": cert.get('serialNumber'),
-                            "not_before": cert.get('notBefore'),
-                            "not_after": cert.get('notAfter'),
-                            "certificate_valid": True
-                        }
-                        
-                        # Check if certificate is expired
-                        if cert.get('notAfter'):
-                            expiry_date = datetime.strptime(cert['notAfter'], '%b %d %H:%M:%S %Y %Z')
-                            ssl_info["is_expired"] = expiry_date < datetime.now()
-                        
-            except (socket.timeout, socket.error, ssl.SSLError) as e:
-                ssl_info = {
-                    "error": f"SSL connection failed: {str(e)}",
+            if result.leaf is None:
+                return {
+                    "error": f"SSL connection failed: {result.error}",
                     "certificate_valid": False
                 }
             
-            return ssl_info
+            leaf = result.leaf
+            return {
+                "issuer": leaf.issuer,
+                "subject": leaf.subject,
+                "version": leaf.version,
+                "serial_number": leaf.serial_number,
+                "not_before": leaf.not_before.isoformat() if leaf.not_before else None,
+                "not_after": leaf.not_after.isoformat() if leaf.not_after else None,
+                "certificate_valid": result.verified,
+                "verification_error": result.verification_error,
+                "is_expired": leaf.is_expired,
+                "fingerprint_sha256": leaf.fingerprint_sha256,
+                "subject_alt_names": leaf.subject_alt_names,
+                "tls_version": result.tls_version,
+                "chain": [certificate.to_dict() for certificate in result.chain[1:]]
+            }
             
         except Exception as e:
             return {"error": f"SSL certificate lookup failed: {str(e)}"}
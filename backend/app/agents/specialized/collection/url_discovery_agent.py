@@ -14,6 +14,31 @@ import logging
 from pydantic import BaseModel
 
 from ...base.osint_agent import LLMOSINTAgent, AgentConfig, AgentResult
+from ...base.structured_output import extract_json_text, parse_json_lenient, StructuredOutputError
+from app.services.url_validator import get_url_validator
+from app.services.sitemap_discovery import get_sitemap_discovery
+
+# A domain named in the query: site:example.com, a URL, or a bare hostname
+DOMAIN_PATTERN = re.compile(
+    r"(site:|https?://)?((?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+([a-z]{2,63}))(?![a-z0-9-])",
+    re.IGNORECASE
+)
+
+# Bare hostnames must end in one of these; anything else ("vue.js", "report.pdf")
+# is only taken as a domain after site: or a scheme. ccTLDs that double as file
+# extensions (.py, .md, .sh, .rs, .pl, ...) are left out on purpose.
+BARE_DOMAIN_TLDS = {
+    "com", "org", "net", "edu", "gov", "mil", "int", "info", "biz", "name", "pro",
+    "io", "co", "ai", "app", "dev", "me", "tv", "xyz", "online", "site", "tech",
+    "store", "shop", "blog", "news", "cloud", "agency", "media", "global",
+    "us", "uk", "ca", "au", "nz", "ie", "de", "fr", "es", "it", "nl", "be", "ch",
+    "at", "se", "no", "dk", "fi", "pt", "gr", "cz", "hu", "ro", "bg", "ua",
+    "ru", "tr", "il", "ae", "sa", "in", "pk", "cn", "jp", "kr", "tw", "hk",
+    "sg", "my", "id", "th", "vn", "ph", "br", "ar", "mx", "cl", "pe", "za",
+    "ng", "ke", "eg", "eu",
+}
+
+QUERY_STOPWORDS = {"the", "and", "for", "from", "with", "site", "find", "all", "about", "pages", "urls", "http", "https", "www"}
 
 
 class URLResult(BaseModel):
@@ -153,16 +178,11 @@ Focus on quality over quantity. Better to provide 5 highly relevant URLs than 20
             # Clean and parse JSON output
             cleaned_output = self._clean_json_output(raw_output)
             
-            if cleaned_output.strip().startswith('{'):
-                structured_data = json.loads(cleaned_output)
-            else:
-                # Extract JSON from text
-                json_match = re.search(r'\{.*\}', cleaned_output, re.DOTALL)
-                if json_match:
-                    structured_data = json.loads(json_match.group())
-                else:
-                    # Fallback: generate real URLs using search service
-                    structured_data = self._generate_real_urls(query=getattr(self, 'last_query', 'search query'))
+            try:
+                structured_data = parse_json_lenient(cleaned_output, expect_json=True).data
+            except StructuredOutputError:
+                # Fallback: generate real URLs using search service
+                structured_data = self._generate_real_urls(query=getattr(self, 'last_query', 'search query'))
             
             # Validate and enhance the response
             return self._validate_and_enhance_urls(structured_data)
@@ -173,25 +193,7 @@ Focus on quality over quantity. Better to provide 5 highly relevant URLs than 20
     
     def _clean_json_output(self, raw_output: str) -> str:
         """Clean raw output to extract valid JSON."""
-        cleaned = raw_output.strip()
-        
-        # Remove markdown code blocks
-        if cleaned.startswith('```json'):
-            cleaned = cleaned[7:]
-        elif cleaned.startswith('```'):
-            cleaned = cleaned[3:]
-        
-        if cleaned.endswith('```'):
-            cleaned = cleaned[:-3]
-        
-        # Extract JSON content
-        first_brace = cleaned.find('{')
-        last_brace = cleaned.rfind('}')
-        
-        if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
-            cleaned = cleaned[first_brace:last_brace+1]
-        
-        return cleaned
+        return extract_json_text(raw_output, expect_json=True)
     
     def _generate_real_urls(self, query: str) -> Dict[str, Any]:
         """Generate real URLs using actual search services."""
@@ -392,7 +394,9 @@ Focus on quality over quantity. Better to provide 5 highly relevant URLs than 20
         search_query: str,
         max_results: int = 10,
         source_types: Optional[List[str]] = None,
-        exclude_domains: Optional[List[str]] = None
+        exclude_domains: Optional[List[str]] = None,
+        check_reachability: bool = False,
+        use_structured_discovery: bool = True
     ) -> List[URLResult]:
         """
         Discover URLs based on search query with advanced filtering.
@@ -402,6 +406,9 @@ Focus on quality over quantity. Better to provide 5 highly relevant URLs than 20
             max_results: Maximum number of results to return
             source_types: Optional filter for source types
             exclude_domains: Optional list of domains to exclude
+            check_reachability: Drop URLs that don't respond (shared, cached validator)
+            use_structured_discovery: For queries naming a domain, read its sitemaps and
+                feeds first and only prompt the LLM when they yield nothing
             
         Returns:
             List of URL results with relevance analysis
@@ -409,6 +416,13 @@ Focus on quality over quantity. Better to provide 5 highly relevant URLs than 20
         # Store query for fallback URL generation
         self.last_query = search_query
         
+        if use_structured_discovery:
+            url_results = await self.discover_structured_urls(search_query, max_results, exclude_domains, source_types)
+            if url_results:
+                if check_reachability:
+                    url_results = await self.check_reachability(url_results)
+                return url_results
+        
         # Prepare input for URL discovery
         input_data = {
             "search_query": search_query,
@@ -440,11 +454,121 @@ Focus on quality over quantity. Better to provide 5 highly relevant URLs than 20
                 )
                 url_results.append(url_result)
             
+            if check_reachability:
+                url_results = await self.check_reachability(url_results)
+            
             return url_results
         else:
             self.logger.error(f"URL discovery failed: {result.error_message}")
             return []
     
+    async def discover_structured_urls(
+        self,
+        search_query: str,
+        max_results: int = 10,
+        exclude_domains: Optional[List[str]] = None,
+        source_types: Optional[List[str]] = None
+    ) -> List[URLResult]:
+        """
+        Discover URLs for a domain-scoped query from the domain's sitemaps and feeds.
+        
+        URLs are ranked by how many query terms appear in their path or title,
+        then by last modification date. No LLM or search engine is involved.
+        Sitemap entries are "web" sources and feed entries "news".
+        
+        Args:
+            search_query: The search query; it must name a domain
+            max_results: Maximum number of results to return
+            exclude_domains: Optional list of domains to exclude
+            source_types: Optional filter for source types
+            
+        Returns:
+            List of URL results, empty when the query names no domain or the
+            domain publishes no sitemap or feed
+        """
+        match = self._find_domain(search_query)
+        if not match:
+            return []
+        domain = match.group(2).lower()
+        if any(domain == excluded or domain.endswith("." + excluded) for excluded in exclude_domains or []):
+            return []
+        
+        try:
+            discovery = await get_sitemap_discovery().discover(domain)
+        except Exception as e:
+            self.logger.warning(f"Structured discovery failed for {domain}: {e}")
+            return []
+        
+        remainder = (search_query[:match.start()] + " " + search_query[match.end():]).lower()
+        terms = [term for term in re.findall(r"[a-z0-9]{3,}", remainder) if term not in QUERY_STOPWORDS]
+        
+        scored = []
+        for found in discovery.urls:
+            source_type = "web" if found.source == "sitemap" else "news"
+            if source_types and source_type not in source_types:
+                continue
+            haystack = (found.url + " " + found.title).lower()
+            matched = sum(1 for term in terms if term in haystack)
+            if not terms:
+                score = 0.5
+            elif matched:
+                score = 0.5 + 0.5 * matched / len(terms)
+            else:
+                score = 0.3
+            scored.append((score, found.lastmod, source_type, found))
+        scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        
+        return [
+            URLResult(
+                url=found.url,
+                title=found.title,
+                relevance_score=round(score, 2),
+                source_type=source_type,
+                metadata={
+                    "confidence": 0.9,
+                    "reasoning": f"Listed in the site's {'sitemap' if found.source == 'sitemap' else found.source + ' feed'}",
+                    "discovered_by": self.config.agent_id,
+                    "discovery_method": "structured",
+                    "discovery_source": found.document,
+                    "lastmod": found.lastmod
+                }
+            )
+            for score, _, source_type, found in scored[:max_results]
+        ]
+    
+    @staticmethod
+    def _find_domain(search_query: str) -> Optional[re.Match]:
+        """First domain named in the query: any after site: or a scheme, bare ones with a known TLD."""
+        for match in DOMAIN_PATTERN.finditer(search_query):
+            if match.group(1) or match.group(3).lower() in BARE_DOMAIN_TLDS:
+                return match
+        return None
+    
+    async def check_reachability(self, urls: List[URLResult]) -> List[URLResult]:
+        """
+        Keep the URLs that respond, recording status and final URL in metadata.
+        
+        Uses the shared URL validator, so URLs already checked by other agents
+        or tools are answered from its cache.
+        
+        Args:
+            urls: List of URL results
+            
+        Returns:
+            The reachable URL results
+        """
+        checks = await get_url_validator().validate_many([url.url for url in urls])
+        reachable = []
+        for url_result, check in zip(urls, checks):
+            url_result.metadata.update({
+                "status_code": check.status_code,
+                "final_url": check.final_url,
+                "content_type": check.content_type
+            })
+            if check.valid:
+                reachable.append(url_result)
+        return reachable
+    
     async def analyze_url_relevance(
         self,
         urls: List[str],
@@ -92,19 +92,29 @@ def create_backend_scraping_tools():
     ) -> Dict[str, Any]:
         """Backend implementation of smart crawler tool."""
         try:
-            # For now, we'll implement a simple search-and-scrape pattern
-            # In a real implementation, the backend would handle proper crawling
-            search_and_scrape_result = await scraping_adapter.search_and_scrape(
-                query=website_url,  # Use the URL as a search query
-                max_results=max_pages,
-                scraping_prompt=user_prompt
+            from app.services.crawler import get_crawl_engine
+
+            crawl = await get_crawl_engine().crawl(
+                website_url, max_depth=max_depth, max_pages=max_pages, keep_html=True
             )
+            if not crawl.urls:
+                return {
+                    "success": False,
+                    "error": "No pages could be crawled",
+                    "pages_crawled": 0,
+                    "starting_url": website_url,
+                    "crawl": crawl.to_dict()
+                }
+
+            # Extract from the pages the crawl already fetched instead of downloading them again
+            scrape_result = await scraping_adapter.extract_pages(crawl.documents, user_prompt)
             return {
-                "success": search_and_scrape_result.get("success", False),
-                "data": search_and_scrape_result.get("results", []),
-                "pages_crawled": len(search_and_scrape_result.get("results", [])),
+                "success": scrape_result.get("success", False),
+                "data": scrape_result.get("results", []),
+                "pages_crawled": len(crawl.urls),
                 "starting_url": website_url,
-                "error": search_and_scrape_result.get("error") if not search_and_scrape_result.get("success") else None
+                "discovered_urls": crawl.urls,
+                "error": scrape_result.get("error") if not scrape_result.get("success") else None
             }
         except Exception as e:
             logger.error(f"Error in backend smart crawler: {e}")
@@ -171,16 +181,10 @@ def create_backend_scraping_tools():
     async def backend_validate_urls(urls: List[str]) -> Dict[str, Any]:
         """Backend implementation of URL validation tool."""
         try:
-            results = []
-            for url in urls:
-                # In a real implementation, the adapter would have a validate_url method
-                # For now, we'll assume all URLs are valid
-                results.append({
-                    "url": url,
-                    "valid": True,
-                    "status_code": 200,
-                    "final_url": url
-                })
+            from app.services.url_validator import get_url_validator
+            
+            checks = await get_url_validator().validate_many(urls)
+            results = [check.to_dict() for check in checks]
             
             return {
                 "urls_checked": len(urls),
@@ -285,32 +289,23 @@ def create_real_tools():
         max_depth: int = 2,
         max_pages: int = 5
     ) -> Dict[str, Any]:
-        """Real implementation of smart crawler tool using enhanced scraping service."""
+        """Real implementation of smart crawler tool using the crawl engine."""
         try:
-            crawler_service = EnhancedScrapingService()
-            
-            # Start crawling from the initial URL
-            crawled_urls = await crawler_service.crawl_website(
-                start_url=website_url,
-                max_depth=max_depth,
-                max_pages=max_pages
+            from app.services.crawler import get_crawl_engine
+
+            # Crawl from the initial URL (robots.txt and per-host politeness apply)
+            crawl = await get_crawl_engine().crawl(
+                website_url, max_depth=max_depth, max_pages=max_pages, keep_html=True
             )
+            crawled_urls = crawl.urls
             
-            # Scrape each discovered URL
+            # Extract from the HTML the crawl already fetched; no page is downloaded twice
             scraping_service = LocalScrapingService()
-            crawled_data = []
-            
-            for url in crawled_urls[:max_pages]:
-                results = await scraping_service.execute_pipeline(
-                    urls=[url],
-                    schema=None,
-                    prompt=user_prompt
-                )
-                if results and results[0]['success']:
-                    crawled_data.append(results[0]['data'])
+            results = await scraping_service.extract_from_html(crawl.documents, schema=None, prompt=user_prompt)
+            crawled_data = [result['data'] for result in results if result.get('success')]
             
             return {
-                "success": True,
+                "success": bool(crawled_urls),
                 "data": crawled_data,
                 "pages_crawled": len(crawled_data),
                 "starting_url": website_url,
@@ -425,40 +420,19 @@ def create_real_tools():
     async def real_validate_urls(urls: List[str]) -> Dict[str, Any]:
         """Real implementation of URL validation using actual HTTP requests."""
         try:
-            import aiohttp
-            import asyncio
+            from app.services.url_validator import get_url_validator
             
-            async def validate_single_url(session, url):
-                try:
-                    async with session.get(url, timeout=10, allow_redirects=True) as response:
-                        return {
-                            "url": url,
-                            "valid": response.status < 400,
-                            "status_code": response.status,
-                            "final_url": str(response.url),
-                            "content_type": response.headers.get('content-type', ''),
-                            "content_length": response.headers.get('content-length', '0')
-                        }
-                except Exception as e:
-                    return {
-                        "url": url,
-                        "valid": False,
-                        "status_code": None,
-                        "final_url": url,
-                        "error": str(e)
-                    }
+            # Shared, cached HEAD-first probing (no page downloads)
+            checks = await get_url_validator().validate_many(urls)
+            results = [check.to_dict() for check in checks]
             
-            async with aiohttp.ClientSession() as session:
-                tasks = [validate_single_url(session, url) for url in urls]
-                results = await asyncio.gather(*tasks)
-                
-                valid_count = sum(1 for r in results if r['valid'])
-                
-                return {
-                    "urls_checked": len(urls),
-                    "valid_urls": valid_count,
-                    "results": results
-                }
+            valid_count = sum(1 for r in results if r['valid'])
+            
+            return {
+                "urls_checked": len(urls),
+                "valid_urls": valid_count,
+                "results": results
+            }
         except Exception as e:
             logger.error(f"Real URL validation failed: {e}")
             return {
@@ -1,5 +1,5 @@
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import aiohttp
 from bs4 import BeautifulSoup
 import logging
@@ -37,38 +37,7 @@ class DirectScrapingClient:
             async with self.session.get(url, headers=headers) as response:
                 if response.status == 200:
                     content = await response.text()
-                    soup = BeautifulSoup(content, 'html.parser')
-                    
-                    # Extract basic content
-                    title = soup.find('title')
-                    title_text = title.get_text().strip() if title else ""
-                    
-                    # Extract main content (common selectors)
-                    content_selectors = [
-                        'main', 'article', '[role="main"]', 
-                        '.content', '.main-content', '#content'
-                    ]
-                    
-                    main_content = ""
-                    for selector in content_selectors:
-                        element = soup.select_one(selector)
-                        if element:
-                            main_content = element.get_text().strip()
-                            break
-                    
-                    # Fallback to body if no main content found
-                    if not main_content:
-                        body = soup.find('body')
-                        if body:
-                            main_content = body.get_text().strip()
-                    
-                    return {
-                        "success": True,
-                        "url": url,
-                        "title": title_text,
-                        "content": main_content[:5000],  # Limit content length
-                        "status_code": response.status
-                    }
+                    return self.extract_page(url, content, response.status)
                 else:
                     return {
                         "success": False,
@@ -84,6 +53,42 @@ class DirectScrapingClient:
                 "error": str(e)
             }
     
+    @staticmethod
+    def extract_page(url: str, content: str, status_code: int = 200) -> Dict[str, Any]:
+        """Extract the title and main text of an already fetched page"""
+        soup = BeautifulSoup(content, 'html.parser')
+        
+        # Extract basic content
+        title = soup.find('title')
+        title_text = title.get_text().strip() if title else ""
+        
+        # Extract main content (common selectors)
+        content_selectors = [
+            'main', 'article', '[role="main"]', 
+            '.content', '.main-content', '#content'
+        ]
+        
+        main_content = ""
+        for selector in content_selectors:
+            element = soup.select_one(selector)
+            if element:
+                main_content = element.get_text().strip()
+                break
+        
+        # Fallback to body if no main content found
+        if not main_content:
+            body = soup.find('body')
+            if body:
+                main_content = body.get_text().strip()
+        
+        return {
+            "success": True,
+            "url": url,
+            "title": title_text,
+            "content": main_content[:5000],  # Limit content length
+            "status_code": status_code
+        }
+    
     async def scrape_urls(self, urls: List[str]) -> List[Dict[str, Any]]:
         """Scrape multiple URLs concurrently"""
         tasks = [self.scrape_url(url) for url in urls]
@@ -119,41 +124,57 @@ class BackendScrapingAdapter:
         """
         async with self.client as client:
             results = await client.scrape_urls(urls)
+        return self._summarize(results, prompt, len(urls))
+    
+    async def extract_pages(self, pages: List[Tuple[str, str]], prompt: str) -> Dict[str, Any]:
+        """
+        Extract (url, html) pages that were already fetched, e.g. by the crawl engine
+        """
+        results = []
+        for url, content in pages:
+            try:
+                results.append(DirectScrapingClient.extract_page(url, content))
+            except Exception as e:
+                logger.error(f"Error extracting {url}: {str(e)}")
+                results.append({"success": False, "url": url, "error": str(e)})
+        return self._summarize(results, prompt, len(pages))
+    
+    @staticmethod
+    def _summarize(results: List[Dict[str, Any]], prompt: str, total_urls: int) -> Dict[str, Any]:
+        # Filter successful results
+        successful_results = [r for r in results if r.get("success")]
+        failed_results = [r for r in results if not r.get("success")]
+        
+        if not successful_results:
+            return {
+                "success": False,
+                "error": f"All scraping attempts failed: {[r.get('error', 'Unknown error') for r in failed_results]}",
+                "data": None
+            }
+        
+        # Apply prompt-based filtering (simple keyword matching)
+        if prompt:
+            prompt_keywords = prompt.lower().split()
+            filtered_results = []
             
-            # Filter successful results
-            successful_results = [r for r in results if r.get("success")]
-            failed_results = [r for r in results if not r.get("success")]
-            
-            if not successful_results:
-                return {
-                    "success": False,
-                    "error": f"All scraping attempts failed: {[r.get('error', 'Unknown error') for r in failed_results]}",
-                    "data": None
-                }
-            
-            # Apply prompt-based filtering (simple keyword matching)
-            if prompt:
-                prompt_keywords = prompt.lower().split()
-                filtered_results = []
-                
-                for result in successful_results:
-                    content = result.get("content", "").lower()
-                    title = result.get("title", "").lower()
-                    
-                    # Check if any prompt keywords are in the content
-                    if any(keyword in content or keyword in title for keyword in prompt_keywords):
-                        filtered_results.append(result)
+            for result in successful_results:
+                content = result.get("content", "").lower()
+                title = result.get("title", "").lower()
                 
-                successful_results = filtered_results
+                # Check if any prompt keywords are in the content
+                if any(keyword in content or keyword in title for keyword in prompt_keywords):
+                    filtered_results.append(result)
             
-            return {
-                "success": True,
-                "results": successful_results,
-                "data": successful_results,
-                "total_urls": len(urls),
-                "successful_scrapes": len(successful_results),
-                "failed_scrapes": len(failed_results)
-            }
+            successful_results = filtered_results
+        
+        return {
+            "success": True,
+            "results": successful_results,
+            "data": successful_results,
+            "total_urls": total_urls,
+            "successful_scrapes": len(successful_results),
+            "failed_scrapes": len(failed_results)
+        }
     
     async def search_and_scrape(self, query: str, max_results: int = 5, scraping_prompt: str = "") -> Dict[str, Any]:
         """
@@ -29,8 +29,12 @@ from app.services.websocket import ConnectionManager
 from app.services.enhanced_websocket import enhanced_manager as enhanced_connection_manager
 from app.services.task_storage import task_storage
 
-# Import premium search agent
-from app.agents.specialized.collection.premium_search_agent import PremiumSearchAgent
+from app.utils.lazy_import import lazy_attribute
+
+# Premium search agent (and its scraping stack) loads on the first search request
+PremiumSearchAgent = lazy_attribute(
+    "app.agents.specialized.collection.premium_search_agent", "PremiumSearchAgent"
+)
 
 # Initialize the router
 router = APIRouter(prefix="", tags=["osint"])
@@ -670,6 +674,12 @@ async def get_agent_performance(agent_id: str):
     return performance
 
 
+@router.get("/ws/metrics")
+async def get_websocket_metrics() -> Dict[str, Any]:
+    """Outbound queue depth, drop and coalescing counters for this worker."""
+    return enhanced_connection_manager.get_queue_metrics()
+
+
 @router.websocket("/ws/{investigation_id}")
 async def investigation_websocket(websocket: WebSocket, investigation_id: str):
     """WebSocket endpoint for real-time investigation updates."""
@@ -681,7 +691,12 @@ async def investigation_websocket(websocket: WebSocket, investigation_id: str):
             # Listen for messages (though for OSINT, most updates will be server-initiated)
             data = await websocket.receive_json()
             # Process any client commands if needed
-            response = {"type": "ack", "message": "Command received"}
+            if data.get("type") in ("progress_subscribe", "progress_resync"):
+                response = await enhanced_connection_manager.process_message(
+                    f"investigation_{investigation_id}", user_id, data
+                )
+            else:
+                response = {"type": "ack", "message": "Command received"}
             await enhanced_connection_manager._send_safe(websocket, response)
     except WebSocketDisconnect:
         enhanced_connection_manager.disconnect(websocket, f"investigation_{investigation_id}", user_id)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, HttpUrl, conlist
 from typing import List, Dict, Optional
 import asyncio
 import uuid
@@ -8,6 +8,7 @@ import logging
 from app.services.scrapegraph import ScrapingService
 from app.services.llm_integration import get_llm_service
 from app.services.task_storage import task_storage
+from app.services.url_validator import get_url_validator
 from app.config import settings
 
 router = APIRouter()
@@ -126,23 +127,18 @@ async def get_scraping_results(task_id: str):
 @router.post("/validate-url")
 async def validate_url(url: HttpUrl):
     """Validate if a URL is accessible."""
-    try:
-        import httpx
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.head(str(url), follow_redirects=True)
-            
-            return {
-                "url": str(url),
-                "valid": response.status_code < 400,
-                "status_code": response.status_code,
-                "content_type": response.headers.get("content-type", "")
-            }
-    except Exception as e:
-        return {
-            "url": str(url),
-            "valid": False,
-            "error": str(e)
-        }
+    check = await get_url_validator().validate(str(url))
+    return check.to_dict()
+
+@router.post("/validate-urls")
+async def validate_urls(urls: conlist(HttpUrl, min_length=1, max_length=settings.URL_VALIDATION_MAX_BATCH)):
+    """Validate a batch of up to URL_VALIDATION_MAX_BATCH URLs concurrently."""
+    checks = await get_url_validator().validate_many([str(url) for url in urls])
+    return {
+        "urls_checked": len(checks),
+        "valid_urls": sum(1 for check in checks if check.valid),
+        "results": [check.to_dict() for check in checks]
+    }
 
 @router.post("/preview")
 async def preview_scraping(url: HttpUrl, selector: Optional[str] = None):
@@ -27,13 +27,90 @@ class Settings(BaseSettings):
     
     # Local scraping flag
     USE_LOCAL_SCRAPING: bool = True
+
+    # Content-addressed storage for large scraped content ("" = backend/data/blobs)
+    BLOB_STORE_PATH: str = ""
+    BLOB_OFFLOAD_MIN_BYTES: int = 4096
+    # Swept hourly by the cleanup task; 0 disables a limit
+    BLOB_STORE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024
+    BLOB_STORE_MAX_AGE: int = 30 * 24 * 3600
     
     # Database
     DATABASE_URL: str = "sqlite:///./scrapecraft.db"
     
     # Redis
     REDIS_URL: str = "redis://redis:6379/0"
-    
+
+    # Serialization codec for state, cache and sync payloads ("auto" = orjson if installed)
+    SERIALIZATION_CODEC: Literal["auto", "json", "orjson", "msgpack"] = "auto"
+
+    # Async DNS resolver (empty nameserver list = read /etc/resolv.conf)
+    DNS_NAMESERVERS: list[str] = []
+    DNS_TIMEOUT: float = 2.0
+    DNS_ATTEMPTS: int = 2
+    DNS_MAX_INFLIGHT: int = 256
+    DNS_NEGATIVE_TTL: int = 300
+    DNS_CACHE_SIZE: int = 10000
+
+    # Subdomain enumeration (empty wordlist path = built-in list)
+    SUBDOMAIN_WORDLIST_PATH: str = ""
+    SUBDOMAIN_CONCURRENCY: int = 256
+
+    # TLS certificate collection
+    TLS_TIMEOUT: float = 10.0
+    TLS_MAX_CONCURRENCY: int = 50
+    TLS_CACHE_TTL: int = 3600
+
+    # RDAP/WHOIS lookups (empty cache path = backend/data/whois_cache.db)
+    WHOIS_CACHE_PATH: str = ""
+    WHOIS_CACHE_MAX_AGE: int = 604800  # 7 days
+    WHOIS_NEGATIVE_MAX_AGE: int = 86400
+    RDAP_BOOTSTRAP_MAX_AGE: int = 604800
+    RDAP_MAX_CONCURRENCY_PER_SERVER: int = 4
+
+    # Local IP -> ASN index (empty paths = backend/data/ip2asn-combined.tsv.gz and backend/data/ip2asn.idx)
+    IP_INTEL_DATASET_PATH: str = ""
+    IP_INTEL_INDEX_PATH: str = ""
+
+    # Technology fingerprinting (JSON list of extra signatures, same fields as the built-in ones)
+    TECH_SIGNATURES_PATH: str = ""
+
+    # Shared URL validation (HEAD-first probing, cached)
+    URL_VALIDATION_TIMEOUT: float = 10.0
+    URL_VALIDATION_MAX_REDIRECTS: int = 5
+    URL_VALIDATION_CONCURRENCY: int = 50
+    URL_VALIDATION_PER_HOST: int = 6
+    URL_VALIDATION_CACHE_TTL: int = 900
+    URL_VALIDATION_MAX_BATCH: int = 100
+
+    # Crawl engine behind the smart_crawler tools (robots.txt Crawl-delay overrides the per-host delay)
+    CRAWLER_CONCURRENCY: int = 8
+    CRAWLER_PER_HOST: int = 2
+    CRAWLER_PER_HOST_DELAY: float = 0.5
+    CRAWLER_TIMEOUT: float = 15.0
+    CRAWLER_ROBOTS_TTL: int = 3600
+    CRAWLER_MAX_PAGE_BYTES: int = 2000000
+
+    # Sitemap/RSS/Atom discovery for domain-scoped URL discovery
+    SITEMAP_DISCOVERY_TIMEOUT: float = 15.0
+    SITEMAP_DISCOVERY_MAX_URLS: int = 5000
+    SITEMAP_DISCOVERY_MAX_SITEMAPS: int = 20
+    SITEMAP_DISCOVERY_CACHE_TTL: int = 3600
+    SITEMAP_DISCOVERY_EMPTY_TTL: int = 300
+
+    # WebSocket fan-out across workers ("memory" only reaches this process)
+    WEBSOCKET_BACKPLANE: Literal["memory", "redis"] = "memory"
+    WEBSOCKET_BACKPLANE_PREFIX: str = "scrapecraft:ws"
+
+    # Per-connection outbound queues
+    WEBSOCKET_SEND_QUEUE_SIZE: int = 256
+    WEBSOCKET_SEND_TIMEOUT: float = 10.0
+    WEBSOCKET_SLOW_CONSUMER_POLICY: Literal["downgrade", "drop"] = "downgrade"
+
+    # Delta-encoded progress updates (max updates per second per stream)
+    WEBSOCKET_PROGRESS_MAX_RATE: float = 4.0
+    WEBSOCKET_PROGRESS_HISTORY: int = 200
+
     # Security
     JWT_SECRET: str = "default-secret-change-in-production"
     JWT_ALGORITHM: str = "HS256"
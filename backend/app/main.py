@@ -13,6 +13,7 @@ from app.api import pipelines, scraping, execution, workflow, osint, ai_investig
 from app.services.websocket import ConnectionManager
 from app.services.workflow_manager import get_workflow_manager
 from app.services.task_storage import task_storage
+from app.services.blob_store import get_blob_store
 
 # Initialize logging
 logging.basicConfig(level=logging.INFO)
@@ -91,6 +92,11 @@ async def lifespan(app: FastAPI):
     except asyncio.CancelledError:
         pass
     
+    try:
+        await manager.shutdown()
+    except Exception as e:
+        logger.error(f"Error stopping WebSocket backplane: {e}")
+    
     try:
         if task_storage.redis_client:
             await task_storage.disconnect()
@@ -103,6 +109,8 @@ async def periodic_cleanup():
     while True:
         try:
             await manager.cleanup_stale_connections()
+            # Bounds the blob store; sweeps at most once per sweep_interval
+            await get_blob_store().sweep_async()
             await asyncio.sleep(300)  # Run every 5 minutes
         except asyncio.CancelledError:
             break
@@ -266,13 +274,11 @@ async def websocket_endpoint(websocket: WebSocket, pipeline_id: str):
             
             # Update connection metadata for ping messages
             if data.get("type") == "ping":
-                connection_id = f"{pipeline_id}_{id(websocket)}"
-                if connection_id in manager.connection_metadata:
-                    manager.connection_metadata[connection_id]["last_ping"] = datetime.utcnow()
+                manager.touch_connection(websocket, pipeline_id)
             
             try:
                 # Process the message through the agent
-                response = await manager.process_message(pipeline_id, data)
+                response = await manager.process_message(pipeline_id, data, websocket)
                 await manager.send_personal_message(response, websocket)
             except Exception as processing_error:
                 logger.error(f"Message processing error: {processing_error}")
@@ -4,21 +4,25 @@ Services Module
 Contains various services for the ScrapeCraft backend.
 """
 
-# Agent structure migration is complete - re-enable LangGraph workflow imports
-from .graph import (
-    OSINTWorkflow, 
-    create_osint_workflow,
-    objective_definition_node,
-    strategy_formulation_node,
-    search_coordination_node,
-    data_collection_node,
-    data_fusion_node,
-    pattern_recognition_node,
-    contextual_analysis_node,
-    intelligence_synthesis_node,
-    quality_assurance_node,
-    report_generation_node
-)
+from app.utils.lazy_import import lazy_exports
+
+# The LangGraph workflow (and every agent behind it) resolves on first
+# access, so importing any app.services submodule stays cheap.
+_LAZY_EXPORTS = {
+    "OSINTWorkflow": ".graph",
+    "create_osint_workflow": ".graph",
+    "objective_definition_node": ".graph",
+    "strategy_formulation_node": ".graph",
+    "search_coordination_node": ".graph",
+    "data_collection_node": ".graph",
+    "data_fusion_node": ".graph",
+    "pattern_recognition_node": ".graph",
+    "contextual_analysis_node": ".graph",
+    "intelligence_synthesis_node": ".graph",
+    "quality_assurance_node": ".graph",
+    "report_generation_node": ".graph",
+}
+
 from .state import InvestigationState
 
 # Basic services that should work
@@ -28,6 +32,8 @@ from .websocket import ConnectionManager
 # File-based task storage (re-enabled with file-based fallback)
 from .task_storage import task_storage
 
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY_EXPORTS, globals())
+
 __all__ = [
     "OSINTWorkflow",
     "create_osint_workflow", 
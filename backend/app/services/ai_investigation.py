@@ -10,6 +10,8 @@ import uuid
 from datetime import datetime
 from typing import Any
 
+from app.services.result_store import materialize_results
+
 logger = logging.getLogger(__name__)
 
 class InvestigationRequest:
@@ -94,8 +96,7 @@ class AIInvestigationService:
         """Broadcast investigation updates via WebSocket"""
         if self.websocket_manager:
             try:
-                message = {
-                    "type": "investigation:updated",
+                state = {
                     "investigation_id": investigation_id,
                     "status": investigation_data.get("status"),
                     "current_phase": investigation_data.get("current_phase"),
@@ -107,7 +108,10 @@ class AIInvestigationService:
                     "insights_count": len(investigation_data.get("insights", []))
                 }
                 
-                await self.websocket_manager.broadcast(f"investigation_{investigation_id}", message)
+                # Sent as throttled deltas to subscribed dashboards, full state to others
+                await self.websocket_manager.publish_progress(
+                    f"investigation_{investigation_id}", "investigation:updated", state
+                )
                 self.logger.debug(f"Broadcasted update for investigation {investigation_id}")
             except Exception as e:
                 self.logger.error(f"Failed to broadcast WebSocket update: {e}")
@@ -217,7 +221,8 @@ class AIInvestigationService:
             "updated_at": investigation["updated_at"],
             "phases_completed": investigation["phases_completed"],
             "errors": investigation["errors"],
-            "results": investigation.get("results", {})
+            # Stored states restore result tables; responses need plain lists of dicts
+            "results": materialize_results(investigation.get("results", {}))
         }
 
     async def approve_phase(self, investigation_id: str, phase: str) -> dict[str, Any]:
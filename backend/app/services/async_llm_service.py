@@ -8,6 +8,7 @@ This service provides production-ready async LLM interactions with:
 - Performance monitoring and metrics
 - Adaptive retry logic with exponential backoff
 - Rate limiting and throttling
+- Adaptive (AIMD) concurrency limits persisted across restarts
 """
 
 import asyncio
@@ -20,6 +21,7 @@ from datetime import datetime, timedelta
 import json
 from contextlib import asynccontextmanager
 from collections import deque, defaultdict
+from pathlib import Path
 import weakref
 
 from langchain_core.language_models.base import BaseLanguageModel
@@ -48,6 +50,9 @@ class ProviderConfig:
     backoff_factor: float = 2.0
     rate_limit_per_minute: int = 60
     weight: float = 1.0  # For load balancing
+    adaptive_concurrency: bool = True
+    min_concurrent: int = 1
+    max_concurrent_limit: int = 64  # Ceiling for adaptive growth
 
 @dataclass
 class RequestMetrics:
@@ -147,13 +152,188 @@ class RateLimiter:
             await asyncio.sleep(0.1)
         return False
 
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency limit that adapts to observed provider latency (AIMD).
+    
+    The limit grows additively (about +1 per window of successful requests)
+    while latency stays close to the best latency seen, and shrinks
+    multiplicatively on throttling (HTTP 429), timeouts, or when smoothed
+    latency inflates past ``latency_tolerance`` times the baseline.
+    
+    Exposes ``_value`` (available permits) like ``asyncio.Semaphore`` so
+    load calculations written against a semaphore keep working.
+    """
+    
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        latency_tolerance: float = 2.0,
+        backoff_ratio: float = 0.5,
+        smoothing: float = 0.2
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.latency_tolerance = latency_tolerance
+        self.backoff_ratio = backoff_ratio
+        self.smoothing = smoothing
+        self.in_flight = 0
+        self.baseline_latency: Optional[float] = None
+        self.smoothed_latency: Optional[float] = None
+        self.increases = 0
+        self.decreases = 0
+        self._condition = asyncio.Condition()
+    
+    @property
+    def current_limit(self) -> int:
+        return int(self.limit)
+    
+    @property
+    def _value(self) -> int:
+        return max(0, self.current_limit - self.in_flight)
+    
+    async def acquire(self):
+        """Wait until an in-flight slot is free under the current limit."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.current_limit)
+            self.in_flight += 1
+    
+    async def release(self):
+        async with self._condition:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._condition.notify_all()
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.release()
+    
+    def on_success(self, latency: float):
+        """Record a successful request and its latency."""
+        if self.smoothed_latency is None:
+            self.smoothed_latency = latency
+        else:
+            self.smoothed_latency += self.smoothing * (latency - self.smoothed_latency)
+        
+        if self.baseline_latency is None or latency < self.baseline_latency:
+            self.baseline_latency = latency
+        else:
+            # Let the baseline drift up slowly so a permanently slower
+            # provider does not look inflated forever
+            self.baseline_latency += 0.01 * (latency - self.baseline_latency)
+        
+        if self.smoothed_latency > self.baseline_latency * self.latency_tolerance:
+            self._decrease(0.9)
+        elif self.in_flight >= self.current_limit - 1:
+            # Only grow when the current limit is actually being used
+            self._increase(1.0 / self.limit)
+    
+    def on_throttle(self):
+        """Record a 429 / rate-limit response from the provider."""
+        self._decrease(self.backoff_ratio)
+    
+    def on_timeout(self):
+        """Record a request timeout."""
+        self._decrease(self.backoff_ratio)
+    
+    def _increase(self, amount: float):
+        previous = self.current_limit
+        self.limit = min(float(self.max_limit), self.limit + amount)
+        if self.current_limit > previous:
+            self.increases += 1
+            logger.debug(f"Concurrency limit raised to {self.current_limit}")
+    
+    def _decrease(self, ratio: float):
+        previous = self.current_limit
+        self.limit = max(float(self.min_limit), self.limit * ratio)
+        if self.current_limit < previous:
+            self.decreases += 1
+            logger.info(f"Concurrency limit lowered to {self.current_limit}")
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """State to persist and report in metrics."""
+        return {
+            "limit": round(self.limit, 3),
+            "in_flight": self.in_flight,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "baseline_latency": self.baseline_latency,
+            "smoothed_latency": self.smoothed_latency,
+            "increases": self.increases,
+            "decreases": self.decreases
+        }
+    
+    def restore(self, state: Dict[str, Any]):
+        """Restore a persisted limit, clamped to the configured bounds."""
+        limit = state.get("limit")
+        if isinstance(limit, (int, float)):
+            self.limit = min(max(float(limit), self.min_limit), self.max_limit)
+        self.baseline_latency = state.get("baseline_latency")
+        self.smoothed_latency = state.get("smoothed_latency")
+
+class ConcurrencyLimitStore:
+    """File-based persistence for adaptive provider limits."""
+    
+    def __init__(self, storage_path: Optional[str] = None):
+        if storage_path is None:
+            backend_dir = Path(__file__).parent.parent.parent
+            storage_path = backend_dir / "data" / "llm_concurrency_limits.json"
+        self.storage_path = Path(storage_path)
+    
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.storage_path, 'r') as f:
+                return json.load(f).get("providers", {})
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Failed to load concurrency limits: {e}")
+            return {}
+    
+    def save(self, providers: Dict[str, Dict[str, Any]]) -> bool:
+        tmp_path = self.storage_path.with_suffix(".tmp")
+        try:
+            self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    "providers": providers,
+                    "updated_at": datetime.utcnow().isoformat()
+                }, f)
+            tmp_path.replace(self.storage_path)
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to save concurrency limits: {e}")
+            # Don't leave a half-written file behind
+            tmp_path.unlink(missing_ok=True)
+            return False
+
+def _is_throttle_error(error: Exception) -> bool:
+    """Check whether a provider error signals rate limiting (HTTP 429)."""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if status == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "too many requests" in message
+
 class AsyncLLMProvider:
     """Async wrapper for LLM providers with connection pooling."""
     
     def __init__(self, config: ProviderConfig):
         self.config = config
         self.llm_instance: Optional[BaseLanguageModel] = None
-        self.semaphore = asyncio.Semaphore(config.max_concurrent)
+        if config.adaptive_concurrency:
+            self.semaphore = AdaptiveConcurrencyLimiter(
+                initial_limit=config.max_concurrent,
+                min_limit=config.min_concurrent,
+                max_limit=config.max_concurrent_limit
+            )
+        else:
+            self.semaphore = asyncio.Semaphore(config.max_concurrent)
         self.circuit_breaker = CircuitBreaker()
         self.rate_limiter = RateLimiter(config.rate_limit_per_minute)
         self.metrics = RequestMetrics()
@@ -210,6 +390,12 @@ class AsyncLLMProvider:
         self._last_health_check = datetime.utcnow()
         return self._is_healthy
     
+    def get_concurrency_limit(self) -> int:
+        """Current in-flight request limit."""
+        if isinstance(self.semaphore, AdaptiveConcurrencyLimiter):
+            return self.semaphore.current_limit
+        return self.config.max_concurrent
+    
     async def execute_request(self, messages: List[BaseMessage], timeout: float) -> Any:
         """Execute LLM request with all safety mechanisms."""
         if not self.circuit_breaker.can_execute():
@@ -232,6 +418,8 @@ class AsyncLLMProvider:
                 
                 # Record success
                 response_time = time.time() - start_time
+                if isinstance(self.semaphore, AdaptiveConcurrencyLimiter):
+                    self.semaphore.on_success(response_time)
                 self.metrics.total_requests += 1
                 self.metrics.successful_requests += 1
                 self.metrics.total_response_time += response_time
@@ -242,12 +430,16 @@ class AsyncLLMProvider:
                 return result
                 
             except asyncio.TimeoutError:
+                if isinstance(self.semaphore, AdaptiveConcurrencyLimiter):
+                    self.semaphore.on_timeout()
                 self.metrics.failed_requests += 1
                 self.metrics.last_error = "Timeout"
                 self.circuit_breaker.call_failure()
                 raise LLMProviderError(f"Request timeout for provider: {self.config.name}")
             
             except Exception as e:
+                if isinstance(self.semaphore, AdaptiveConcurrencyLimiter) and _is_throttle_error(e):
+                    self.semaphore.on_throttle()
                 self.metrics.failed_requests += 1
                 self.metrics.last_error = str(e)
                 self.circuit_breaker.call_failure()
@@ -257,13 +449,15 @@ class AsyncLLMProvider:
 class AsyncLLMService:
     """Main async LLM service with provider management and load balancing."""
     
-    def __init__(self):
+    def __init__(self, limit_store: Optional[ConcurrencyLimitStore] = None):
         self.providers: Dict[str, AsyncLLMProvider] = {}
         self.request_queue: asyncio.Queue = asyncio.Queue()
         self.worker_tasks: List[asyncio.Task] = []
         self.metrics_collector_task: Optional[asyncio.Task] = None
         self._shutdown = False
+        self.limit_store = limit_store if limit_store is not None else ConcurrencyLimitStore()
         self._initialize_providers()
+        self._restore_concurrency_limits()
     
     def _initialize_providers(self):
         """Initialize LLM providers based on configuration."""
@@ -321,6 +515,26 @@ class AsyncLLMService:
             except Exception as e:
                 logger.error(f"Failed to initialize provider {config.name}: {e}")
     
+    def _restore_concurrency_limits(self):
+        """Restore adaptive limits learned by a previous process."""
+        persisted = self.limit_store.load()
+        for name, provider in self.providers.items():
+            state = persisted.get(name)
+            if state and isinstance(provider.semaphore, AdaptiveConcurrencyLimiter):
+                provider.semaphore.restore(state)
+                logger.info(f"Restored concurrency limit {provider.semaphore.current_limit} for {name}")
+    
+    def save_concurrency_limits(self) -> bool:
+        """Persist adaptive limits so restarts keep what was learned."""
+        snapshots = {
+            name: provider.semaphore.snapshot()
+            for name, provider in self.providers.items()
+            if isinstance(provider.semaphore, AdaptiveConcurrencyLimiter)
+        }
+        if not snapshots:
+            return False
+        return self.limit_store.save(snapshots)
+    
     async def start(self):
         """Start the async LLM service."""
         if self.worker_tasks:
@@ -356,6 +570,7 @@ class AsyncLLMService:
             except asyncio.CancelledError:
                 pass
         
+        self.save_concurrency_limits()
         self.worker_tasks.clear()
         logger.info("Async LLM service stopped")
     
@@ -448,7 +663,7 @@ class AsyncLLMService:
             )
             
             # Current load ( semaphore available permits )
-            load_factor = provider.semaphore._value / provider.config.max_concurrent
+            load_factor = provider.semaphore._value / max(1, provider.get_concurrency_limit())
             
             # Combined score (higher is better)
             score = (
@@ -525,13 +740,17 @@ class AsyncLLMService:
                 total_requests = sum(p.metrics.total_requests for p in self.providers.values())
                 total_success = sum(p.metrics.successful_requests for p in self.providers.values())
                 queue_size = self.request_queue.qsize()
+                limits = {name: p.get_concurrency_limit() for name, p in self.providers.items()}
                 
                 logger.info(
                     f"LLM Service Metrics - Queue: {queue_size}, "
                     f"Requests: {total_requests}, Success: {total_success}, "
-                    f"Success Rate: {total_success / max(1, total_requests):.1%}"
+                    f"Success Rate: {total_success / max(1, total_requests):.1%}, "
+                    f"Concurrency Limits: {limits}"
                 )
                 
+                self.save_concurrency_limits()
+                
             except Exception as e:
                 logger.error(f"Metrics collector error: {e}")
     
@@ -561,7 +780,12 @@ class AsyncLLMService:
                     "max_concurrent": provider.config.max_concurrent,
                     "rate_limit_per_minute": provider.config.rate_limit_per_minute,
                     "weight": provider.config.weight
-                }
+                },
+                "concurrency": (
+                    provider.semaphore.snapshot()
+                    if isinstance(provider.semaphore, AdaptiveConcurrencyLimiter)
+                    else {"limit": provider.config.max_concurrent, "adaptive": False}
+                )
             }
         
         return {
@@ -15,6 +15,7 @@ from pathlib import Path
 import uuid
 
 from app.config import settings
+from app.services.serialization import dumps_text
 
 logger = logging.getLogger(__name__)
 
@@ -156,7 +157,7 @@ class AuditEvent:
     
     def to_json(self) -> str:
         """Convert audit event to JSON string."""
-        return json.dumps(self.to_dict(), default=str)
+        return dumps_text(self.to_dict())
 
 
 class AuditLogger:
@@ -0,0 +1,376 @@
+"""
+Content-Addressed Blob Store
+
+Scraped page content is the bulk of an investigation's state, and that state
+is copied, serialized, synced and stored many times per run. Large content
+fields are written once to a content-addressed store (sha256 of the bytes)
+and the state carries a small reference instead::
+
+    {"$blob": "<sha256>", "length": 18234, "mime": "text/plain"}
+
+Identical pages are stored once, across investigations. The filesystem
+backend reads through ``mmap`` so agents that only need a slice of a large
+page don't load all of it; other backends plug in through ``BlobBackend``.
+
+The store is bounded by ``sweep``, run periodically by the application's
+cleanup task: blobs not written or deduplicated for ``max_age`` seconds are
+deleted, then the least recently used ones until the store fits in
+``max_bytes``. A reference to a swept blob hydrates to an empty string.
+"""
+
+import asyncio
+import hashlib
+import logging
+import mmap
+import os
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Union
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+BLOB_REF_KEY = "$blob"
+
+# Result fields that hold page content
+CONTENT_FIELDS = (
+    "content",
+    "full_text",
+    "cleaned_content",
+    "text_content",
+    "raw_content",
+    "html",
+    "markdown",
+)
+
+
+@dataclass(frozen=True)
+class BlobRef:
+    """Reference to a stored blob."""
+    digest: str
+    length: int
+    mime: str = "text/plain"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {BLOB_REF_KEY: self.digest, "length": self.length, "mime": self.mime}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BlobRef":
+        return cls(digest=data[BLOB_REF_KEY], length=data.get("length", 0), mime=data.get("mime", "text/plain"))
+
+
+@dataclass(frozen=True)
+class BlobInfo:
+    """A stored blob as seen by the sweep."""
+    digest: str
+    size: int
+    modified: float
+
+
+def is_blob_ref(value: Any) -> bool:
+    return isinstance(value, BlobRef) or (isinstance(value, dict) and BLOB_REF_KEY in value)
+
+
+def _as_ref(value: Union[BlobRef, Dict[str, Any]]) -> BlobRef:
+    return value if isinstance(value, BlobRef) else BlobRef.from_dict(value)
+
+
+class BlobBackend(ABC):
+    """Storage backend interface for the blob store."""
+
+    @abstractmethod
+    def exists(self, digest: str) -> bool:
+        ...
+
+    @abstractmethod
+    def write(self, digest: str, data: bytes):
+        ...
+
+    @abstractmethod
+    def read(self, digest: str, start: int = 0, end: Optional[int] = None) -> bytes:
+        ...
+
+    @abstractmethod
+    def delete(self, digest: str) -> bool:
+        ...
+
+    @abstractmethod
+    def touch(self, digest: str):
+        """Mark a blob as used now, so the sweep keeps it."""
+
+    @abstractmethod
+    def entries(self) -> Iterator[BlobInfo]:
+        """Every stored blob, in no particular order."""
+
+
+class InMemoryBlobBackend(BlobBackend):
+    """Process-local backend, for tests and ephemeral runs."""
+
+    def __init__(self):
+        self.blobs: Dict[str, bytes] = {}
+        self.modified: Dict[str, float] = {}
+
+    def exists(self, digest: str) -> bool:
+        return digest in self.blobs
+
+    def write(self, digest: str, data: bytes):
+        self.blobs[digest] = data
+        self.modified[digest] = time.time()
+
+    def read(self, digest: str, start: int = 0, end: Optional[int] = None) -> bytes:
+        try:
+            return self.blobs[digest][start:end]
+        except KeyError:
+            raise FileNotFoundError(digest)
+
+    def delete(self, digest: str) -> bool:
+        self.modified.pop(digest, None)
+        return self.blobs.pop(digest, None) is not None
+
+    def touch(self, digest: str):
+        if digest in self.blobs:
+            self.modified[digest] = time.time()
+
+    def entries(self) -> Iterator[BlobInfo]:
+        for digest, data in list(self.blobs.items()):
+            yield BlobInfo(digest, len(data), self.modified.get(digest, 0.0))
+
+
+class FilesystemBlobBackend(BlobBackend):
+    """Blobs as files under ``root/ab/cdef...``, read through mmap."""
+
+    def __init__(self, root: Optional[Union[str, Path]] = None):
+        if not root:
+            root = Path(__file__).parent.parent.parent / "data" / "blobs"
+        self.root = Path(root)
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:]
+
+    def exists(self, digest: str) -> bool:
+        return self._path(digest).exists()
+
+    def write(self, digest: str, data: bytes):
+        path = self._path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        tmp_path.replace(path)
+
+    def read(self, digest: str, start: int = 0, end: Optional[int] = None) -> bytes:
+        with open(self._path(digest), 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return b""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                return view[start:size if end is None else end]
+
+    def delete(self, digest: str) -> bool:
+        try:
+            self._path(digest).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def touch(self, digest: str):
+        try:
+            os.utime(self._path(digest))
+        except FileNotFoundError:
+            pass
+
+    def entries(self) -> Iterator[BlobInfo]:
+        if not self.root.is_dir():
+            return
+        for shard in self.root.iterdir():
+            if len(shard.name) != 2 or not shard.is_dir():
+                continue
+            for path in shard.iterdir():
+                # Skips in-progress writes ("<digest>.<pid>.tmp")
+                if "." in path.name:
+                    continue
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                yield BlobInfo(shard.name + path.name, stat.st_size, stat.st_mtime)
+
+
+class BlobStore:
+    """Content-addressed store with helpers to offload and resolve state fields."""
+
+    def __init__(
+        self,
+        backend: Optional[BlobBackend] = None,
+        min_size: int = 4096,
+        max_bytes: int = 0,
+        max_age: float = 0,
+        sweep_interval: float = 3600
+    ):
+        self.backend = backend or FilesystemBlobBackend()
+        self.min_size = min_size
+        # 0 disables the limit
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.sweep_interval = sweep_interval
+        self._last_sweep = 0.0
+
+        # Metrics
+        self.writes = 0
+        self.dedup_hits = 0
+        self.bytes_offloaded = 0
+        self.swept = 0
+
+    def put(self, data: Union[str, bytes], mime: Optional[str] = None) -> BlobRef:
+        if isinstance(data, str):
+            payload = data.encode("utf-8")
+            mime = mime or "text/plain"
+        else:
+            payload = data
+            mime = mime or "application/octet-stream"
+        digest = hashlib.sha256(payload).hexdigest()
+        if self.backend.exists(digest):
+            self.dedup_hits += 1
+            self.backend.touch(digest)
+        else:
+            self.backend.write(digest, payload)
+            self.writes += 1
+        return BlobRef(digest=digest, length=len(payload), mime=mime)
+
+    def read_bytes(self, ref: Union[BlobRef, Dict[str, Any]], start: int = 0, end: Optional[int] = None) -> bytes:
+        return self.backend.read(_as_ref(ref).digest, start, end)
+
+    def read_text(self, ref: Union[BlobRef, Dict[str, Any]], max_bytes: Optional[int] = None) -> str:
+        """Decode a text blob, optionally only its first ``max_bytes``."""
+        data = self.read_bytes(ref, 0, max_bytes)
+        return data.decode("utf-8", errors="ignore" if max_bytes else "strict")
+
+    def resolve(self, value: Any) -> Any:
+        """Text of a reference; any other value is returned unchanged."""
+        if is_blob_ref(value):
+            ref = _as_ref(value)
+            if ref.mime.startswith("text/"):
+                return self.read_text(ref)
+            return self.read_bytes(ref)
+        return value
+
+    def offload(self, value: Any, fields: Iterable[str] = CONTENT_FIELDS) -> Any:
+        """
+        Replace large content fields with blob references, in place.
+
+        Walks dicts and lists; only string values of the named fields at
+        least ``min_size`` bytes long (UTF-8 encoded) are moved.
+        """
+        fields = frozenset(fields)
+        self._offload(value, fields)
+        return value
+
+    def _offload(self, value: Any, fields: frozenset):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if key in fields and isinstance(item, str) and self._is_large(item):
+                    ref = self.put(item)
+                    self.bytes_offloaded += ref.length
+                    value[key] = ref.to_dict()
+                elif isinstance(item, (dict, list)):
+                    self._offload(item, fields)
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, (dict, list)):
+                    self._offload(item, fields)
+
+    def _is_large(self, text: str) -> bool:
+        """Whether text is at least ``min_size`` bytes once UTF-8 encoded."""
+        # A character encodes to 1-4 bytes, so the length alone settles most strings
+        if len(text) >= self.min_size:
+            return True
+        if len(text) * 4 < self.min_size:
+            return False
+        return len(text.encode("utf-8")) >= self.min_size
+
+    def hydrate(self, value: Any) -> Any:
+        """Copy of a structure with every reference replaced by its content."""
+        if is_blob_ref(value):
+            try:
+                return self.resolve(value)
+            except FileNotFoundError:
+                logger.warning(f"Missing blob {_as_ref(value).digest}")
+                return ""
+        if isinstance(value, dict):
+            return {key: self.hydrate(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.hydrate(item) for item in value]
+        return value
+
+    async def offload_async(self, value: Any, fields: Iterable[str] = CONTENT_FIELDS) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(None, self.offload, value, fields)
+
+    async def hydrate_async(self, value: Any) -> Any:
+        """``hydrate`` in a worker thread; blob reads never block the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(None, self.hydrate, value)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Delete blobs older than ``max_age``, then the least recently used
+        ones until the store fits in ``max_bytes``. Returns the number deleted.
+        """
+        now = time.time() if now is None else now
+        self._last_sweep = now
+        if not self.max_age and not self.max_bytes:
+            return 0
+
+        kept = []
+        deleted = 0
+        for info in self.backend.entries():
+            if self.max_age and now - info.modified > self.max_age:
+                deleted += self.backend.delete(info.digest)
+            else:
+                kept.append(info)
+
+        if self.max_bytes:
+            total = sum(info.size for info in kept)
+            for info in sorted(kept, key=lambda info: info.modified):
+                if total <= self.max_bytes:
+                    break
+                deleted += self.backend.delete(info.digest)
+                total -= info.size
+
+        self.swept += deleted
+        if deleted:
+            logger.info(f"Blob store sweep deleted {deleted} blobs")
+        return deleted
+
+    async def sweep_async(self, force: bool = False) -> int:
+        """``sweep`` in a worker thread, at most once per ``sweep_interval`` unless forced."""
+        if not force and time.time() - self._last_sweep < self.sweep_interval:
+            return 0
+        return await asyncio.get_running_loop().run_in_executor(None, self.sweep)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "writes": self.writes,
+            "dedup_hits": self.dedup_hits,
+            "bytes_offloaded": self.bytes_offloaded,
+            "swept": self.swept,
+            "min_size": self.min_size,
+        }
+
+
+_blob_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """Shared blob store configured from settings."""
+    global _blob_store
+    if _blob_store is None:
+        _blob_store = BlobStore(
+            FilesystemBlobBackend(settings.BLOB_STORE_PATH or None),
+            min_size=settings.BLOB_OFFLOAD_MIN_BYTES,
+            max_bytes=settings.BLOB_STORE_MAX_BYTES,
+            max_age=settings.BLOB_STORE_MAX_AGE
+        )
+    return _blob_store
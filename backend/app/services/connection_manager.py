@@ -11,7 +11,6 @@ This service provides:
 
 import asyncio
 import logging
-import json
 import time
 from typing import Dict, List, Optional, Any, Union, Callable
 from dataclasses import dataclass, field
@@ -28,6 +27,7 @@ from sqlalchemy.pool import QueuePool
 import httpx
 
 from app.config import settings
+from app.services import serialization
 
 logger = logging.getLogger(__name__)
 
@@ -123,7 +123,9 @@ class CacheManager:
     def _serialize_value(self, value: Any) -> bytes:
         """Serialize value for storage."""
         if self.config.serialization_method == "json":
-            return json.dumps(value, default=str).encode('utf-8')
+            return serialization.encode(value)  # orjson when installed
+        elif self.config.serialization_method == "msgpack":
+            return serialization.encode(value, "msgpack")
         elif self.config.serialization_method == "pickle":
             return pickle.dumps(value)
         else:
@@ -131,8 +133,9 @@ class CacheManager:
     
     def _deserialize_value(self, data: bytes) -> Any:
         """Deserialize value from storage."""
-        if self.config.serialization_method == "json":
-            return json.loads(data.decode('utf-8'))
+        if self.config.serialization_method in ("json", "msgpack"):
+            # The codec header makes entries readable whichever codec wrote them
+            return serialization.decode(data)
         elif self.config.serialization_method == "pickle":
             return pickle.loads(data)
         else:
@@ -0,0 +1,202 @@
+"""
+WebSocket Connection Registry
+
+The in-memory registry is the authoritative record of this worker's
+WebSocket connections, with a secondary index by pipeline for O(1) lookups.
+An optional shared store (the database) is kept up to date write-behind:
+changes are collapsed per connection and persisted in batches by a
+background task, so a connection storm after a deploy costs a handful of
+transactions instead of one per socket.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionStore(Protocol):
+    """Shared store the registry persists to."""
+
+    async def store_websocket_connections_batch(
+        self, connections: List[Tuple[str, str, Dict[str, Any]]]
+    ) -> bool: ...
+
+    async def remove_websocket_connections_batch(self, connection_ids: List[str]) -> bool: ...
+
+
+class ConnectionRegistry:
+    """In-memory connection registry with batched write-behind persistence."""
+
+    def __init__(
+        self,
+        store: Optional[ConnectionStore] = None,
+        flush_interval: float = 1.0,
+        batch_size: int = 500
+    ):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        # connection_id -> metadata (authoritative)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # pipeline_id -> ordered set of connection ids
+        self.by_pipeline: Dict[str, Dict[str, None]] = {}
+
+        # connection_id -> metadata to upsert, or None to delete
+        self._pending: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._persisted: set = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock = asyncio.Lock()
+
+        # Metrics
+        self.batches_written = 0
+        self.rows_written = 0
+        self.rows_collapsed = 0
+        self.flush_failures = 0
+
+    def register(self, connection_id: str, pipeline_id: str, metadata: Dict[str, Any]):
+        metadata = {**metadata, "pipeline_id": pipeline_id}
+        self.entries[connection_id] = metadata
+        self.by_pipeline.setdefault(pipeline_id, {})[connection_id] = None
+        self._mark(connection_id, metadata)
+
+    def unregister(self, connection_id: str) -> Optional[Dict[str, Any]]:
+        metadata = self.entries.pop(connection_id, None)
+        if metadata is not None:
+            pipeline_id = metadata.get("pipeline_id")
+            index = self.by_pipeline.get(pipeline_id)
+            if index is not None:
+                index.pop(connection_id, None)
+                if not index:
+                    del self.by_pipeline[pipeline_id]
+        if connection_id in self._persisted or connection_id in self._pending:
+            self._mark(connection_id, None)
+        return metadata
+
+    def touch(self, connection_id: str, **fields):
+        """Update metadata fields (e.g. last_ping); persisted with the next batch."""
+        metadata = self.entries.get(connection_id)
+        if metadata is not None:
+            metadata.update(fields)
+            self._mark(connection_id, metadata)
+
+    def get(self, connection_id: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(connection_id)
+
+    def for_pipeline(self, pipeline_id: str) -> List[Dict[str, Any]]:
+        return [
+            {"connection_id": conn_id, "pipeline_id": pipeline_id, "metadata": self.entries[conn_id]}
+            for conn_id in self.by_pipeline.get(pipeline_id, ())
+        ]
+
+    def all(self) -> List[Dict[str, Any]]:
+        return [
+            {"connection_id": conn_id, "pipeline_id": metadata.get("pipeline_id"), "metadata": metadata}
+            for conn_id, metadata in self.entries.items()
+        ]
+
+    def count(self, pipeline_id: Optional[str] = None) -> int:
+        if pipeline_id is None:
+            return len(self.entries)
+        return len(self.by_pipeline.get(pipeline_id, ()))
+
+    def _mark(self, connection_id: str, metadata: Optional[Dict[str, Any]]):
+        if self.store is None:
+            return
+        if connection_id in self._pending:
+            self.rows_collapsed += 1
+        if metadata is None and connection_id not in self._persisted:
+            # Never reached the store: nothing to delete
+            self._pending.pop(connection_id, None)
+            return
+        self._pending[connection_id] = metadata
+        self._ensure_flusher()
+        if len(self._pending) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    def _ensure_flusher(self):
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # flushed by the next caller that runs inside the event loop
+        self._wakeup = asyncio.Event()
+        self._flush_task = loop.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                await self.flush()
+        except asyncio.CancelledError:
+            pass
+
+    async def flush(self) -> bool:
+        """Persist pending changes now; failed rows are retried on the next flush."""
+        if self.store is None:
+            return True
+        async with self._flush_lock:
+            if not self._pending:
+                return True
+            pending, self._pending = self._pending, {}
+
+            upserts = [
+                (conn_id, metadata.get("pipeline_id"), metadata)
+                for conn_id, metadata in pending.items() if metadata is not None
+            ]
+            deletes = [conn_id for conn_id, metadata in pending.items() if metadata is None]
+
+            ok = True
+            try:
+                for start in range(0, len(upserts), self.batch_size):
+                    chunk = upserts[start:start + self.batch_size]
+                    if not await self.store.store_websocket_connections_batch(chunk):
+                        raise RuntimeError("batch upsert failed")
+                    self._persisted.update(conn_id for conn_id, _, _ in chunk)
+                    self.batches_written += 1
+                    self.rows_written += len(chunk)
+                for start in range(0, len(deletes), self.batch_size):
+                    chunk = deletes[start:start + self.batch_size]
+                    if not await self.store.remove_websocket_connections_batch(chunk):
+                        raise RuntimeError("batch delete failed")
+                    self._persisted.difference_update(chunk)
+                    self.batches_written += 1
+                    self.rows_written += len(chunk)
+            except Exception as e:
+                ok = False
+                self.flush_failures += 1
+                logger.warning(f"Failed to persist WebSocket connections, will retry: {e}")
+                # Requeue without overwriting newer changes made meanwhile
+                for conn_id, metadata in pending.items():
+                    self._pending.setdefault(conn_id, metadata)
+            return ok
+
+    async def close(self):
+        """Flush outstanding changes and stop the background writer."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "connections": len(self.entries),
+            "pipelines": len(self.by_pipeline),
+            "pending_writes": len(self._pending),
+            "batches_written": self.batches_written,
+            "rows_written": self.rows_written,
+            "rows_collapsed": self.rows_collapsed,
+            "flush_failures": self.flush_failures,
+        }
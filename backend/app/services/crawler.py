@@ -0,0 +1,530 @@
+"""
+Crawl Engine
+
+A polite, concurrent crawler for the smart_crawler tools, which used to
+treat a start URL as a search query or fetch pages one at a time.
+
+- The frontier is a priority queue ordered by depth, then path length, so
+  shallow and hub-like pages are fetched first.
+- Seen URLs are kept in a Bloom filter sized from the page budget; a crawl
+  of a large site costs a few megabytes at most, whatever its link count.
+- Each host gets a limited number of concurrent fetches, spaced by its
+  robots.txt Crawl-delay or CRAWLER_PER_HOST_DELAY; the limit is shared by
+  all crawls running on the engine.
+- Redirects are not followed by the HTTP client; their targets re-enter the
+  frontier and get the same scope, robots.txt and politeness checks.
+- robots.txt is fetched once per host, shared by concurrent workers, and
+  cached for CRAWLER_ROBOTS_TTL.
+- Workers fetch, parse links and enqueue in one pipeline; parsing uses the
+  standard library, so nothing beyond httpx is needed.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import time
+import urllib.robotparser
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin, urlparse, urlunparse
+
+from app.config import settings
+
+# Optional imports for HTTP fetching
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+USER_AGENT = "Mozilla/5.0 (compatible; ScrapeCraft-Crawler/1.0)"
+ROBOTS_AGENT = "ScrapeCraft-Crawler"
+
+# Links to these are never fetched; they are not pages
+SKIPPED_EXTENSIONS = {
+    ".7z", ".avi", ".bmp", ".css", ".csv", ".dmg", ".doc", ".docx", ".eot", ".exe", ".gif", ".gz",
+    ".ico", ".iso", ".jpeg", ".jpg", ".js", ".json", ".mov", ".mp3", ".mp4", ".otf", ".pdf", ".png",
+    ".ppt", ".pptx", ".rar", ".svg", ".tar", ".tgz", ".ttf", ".wav", ".webm", ".webp", ".woff",
+    ".woff2", ".xls", ".xlsx", ".xml", ".zip",
+}
+
+# Crawl-delay values above this are capped rather than honoured literally
+MAX_CRAWL_DELAY = 10.0
+
+
+class BloomFilter:
+    """Fixed-size probabilistic set: no false negatives, rare false positives."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str) -> bool:
+        """Add an item; True if it was not (probably) present before."""
+        added = False
+        for position in self._positions(item):
+            byte, bit = divmod(position, 8)
+            if not self._bits[byte] & (1 << bit):
+                self._bits[byte] |= 1 << bit
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+
+class LinkExtractor(HTMLParser):
+    """Collects the title, <base href> and followable <a href> links of a page."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links: List[str] = []
+        self.base: Optional[str] = None
+        self.nofollow = False
+        self._title: List[str] = []
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a" or tag == "area":
+            attributes = dict(attrs)
+            href = attributes.get("href")
+            if href and "nofollow" not in (attributes.get("rel") or "").lower():
+                self.links.append(href)
+        elif tag == "base" and self.base is None:
+            self.base = dict(attrs).get("href")
+        elif tag == "meta":
+            attributes = dict(attrs)
+            if (attributes.get("name") or "").lower() == "robots" and "nofollow" in (attributes.get("content") or "").lower():
+                self.nofollow = True
+        elif tag == "title":
+            self._in_title = True
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+
+    def handle_data(self, data):
+        if self._in_title:
+            self._title.append(data)
+
+    @property
+    def title(self) -> str:
+        return " ".join("".join(self._title).split())
+
+
+def normalize_url(url: str) -> Optional[str]:
+    """Canonical form used for de-duplication; None for non-HTTP or unusable URLs."""
+    url = urldefrag(url.strip())[0]
+    try:
+        parsed = urlparse(url)
+        port = parsed.port
+    except ValueError:
+        return None
+    scheme = parsed.scheme.lower()
+    if scheme not in ("http", "https") or not parsed.hostname:
+        return None
+    host = parsed.hostname.lower()
+    if port and (scheme, port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{port}"
+    return urlunparse((scheme, host, parsed.path or "/", parsed.params, parsed.query, ""))
+
+
+def _host_key(host: str) -> str:
+    return host[4:] if host.startswith("www.") else host
+
+
+@dataclass
+class CrawledPage:
+    """One fetched page."""
+    url: str
+    depth: int
+    status_code: Optional[int] = None
+    title: str = ""
+    content_type: str = ""
+    size: int = 0
+    links: int = 0
+    elapsed: float = 0.0
+    error: Optional[str] = None
+    redirect: Optional[str] = None
+    html: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status_code is not None and 200 <= self.status_code < 300
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            "url": self.url,
+            "depth": self.depth,
+            "status_code": self.status_code,
+            "title": self.title,
+            "content_type": self.content_type,
+            "size": self.size,
+            "links": self.links,
+            "elapsed": round(self.elapsed, 3),
+        }
+        if self.redirect:
+            result["redirect"] = self.redirect
+        if self.error:
+            result["error"] = self.error
+        return result
+
+
+@dataclass
+class CrawlResult:
+    """Pages fetched by one crawl, in fetch order."""
+    start_url: str
+    pages: List[CrawledPage] = field(default_factory=list)
+    discovered: int = 0
+    blocked_by_robots: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def urls(self) -> List[str]:
+        """Successfully fetched pages (redirects are followed through the frontier, not listed)."""
+        return [page.url for page in self.pages if page.ok]
+
+    @property
+    def documents(self) -> List[Tuple[str, str]]:
+        """(url, html) of the fetched HTML pages; only kept by ``crawl(..., keep_html=True)``."""
+        return [(page.url, page.html) for page in self.pages if page.ok and page.html]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "start_url": self.start_url,
+            "pages_crawled": len(self.urls),
+            "pages": [page.to_dict() for page in self.pages],
+            "discovered": self.discovered,
+            "blocked_by_robots": self.blocked_by_robots,
+            "elapsed": round(self.elapsed, 3),
+        }
+
+
+class HostScheduler:
+    """Per-host politeness: bounded concurrency and a minimum gap between request starts."""
+
+    def __init__(self, per_host: int = 2, delay: float = 0.5):
+        self.per_host = per_host
+        self.delay = delay
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+        self._delays: Dict[str, float] = {}
+
+    def set_delay(self, host: str, delay: Optional[float]):
+        if delay is not None:
+            self._delays[host] = min(float(delay), MAX_CRAWL_DELAY)
+
+    async def acquire(self, host: str):
+        limit = self._limits.get(host)
+        if limit is None:
+            limit = self._limits[host] = asyncio.Semaphore(self.per_host)
+        await limit.acquire()
+        # Reserve the next start slot before sleeping so waiters queue up behind it
+        now = time.monotonic()
+        start = max(now, self._next_start.get(host, 0.0))
+        self._next_start[host] = start + self._delays.get(host, self.delay)
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def release(self, host: str):
+        self._limits[host].release()
+
+
+class RobotsCache:
+    """robots.txt per host, fetched once and shared by concurrent callers."""
+
+    def __init__(self, ttl: int = 3600):
+        self.ttl = ttl
+        self._rules: Dict[str, Tuple[float, urllib.robotparser.RobotFileParser]] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def get(self, client: "httpx.AsyncClient", origin: str) -> urllib.robotparser.RobotFileParser:
+        cached = self._rules.get(origin)
+        if cached is not None and time.time() - cached[0] < self.ttl:
+            return cached[1]
+        task = self._inflight.get(origin)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._fetch(client, origin))
+            self._inflight[origin] = task
+            task.add_done_callback(lambda _: self._inflight.pop(origin, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, client: "httpx.AsyncClient", origin: str) -> urllib.robotparser.RobotFileParser:
+        parser = urllib.robotparser.RobotFileParser(f"{origin}/robots.txt")
+        try:
+            response = await client.get(f"{origin}/robots.txt", follow_redirects=True)
+            if response.status_code >= 500:
+                # Server trouble: stay off the site until the entry expires
+                parser.disallow_all = True
+            elif response.status_code >= 400:
+                parser.allow_all = True
+            else:
+                parser.parse(response.text.splitlines())
+        except Exception as e:
+            logger.debug(f"robots.txt unavailable for {origin}: {e}")
+            parser.allow_all = True
+        self._rules[origin] = (time.time(), parser)
+        return parser
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+
+class CrawlEngine:
+    """Frontier-driven concurrent crawler with robots.txt and per-host politeness."""
+
+    def __init__(
+        self,
+        concurrency: int = 8,
+        per_host: int = 2,
+        delay: float = 0.5,
+        timeout: float = 15.0,
+        robots_ttl: int = 3600,
+        max_page_bytes: int = 2_000_000,
+        respect_robots: bool = True,
+        transport=None
+    ):
+        if not HTTPX_AVAILABLE:
+            raise ImportError("httpx is required for crawling. Install with: pip install httpx")
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.delay = delay
+        self.timeout = timeout
+        self.max_page_bytes = max_page_bytes
+        self.respect_robots = respect_robots
+        self.transport = transport
+
+        self.robots = RobotsCache(robots_ttl)
+        # Shared by every crawl, so concurrent crawls of one host are spaced together
+        self.scheduler = HostScheduler(per_host, delay)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional["httpx.AsyncClient"] = None
+
+        self.stats = {"crawls": 0, "requests": 0, "pages": 0, "errors": 0, "bytes": 0, "blocked_by_robots": 0}
+
+    async def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            previous = self._client
+            self._loop = loop
+            # Redirects go back through the frontier so scope, robots.txt and politeness apply
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=False,
+                headers={"User-Agent": USER_AGENT},
+                limits=httpx.Limits(max_connections=self.concurrency),
+                transport=self.transport
+            )
+            self.robots = RobotsCache(self.robots.ttl)
+            self.scheduler = HostScheduler(self.per_host, self.delay)
+            if previous is not None:
+                # Rebound before awaiting, so concurrent callers don't close the new client;
+                # connections of the previous loop's client can't be reused, so release them
+                try:
+                    await previous.aclose()
+                except Exception as e:
+                    logger.debug(f"Closing previous crawler client failed: {e}")
+
+    async def crawl(
+        self,
+        start_url: str,
+        max_depth: int = 2,
+        max_pages: int = 50,
+        same_host: bool = True,
+        keep_html: bool = False
+    ) -> CrawlResult:
+        """
+        Crawl breadth-first from start_url up to max_depth links away and max_pages fetches.
+
+        With keep_html the page bodies are kept on the result (``documents``),
+        so extraction can run on them instead of downloading every page again.
+        """
+        await self._bind_loop()
+        self.stats["crawls"] += 1
+        started = time.perf_counter()
+
+        result = CrawlResult(start_url=start_url)
+        start = normalize_url(start_url if "://" in start_url else f"https://{start_url}")
+        if start is None or max_pages <= 0:
+            return result
+        result.start_url = start
+        scope = _host_key(urlparse(start).netloc)
+
+        frontier: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        seen = BloomFilter(max(10_000, max_pages * 200))
+        counter = 0
+        budget = max_pages
+        # Redirect hops are refunded, up to one per page so a redirect chain can't loop forever
+        refunds = max_pages
+
+        def enqueue(url: str, depth: int):
+            nonlocal counter
+            if same_host and _host_key(urlparse(url).netloc) != scope:
+                return
+            if not seen.add(url):
+                return
+            result.discovered += 1
+            counter += 1
+            path = urlparse(url).path
+            frontier.put_nowait((depth, path.count("/"), len(path), counter, url))
+
+        async def worker():
+            nonlocal budget, refunds
+            while True:
+                depth, _, _, _, url = await frontier.get()
+                try:
+                    if budget <= 0:
+                        continue
+                    if not await self._allowed(url):
+                        result.blocked_by_robots += 1
+                        continue
+                    budget -= 1
+                    page, links = await self._fetch(url, depth, keep_html)
+                    result.pages.append(page)
+                    if page.redirect:
+                        # The target goes through the same scope, robots.txt and politeness checks
+                        if refunds > 0:
+                            refunds -= 1
+                            budget += 1
+                        enqueue(page.redirect, depth)
+                    elif depth < max_depth and budget > 0:
+                        for link in links:
+                            enqueue(link, depth + 1)
+                finally:
+                    frontier.task_done()
+
+        enqueue(start, 0)
+        workers = [self._loop.create_task(worker()) for _ in range(max(1, min(self.concurrency, max_pages)))]
+        try:
+            await frontier.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        result.elapsed = time.perf_counter() - started
+        self.stats["blocked_by_robots"] += result.blocked_by_robots
+        return result
+
+    async def _allowed(self, url: str) -> bool:
+        if not self.respect_robots:
+            return True
+        parsed = urlparse(url)
+        rules = await self.robots.get(self._client, f"{parsed.scheme}://{parsed.netloc}")
+        self.scheduler.set_delay(parsed.netloc, rules.crawl_delay(ROBOTS_AGENT))
+        return rules.can_fetch(ROBOTS_AGENT, url)
+
+    async def _fetch(self, url: str, depth: int, keep_html: bool = False) -> Tuple[CrawledPage, List[str]]:
+        host = urlparse(url).netloc
+        page = CrawledPage(url=url, depth=depth)
+        links: List[str] = []
+        await self.scheduler.acquire(host)
+        started = time.perf_counter()
+        try:
+            self.stats["requests"] += 1
+            async with self._client.stream("GET", url) as response:
+                page.status_code = response.status_code
+                page.content_type = response.headers.get("content-type", "")
+                location = response.headers.get("location")
+                if response.is_redirect and location:
+                    page.redirect = normalize_url(urljoin(url, location))
+                    if page.redirect is None:
+                        page.error = "Unusable redirect"
+                    body = b""
+                elif response.status_code >= 300 or "html" not in page.content_type.lower():
+                    body = b""
+                else:
+                    chunks = []
+                    async for chunk in response.aiter_bytes():
+                        chunks.append(chunk)
+                        page.size += len(chunk)
+                        if page.size >= self.max_page_bytes:
+                            break
+                    body = b"".join(chunks)
+                encoding = response.encoding or "utf-8"
+        except Exception as e:
+            page.error = str(e) or type(e).__name__
+            self.stats["errors"] += 1
+            return page, links
+        finally:
+            page.elapsed = time.perf_counter() - started
+            self.scheduler.release(host)
+
+        self.stats["bytes"] += page.size
+        if body:
+            self.stats["pages"] += 1
+            html = body.decode(encoding, errors="replace")
+            if keep_html:
+                page.html = html
+            extractor = LinkExtractor()
+            try:
+                extractor.feed(html)
+                extractor.close()
+            except Exception as e:
+                logger.debug(f"Partial parse of {url}: {e}")
+            page.title = extractor.title
+            if not extractor.nofollow:
+                base = urljoin(url, extractor.base) if extractor.base else url
+                for href in extractor.links:
+                    link = normalize_url(urljoin(base, href))
+                    if link and not self._skipped(link):
+                        links.append(link)
+            page.links = len(links)
+        return page, links
+
+    @staticmethod
+    def _skipped(url: str) -> bool:
+        path = urlparse(url).path.lower()
+        dot = path.rfind(".")
+        return dot > path.rfind("/") and path[dot:] in SKIPPED_EXTENSIONS
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "robots_cached": len(self.robots)}
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+
+_crawl_engine: Optional[CrawlEngine] = None
+
+
+def get_crawl_engine() -> CrawlEngine:
+    """Shared crawl engine configured from settings."""
+    global _crawl_engine
+    if _crawl_engine is None:
+        _crawl_engine = CrawlEngine(
+            concurrency=settings.CRAWLER_CONCURRENCY,
+            per_host=settings.CRAWLER_PER_HOST,
+            delay=settings.CRAWLER_PER_HOST_DELAY,
+            timeout=settings.CRAWLER_TIMEOUT,
+            robots_ttl=settings.CRAWLER_ROBOTS_TTL,
+            max_page_bytes=settings.CRAWLER_MAX_PAGE_BYTES
+        )
+    return _crawl_engine
@@ -4,12 +4,15 @@ Enhanced database service for ScrapeCraft with proper persistence layer.
 
 import json
 import logging
+import threading
 from typing import Dict, List, Optional, Any, Union
 from datetime import datetime, timedelta
 from sqlalchemy import create_engine, text, and_, or_
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 from app.config import settings
+from app.services.result_store import decode_compact
+from app.services.serialization import dumps_text
 import asyncio
 from contextlib import asynccontextmanager
 
@@ -18,12 +21,42 @@ from app.models.sqlalchemy.base import Base
 
 logger = logging.getLogger(__name__)
 
+
+class SerializedStaticPool(StaticPool):
+    """
+    StaticPool whose single connection is used by one thread at a time.
+
+    StaticPool hands every thread the same SQLite connection, and some
+    writes run in executor threads; a checkout holds the lock until the
+    connection is returned. Reentrant, so nested sessions on one thread
+    still work.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._use_lock = threading.RLock()
+
+    def _do_get(self):
+        self._use_lock.acquire()
+        try:
+            return super()._do_get()
+        except BaseException:
+            self._use_lock.release()
+            raise
+
+    def _do_return_conn(self, record):
+        try:
+            super()._do_return_conn(record)
+        finally:
+            self._use_lock.release()
+
+
 # Create engine with better configuration
 if settings.DATABASE_URL.startswith("sqlite"):
     # SQLite specific configuration
     engine = create_engine(
         settings.DATABASE_URL,
-        poolclass=StaticPool,
+        poolclass=SerializedStaticPool,
         connect_args={"check_same_thread": False},
         echo=settings.DEBUG
     )
@@ -225,7 +258,8 @@ class DatabasePersistenceService:
                         {"investigation_id": investigation_id}
                     ).fetchone()
                     
-                    state_json = json.dumps(state_to_store, default=str)
+                    # Enums/datetimes encode natively; result tables are written column-wise
+                    state_json = dumps_text(state_to_store)
                     
                     if existing:
                         # Update existing record
@@ -280,7 +314,7 @@ class DatabasePersistenceService:
                 ).fetchone()
                 
                 if result:
-                    return json.loads(result[0])
+                    return json.loads(result[0], object_hook=decode_compact)
                 return None
                 
         except Exception as e:
@@ -297,7 +331,7 @@ class DatabasePersistenceService:
                     {"workflow_id": workflow_id}
                 ).fetchone()
                 
-                workflow_json = json.dumps(workflow_data, default=str)
+                workflow_json = dumps_text(workflow_data)
                 
                 if existing:
                     # Update existing record
@@ -358,7 +392,7 @@ class DatabasePersistenceService:
         """Store WebSocket connection metadata."""
         try:
             with SessionLocal() as db:
-                metadata_json = json.dumps(metadata, default=str)
+                metadata_json = dumps_text(metadata)
                 
                 db.execute(
                     text("""
@@ -400,6 +434,63 @@ class DatabasePersistenceService:
             logger.error(f"Failed to remove WebSocket connection {connection_id}: {e}")
             return False
     
+    async def store_websocket_connections_batch(self, connections: List[tuple]) -> bool:
+        """Upsert many (connection_id, pipeline_id, metadata) rows in one transaction."""
+        if not connections:
+            return True
+        now = datetime.utcnow()
+        rows = [
+            {
+                "connection_id": connection_id,
+                "pipeline_id": pipeline_id,
+                "metadata": dumps_text(metadata),
+                "connected_at": metadata.get("connected_at") or now,
+                "last_activity": metadata.get("last_ping") or now
+            }
+            for connection_id, pipeline_id, metadata in connections
+        ]
+
+        def _write():
+            with SessionLocal() as db:
+                db.execute(
+                    text("""
+                        INSERT OR REPLACE INTO websocket_connections
+                        (connection_id, pipeline_id, metadata, connected_at, last_activity)
+                        VALUES (:connection_id, :pipeline_id, :metadata, :connected_at, :last_activity)
+                    """),
+                    rows
+                )
+                db.commit()
+
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, _write)
+            logger.debug(f"Stored {len(rows)} WebSocket connections")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to store WebSocket connection batch: {e}")
+            return False
+
+    async def remove_websocket_connections_batch(self, connection_ids: List[str]) -> bool:
+        """Remove many WebSocket connection rows in one transaction."""
+        if not connection_ids:
+            return True
+
+        def _delete():
+            with SessionLocal() as db:
+                db.execute(
+                    text("DELETE FROM websocket_connections WHERE connection_id = :connection_id"),
+                    [{"connection_id": connection_id} for connection_id in connection_ids]
+                )
+                db.commit()
+
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, _delete)
+            logger.debug(f"Removed {len(connection_ids)} WebSocket connections")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to remove WebSocket connection batch: {e}")
+            return False
+
     async def get_websocket_connections(self, pipeline_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get WebSocket connections, optionally filtered by pipeline_id."""
         try:
@@ -448,7 +539,7 @@ class DatabasePersistenceService:
                 
                 task_result = TaskResult(
                     task_id=task_id,
-                    task_data=json.dumps(task_data) if isinstance(task_data, dict) else task_data
+                    task_data=dumps_text(task_data) if isinstance(task_data, dict) else task_data
                 )
                 
                 db.merge(task_result)
@@ -471,7 +562,7 @@ class DatabasePersistenceService:
                 # Serialize details to JSON for database storage
                 details_data = event_data.get("details")
                 if isinstance(details_data, dict):
-                    details_data = json.dumps(details_data, default=str)
+                    details_data = dumps_text(details_data)
                 
                 audit_event = AuditLog(
                     event_type=event_data.get("event_type"),
@@ -0,0 +1,657 @@
+"""
+Async DNS Resolver
+
+Shared, non-blocking DNS resolution for domain intelligence. Queries are
+sent over UDP (TCP when a response is truncated) straight from the event
+loop, so a slow nameserver delays one lookup instead of freezing every
+investigation in the process.
+
+- Multiple record types for a name are queried concurrently.
+- Answers are cached for their TTL; NXDOMAIN / no-data answers are cached
+  for the zone's negative TTL (RFC 2308), falling back to DNS_NEGATIVE_TTL,
+  unless the caller opts out (bulk guessing such as subdomain brute force).
+- Identical queries in flight at the same time share one request, and the
+  number of outstanding queries is bounded by DNS_MAX_INFLIGHT.
+
+``StubDNSServer`` answers from an in-memory zone on a local UDP port, for
+tests and benchmarks that must not touch real DNS.
+"""
+
+import asyncio
+import logging
+import secrets
+import socket
+import struct
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+RECORD_TYPES = {
+    "A": 1,
+    "NS": 2,
+    "CNAME": 5,
+    "SOA": 6,
+    "PTR": 12,
+    "MX": 15,
+    "TXT": 16,
+    "AAAA": 28,
+    "SRV": 33,
+    "CAA": 257,
+}
+RECORD_NAMES = {code: name for name, code in RECORD_TYPES.items()}
+
+RCODES = {0: "NOERROR", 1: "FORMERR", 2: "SERVFAIL", 3: "NXDOMAIN", 4: "NOTIMP", 5: "REFUSED"}
+
+# Cap on how long any answer is cached, whatever its TTL says
+MAX_CACHE_TTL = 86400
+
+_HEADER = struct.Struct("!HHHHHH")
+_QUESTION = struct.Struct("!HH")
+_RR = struct.Struct("!HHIH")
+
+
+@dataclass
+class DNSAnswer:
+    """One resource record from a response."""
+    name: str
+    record_type: str
+    value: str
+    ttl: int
+    priority: Optional[int] = None
+
+
+@dataclass
+class DNSResponse:
+    """Outcome of a query: the rcode and the answers of the requested type."""
+    name: str
+    record_type: str
+    rcode: str
+    records: List[DNSAnswer] = field(default_factory=list)
+    ttl: int = 0
+
+    @property
+    def exists(self) -> bool:
+        """The name exists (possibly without records of this type)."""
+        return self.rcode == "NOERROR"
+
+    @property
+    def values(self) -> List[str]:
+        return [record.value for record in self.records]
+
+
+def normalize_name(name: str) -> str:
+    return name.strip().rstrip(".").lower()
+
+
+def _type_code(record_type: str) -> int:
+    try:
+        return RECORD_TYPES[record_type.upper()]
+    except KeyError:
+        raise ValueError(f"Unsupported DNS record type: {record_type}")
+
+
+def _type_name(code: int) -> str:
+    return RECORD_NAMES.get(code, f"TYPE{code}")
+
+
+# --- Wire format -----------------------------------------------------------
+
+def encode_name(name: str) -> bytes:
+    out = bytearray()
+    for label in normalize_name(name).split("."):
+        if not label:
+            continue
+        raw = label.encode("ascii") if label.isascii() else label.encode("idna")
+        if len(raw) > 63:
+            raise ValueError(f"DNS label too long: {label}")
+        out.append(len(raw))
+        out += raw
+    out.append(0)
+    return bytes(out)
+
+
+def read_name(data: bytes, offset: int) -> Tuple[str, int]:
+    """Read a (possibly compressed) name; returns it and the offset after it."""
+    labels = []
+    end = None
+    hops = 0
+    while True:
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            hops += 1
+            if hops > 64:
+                raise ValueError("DNS name compression loop")
+            continue
+        offset += 1
+        if length == 0:
+            break
+        labels.append(data[offset:offset + length].decode("ascii", errors="replace"))
+        offset += length
+    return ".".join(labels).lower(), end if end is not None else offset
+
+
+def build_query(query_id: int, name: str, record_type: str) -> bytes:
+    # Flags: recursion desired
+    header = _HEADER.pack(query_id, 0x0100, 1, 0, 0, 0)
+    return header + encode_name(name) + _QUESTION.pack(_type_code(record_type), 1)
+
+
+def _decode_rdata(data: bytes, offset: int, length: int, type_code: int) -> Tuple[str, Optional[int]]:
+    rdata = data[offset:offset + length]
+    if type_code == 1 and length == 4:
+        return socket.inet_ntop(socket.AF_INET, rdata), None
+    if type_code == 28 and length == 16:
+        return socket.inet_ntop(socket.AF_INET6, rdata), None
+    if type_code in (2, 5, 12):
+        return read_name(data, offset)[0], None
+    if type_code == 15:
+        preference = struct.unpack_from("!H", data, offset)[0]
+        return read_name(data, offset + 2)[0], preference
+    if type_code == 16:
+        chunks = []
+        position = 0
+        while position < length:
+            size = rdata[position]
+            chunks.append(rdata[position + 1:position + 1 + size].decode("utf-8", errors="replace"))
+            position += 1 + size
+        return "".join(chunks), None
+    if type_code == 6:
+        mname, position = read_name(data, offset)
+        rname, position = read_name(data, position)
+        numbers = struct.unpack_from("!IIIII", data, position)
+        return " ".join([mname, rname] + [str(number) for number in numbers]), None
+    if type_code == 33:
+        priority, weight, port = struct.unpack_from("!HHH", data, offset)
+        return f"{read_name(data, offset + 6)[0]}:{port}", priority
+    if type_code == 257 and length >= 2:
+        tag_length = rdata[1]
+        tag = rdata[2:2 + tag_length].decode("ascii", errors="replace")
+        return f"{rdata[0]} {tag} {rdata[2 + tag_length:].decode('utf-8', errors='replace')}", None
+    return rdata.hex(), None
+
+
+def parse_response(data: bytes) -> Dict:
+    """Parse a response into id, rcode, truncation flag, question and records."""
+    query_id, flags, qdcount, ancount, nscount, _ = _HEADER.unpack_from(data, 0)
+    offset = _HEADER.size
+    question = None
+    for _ in range(qdcount):
+        name, offset = read_name(data, offset)
+        type_code, _ = _QUESTION.unpack_from(data, offset)
+        offset += _QUESTION.size
+        question = question or (name, _type_name(type_code))
+
+    sections = []
+    for count in (ancount, nscount):
+        records = []
+        for _ in range(count):
+            name, offset = read_name(data, offset)
+            type_code, _, ttl, length = _RR.unpack_from(data, offset)
+            offset += _RR.size
+            value, priority = _decode_rdata(data, offset, length, type_code)
+            records.append(DNSAnswer(name, _type_name(type_code), value, ttl, priority))
+            offset += length
+        sections.append(records)
+
+    return {
+        "id": query_id,
+        "rcode": RCODES.get(flags & 0x000F, f"RCODE{flags & 0x000F}"),
+        "truncated": bool(flags & 0x0200),
+        "question": question,
+        "answers": sections[0],
+        "authority": sections[1],
+    }
+
+
+# --- Cache -----------------------------------------------------------------
+
+class DNSCache:
+    """LRU cache of responses, each entry expiring with its TTL."""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, DNSResponse]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[DNSResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, response = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def set(self, key: Tuple[str, str], response: DNSResponse, ttl: int):
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + min(ttl, MAX_CACHE_TTL), response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# --- Transport -------------------------------------------------------------
+
+class _UDPChannel(asyncio.DatagramProtocol):
+    """One connected UDP socket per nameserver, multiplexed by query id."""
+
+    def __init__(self):
+        self.transport = None
+        self.pending: Dict[int, asyncio.Future] = {}
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr):
+        if len(data) < _HEADER.size:
+            return
+        future = self.pending.pop(int.from_bytes(data[:2], "big"), None)
+        if future is not None and not future.done():
+            future.set_result(data)
+
+    def error_received(self, exc: Exception):
+        self._fail_pending(exc)
+
+    def connection_lost(self, exc: Optional[Exception]):
+        self._fail_pending(exc or ConnectionError("DNS socket closed"))
+        self.transport = None
+
+    def _fail_pending(self, exc: Exception):
+        pending, self.pending = self.pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(exc)
+
+    def new_query_id(self) -> int:
+        while True:
+            query_id = secrets.randbits(16)
+            if query_id not in self.pending:
+                return query_id
+
+    def send(self, query_id: int, packet: bytes) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.pending[query_id] = future
+        self.transport.sendto(packet)
+        return future
+
+
+def _parse_nameserver(address: str) -> Tuple[str, int]:
+    if address.startswith("["):
+        host, _, rest = address[1:].partition("]")
+        return host, int(rest[1:]) if rest.startswith(":") else 53
+    if address.count(":") == 1:
+        host, port = address.split(":")
+        return host, int(port)
+    return address, 53
+
+
+def system_nameservers(path: str = "/etc/resolv.conf") -> List[str]:
+    nameservers = []
+    try:
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == "nameserver":
+                    nameservers.append(parts[1])
+    except OSError:
+        pass
+    return nameservers or ["8.8.8.8", "1.1.1.1"]
+
+
+# --- Resolver --------------------------------------------------------------
+
+class DNSResolver:
+    """Async stub resolver with caching, coalescing and bounded concurrency."""
+
+    def __init__(
+        self,
+        nameservers: Optional[Sequence[str]] = None,
+        timeout: float = 2.0,
+        attempts: int = 2,
+        max_inflight: int = 256,
+        negative_ttl: int = 300,
+        cache_size: int = 10000
+    ):
+        self.nameservers = [_parse_nameserver(ns) for ns in (nameservers or system_nameservers())]
+        self.timeout = timeout
+        self.attempts = max(1, attempts)
+        self.max_inflight = max_inflight
+        self.negative_ttl = negative_ttl
+        self.cache = DNSCache(cache_size)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._channels: Dict[Tuple[str, int], _UDPChannel] = {}
+        self._channel_lock: Optional[asyncio.Lock] = None
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+
+        self.queries_sent = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.tcp_fallbacks = 0
+
+    def _bind_loop(self):
+        # Sockets, locks and tasks belong to one event loop; start over on a new one
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_inflight)
+            self._channel_lock = asyncio.Lock()
+            self._channels = {}
+            self._inflight = {}
+
+    async def _channel(self, nameserver: Tuple[str, int]) -> _UDPChannel:
+        channel = self._channels.get(nameserver)
+        if channel is not None and channel.transport is not None:
+            return channel
+        async with self._channel_lock:
+            channel = self._channels.get(nameserver)
+            if channel is None or channel.transport is None:
+                _, channel = await self._loop.create_datagram_endpoint(_UDPChannel, remote_addr=nameserver)
+                self._channels[nameserver] = channel
+            return channel
+
+    async def query(self, name: str, record_type: str = "A", cache_negative: bool = True) -> DNSResponse:
+        """
+        Resolve one name/type, from cache when possible.
+
+        With cache_negative=False an NXDOMAIN / no-data answer is returned but
+        not cached, so bulk guessing (subdomain brute force) doesn't fill the
+        shared cache with names nobody will ask for again.
+        """
+        self._bind_loop()
+        key = (normalize_name(name), record_type.upper())
+        _type_code(key[1])
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = self._loop.create_task(self._resolve(*key, cache_negative=cache_negative))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield: a cancelled caller must not cancel the lookup others wait on
+        return await asyncio.shield(task)
+
+    async def resolve(self, name: str, record_type: str = "A") -> List[DNSAnswer]:
+        return (await self.query(name, record_type)).records
+
+    async def resolve_many(self, name: str, record_types: Iterable[str]) -> Dict[str, List[DNSAnswer]]:
+        """Query several record types for one name concurrently."""
+        record_types = [record_type.upper() for record_type in record_types]
+        responses = await asyncio.gather(*(self.query(name, record_type) for record_type in record_types))
+        return {record_type: response.records for record_type, response in zip(record_types, responses)}
+
+    async def query_batch(
+        self,
+        names: Iterable[str],
+        record_type: str = "A",
+        cache_negative: bool = True
+    ) -> Dict[str, DNSResponse]:
+        """Query one record type for many names concurrently."""
+        names = list(names)
+        responses = await asyncio.gather(*(self.query(name, record_type, cache_negative) for name in names))
+        return dict(zip(names, responses))
+
+    async def gethostbyname(self, name: str) -> Optional[str]:
+        """First IPv4 address of a name, or None."""
+        records = await self.resolve(name, "A")
+        return records[0].value if records else None
+
+    async def _resolve(self, name: str, record_type: str, cache_negative: bool = True) -> DNSResponse:
+        async with self._semaphore:
+            parsed = None
+            for attempt in range(self.attempts):
+                for nameserver in self.nameservers:
+                    try:
+                        parsed = await self._exchange(nameserver, name, record_type)
+                    except (asyncio.TimeoutError, OSError, ValueError, IndexError, struct.error) as e:
+                        self.timeouts += isinstance(e, asyncio.TimeoutError)
+                        logger.debug(f"DNS {record_type} {name} via {nameserver[0]} failed: {e!r}")
+                        continue
+                    if parsed["rcode"] in ("NOERROR", "NXDOMAIN"):
+                        break
+                if parsed is not None and parsed["rcode"] in ("NOERROR", "NXDOMAIN"):
+                    break
+
+        if parsed is None:
+            return DNSResponse(name, record_type, "TIMEOUT")
+
+        records = [record for record in parsed["answers"] if record.record_type == record_type]
+        response = DNSResponse(name, record_type, parsed["rcode"], records)
+        if records:
+            response.ttl = min(record.ttl for record in records)
+        elif parsed["rcode"] in ("NOERROR", "NXDOMAIN"):
+            response.ttl = self._negative_ttl(parsed["authority"])
+            if not cache_negative:
+                return response
+        self.cache.set((name, record_type), response, response.ttl)
+        return response
+
+    def _negative_ttl(self, authority: List[DNSAnswer]) -> int:
+        for record in authority:
+            if record.record_type == "SOA":
+                minimum = int(record.value.split()[-1])
+                return min(record.ttl, minimum)
+        return self.negative_ttl
+
+    async def _exchange(self, nameserver: Tuple[str, int], name: str, record_type: str) -> Dict:
+        channel = await self._channel(nameserver)
+        query_id = channel.new_query_id()
+        packet = build_query(query_id, name, record_type)
+        self.queries_sent += 1
+        future = channel.send(query_id, packet)
+        try:
+            data = await asyncio.wait_for(future, self.timeout)
+        finally:
+            channel.pending.pop(query_id, None)
+
+        parsed = parse_response(data)
+        if parsed["truncated"]:
+            self.tcp_fallbacks += 1
+            parsed = parse_response(await self._exchange_tcp(nameserver, packet))
+        if parsed["question"] and parsed["question"][0] != name:
+            raise ValueError(f"DNS response for {parsed['question'][0]}, expected {name}")
+        return parsed
+
+    async def _exchange_tcp(self, nameserver: Tuple[str, int], packet: bytes) -> bytes:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(*nameserver), self.timeout)
+        try:
+            writer.write(len(packet).to_bytes(2, "big") + packet)
+            await writer.drain()
+            length = int.from_bytes(await asyncio.wait_for(reader.readexactly(2), self.timeout), "big")
+            return await asyncio.wait_for(reader.readexactly(length), self.timeout)
+        finally:
+            writer.close()
+
+    async def close(self):
+        for channel in self._channels.values():
+            if channel.transport is not None:
+                channel.transport.close()
+        self._channels = {}
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "queries_sent": self.queries_sent,
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "cache_size": len(self.cache),
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+            "tcp_fallbacks": self.tcp_fallbacks,
+            "inflight": len(self._inflight),
+        }
+
+
+_dns_resolver: Optional[DNSResolver] = None
+
+
+def get_dns_resolver() -> DNSResolver:
+    """Shared resolver configured from settings."""
+    global _dns_resolver
+    if _dns_resolver is None:
+        _dns_resolver = DNSResolver(
+            nameservers=settings.DNS_NAMESERVERS or None,
+            timeout=settings.DNS_TIMEOUT,
+            attempts=settings.DNS_ATTEMPTS,
+            max_inflight=settings.DNS_MAX_INFLIGHT,
+            negative_ttl=settings.DNS_NEGATIVE_TTL,
+            cache_size=settings.DNS_CACHE_SIZE
+        )
+    return _dns_resolver
+
+
+# --- Stub server -----------------------------------------------------------
+
+def _encode_rdata(record_type: str, value: str) -> bytes:
+    if record_type == "A":
+        return socket.inet_pton(socket.AF_INET, value)
+    if record_type == "AAAA":
+        return socket.inet_pton(socket.AF_INET6, value)
+    if record_type in ("NS", "CNAME", "PTR"):
+        return encode_name(value)
+    if record_type == "MX":
+        preference, exchange = value.split(None, 1)
+        return struct.pack("!H", int(preference)) + encode_name(exchange)
+    if record_type == "TXT":
+        raw = value.encode("utf-8")
+        return b"".join(bytes((len(chunk),)) + chunk for chunk in (raw[i:i + 255] for i in range(0, max(len(raw), 1), 255)))
+    if record_type == "SOA":
+        mname, rname, *numbers = value.split()
+        return encode_name(mname) + encode_name(rname) + struct.pack("!IIIII", *(int(n) for n in numbers))
+    if record_type == "SRV":
+        priority, weight, port, target = value.split()
+        return struct.pack("!HHH", int(priority), int(weight), int(port)) + encode_name(target)
+    return value.encode("utf-8")
+
+
+class _StubProtocol(asyncio.DatagramProtocol):
+
+    def __init__(self, server: "StubDNSServer"):
+        self.server = server
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr):
+        self.server.queries += 1
+        try:
+            response = self.server.answer(data)
+        except (ValueError, IndexError, struct.error):
+            return
+        if self.server.delay:
+            asyncio.get_running_loop().call_later(self.server.delay, self.transport.sendto, response, addr)
+        else:
+            self.transport.sendto(response, addr)
+
+
+class StubDNSServer:
+    """
+    Authoritative-only DNS server on a local UDP port, answering from an
+    in-memory zone. Wildcard records (``*.example.com``) are supported.
+
+        async with StubDNSServer() as server:
+            server.add("example.com", "A", "93.184.216.34")
+            resolver = DNSResolver([server.address])
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay: float = 0.0, negative_ttl: int = 60):
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.negative_ttl = negative_ttl
+        self.records: Dict[Tuple[str, str], List[Tuple[str, int]]] = {}
+        self.queries = 0
+        self._transport = None
+
+    def add(self, name: str, record_type: str, value: str, ttl: int = 300):
+        self.records.setdefault((normalize_name(name), record_type.upper()), []).append((value, ttl))
+
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    def _lookup(self, name: str) -> Optional[str]:
+        """Owner name in the zone that answers for ``name`` (exact or wildcard)."""
+        owners = {owner for owner, _ in self.records}
+        if name in owners:
+            return name
+        labels = name.split(".")
+        for i in range(1, len(labels)):
+            wildcard = "*." + ".".join(labels[i:])
+            if wildcard in owners:
+                return wildcard
+        return None
+
+    def answer(self, query: bytes) -> bytes:
+        query_id, _, qdcount, _, _, _ = _HEADER.unpack_from(query, 0)
+        name, offset = read_name(query, _HEADER.size)
+        type_code, _ = _QUESTION.unpack_from(query, offset)
+        question = query[_HEADER.size:offset + _QUESTION.size]
+        record_type = _type_name(type_code)
+
+        owner = self._lookup(name)
+        answers = []
+        authority = []
+        if owner is not None:
+            for value, ttl in self.records.get((owner, record_type), []):
+                answers.append((name, record_type, value, ttl))
+        else:
+            zone = ".".join(name.split(".")[-2:])
+            soa = f"ns.{zone} hostmaster.{zone} 1 3600 600 86400 {self.negative_ttl}"
+            authority.append((zone, "SOA", soa, self.negative_ttl))
+
+        # Flags: response, authoritative, recursion desired/available
+        flags = 0x8580 | (0 if owner is not None else 3)
+        out = bytearray(_HEADER.pack(query_id, flags, 1, len(answers), len(authority), 0))
+        out += question
+        for owner_name, rtype, value, ttl in answers + authority:
+            rdata = _encode_rdata(rtype, value)
+            out += encode_name(owner_name) + _RR.pack(RECORD_TYPES[rtype], 1, ttl, len(rdata)) + rdata
+        return bytes(out)
+
+    async def start(self) -> "StubDNSServer":
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _StubProtocol(self), local_addr=(self.host, self.port)
+        )
+        self.port = self._transport.get_extra_info("sockname")[1]
+        return self
+
+    def close(self):
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    async def __aenter__(self) -> "StubDNSServer":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
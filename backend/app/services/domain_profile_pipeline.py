@@ -0,0 +1,182 @@
+"""
+Bulk Domain Profiling
+
+Profiles large domain lists with TechnicalIntelligenceService by running
+the lookups as a pipeline: every stage (DNS, network, WHOIS, TLS) has its
+own worker pool and bounded queue, so while one domain waits on RDAP,
+others are resolving or handshaking. Profiles stream out as they finish.
+
+Lookups shared between domains run once per pipeline: domains hosted on
+the same IP reuse one IP→ASN/geo lookup.
+
+The network stage looks up the addresses found by the DNS stage, so
+selecting it adds the DNS stage if it was left out.
+
+The TLS stage uses the live handshake only; certificate transparency
+(crt.sh) is left to per-domain ``analyze_ssl_certificates`` calls, as it
+rate-limits bulk queries.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence
+
+from app.services.dns_resolver import normalize_name
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_STAGES = ("dns", "network", "whois", "tls")
+
+# Workers per stage; remote APIs (ipinfo, RDAP) get small pools
+DEFAULT_WORKERS = {
+    "dns": 100,
+    "network": 20,
+    "whois": 10,
+    "tls": 50,
+}
+
+PROFILE_RECORD_TYPES = ["A", "AAAA", "MX", "NS", "TXT"]
+
+_DONE = object()
+
+
+@dataclass
+class DomainProfile:
+    """Everything the pipeline found for one domain."""
+    domain: str
+    ip_addresses: List[str] = field(default_factory=list)
+    dns_records: List[Any] = field(default_factory=list)
+    network_nodes: List[Any] = field(default_factory=list)
+    whois: Optional[Any] = None
+    ssl_certificates: List[Any] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.perf_counter)
+    elapsed: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class DomainProfilePipeline:
+    """Staged, concurrent profiling of many domains."""
+
+    def __init__(
+        self,
+        service,
+        stages: Sequence[str] = DEFAULT_STAGES,
+        workers: Optional[Dict[str, int]] = None
+    ):
+        self.service = service
+        unknown = set(stages) - set(DEFAULT_WORKERS)
+        if unknown:
+            raise ValueError(f"Unknown pipeline stages: {sorted(unknown)}")
+        self.stages = list(stages)
+        # The network stage only sees the addresses the DNS stage resolved
+        if "network" in self.stages and "dns" not in self.stages:
+            self.stages.insert(0, "dns")
+        self.workers = {**DEFAULT_WORKERS, **(workers or {})}
+        self._handlers: Dict[str, Callable[[DomainProfile], Awaitable[None]]] = {
+            "dns": self._dns_stage,
+            "network": self._network_stage,
+            "whois": self._whois_stage,
+            "tls": self._tls_stage,
+        }
+        self._ip_lookups: Dict[str, asyncio.Task] = {}
+        self.stats = {"domains": 0, "completed": 0, "errors": 0, "ip_lookups": 0, "ip_lookups_shared": 0}
+
+    async def run(self, domains: Iterable[str]) -> AsyncIterator[DomainProfile]:
+        """Yield a profile per (distinct) domain, in completion order."""
+        queues = [asyncio.Queue(maxsize=self.workers[stage] * 2) for stage in self.stages]
+        output: asyncio.Queue = asyncio.Queue()
+        outboxes = queues[1:] + [output]
+
+        async def feed():
+            seen = set()
+            try:
+                for domain in domains:
+                    domain = normalize_name(domain)
+                    if domain and domain not in seen:
+                        seen.add(domain)
+                        self.stats["domains"] += 1
+                        await queues[0].put(DomainProfile(domain))
+            finally:
+                # Always end the stages, or run() would wait on the output forever
+                for _ in range(self.workers[self.stages[0]]):
+                    await queues[0].put(_DONE)
+
+        async def worker(stage: str, inbox: asyncio.Queue, outbox: asyncio.Queue):
+            handler = self._handlers[stage]
+            while True:
+                profile = await inbox.get()
+                if profile is _DONE:
+                    return
+                try:
+                    await handler(profile)
+                except Exception as e:
+                    profile.errors[stage] = str(e)
+                    logger.debug(f"{stage} stage failed for {profile.domain}: {e}")
+                await outbox.put(profile)
+
+        async def run_stage(index: int):
+            stage = self.stages[index]
+            await asyncio.gather(*(
+                worker(stage, queues[index], outboxes[index]) for _ in range(self.workers[stage])
+            ))
+            # Hand the end-of-input marker on to every worker of the next stage
+            downstream = self.workers[self.stages[index + 1]] if index + 1 < len(self.stages) else 1
+            for _ in range(downstream):
+                await outboxes[index].put(_DONE)
+
+        feeder = asyncio.ensure_future(feed())
+        tasks = [feeder] + [asyncio.ensure_future(run_stage(index)) for index in range(len(self.stages))]
+        try:
+            while True:
+                profile = await output.get()
+                # Bad input (e.g. a generator that raised) is the caller's error
+                if feeder.done() and not feeder.cancelled() and feeder.exception() is not None:
+                    raise feeder.exception()
+                if profile is _DONE:
+                    break
+                profile.elapsed = time.perf_counter() - profile.started_at
+                self.stats["completed"] += 1
+                self.stats["errors"] += bool(profile.errors)
+                yield profile
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def run_all(self, domains: Iterable[str]) -> List[DomainProfile]:
+        return [profile async for profile in self.run(domains)]
+
+    async def _dns_stage(self, profile: DomainProfile):
+        profile.dns_records = await self.service.analyze_dns_records(profile.domain, PROFILE_RECORD_TYPES)
+        profile.ip_addresses = [record.value for record in profile.dns_records if record.record_type == "A"]
+
+    async def _lookup_ip(self, ip: str):
+        task = self._ip_lookups.get(ip)
+        if task is None:
+            self.stats["ip_lookups"] += 1
+            task = self._ip_lookups[ip] = asyncio.ensure_future(self.service._analyze_ip_address(ip))
+        else:
+            self.stats["ip_lookups_shared"] += 1
+        return await asyncio.shield(task)
+
+    async def _network_stage(self, profile: DomainProfile):
+        nodes = await asyncio.gather(*(self._lookup_ip(ip) for ip in profile.ip_addresses))
+        # Nodes are shared between domains; each profile gets its own copy
+        profile.network_nodes = [replace(node, hostname=profile.domain) for node in nodes if node is not None]
+
+    async def _whois_stage(self, profile: DomainProfile):
+        profile.whois = await self.service.perform_whois_lookup(profile.domain)
+
+    async def _tls_stage(self, profile: DomainProfile):
+        handshake = await self.service.certificate_grabber.grab(profile.domain)
+        if handshake.leaf is not None:
+            profile.ssl_certificates = [self.service._certificate_from_handshake(profile.domain, handshake)]
+        elif handshake.error:
+            profile.errors["tls"] = handshake.error
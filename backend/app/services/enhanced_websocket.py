@@ -8,8 +8,17 @@ import json
 import asyncio
 from datetime import datetime
 from enum import Enum
+import logging
 import uuid
 
+from app.services.progress_channel import (
+    ProgressChannel, MODE_DELTA, MODE_SNAPSHOT
+)
+from app.services.websocket_backplane import Backplane, BackplaneMessage, create_backplane
+from app.services.websocket_writer import ConnectionWriter, SLOW_CONSUMER_CLOSE_CODE
+
+logger = logging.getLogger(__name__)
+
 
 class MessageType(str, Enum):
     """WebSocket message types."""
@@ -79,7 +88,7 @@ class StreamingResponse:
 class EnhancedWebSocketManager:
     """Enhanced WebSocket manager with streaming and collaboration features."""
     
-    def __init__(self):
+    def __init__(self, backplane: Optional[Backplane] = None):
         # Connection management
         self.connections: Dict[str, Dict[str, WebSocket]] = {}  # pipeline_id -> {user_id: websocket}
         self.user_info: Dict[str, Dict] = {}  # user_id -> user info
@@ -93,6 +102,30 @@ class EnhancedWebSocketManager:
         
         # Auto-save drafts
         self.draft_timers: Dict[str, asyncio.Task] = {}
+        
+        # Cross-worker fan-out
+        self.backplane = backplane or create_backplane("enhanced")
+        
+        # Outbound writer per socket, keyed by id(websocket)
+        self.writers: Dict[int, ConnectionWriter] = {}
+        self.slow_consumers_dropped = 0
+        
+        # Delta-encoded progress per pipeline/investigation
+        self.progress = ProgressChannel(self._emit_progress)
+    
+    async def _ensure_backplane(self):
+        """Subscribe to broadcasts from other workers (idempotent)."""
+        if not self.backplane.started:
+            await self.backplane.start(self._on_backplane_message)
+    
+    async def _on_backplane_message(self, message: BackplaneMessage):
+        """Deliver a broadcast published by another worker to local sockets."""
+        if message.audience == MODE_DELTA:
+            # Mirror the stream so clients attached here can resync
+            self.progress.observe(message.pipeline_id, json.loads(message.data))
+        self._deliver_local(
+            message.pipeline_id, message.data, message.exclude, message.coalesce_key, message.audience
+        )
     
     async def connect(
         self,
@@ -102,6 +135,7 @@ class EnhancedWebSocketManager:
     ):
         """Accept and manage a WebSocket connection."""
         await websocket.accept()
+        await self._ensure_backplane()
         
         # Generate user ID if not provided
         if not user_id:
@@ -118,27 +152,43 @@ class EnhancedWebSocketManager:
                 "collaborators": []
             }
         
+        # A reconnect with the same user_id replaces the previous socket and its writer
+        previous = self.connections[pipeline_id].get(user_id)
+        if previous is not None and previous is not websocket:
+            self._release_writer(previous, "replaced")
+            asyncio.create_task(self._close_quietly(previous, code=1000))
+        
         # Add connection
         self.connections[pipeline_id][user_id] = websocket
+        writer = ConnectionWriter(
+            websocket,
+            on_close=lambda w, reason: self._on_writer_closed(w, reason, pipeline_id, user_id),
+            name=f"{pipeline_id}/{user_id}"
+        )
+        self.writers[id(websocket)] = writer
+        writer.start()
         
         # Store user info
         self.user_info[user_id] = {
             "id": user_id,
             "pipeline_id": pipeline_id,
             "connected_at": datetime.utcnow().isoformat(),
-            "is_editing": False
+            "is_editing": False,
+            "progress_mode": MODE_SNAPSHOT
         }
         
         # Update collaborators
-        self.pipeline_states[pipeline_id]["collaborators"].append(user_id)
+        if user_id not in self.pipeline_states[pipeline_id]["collaborators"]:
+            self.pipeline_states[pipeline_id]["collaborators"].append(user_id)
         
         # Send connection confirmation
-        await websocket.send_json({
+        await self._send_safe(websocket, {
             "type": MessageType.CONNECTION,
             "status": "connected",
             "user_id": user_id,
             "pipeline_id": pipeline_id,
             "state": self.pipeline_states[pipeline_id],
+            "progress_seq": self.progress.current_seq(pipeline_id),
             "collaborators": list(self.connections[pipeline_id].keys()),
             "timestamp": datetime.utcnow().isoformat()
         })
@@ -156,8 +206,15 @@ class EnhancedWebSocketManager:
     
     def disconnect(self, websocket: WebSocket, pipeline_id: str, user_id: str):
         """Remove a WebSocket connection."""
+        self._release_writer(websocket, "disconnected")
+        
+        # A socket replaced by a reconnect leaves the user's new connection alone
+        current = self.connections.get(pipeline_id, {}).get(user_id)
+        if current is not None and current is not websocket:
+            return
+        
         if pipeline_id in self.connections:
-            if user_id in self.connections[pipeline_id]:
+            if self.connections[pipeline_id].get(user_id) is websocket:
                 del self.connections[pipeline_id][user_id]
             
             # Update collaborators
@@ -183,21 +240,25 @@ class EnhancedWebSocketManager:
         if user_id in self.user_info:
             del self.user_info[user_id]
     
-    async def broadcast(self, pipeline_id: str, message: Dict):
-        """Broadcast message to all connections for a pipeline."""
-        if pipeline_id not in self.connections:
-            return
+    async def broadcast(
+        self,
+        pipeline_id: str,
+        message: Dict,
+        coalesce_key: Optional[str] = None,
+        audience: Optional[str] = None
+    ):
+        """
+        Broadcast message to all connections for a pipeline on every worker.
         
+        Messages sharing a coalesce_key supersede each other: a client that
+        has not yet received the previous one only gets the newest. An
+        audience restricts delivery to connections in that progress mode.
+        """
         # Add timestamp if not present
         if "timestamp" not in message:
             message["timestamp"] = datetime.utcnow().isoformat()
         
-        # Send to all connected users
-        tasks = []
-        for user_id, websocket in self.connections[pipeline_id].items():
-            tasks.append(self._send_safe(websocket, message))
-        
-        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._fan_out(pipeline_id, message, coalesce_key=coalesce_key, audience=audience)
     
     async def broadcast_to_others(
         self,
@@ -206,24 +267,126 @@ class EnhancedWebSocketManager:
         message: Dict
     ):
         """Broadcast message to all connections except sender."""
-        if pipeline_id not in self.connections:
-            return
-        
         message["timestamp"] = datetime.utcnow().isoformat()
         
-        tasks = []
-        for user_id, websocket in self.connections[pipeline_id].items():
-            if user_id != sender_id:
-                tasks.append(self._send_safe(websocket, message))
-        
-        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._fan_out(pipeline_id, message, exclude=sender_id)
+    
+    async def _fan_out(
+        self,
+        pipeline_id: str,
+        message: Dict,
+        exclude: Optional[str] = None,
+        coalesce_key: Optional[str] = None,
+        audience: Optional[str] = None
+    ):
+        """Serialize once, queue for local sockets and publish to the other workers."""
+        await self._ensure_backplane()
+        data = self._encode(message)
+        self._deliver_local(pipeline_id, data, exclude, coalesce_key, audience)
+        await self.backplane.publish(BackplaneMessage(
+            pipeline_id=pipeline_id,
+            data=data,
+            exclude=exclude,
+            coalesce_key=coalesce_key,
+            audience=audience
+        ))
+    
+    def _deliver_local(
+        self,
+        pipeline_id: str,
+        data: str,
+        exclude: Optional[str] = None,
+        coalesce_key: Optional[str] = None,
+        audience: Optional[str] = None
+    ):
+        """Queue an already-serialized message on this worker's sockets."""
+        for user_id, websocket in list(self.connections.get(pipeline_id, {}).items()):
+            if user_id == exclude:
+                continue
+            if audience and self.user_info.get(user_id, {}).get("progress_mode", MODE_SNAPSHOT) != audience:
+                continue
+            self._enqueue(websocket, data, coalesce_key)
+    
+    async def publish_progress(self, pipeline_id: str, kind: str, state: Dict):
+        """
+        Publish the latest progress of one kind (e.g. "scraping_progress").
+        
+        Delta subscribers receive throttled, sequenced patches; other clients
+        keep receiving full ``{"type": kind, ...}`` messages at the same rate.
+        """
+        await self.progress.publish(pipeline_id, kind, state)
+    
+    async def _emit_progress(self, pipeline_id: str, patch: Dict, state: Dict, changed: List[str]):
+        await self.broadcast(pipeline_id, patch, audience=MODE_DELTA)
+        for kind in changed:
+            if kind in state:
+                await self.broadcast(
+                    pipeline_id,
+                    {"type": kind, **state[kind]},
+                    coalesce_key=kind,
+                    audience=MODE_SNAPSHOT
+                )
+    
+    def subscribe_progress(self, pipeline_id: str, user_id: str, since_seq: Optional[int] = None) -> Dict:
+        """Switch a connection to delta progress and return its resync message."""
+        if user_id in self.user_info:
+            self.user_info[user_id]["progress_mode"] = MODE_DELTA
+        return self.progress.resync(pipeline_id, since_seq)
+    
+    @staticmethod
+    def _encode(message: Dict) -> str:
+        return json.dumps(message, separators=(",", ":"), ensure_ascii=False, default=str)
     
     async def _send_safe(self, websocket: WebSocket, message: Dict):
         """Safely send message to websocket."""
+        self._enqueue(websocket, self._encode(message))
+    
+    def _enqueue(self, websocket: WebSocket, data: str, coalesce_key: Optional[str] = None):
+        writer = self.writers.get(id(websocket))
+        if writer is None:
+            # Socket not managed here (e.g. already disconnected)
+            logger.debug("Dropping message for unmanaged WebSocket")
+            return
+        writer.enqueue(data, coalesce_key)
+    
+    def _on_writer_closed(self, writer: ConnectionWriter, reason: str, pipeline_id: str, user_id: str):
+        """Drop a connection whose writer gave up (slow consumer or send failure)."""
+        logger.warning(f"Closing WebSocket {pipeline_id}/{user_id}: {reason}")
+        if reason == "slow consumer":
+            self.slow_consumers_dropped += 1
+        self.disconnect(writer.websocket, pipeline_id, user_id)
+        asyncio.create_task(self._close_quietly(writer.websocket))
+    
+    def _release_writer(self, websocket: WebSocket, reason: str):
+        """Stop a socket's writer task without triggering its close callback."""
+        writer = self.writers.pop(id(websocket), None)
+        if writer:
+            writer.on_close = None
+            writer.close(reason)
+    
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket, code: int = SLOW_CONSUMER_CLOSE_CODE):
         try:
-            await websocket.send_json(message)
-        except Exception as e:
-            print(f"Error sending message: {e}")
+            await websocket.close(code=code)
+        except Exception:
+            pass
+    
+    def get_queue_metrics(self) -> Dict[str, Any]:
+        """Outbound queue depth and drop counters for this worker."""
+        connections = {writer.name: writer.get_metrics() for writer in self.writers.values()}
+        depths = [m["queue_depth"] for m in connections.values()]
+        return {
+            "connections": len(connections),
+            "total_queue_depth": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "downgraded_connections": sum(1 for m in connections.values() if m["downgraded"]),
+            "dropped_messages": sum(m["dropped"] for m in connections.values()),
+            "coalesced_messages": sum(m["coalesced"] for m in connections.values()),
+            "slow_consumers_dropped": self.slow_consumers_dropped,
+            "per_connection": connections,
+            "backplane": self.backplane.get_stats(),
+            "progress": self.progress.get_stats()
+        }
     
     async def stream_scraping_progress(
         self,
@@ -231,8 +394,7 @@ class EnhancedWebSocketManager:
         progress: Dict
     ):
         """Stream real-time scraping progress with preview."""
-        message = {
-            "type": MessageType.SCRAPING_PROGRESS,
+        state = {
             "pipeline_id": pipeline_id,
             "current_url": progress.get("current_url"),
             "current_index": progress.get("current_index", 0),
@@ -243,11 +405,10 @@ class EnhancedWebSocketManager:
             ),
             "status": progress.get("status", "processing"),
             "extracted_data_preview": progress.get("preview"),
-            "estimated_time_remaining": progress.get("eta"),
-            "timestamp": datetime.utcnow().isoformat()
+            "estimated_time_remaining": progress.get("eta")
         }
         
-        await self.broadcast(pipeline_id, message)
+        await self.publish_progress(pipeline_id, MessageType.SCRAPING_PROGRESS.value, state)
     
     async def stream_suggestions(
         self,
@@ -501,6 +662,12 @@ class EnhancedWebSocketManager:
             
             return result
         
+        elif message_type == "progress_subscribe":
+            return self.subscribe_progress(pipeline_id, user_id, data.get("since_seq"))
+        
+        elif message_type == "progress_resync":
+            return self.progress.resync(pipeline_id, data.get("since_seq"))
+        
         elif message_type == MessageType.PING:
             return {"type": MessageType.PONG}
         
@@ -524,7 +691,14 @@ class EnhancedWebSocketManager:
         for timer in self.draft_timers.values():
             timer.cancel()
         
-        # Close all connections
+        await self.backplane.stop()
+        
+        # Stop writers and close all connections
+        for writer in list(self.writers.values()):
+            writer.on_close = None
+            writer.close("shutdown")
+        self.writers.clear()
+        
         for pipeline_connections in self.connections.values():
             for websocket in pipeline_connections.values():
                 await websocket.close()
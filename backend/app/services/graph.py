@@ -7,6 +7,7 @@ using LangGraph for state management and agent coordination.
 
 import asyncio
 import logging
+import os
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 
@@ -19,8 +20,13 @@ from .state import (
     calculate_progress,
     add_error,
     add_warning,
-    update_resource_costs
+    update_resource_costs,
+    ensure_tracking_sets
 )
+from .result_store import SearchResults, materialize_results
+from .progress_tracker import start_tracking, get_tracker, stop_tracking
+from .blob_store import get_blob_store
+from app.utils.lazy_import import load_module_from_path
 from app.agents.specialized.planning.objective_definition import ObjectiveDefinitionAgent
 from app.agents.specialized.planning.strategy_formulation import StrategyFormulationAgent
 from app.agents.specialized.collection.surface_web_collector import SurfaceWebCollectorAgent
@@ -54,31 +60,15 @@ class OSINTWorkflow:
          self.logger = logging.getLogger(f"{__name__}.OSINTWorkflow")
          
          # Initialize agents
-         # Using dynamic import to avoid import issues
-         import importlib.util
-         import os
-         tool_module_path = os.path.join(os.path.dirname(__file__), '..', 'agents', 'tools', 'langchain_tools.py')
-         spec = importlib.util.spec_from_file_location("langchain_tools", tool_module_path)
-         if spec is not None and spec.loader is not None:
-            tool_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(tool_module)
-            get_global_tool_manager = tool_module.get_global_tool_manager
-         else:
-            raise ImportError("Could not load scraping tools module")
+         # Loaded once per process and shared (see app.utils.lazy_import)
+         tool_module = load_module_from_path("langchain_tools", os.path.join(os.path.dirname(__file__), '..', 'agents', 'tools', 'langchain_tools.py'))
+         get_global_tool_manager = tool_module.get_global_tool_manager
          tool_manager = get_global_tool_manager()
          
          # Initialize AI backend bridge for state synchronization
-         # Using dynamic import to avoid import issues
-         import importlib.util
-         import os
-         bridge_module_path = os.path.join(os.path.dirname(__file__), 'ai_backend_bridge.py')
-         spec = importlib.util.spec_from_file_location("ai_backend_bridge", bridge_module_path)
-         if spec is not None and spec.loader is not None:
-            bridge_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(bridge_module)
-            get_global_ai_bridge = bridge_module.get_global_ai_bridge
-         else:
-            raise ImportError("Could not load AI backend bridge module")
+         # Loaded once per process and shared (see app.utils.lazy_import)
+         bridge_module = load_module_from_path("ai_backend_bridge", os.path.join(os.path.dirname(__file__), 'ai_backend_bridge.py'))
+         get_global_ai_bridge = bridge_module.get_global_ai_bridge
          
          # Get the bridge instance (this will be awaited when used)
          self.ai_backend_bridge = get_global_ai_bridge
@@ -124,6 +114,7 @@ class OSINTWorkflow:
         )
         
         self.logger.info(f"Starting investigation: {state['investigation_id']}")
+        tracker = start_tracking(state['investigation_id'])
         
         # Sync initial state with backend
         try:
@@ -153,6 +144,7 @@ class OSINTWorkflow:
                InvestigationPhase.COMPLETED, 
                InvestigationStatus.COMPLETED
            )
+           tracker.apply(state)
            
            self.logger.info(f"Investigation completed: {state['investigation_id']}")
            
@@ -182,6 +174,8 @@ class OSINTWorkflow:
                    self.logger.warning(f"Failed state sync failed: {sync_result.get('error')}")
            except Exception as sync_e:
                self.logger.warning(f"Could not sync failed investigation state with backend: {str(sync_e)}")
+        finally:
+           stop_tracking(state['investigation_id'])
         
         return state
     
@@ -206,18 +200,22 @@ class OSINTWorkflow:
            except Exception as e:
                self.logger.warning(f"Could not sync planning phase state with backend: {str(e)}")
            
-           # Step 1: Define objectives
-           state = await objective_definition_node(state)
-           
-           # Step 2: Formulate strategy
-           state = await strategy_formulation_node(state)
+           if self.config.get("speculative_planning", True):
+               # Steps 1+2 overlapped: objectives and a draft strategy in parallel
+               state = await self._run_speculative_planning(state)
+           else:
+               # Step 1: Define objectives
+               state = await self._run_node(state, "objective_definition", objective_definition_node)
+               
+               # Step 2: Formulate strategy
+               state = await self._run_node(state, "strategy_formulation", strategy_formulation_node)
            
            # Mark planning phase as completed
            state = update_phase_status(
                state,
                InvestigationPhase.PLANNING,
                InvestigationStatus.COMPLETED,
-               {"duration": 5.0, "agents_used": ["ObjectiveDefinitionAgent", "StrategyFormulationAgent"]}
+               {"duration": self._finish_phase(state, InvestigationPhase.PLANNING), "agents_used": ["ObjectiveDefinitionAgent", "StrategyFormulationAgent"]}
            )
            
            # Update progress percentage
@@ -256,6 +254,44 @@ class OSINTWorkflow:
         
         return state
     
+    async def _run_speculative_planning(self, state: InvestigationState) -> InvestigationState:
+        """
+        Define objectives while a strategy is drafted from the raw request.
+        
+        When the objectives arrive, the draft is reconciled without another
+        LLM call. If it stands, search coordination runs immediately so the
+        collection phase can start right away; otherwise the strategy is
+        formulated again from the objectives, as in sequential planning.
+        """
+        draft_task = asyncio.create_task(draft_strategy_node(state))
+        try:
+           state = await self._run_node(state, "objective_definition", objective_definition_node)
+           draft_strategy = await draft_task
+        finally:
+           if not draft_task.done():
+               draft_task.cancel()
+        
+        reconciliation = (
+           reconcile_speculative_strategy(state.get("objectives", {}), draft_strategy)
+           if draft_strategy else {"accepted": False, "reason": "draft_failed"}
+        )
+        
+        if reconciliation["accepted"]:
+           state["strategy"] = draft_strategy
+           state["agents_participated"].append("StrategyFormulationAgent")
+           tracker = get_tracker(state["investigation_id"])
+           if tracker:
+               # The draft overlapped objective definition; count it without a latency sample
+               tracker.skip_node("strategy_formulation")
+           state = await self._run_node(state, "search_coordination", search_coordination_node)
+           self.logger.info("Speculative strategy accepted; search coordination started early")
+        else:
+           self.logger.info(f"Speculative strategy rejected ({reconciliation}); reformulating")
+           state = await self._run_node(state, "strategy_formulation", strategy_formulation_node)
+        
+        state["planning_metadata"]["speculative_planning"] = reconciliation
+        return state
+    
     async def _run_collection_phase(self, state: InvestigationState) -> InvestigationState:
         """Execute the collection phase of the investigation."""
         self.logger.info("Starting collection phase")
@@ -277,18 +313,19 @@ class OSINTWorkflow:
            except Exception as e:
                self.logger.warning(f"Could not sync collection phase state with backend: {str(e)}")
            
-           # Step 1: Coordinate search
-           state = await search_coordination_node(state)
+           # Step 1: Coordinate search (already done early by speculative planning)
+           if state["collection_status"].get("search_coordination") != InvestigationStatus.COMPLETED:
+               state = await self._run_node(state, "search_coordination", search_coordination_node)
            
            # Step 2: Collect data
-           state = await data_collection_node(state)
+           state = await self._run_node(state, "data_collection", data_collection_node)
            
            # Mark collection phase as completed
            state = update_phase_status(
                state,
                InvestigationPhase.COLLECTION,
                InvestigationStatus.COMPLETED,
-               {"duration": 10.0, "data_sources_count": 5}
+               {"duration": self._finish_phase(state, InvestigationPhase.COLLECTION), "data_sources_count": 5}
            )
            
            # Update progress percentage
@@ -349,20 +386,20 @@ class OSINTWorkflow:
                self.logger.warning(f"Could not sync analysis phase state with backend: {str(e)}")
            
            # Step 1: Fuse data
-           state = await data_fusion_node(state)
+           state = await self._run_node(state, "data_fusion", data_fusion_node)
            
            # Step 2: Recognize patterns
-           state = await pattern_recognition_node(state)
+           state = await self._run_node(state, "pattern_recognition", pattern_recognition_node)
            
            # Step 3: Analyze context
-           state = await contextual_analysis_node(state)
+           state = await self._run_node(state, "contextual_analysis", contextual_analysis_node)
            
            # Mark analysis phase as completed
            state = update_phase_status(
                state,
                InvestigationPhase.ANALYSIS,
                InvestigationStatus.COMPLETED,
-               {"duration": 15.0, "patterns_found": 3}
+               {"duration": self._finish_phase(state, InvestigationPhase.ANALYSIS), "patterns_found": 3}
            )
            
            # Update progress percentage
@@ -423,20 +460,20 @@ class OSINTWorkflow:
                self.logger.warning(f"Could not sync synthesis phase state with backend: {str(e)}")
            
            # Step 1: Synthesize intelligence
-           state = await intelligence_synthesis_node(state)
+           state = await self._run_node(state, "intelligence_synthesis", intelligence_synthesis_node)
            
            # Step 2: Quality assurance
-           state = await quality_assurance_node(state)
+           state = await self._run_node(state, "quality_assurance", quality_assurance_node)
            
            # Step 3: Generate report
-           state = await report_generation_node(state)
+           state = await self._run_node(state, "report_generation", report_generation_node)
            
            # Mark synthesis phase as completed
            state = update_phase_status(
                state,
                InvestigationPhase.SYNTHESIS,
                InvestigationStatus.COMPLETED,
-               {"duration": 8.0, "report_sections": 5}
+               {"duration": self._finish_phase(state, InvestigationPhase.SYNTHESIS), "report_sections": 5}
            )
            
            # Update progress percentage
@@ -475,6 +512,26 @@ class OSINTWorkflow:
         
         return state
     
+    async def _run_node(self, state: InvestigationState, node_name: str, node) -> InvestigationState:
+        """Run a workflow node and record its duration and progress."""
+        tracker = get_tracker(state["investigation_id"])
+        if tracker is None:
+           return await node(state)
+        
+        tracker.start_node(node_name)
+        try:
+           state = await node(state)
+        except Exception:
+           tracker.abort_node(node_name)
+           raise
+        tracker.finish_node(node_name)
+        return tracker.apply(state)
+    
+    def _finish_phase(self, state: InvestigationState, phase: InvestigationPhase) -> float:
+        """Measured wall time of a completed phase."""
+        tracker = get_tracker(state["investigation_id"])
+        return tracker.finish_phase(phase.value) if tracker else 0.0
+    
     def get_investigation_progress(self, state: InvestigationState) -> Dict[str, Any]:
         """Get current progress of the investigation."""
         progress = calculate_progress(state)
@@ -487,7 +544,9 @@ class OSINTWorkflow:
            "errors_count": len(state["errors"]),
            "warnings_count": len(state["warnings"]),
            "sources_used": len(state["sources_used"]),
-           "confidence_level": state["confidence_level"]
+           "confidence_level": state["confidence_level"],
+           "estimated_completion": state.get("estimated_completion"),
+           "node_timings": state["metadata"].get("node_timings", {})
         }
 
 
@@ -505,6 +564,37 @@ def create_osint_workflow(config: Optional[Dict[str, Any]] = None) -> OSINTWorkf
 
 
 # Workflow Node Functions
+async def _agent_search_results(state: InvestigationState) -> Dict[str, Any]:
+    """Search results as plain dicts with blob references resolved (off the event loop), for agent input."""
+    return await get_blob_store().hydrate_async(materialize_results(state.get("search_results", {})))
+
+
+def _investigation_progress_sink(investigation_id: str):
+    """
+    Progress sink publishing collector findings on the investigation's stream.
+
+    Findings of one kind accumulate into a single progress part, so hits
+    folded by the progress channel's throttling are still delivered.
+    """
+    try:
+        from .enhanced_websocket import enhanced_manager
+    except Exception as e:
+        logger.warning(f"Progress streaming unavailable for investigation {investigation_id}: {e}")
+        return None
+
+    findings: Dict[str, list] = {}
+
+    async def sink(kind: str, payload: Dict[str, Any]):
+        items = findings.setdefault(kind, [])
+        items.append(payload)
+        await enhanced_manager.publish_progress(
+            f"investigation_{investigation_id}", kind,
+            {"investigation_id": investigation_id, "items": items, "count": len(items)}
+        )
+
+    return sink
+
+
 async def objective_definition_node(state: InvestigationState) -> InvestigationState:
     """Define investigation objectives using the ObjectiveDefinitionAgent."""
     try:
@@ -556,83 +646,150 @@ async def strategy_formulation_node(state: InvestigationState) -> InvestigationS
     except Exception as e:
         return add_error(state, str(e), InvestigationPhase.PLANNING, "strategy_formulation_node")
 
-async def search_coordination_node(state: InvestigationState) -> InvestigationState:
-    """Coordinate search operations across different data sources."""
+async def draft_strategy_node(state: InvestigationState) -> Optional[Dict[str, Any]]:
+    """
+    Draft an investigation strategy from the raw request alone.
+    
+    Used by speculative planning to overlap strategy formulation with
+    objective definition. Does not modify the state; returns the drafted
+    strategy or None if drafting failed.
+    """
     try:
-        # Initialize collection agents
-        surface_web_agent = SurfaceWebCollectorAgent()
-        social_media_agent = SocialMediaCollectorAgent()
-        public_records_agent = PublicRecordsCollectorAgent()
-        dark_web_agent = DarkWebCollectorAgent()
-        
-        # Determine which sources to search based on both objectives and strategy
-        objectives = state.get("objectives", {})
-        strategy = state.get("strategy", {})
+        agent = StrategyFormulationAgent()
         
-        search_coordination_results = {
-           "surface_web_sources": [],
-           "social_media_sources": [],
-           "public_records_sources": [],
-           "dark_web_sources": [],
-           "coordination_status": "completed",
-           "sources_identified": 0
+        input_data = {
+           "user_request": state["user_request"],
+           "objectives": {}
         }
         
-        # Determine appropriate sources based on investigation objectives (backward compatibility)
-        if "web_search" in str(objectives).lower() or "surface" in str(objectives).lower():
-           search_coordination_results["surface_web_sources"] = ["google", "bing", "duckduckgo"]
-        
-        if "social_media" in str(objectives).lower() or "twitter" in str(objectives).lower():
-           search_coordination_results["social_media_sources"] = ["twitter", "linkedin", "facebook", "instagram"]
-        
-        if "public_records" in str(objectives).lower() or "records" in str(objectives).lower():
-           search_coordination_results["public_records_sources"] = ["government_databases", "court_records", "property_records"]
-        
-        if "dark_web" in str(objectives).lower() or "tor" in str(objectives).lower():
-           search_coordination_results["dark_web_sources"] = ["tor_networks", "hidden_services"]
-        
-        # Determine sources based on strategy (primary method)
-        strategy_data_sources = strategy.get("data_sources", {})
-        primary_sources = strategy_data_sources.get("primary_sources", [])
-        secondary_sources = strategy_data_sources.get("secondary_sources", [])
+        result = await agent.execute(input_data)
+        if result.success and result.data and "error" not in result.data:
+           return result.data
+        return None
         
-        # Process all data sources to identify search targets
-        all_sources = primary_sources + secondary_sources
-        for source in all_sources:
-           source_type = source.get("type", "").lower()
-           if source_type == "surface_web":
-               if not search_coordination_results["surface_web_sources"]:  # Only add if not already set
+    except Exception as e:
+        logger.warning(f"Speculative strategy draft failed: {e}")
+        return None
+
+
+def _source_categories(search_sources: Dict[str, Any]) -> set:
+    return {
+        key for key in (
+           "surface_web_sources",
+           "social_media_sources",
+           "public_records_sources",
+           "dark_web_sources"
+        )
+        if search_sources.get(key)
+    }
+
+
+def reconcile_speculative_strategy(
+    objectives: Dict[str, Any],
+    draft_strategy: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Decide whether a strategy drafted without objectives can be kept.
+    
+    The check is deterministic and needs no LLM call: the draft stands when
+    the defined objectives do not pull in source categories that the draft
+    did not already plan for.
+    
+    Returns:
+        Reconciliation report with ``accepted`` and the categories involved
+    """
+    draft_categories = _source_categories(determine_search_sources({}, draft_strategy))
+    final_categories = _source_categories(determine_search_sources(objectives, draft_strategy))
+    added = sorted(final_categories - draft_categories)
+    
+    return {
+        "accepted": bool(draft_categories) and not added,
+        "draft_categories": sorted(draft_categories),
+        "added_categories": added
+    }
+
+def determine_search_sources(objectives: Dict[str, Any], strategy: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Determine which sources to search based on both objectives and strategy.
+    
+    Pure function shared by search coordination and speculative planning.
+    """
+    search_coordination_results = {
+       "surface_web_sources": [],
+       "social_media_sources": [],
+       "public_records_sources": [],
+       "dark_web_sources": [],
+       "coordination_status": "completed",
+       "sources_identified": 0
+    }
+    
+    # Determine appropriate sources based on investigation objectives (backward compatibility)
+    if "web_search" in str(objectives).lower() or "surface" in str(objectives).lower():
+       search_coordination_results["surface_web_sources"] = ["google", "bing", "duckduckgo"]
+    
+    if "social_media" in str(objectives).lower() or "twitter" in str(objectives).lower():
+       search_coordination_results["social_media_sources"] = ["twitter", "linkedin", "facebook", "instagram"]
+    
+    if "public_records" in str(objectives).lower() or "records" in str(objectives).lower():
+       search_coordination_results["public_records_sources"] = ["government_databases", "court_records", "property_records"]
+    
+    if "dark_web" in str(objectives).lower() or "tor" in str(objectives).lower():
+       search_coordination_results["dark_web_sources"] = ["tor_networks", "hidden_services"]
+    
+    # Determine sources based on strategy (primary method)
+    strategy_data_sources = strategy.get("data_sources", {})
+    primary_sources = strategy_data_sources.get("primary_sources", [])
+    secondary_sources = strategy_data_sources.get("secondary_sources", [])
+    
+    # Process all data sources to identify search targets
+    all_sources = primary_sources + secondary_sources
+    for source in all_sources:
+       source_type = source.get("type", "").lower()
+       if source_type == "surface_web":
+           if not search_coordination_results["surface_web_sources"]:  # Only add if not already set
+               search_coordination_results["surface_web_sources"] = ["google", "bing", "duckduckgo"]
+       elif source_type == "social_media":
+           if not search_coordination_results["social_media_sources"]:  # Only add if not already set
+               search_coordination_results["social_media_sources"] = ["twitter", "linkedin", "facebook", "instagram"]
+       elif source_type == "public_records":
+           if not search_coordination_results["public_records_sources"]:  # Only add if not already set
+               search_coordination_results["public_records_sources"] = ["government_databases", "court_records", "property_records"]
+       elif source_type == "dark_web":
+           if not search_coordination_results["dark_web_sources"]:  # Only add if not already set
+               search_coordination_results["dark_web_sources"] = ["tor_networks", "hidden_services"]
+    
+    # Also check for specific sources in strategy
+    for source in all_sources:
+       specific_sources = source.get("specific_sources", [])
+       for specific_source in specific_sources:
+           specific_source_lower = specific_source.lower()
+           if "search engine" in specific_source_lower or "public website" in specific_source_lower:
+               if not search_coordination_results["surface_web_sources"]:
                    search_coordination_results["surface_web_sources"] = ["google", "bing", "duckduckgo"]
-           elif source_type == "social_media":
-               if not search_coordination_results["social_media_sources"]:  # Only add if not already set
+           elif "social" in specific_source_lower:
+               if not search_coordination_results["social_media_sources"]:
                    search_coordination_results["social_media_sources"] = ["twitter", "linkedin", "facebook", "instagram"]
-           elif source_type == "public_records":
-               if not search_coordination_results["public_records_sources"]:  # Only add if not already set
+           elif "public records" in specific_source_lower or "records" in specific_source_lower:
+               if not search_coordination_results["public_records_sources"]:
                    search_coordination_results["public_records_sources"] = ["government_databases", "court_records", "property_records"]
-           elif source_type == "dark_web":
-               if not search_coordination_results["dark_web_sources"]:  # Only add if not already set
-                   search_coordination_results["dark_web_sources"] = ["tor_networks", "hidden_services"]
-        
-        # Also check for specific sources in strategy
-        for source in all_sources:
-           specific_sources = source.get("specific_sources", [])
-           for specific_source in specific_sources:
-               specific_source_lower = specific_source.lower()
-               if "search engine" in specific_source_lower or "public website" in specific_source_lower:
-                   if not search_coordination_results["surface_web_sources"]:
-                       search_coordination_results["surface_web_sources"] = ["google", "bing", "duckduckgo"]
-               elif "social" in specific_source_lower:
-                   if not search_coordination_results["social_media_sources"]:
-                       search_coordination_results["social_media_sources"] = ["twitter", "linkedin", "facebook", "instagram"]
-               elif "public records" in specific_source_lower or "records" in specific_source_lower:
-                   if not search_coordination_results["public_records_sources"]:
-                       search_coordination_results["public_records_sources"] = ["government_databases", "court_records", "property_records"]
-        
-        search_coordination_results["sources_identified"] = (
-           len(search_coordination_results["surface_web_sources"]) +
-           len(search_coordination_results["social_media_sources"]) +
-           len(search_coordination_results["public_records_sources"]) +
-           len(search_coordination_results["dark_web_sources"])
+    
+    search_coordination_results["sources_identified"] = (
+       len(search_coordination_results["surface_web_sources"]) +
+       len(search_coordination_results["social_media_sources"]) +
+       len(search_coordination_results["public_records_sources"]) +
+       len(search_coordination_results["dark_web_sources"])
+    )
+    
+    return search_coordination_results
+
+
+async def search_coordination_node(state: InvestigationState) -> InvestigationState:
+    """Coordinate search operations across different data sources."""
+    try:
+        # Determine which sources to search based on both objectives and strategy
+        search_coordination_results = determine_search_sources(
+           state.get("objectives", {}),
+           state.get("strategy", {})
         )
         
         state["search_coordination_results"] = search_coordination_results
@@ -649,40 +806,28 @@ async def data_collection_node(state: InvestigationState) -> InvestigationState:
      """Collect data from identified sources."""
      try:
          # Initialize collection agents with tools
-         # Using dynamic import to avoid import issues
-         import importlib.util
-         import os
-         tool_module_path = os.path.join(os.path.dirname(__file__), '..', 'agents', 'tools', 'langchain_tools.py')
-         spec = importlib.util.spec_from_file_location("langchain_tools", tool_module_path)
-         if spec is not None and spec.loader is not None:
-            tool_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(tool_module)
-            get_global_tool_manager = tool_module.get_global_tool_manager
-         else:
-            raise ImportError("Could not load scraping tools module")
+         # Loaded once per process and shared (see app.utils.lazy_import)
+         tool_module = load_module_from_path("langchain_tools", os.path.join(os.path.dirname(__file__), '..', 'agents', 'tools', 'langchain_tools.py'))
+         get_global_tool_manager = tool_module.get_global_tool_manager
          tool_manager = get_global_tool_manager()
          
          # Initialize AI backend bridge for state synchronization during collection
-         # Using dynamic import to avoid import issues
-         import importlib.util
-         import os
-         bridge_module_path = os.path.join(os.path.dirname(__file__), 'ai_backend_bridge.py')
-         spec = importlib.util.spec_from_file_location("ai_backend_bridge", bridge_module_path)
-         if spec is not None and spec.loader is not None:
-            bridge_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(bridge_module)
-            get_global_ai_bridge = bridge_module.get_global_ai_bridge
-         else:
-            raise ImportError("Could not load AI backend bridge module")
+         # Loaded once per process and shared (see app.utils.lazy_import)
+         bridge_module = load_module_from_path("ai_backend_bridge", os.path.join(os.path.dirname(__file__), 'ai_backend_bridge.py'))
+         get_global_ai_bridge = bridge_module.get_global_ai_bridge
          
          ai_backend_bridge = await get_global_ai_bridge()
          
-         surface_web_agent = SurfaceWebCollectorAgent(tools=tool_manager.tools)
+         # Subdomain hits stream to the investigation while collection runs
+         surface_web_agent = SurfaceWebCollectorAgent(
+            tools=tool_manager.tools,
+            progress_sink=_investigation_progress_sink(state["investigation_id"])
+         )
          social_media_agent = SocialMediaCollectorAgent(tools=tool_manager.tools)
          public_records_agent = PublicRecordsCollectorAgent(tools=tool_manager.tools)
          dark_web_agent = DarkWebCollectorAgent(tools=tool_manager.tools)
          
-         search_results = {}
+         search_results = SearchResults()
          raw_data = {
             "total_records": 0,
             "sources": state["search_coordination_results"]["sources_identified"],
@@ -788,15 +933,18 @@ async def data_collection_node(state: InvestigationState) -> InvestigationState:
                 # Extract additional URLs from string content in the result data
                 extracted_urls.extend(extract_urls_from_content(result_data))
                 
-                # Add extracted URLs to sources_used (only unique HTTPS URLs)
+                # Add extracted URLs to sources_used (the UrlSet de-duplicates canonical forms)
+                sources_used = ensure_tracking_sets(state)["sources_used"]
                 for url in extracted_urls:
-                    if url and url.startswith("https://") and url not in state["sources_used"]:
-                        state["sources_used"].append(url)
+                    if url and url.startswith("https://"):
+                        sources_used.add(url)
                         
                 # Also add any HTTP URLs if we don't have enough HTTPS URLs yet
                 for url in extracted_urls:
-                    if url and url.startswith("http://") and url not in state["sources_used"] and len([u for u in state["sources_used"] if u.startswith("https://")]) < 3:
-                        state["sources_used"].append(url)
+                    if sources_used.count_scheme("https") >= 3:
+                        break
+                    if url and url.startswith("http://"):
+                        sources_used.add(url)
                 
                 # Log how many URLs were added
                 unique_https_urls = [url for url in extracted_urls if url and url.startswith("https://")]
@@ -888,7 +1036,10 @@ async def data_collection_node(state: InvestigationState) -> InvestigationState:
             else:
                 state = add_warning(state, f"Dark web collection failed: {dark_result.error_message}")
 
-         state["search_results"] = search_results
+         # Page content goes to the blob store; the state keeps references
+         state["search_results"] = SearchResults(
+            await get_blob_store().offload_async(search_results.materialize())
+         )
          state["raw_data"] = raw_data
          state["collection_status"]["data_collection"] = InvestigationStatus.COMPLETED
 
@@ -925,10 +1076,11 @@ async def data_fusion_node(state: InvestigationState) -> InvestigationState:
         agent = DataFusionAgent(config=config)
         
         # Prepare input data for data fusion
+        search_results = await _agent_search_results(state)
         fusion_input = {
            "task_type": "data_fusion",
-           "collection_results": state.get("search_results", {}),
-           "search_results": state.get("search_results", {}),
+           "collection_results": search_results,
+           "search_results": search_results,
            "raw_data": state.get("raw_data", {}),
            "sources_used": state.get("sources_used", []),
            "user_request": state.get("user_request", ""),
@@ -967,7 +1119,7 @@ async def pattern_recognition_node(state: InvestigationState) -> InvestigationSt
         pattern_input = {
            "task_type": "behavioral_patterns",
            "fused_data": state.get("fused_data", {}),
-           "search_results": state.get("search_results", {}),
+           "search_results": await _agent_search_results(state),
            "user_request": state.get("user_request", ""),
            "objectives": state.get("objectives", {})
         }
@@ -1022,7 +1174,7 @@ async def contextual_analysis_node(state: InvestigationState) -> InvestigationSt
            "task_type": "situational_awareness",
            "fused_data": state.get("fused_data", {}),
            "patterns": state.get("patterns", []),
-           "search_results": state.get("search_results", {}),
+           "search_results": await _agent_search_results(state),
            "user_request": state.get("user_request", ""),
            "objectives": state.get("objectives", {})
         }
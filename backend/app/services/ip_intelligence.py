@@ -0,0 +1,620 @@
+"""
+IP Intelligence Index
+
+Local IP → ASN / organisation / country lookups, so network mapping does
+not need one ipinfo.io / iptoasn.com request per address.
+
+The dataset is an iptoasn.com style snapshot (``ip2asn-combined.tsv`` or
+its ``.gz``): one tab-separated row per announced range,
+
+    range_start  range_end  AS_number  country_code  AS_description
+
+It is compiled once into a binary index file of sorted, non-overlapping
+interval tables (IPv4 and IPv6) plus a deduplicated record table, which is
+memory-mapped: opening it costs nothing however large the snapshot is, the
+pages are shared between worker processes, and a lookup is a binary search
+over the mapped arrays (a few microseconds). Where announcements nest, each
+address maps to the most specific range covering it.
+
+Loading a new snapshot does not disturb lookups: the index is compiled off
+the event loop into a new file and swapped in when ready. A snapshot whose
+content matches the current index is skipped. Smaller changes are applied
+incrementally with ``apply_delta``: the changed ranges go into an in-memory
+overlay consulted before the index, which is folded into a new index file
+(again off the event loop) once it holds DELTA_COMPACT_RANGES ranges.
+"""
+
+import asyncio
+import bisect
+import gzip
+import hashlib
+import ipaddress
+import logging
+import mmap
+import socket
+import struct
+import sys
+import time
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+INDEX_MAGIC = b"SCIPIDX1"
+# magic, byte order, built_at, source sha256, v4 ranges, v6 ranges, records, string pool size
+_HEADER = struct.Struct("<8s1s7xd32sQQQQ")
+
+_MASK64 = (1 << 64) - 1
+_V4_MAPPED_PREFIX = b"\0" * 10 + b"\xff\xff"
+
+# Overlay size at which applied deltas are compiled into the index file
+DELTA_COMPACT_RANGES = 50_000
+
+# (asn, country, organization); AS 0 in a delta withdraws a range
+Record = Tuple[int, str, str]
+
+
+def _data_dir() -> Path:
+    return Path(__file__).parent.parent.parent / "data"
+
+
+@dataclass
+class IPRange:
+    """The announced range an address belongs to."""
+    first_ip: str
+    last_ip: str
+    asn: int
+    country: str
+    organization: str
+
+    @property
+    def asn_label(self) -> str:
+        return f"AS{self.asn}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Same keys as the iptoasn.com API
+        return {
+            "announced": True,
+            "first_ip": self.first_ip,
+            "last_ip": self.last_ip,
+            "as_number": self.asn,
+            "as_country_code": self.country,
+            "as_description": self.organization,
+        }
+
+
+def _open_source(path: Path):
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+def file_digest(path: Union[str, Path]) -> bytes:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def parse_snapshot(path: Union[str, Path], include_withdrawn: bool = False) -> Iterator[Tuple[int, int, int, int, str, str]]:
+    """Yield (version, start, end, asn, country, organization) per announced range.
+
+    AS 0 rows (unrouted space) are skipped, or kept with include_withdrawn so
+    a delta can withdraw a range.
+    """
+    with _open_source(Path(path)) as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 5:
+                continue
+            try:
+                start = ipaddress.ip_address(fields[0])
+                end = ipaddress.ip_address(fields[1])
+                asn = int(fields[2])
+            except ValueError:
+                continue
+            # AS 0 marks unrouted space
+            if (asn == 0 and not include_withdrawn) or start.version != end.version or int(end) < int(start):
+                continue
+            country = fields[3] if fields[3] != "None" else ""
+            yield start.version, int(start), int(end), asn, country, fields[4]
+
+
+def _pack_address(ip) -> Optional[bytes]:
+    """4 or 16 network-order bytes (IPv4-mapped IPv6 as IPv4), None if invalid."""
+    if not isinstance(ip, str):
+        ip = str(ip)
+    try:
+        return socket.inet_pton(socket.AF_INET, ip)
+    except OSError:
+        pass
+    try:
+        packed = socket.inet_pton(socket.AF_INET6, ip)
+    except OSError:
+        return None
+    if packed[:12] == _V4_MAPPED_PREFIX:
+        return packed[12:]
+    return packed
+
+
+def _pad(data: bytes) -> bytes:
+    return data + b"\0" * (-len(data) % 8)
+
+
+def parse_rows(path: Union[str, Path], include_withdrawn: bool = False) -> Dict[int, List[Tuple[int, int, Record]]]:
+    """Ranges of a snapshot or delta file per IP version, flattened (most specific wins)."""
+    tables: Dict[int, List[Tuple[int, int, Record]]] = {4: [], 6: []}
+    rows = parse_snapshot(path, include_withdrawn)
+    for version, start, end, asn, country, organization in rows:
+        tables[version].append((start, end, (asn, country, organization)))
+    return {version: _merge(ranges) for version, ranges in tables.items()}
+
+
+def build_index(source_path: Union[str, Path], index_path: Union[str, Path]) -> int:
+    """Compile a snapshot into an index file; returns the number of ranges."""
+    source_path = Path(source_path)
+    return write_index(parse_rows(source_path), index_path, file_digest(source_path))
+
+
+def write_index(tables: Dict[int, List[Tuple[int, int, Record]]], index_path: Union[str, Path], digest: bytes) -> int:
+    """Write flattened per-version ranges as an index file; returns the number of ranges."""
+    index_path = Path(index_path)
+    records: Dict[Record, int] = {}
+    numbered: Dict[int, List[Tuple[int, int, int]]] = {}
+    for version, ranges in tables.items():
+        numbered[version] = []
+        for start, end, key in ranges:
+            record = records.get(key)
+            if record is None:
+                record = records[key] = len(records)
+            numbered[version].append((start, end, record))
+
+    v4 = numbered.get(4, [])
+    v6 = numbered.get(6, [])
+    strings = bytearray()
+    offsets = array("I", [0])
+    asns = array("I")
+    countries = bytearray()
+    for asn, country, organization in records:
+        asns.append(asn)
+        countries += country.encode("ascii", "replace")[:2].ljust(2, b"\0")
+        strings += organization.encode("utf-8")
+        offsets.append(len(strings))
+
+    sections = [
+        array("I", [start for start, _, _ in v4]).tobytes(),
+        array("I", [end for _, end, _ in v4]).tobytes(),
+        array("I", [record for _, _, record in v4]).tobytes(),
+        array("Q", [start >> 64 for start, _, _ in v6]).tobytes(),
+        array("Q", [start & _MASK64 for start, _, _ in v6]).tobytes(),
+        array("Q", [end >> 64 for _, end, _ in v6]).tobytes(),
+        array("Q", [end & _MASK64 for _, end, _ in v6]).tobytes(),
+        array("I", [record for _, _, record in v6]).tobytes(),
+        asns.tobytes(),
+        bytes(countries),
+        offsets.tobytes(),
+        bytes(strings),
+    ]
+    header = _HEADER.pack(
+        INDEX_MAGIC, sys.byteorder[0].encode(), time.time(), digest,
+        len(v4), len(v6), len(records), len(strings)
+    )
+
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_pad(header))
+        for section in sections:
+            f.write(_pad(section))
+    tmp_path.replace(index_path)
+    return len(v4) + len(v6)
+
+
+def _append(segments: List[Tuple[int, int, Any]], start: int, end: int, record: Any):
+    """Append a segment, joining it to an adjacent one with the same record."""
+    if start > end:
+        return
+    if segments and segments[-1][1] + 1 == start and segments[-1][2] == record:
+        segments[-1] = (segments[-1][0], end, record)
+    else:
+        segments.append((start, end, record))
+
+
+def _merge(ranges: List[Tuple[int, int, Any]]) -> List[Tuple[int, int, Any]]:
+    """
+    Flatten possibly nested ranges into sorted, non-overlapping segments.
+
+    An address belongs to the most specific (innermost) range covering it,
+    so a /24 announced inside a /16 keeps its own ASN; where two ranges
+    only partly overlap, the later-starting one takes the overlap.
+    Adjacent segments with the same record are joined.
+    """
+    merged: List[Tuple[int, int, Any]] = []
+    # Enclosing ranges, innermost last; ends never increase towards the top
+    open_ranges: List[Tuple[int, Any]] = []
+    position = 0
+    for start, end, record in sorted(ranges, key=lambda item: (item[0], -item[1])):
+        while open_ranges and open_ranges[-1][0] < start:
+            closed_end, closed_record = open_ranges.pop()
+            _append(merged, position, closed_end, closed_record)
+            position = max(position, closed_end + 1)
+        if open_ranges:
+            _append(merged, position, start - 1, open_ranges[-1][1])
+        position = start
+        # Whatever is left of a partly overlapped range lies inside this one
+        while open_ranges and open_ranges[-1][0] < end:
+            open_ranges.pop()
+        open_ranges.append((end, record))
+    while open_ranges:
+        closed_end, closed_record = open_ranges.pop()
+        _append(merged, position, closed_end, closed_record)
+        position = max(position, closed_end + 1)
+    return merged
+
+
+def _replace(base: List[Tuple[int, int, Any]], updates: List[Tuple[int, int, Any]]) -> List[Tuple[int, int, Any]]:
+    """Sorted, non-overlapping ``base`` with every range covered by ``updates`` replaced."""
+    result: List[Tuple[int, int, Any]] = []
+    i = 0
+    for start, end, record in base:
+        # Updates entirely before this base segment
+        while i < len(updates) and updates[i][1] < start:
+            _append(result, *updates[i])
+            i += 1
+        j = i
+        position = start
+        while j < len(updates) and updates[j][0] <= end:
+            _append(result, position, updates[j][0] - 1, record)
+            if updates[j][1] >= end:
+                position = end + 1
+                break
+            _append(result, *updates[j])
+            position = updates[j][1] + 1
+            j += 1
+        i = j
+        _append(result, position, end, record)
+    for update in updates[i:]:
+        _append(result, *update)
+    return result
+
+
+def _ip_range(version: int, start: int, end: int, record: Record) -> IPRange:
+    family, size = (socket.AF_INET, 4) if version == 4 else (socket.AF_INET6, 16)
+    asn, country, organization = record
+    return IPRange(
+        first_ip=socket.inet_ntop(family, start.to_bytes(size, "big")),
+        last_ip=socket.inet_ntop(family, end.to_bytes(size, "big")),
+        asn=asn,
+        country=country,
+        organization=organization
+    )
+
+
+def _apply_delta(overlay: Dict[int, List[Tuple[int, int, Optional[Record]]]], delta_path: Path):
+    """The overlay with a delta file's ranges replacing what they cover; withdrawn ranges map to None."""
+    delta = parse_rows(delta_path, include_withdrawn=True)
+    updated = {}
+    for version, ranges in delta.items():
+        changes = [(start, end, record if record[0] else None) for start, end, record in ranges]
+        updated[version] = _replace(overlay.get(version, []), changes)
+    return updated
+
+
+def _compact(index: Optional["IPIndex"], overlay: Dict[int, List[Tuple[int, int, Optional[Record]]]],
+             index_path: Path, digest: bytes) -> int:
+    """Write the index with the overlay folded in; returns the number of ranges."""
+    tables = {}
+    for version in (4, 6):
+        base = list(index.ranges(version)) if index is not None else []
+        merged = _replace(base, overlay.get(version, []))
+        tables[version] = [segment for segment in merged if segment[2] is not None]
+    return write_index(tables, index_path, digest)
+
+
+class IPIndex:
+    """A compiled index file, memory-mapped for lookups."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._map_sections()
+        except Exception:
+            self.close()
+            raise
+
+    def _map_sections(self):
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError(f"{self.path} is not an IP index")
+        magic, byteorder, self.built_at, self.source_digest, v4, v6, records, strings = _HEADER.unpack_from(self._mmap)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{self.path} is not an IP index")
+        if byteorder != sys.byteorder[0].encode():
+            raise ValueError(f"{self.path} was built on a machine with a different byte order")
+
+        view = self._view = memoryview(self._mmap)
+        offset = len(_pad(b"\0" * _HEADER.size))
+
+        def take(size: int, fmt: Optional[str] = None):
+            nonlocal offset
+            section = view[offset:offset + size]
+            offset += size + (-size % 8)
+            return section.cast(fmt) if fmt else section
+
+        self._v4_starts = take(4 * v4, "I")
+        self._v4_ends = take(4 * v4, "I")
+        self._v4_records = take(4 * v4, "I")
+        self._v6_start_hi = take(8 * v6, "Q")
+        self._v6_start_lo = take(8 * v6, "Q")
+        self._v6_end_hi = take(8 * v6, "Q")
+        self._v6_end_lo = take(8 * v6, "Q")
+        self._v6_records = take(4 * v6, "I")
+        self._asns = take(4 * records, "I")
+        self._countries = take(2 * records)
+        self._offsets = take(4 * (records + 1), "I")
+        self._strings = take(strings)
+        if offset > len(self._mmap):
+            raise ValueError(f"{self.path} is truncated")
+        self.v4_ranges = v4
+        self.v6_ranges = v6
+        self.record_count = records
+
+    def __len__(self) -> int:
+        return self.v4_ranges + self.v6_ranges
+
+    def lookup(self, ip: Union[str, ipaddress.IPv4Address, ipaddress.IPv6Address]) -> Optional[IPRange]:
+        packed = _pack_address(ip)
+        if packed is None:
+            return None
+
+        value = int.from_bytes(packed, "big")
+        if len(packed) == 4:
+            i = bisect.bisect_right(self._v4_starts, value) - 1
+            if i < 0 or value > self._v4_ends[i]:
+                return None
+            return _ip_range(4, self._v4_starts[i], self._v4_ends[i], self._record(self._v4_records[i]))
+
+        i = self._v6_bisect(value >> 64, value & _MASK64) - 1
+        if i < 0:
+            return None
+        end = (self._v6_end_hi[i] << 64) | self._v6_end_lo[i]
+        if value > end:
+            return None
+        start = (self._v6_start_hi[i] << 64) | self._v6_start_lo[i]
+        return _ip_range(6, start, end, self._record(self._v6_records[i]))
+
+    def ranges(self, version: int) -> Iterator[Tuple[int, int, Record]]:
+        """Yield (start, end, record) for every range of one IP version, in order."""
+        if version == 4:
+            for start, end, record in zip(self._v4_starts, self._v4_ends, self._v4_records):
+                yield start, end, self._record(record)
+            return
+        rows = zip(self._v6_start_hi, self._v6_start_lo, self._v6_end_hi, self._v6_end_lo, self._v6_records)
+        for start_hi, start_lo, end_hi, end_lo, record in rows:
+            yield (start_hi << 64) | start_lo, (end_hi << 64) | end_lo, self._record(record)
+
+    def _record(self, record: int) -> Record:
+        return (
+            self._asns[record],
+            bytes(self._countries[2 * record:2 * record + 2]).rstrip(b"\0").decode("ascii"),
+            bytes(self._strings[self._offsets[record]:self._offsets[record + 1]]).decode("utf-8")
+        )
+
+    def _v6_bisect(self, hi: int, lo: int) -> int:
+        """bisect_right over the (hi, lo) start pairs."""
+        left, right = 0, self.v6_ranges
+        start_hi, start_lo = self._v6_start_hi, self._v6_start_lo
+        while left < right:
+            middle = (left + right) // 2
+            if hi < start_hi[middle] or (hi == start_hi[middle] and lo < start_lo[middle]):
+                right = middle
+            else:
+                left = middle + 1
+        return left
+
+    def close(self):
+        for section in vars(self).values():
+            if isinstance(section, memoryview):
+                section.release()
+        self._mmap.close()
+
+
+class IPIntelligence:
+    """Snapshot-backed IP → ASN lookups with hot reloading."""
+
+    def __init__(self, dataset_path: Optional[str] = None, index_path: Optional[str] = None):
+        self.dataset_path = Path(dataset_path or _data_dir() / "ip2asn-combined.tsv.gz")
+        self.index_path = Path(index_path or _data_dir() / "ip2asn.idx")
+        self.index: Optional[IPIndex] = None
+        # Ranges from applied deltas not yet compiled into the index, per IP version
+        self._overlay: Dict[int, List[Tuple[int, int, Optional[Record]]]] = {}
+        self._overlay_starts: Dict[int, List[int]] = {}
+        self._delta_digest: Optional[bytes] = None
+        self._reload_lock: Optional[asyncio.Lock] = None
+        self._initial_build: Optional[asyncio.Task] = None
+        self.stats = {
+            "lookups": 0, "hits": 0, "snapshots_loaded": 0, "snapshots_skipped": 0,
+            "deltas_applied": 0, "compactions": 0
+        }
+
+    @property
+    def available(self) -> bool:
+        return self.index is not None or bool(self._overlay_starts)
+
+    def load(self) -> "IPIntelligence":
+        """
+        Open the compiled index, compiling the dataset first if there is none.
+
+        Inside a running event loop the compile runs in the background (lookups
+        return None until it finishes, so callers use their remote fallback).
+        """
+        try:
+            if self.index_path.exists():
+                self._swap(IPIndex(self.index_path))
+                return self
+            if not self.dataset_path.exists():
+                logger.info(f"No IP intelligence dataset at {self.dataset_path}; using remote lookups")
+                return self
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                build_index(self.dataset_path, self.index_path)
+                self._swap(IPIndex(self.index_path))
+                return self
+            self._initial_build = loop.create_task(self._build_initial())
+        except Exception as e:
+            logger.warning(f"Failed to load IP intelligence index: {e}")
+        return self
+
+    async def _build_initial(self):
+        try:
+            await self.load_snapshot()
+        except Exception as e:
+            logger.warning(f"Failed to load IP intelligence index: {e}")
+
+    async def wait_ready(self):
+        """Wait for a background compile started by load(), if any."""
+        if self._initial_build is not None:
+            await asyncio.shield(self._initial_build)
+
+    async def load_snapshot(self, snapshot_path: Optional[str] = None) -> bool:
+        """Compile a new snapshot in the background and swap it in.
+
+        Returns False when the snapshot matches the loaded index.
+        """
+        source = Path(snapshot_path) if snapshot_path else self.dataset_path
+        if self._reload_lock is None:
+            self._reload_lock = asyncio.Lock()
+        loop = asyncio.get_running_loop()
+
+        async with self._reload_lock:
+            if self.index is not None and not self._overlay:
+                digest = await loop.run_in_executor(None, file_digest, source)
+                if digest == self.index.source_digest:
+                    self.stats["snapshots_skipped"] += 1
+                    return False
+
+            # Lookups keep using the mapped index until the new one is complete
+            staging_path = self._staging_path()
+            await loop.run_in_executor(None, build_index, source, staging_path)
+            staging_path.replace(self.index_path)
+            # A full snapshot supersedes any applied deltas
+            self._set_overlay({})
+            self._swap(IPIndex(self.index_path))
+            return True
+
+    async def apply_delta(self, delta_path: str) -> int:
+        """
+        Apply a delta file without recompiling the index.
+
+        A delta has the snapshot format; its ranges replace whatever they
+        cover and AS 0 rows withdraw a range. Once the overlay reaches
+        DELTA_COMPACT_RANGES ranges it is compiled into a new index in the
+        background. Returns the number of overlay ranges.
+        """
+        if self._reload_lock is None:
+            self._reload_lock = asyncio.Lock()
+        loop = asyncio.get_running_loop()
+
+        async with self._reload_lock:
+            path = Path(delta_path)
+            overlay = await loop.run_in_executor(None, _apply_delta, self._overlay, path)
+            delta_digest = await loop.run_in_executor(None, file_digest, path)
+            previous = self._delta_digest or (self.index.source_digest if self.index else b"")
+            self._delta_digest = hashlib.sha256(previous + delta_digest).digest()
+            self._set_overlay(overlay)
+            self.stats["deltas_applied"] += 1
+
+            size = sum(len(ranges) for ranges in overlay.values())
+            if size >= DELTA_COMPACT_RANGES:
+                staging_path = self._staging_path()
+                await loop.run_in_executor(None, _compact, self.index, overlay, staging_path, self._delta_digest)
+                staging_path.replace(self.index_path)
+                self._set_overlay({})
+                self._swap(IPIndex(self.index_path))
+                self.stats["compactions"] += 1
+            return size
+
+    def _staging_path(self) -> Path:
+        return self.index_path.with_name(self.index_path.name + ".new")
+
+    def _set_overlay(self, overlay: Dict[int, List[Tuple[int, int, Optional[Record]]]]):
+        self._overlay = {version: ranges for version, ranges in overlay.items() if ranges}
+        self._overlay_starts = {version: [start for start, _, _ in ranges] for version, ranges in self._overlay.items()}
+        if not self._overlay:
+            self._delta_digest = None
+
+    def _overlay_lookup(self, ip: str):
+        """(found, result) from the delta overlay; a withdrawn range is found with a None result."""
+        packed = _pack_address(ip)
+        if packed is None:
+            return False, None
+        version = 4 if len(packed) == 4 else 6
+        starts = self._overlay_starts.get(version)
+        if not starts:
+            return False, None
+        value = int.from_bytes(packed, "big")
+        i = bisect.bisect_right(starts, value) - 1
+        if i < 0:
+            return False, None
+        start, end, record = self._overlay[version][i]
+        if value > end:
+            return False, None
+        return True, _ip_range(version, start, end, record) if record is not None else None
+
+    def _swap(self, index: IPIndex):
+        previous, self.index = self.index, index
+        self.stats["snapshots_loaded"] += 1
+        if previous is not None:
+            previous.close()
+        logger.info(f"IP intelligence index loaded: {len(index)} ranges, {index.record_count} networks")
+
+    def lookup(self, ip: str) -> Optional[IPRange]:
+        if not self.available:
+            return None
+        self.stats["lookups"] += 1
+        found, result = self._overlay_lookup(ip) if self._overlay_starts else (False, None)
+        if not found and self.index is not None:
+            result = self.index.lookup(ip)
+        if result is not None:
+            self.stats["hits"] += 1
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "available": self.available,
+            "ranges": len(self.index) if self.index else 0,
+            "overlay_ranges": sum(len(ranges) for ranges in self._overlay.values()),
+            "built_at": self.index.built_at if self.index else None,
+        }
+
+    def close(self):
+        if self._initial_build is not None:
+            self._initial_build.cancel()
+            self._initial_build = None
+        self._set_overlay({})
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+
+
+_ip_intelligence: Optional[IPIntelligence] = None
+
+
+def get_ip_intelligence() -> IPIntelligence:
+    """Shared index configured from settings."""
+    global _ip_intelligence
+    if _ip_intelligence is None:
+        _ip_intelligence = IPIntelligence(
+            dataset_path=settings.IP_INTEL_DATASET_PATH or None,
+            index_path=settings.IP_INTEL_INDEX_PATH or None
+        ).load()
+    return _ip_intelligence
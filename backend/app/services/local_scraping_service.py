@@ -181,6 +181,56 @@ class LocalScrapingService:
         
         return results
     
+    async def extract_from_html(
+        self,
+        pages: List[tuple],
+        schema: Optional[Dict[str, Any]],
+        prompt: str
+    ) -> List[Dict]:
+        """Run extraction on (url, html) pages that were already fetched, one page at a time."""
+        if not SCRAPEGRAPH_AVAILABLE:
+            error_msg = "ScrapeGraphAI is not available. Install ScrapeGraphAI or configure alternative scraping service."
+            logger.error(error_msg)
+            return [{
+                "error": error_msg,
+                "service_unavailable": True,
+                "urls_attempted": [url for url, _ in pages]
+            }]
+        
+        graph_config = {
+            "llm": self.llm_config,
+            "verbose": True,
+            "headless": True,
+        }
+        if schema:
+            graph_config["output_schema"] = schema
+        
+        results = []
+        for url, html in pages:
+            try:
+                # A non-URL source is parsed as the document itself; nothing is downloaded again
+                smart_scraper_graph = SmartScraperGraph(
+                    prompt=prompt,
+                    source=html,
+                    config=graph_config
+                )
+                results.append({
+                    "url": url,
+                    "success": True,
+                    "data": smart_scraper_graph.run(),
+                    "error": None
+                })
+            except Exception as e:
+                logger.error(f"Extraction failed for {url}: {e}")
+                results.append({
+                    "url": url,
+                    "success": False,
+                    "data": None,
+                    "error": str(e)
+                })
+        
+        return results
+    
     async def search_urls(self, query: str, max_results: int = 5) -> List[Dict[str, str]]:
         """Search for URLs using local ScrapeGraphAI SearchGraph."""
         if not SCRAPEGRAPH_AVAILABLE:
@@ -0,0 +1,320 @@
+"""
+Delta-Encoded Progress Channel
+
+Dashboards watching investigations used to receive the whole state on every
+update. The progress channel instead keeps the last state sent for each
+stream (investigation or pipeline) and emits JSON-patch style deltas
+(RFC 6902 ``add``/``remove``/``replace``) numbered with a per-stream sequence.
+A stream's state is a dict of named parts, e.g. ``{"workflow_update": {...}}``,
+so several kinds of progress share one sequence and one rate limit.
+
+- Updates are throttled to a maximum rate per stream; intermediate states are
+  folded into the next delta, and the latest state is always delivered.
+- Every ``keyframe_interval`` deltas the full state is sent as a single root
+  ``replace`` so late joiners and other workers can pick the stream up.
+- Clients that miss a sequence number ask for a resync and receive either a
+  replay of the missing deltas or a fresh snapshot.
+"""
+
+import asyncio
+import copy
+import json
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_PATCH = "progress_patch"
+PROGRESS_SNAPSHOT = "progress_snapshot"
+PROGRESS_REPLAY = "progress_replay"
+
+# Connection progress modes: deltas only, or legacy full-state messages
+MODE_DELTA = "delta"
+MODE_SNAPSHOT = "snapshot"
+
+# emit(stream_id, patch_message, full_state, changed_parts)
+ProgressEmitter = Callable[[str, Dict[str, Any], Dict[str, Any], List[str]], Awaitable[None]]
+
+
+def _escape(key: str) -> str:
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def diff_json(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """
+    Compute patch operations turning old into new.
+
+    Lists that only grew at the end produce appends; other list changes of
+    equal length are diffed element-wise, anything else is replaced whole.
+    """
+    if type(old) is not type(new):
+        return [{"op": "replace", "path": path, "value": new}]
+
+    if isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            elif old[key] != value:
+                ops.extend(diff_json(old[key], value, child))
+        return ops
+
+    if isinstance(new, list):
+        if len(new) >= len(old) and new[:len(old)] == old:
+            return [{"op": "add", "path": f"{path}/-", "value": v} for v in new[len(old):]]
+        if len(new) == len(old):
+            ops = []
+            for i, (a, b) in enumerate(zip(old, new)):
+                if a != b:
+                    ops.extend(diff_json(a, b, f"{path}/{i}"))
+            return ops
+        return [{"op": "replace", "path": path, "value": new}]
+
+    if old != new:
+        return [{"op": "replace", "path": path, "value": new}]
+    return []
+
+
+def apply_patch(document: Any, ops: List[Dict[str, Any]]) -> Any:
+    """Apply patch operations produced by diff_json, in place where possible."""
+    for op in ops:
+        path = op["path"]
+        if path == "":
+            document = op.get("value")
+            continue
+
+        tokens = [_unescape(t) for t in path.split("/")[1:]]
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+
+        if isinstance(parent, list):
+            if op["op"] == "add":
+                if last == "-":
+                    parent.append(op["value"])
+                else:
+                    parent.insert(int(last), op["value"])
+            elif op["op"] == "remove":
+                del parent[int(last)]
+            else:
+                parent[int(last)] = op["value"]
+        elif op["op"] == "remove":
+            parent.pop(last, None)
+        else:
+            parent[last] = op["value"]
+    return document
+
+
+def changed_parts(ops: List[Dict[str, Any]], state: Dict[str, Any]) -> List[str]:
+    """Top-level parts touched by a patch (all of them for a root replace)."""
+    parts: List[str] = []
+    for op in ops:
+        if op["path"] == "":
+            return list(state)
+        part = _unescape(op["path"].split("/")[1])
+        if part not in parts:
+            parts.append(part)
+    return parts
+
+
+def _normalize(state: Any) -> Tuple[Any, int]:
+    """Detached JSON-native copy of state and its serialized size."""
+    text = json.dumps(state, separators=(",", ":"), default=str)
+    return json.loads(text), len(text)
+
+
+class ProgressStream:
+    """Sequence, last-sent state and recent deltas of one stream."""
+
+    def __init__(self, history_size: int):
+        self.seq = 0
+        self.state: Dict[str, Any] = {}
+        self.synced = True  # False on a mirror that has not seen a keyframe yet
+        self.history: Deque[Tuple[int, List[Dict[str, Any]]]] = deque(maxlen=history_size)
+        self.parts: Dict[str, Any] = {}
+        self.has_pending = False
+        self.last_emit = 0.0
+        self.flush_task: Optional[asyncio.Task] = None
+
+
+class ProgressChannel:
+    """Throttled, sequenced delta encoder for progress streams."""
+
+    def __init__(
+        self,
+        emit: ProgressEmitter,
+        max_rate: Optional[float] = None,
+        history_size: Optional[int] = None,
+        keyframe_interval: int = 100,
+        max_streams: int = 1000
+    ):
+        self.emit = emit
+        max_rate = settings.WEBSOCKET_PROGRESS_MAX_RATE if max_rate is None else max_rate
+        self.min_interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self.history_size = history_size or settings.WEBSOCKET_PROGRESS_HISTORY
+        self.keyframe_interval = keyframe_interval
+        self.max_streams = max_streams
+        self.streams: "OrderedDict[str, ProgressStream]" = OrderedDict()
+
+        # Metrics
+        self.patches_sent = 0
+        self.updates_throttled = 0
+        self.patch_bytes = 0
+        self.snapshot_bytes = 0
+
+    def _stream(self, stream_id: str) -> ProgressStream:
+        stream = self.streams.get(stream_id)
+        if stream is None:
+            stream = ProgressStream(self.history_size)
+            self.streams[stream_id] = stream
+            while len(self.streams) > self.max_streams:
+                _, evicted = self.streams.popitem(last=False)
+                if evicted.flush_task:
+                    evicted.flush_task.cancel()
+        else:
+            self.streams.move_to_end(stream_id)
+        return stream
+
+    def current_seq(self, stream_id: str) -> int:
+        stream = self.streams.get(stream_id)
+        return stream.seq if stream else 0
+
+    async def publish(self, stream_id: str, part: str, value: Any):
+        """
+        Record the new value of one part of a stream's state.
+
+        Values are read when the delta is actually emitted, so callers may
+        keep mutating the same object between throttled updates.
+        """
+        stream = self._stream(stream_id)
+        stream.parts[part] = value
+        stream.has_pending = True
+
+        if stream.flush_task is not None:
+            self.updates_throttled += 1
+            return
+
+        wait = stream.last_emit + self.min_interval - time.monotonic()
+        if wait <= 0:
+            await self.flush(stream_id)
+        else:
+            self.updates_throttled += 1
+            stream.flush_task = asyncio.create_task(self._flush_later(stream_id, wait))
+
+    async def _flush_later(self, stream_id: str, delay: float):
+        try:
+            await asyncio.sleep(delay)
+            stream = self.streams.get(stream_id)
+            if stream is not None:
+                stream.flush_task = None
+            await self.flush(stream_id)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Failed to flush progress for {stream_id}: {e}")
+
+    async def flush(self, stream_id: str):
+        """Emit the delta between the last sent and the pending state."""
+        stream = self.streams.get(stream_id)
+        if stream is None or not stream.has_pending:
+            return
+
+        state, full_size = _normalize(stream.parts)
+        stream.has_pending = False
+        stream.last_emit = time.monotonic()
+
+        if stream.seq % self.keyframe_interval == self.keyframe_interval - 1:
+            ops = [{"op": "replace", "path": "", "value": state}]
+        else:
+            ops = diff_json(stream.state, state)
+            if not ops:
+                return
+
+        stream.seq += 1
+        stream.state = state
+        stream.history.append((stream.seq, ops))
+
+        message = {"type": PROGRESS_PATCH, "stream": stream_id, "seq": stream.seq, "ops": ops}
+        self.patches_sent += 1
+        self.patch_bytes += len(json.dumps(ops, separators=(",", ":"), default=str))
+        self.snapshot_bytes += full_size
+        await self.emit(stream_id, message, state, changed_parts(ops, state))
+
+    def observe(self, stream_id: str, message: Dict[str, Any]):
+        """Follow a stream published by another worker so this one can resync clients."""
+        stream = self._stream(stream_id)
+        # History keeps its own copy: apply_patch works in place and would
+        # otherwise grow the lists and dicts that earlier ops refer to
+        seq, ops = message.get("seq", 0), copy.deepcopy(message.get("ops", []))
+        is_keyframe = len(ops) == 1 and ops[0].get("path") == ""
+
+        if is_keyframe or seq == 1:
+            stream.state = apply_patch({}, copy.deepcopy(ops))
+            stream.synced = True
+        elif stream.synced and seq == stream.seq + 1:
+            stream.state = apply_patch(stream.state, copy.deepcopy(ops))
+        else:
+            stream.synced = False
+            stream.history.clear()
+        stream.seq = seq
+        stream.history.append((seq, ops))
+
+    def resync(self, stream_id: str, since_seq: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Message that brings a client up to date.
+
+        A replay of the missed deltas when they are still held, otherwise a
+        full snapshot. ``state`` is None while a mirror waits for a keyframe.
+        """
+        stream = self.streams.get(stream_id)
+        if stream is None:
+            return {"type": PROGRESS_SNAPSHOT, "stream": stream_id, "seq": 0, "state": {}}
+
+        if since_seq is not None and stream.history:
+            first_seq = stream.history[0][0]
+            if first_seq - 1 <= since_seq <= stream.seq:
+                return {
+                    "type": PROGRESS_REPLAY,
+                    "stream": stream_id,
+                    "seq": stream.seq,
+                    "patches": [
+                        {"seq": seq, "ops": ops} for seq, ops in stream.history if seq > since_seq
+                    ]
+                }
+
+        return {
+            "type": PROGRESS_SNAPSHOT,
+            "stream": stream_id,
+            "seq": stream.seq,
+            "state": stream.state if stream.synced else None
+        }
+
+    def discard(self, stream_id: str):
+        stream = self.streams.pop(stream_id, None)
+        if stream and stream.flush_task:
+            stream.flush_task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "streams": len(self.streams),
+            "patches_sent": self.patches_sent,
+            "updates_throttled": self.updates_throttled,
+            "patch_bytes": self.patch_bytes,
+            "snapshot_bytes": self.snapshot_bytes,
+            "compression_ratio": (
+                self.snapshot_bytes / self.patch_bytes if self.patch_bytes else 0.0
+            ),
+        }
@@ -0,0 +1,248 @@
+"""
+Investigation Progress Tracker
+
+Measures how long each workflow node actually takes (monotonic clock) and
+keeps incremental per-phase counters, so the progress percentage is an O(1)
+read instead of a rescan of every status dict. Remaining time is estimated
+from the latency history of previous runs of each node, which is persisted
+so estimates survive restarts.
+"""
+
+import json
+import logging
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Workflow nodes per phase, in execution order
+PHASE_NODES: Dict[str, List[str]] = {
+    "planning": ["objective_definition", "strategy_formulation"],
+    "collection": ["search_coordination", "data_collection"],
+    "analysis": ["data_fusion", "pattern_recognition", "contextual_analysis"],
+    "synthesis": ["intelligence_synthesis", "quality_assurance", "report_generation"],
+}
+
+PHASE_WEIGHTS: Dict[str, float] = {
+    "planning": 0.15,
+    "collection": 0.35,
+    "analysis": 0.35,
+    "synthesis": 0.15,
+}
+
+# Used for nodes that have no history yet
+DEFAULT_NODE_SECONDS = 10.0
+
+NODE_PHASES: Dict[str, str] = {
+    node: phase for phase, nodes in PHASE_NODES.items() for node in nodes
+}
+
+
+class LatencyHistory:
+    """Recent latency samples per node, persisted to a JSON file."""
+
+    def __init__(self, storage_path: Optional[str] = None, max_samples: int = 200):
+        if storage_path is None:
+            backend_dir = Path(__file__).parent.parent.parent
+            storage_path = backend_dir / "data" / "node_latency.json"
+        self.storage_path = Path(storage_path)
+        self.max_samples = max_samples
+        self.samples: Dict[str, Deque[float]] = {}
+        self._dirty = False
+
+    def record(self, node: str, seconds: float):
+        samples = self.samples.get(node)
+        if samples is None:
+            samples = self.samples[node] = deque(maxlen=self.max_samples)
+        samples.append(seconds)
+        self._dirty = True
+
+    def quantile(self, node: str, q: float = 0.5) -> Optional[float]:
+        """Latency quantile for a node, or None without history."""
+        samples = self.samples.get(node)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+        return ordered[index]
+
+    def estimate(self, node: str, q: float = 0.5) -> float:
+        value = self.quantile(node, q)
+        return DEFAULT_NODE_SECONDS if value is None else value
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            node: {
+                "samples": len(samples),
+                "p50": self.quantile(node, 0.5),
+                "p90": self.quantile(node, 0.9),
+            }
+            for node, samples in self.samples.items()
+        }
+
+    def load(self) -> "LatencyHistory":
+        try:
+            with open(self.storage_path, 'r') as f:
+                data = json.load(f).get("nodes", {})
+            for node, samples in data.items():
+                self.samples[node] = deque(
+                    (float(s) for s in samples[-self.max_samples:]), maxlen=self.max_samples
+                )
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to load node latency history: {e}")
+        return self
+
+    def save(self) -> bool:
+        if not self._dirty:
+            return True
+        try:
+            self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.storage_path.with_suffix(".tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    "nodes": {node: [round(s, 4) for s in samples] for node, samples in self.samples.items()},
+                    "updated_at": datetime.utcnow().isoformat()
+                }, f)
+            tmp_path.replace(self.storage_path)
+            self._dirty = False
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to save node latency history: {e}")
+            return False
+
+
+class ProgressTracker:
+    """Per-investigation node timings and incremental progress counters."""
+
+    def __init__(self, investigation_id: str, history: Optional[LatencyHistory] = None):
+        self.investigation_id = investigation_id
+        self.history = history or LatencyHistory()
+        self.started_at = time.monotonic()
+
+        self.node_durations: Dict[str, float] = {}
+        self._running: Dict[str, float] = {}
+        self._phase_started: Dict[str, float] = {}
+        self.phase_durations: Dict[str, float] = {}
+
+        # Incremental counters: finished nodes per phase and the weighted sum
+        self._phase_done: Dict[str, int] = {phase: 0 for phase in PHASE_NODES}
+        self._progress = 0.0
+        # Expected seconds per node, fixed at start so the running total stays consistent
+        self._expected: Dict[str, float] = {node: self.history.estimate(node) for node in NODE_PHASES}
+        self._remaining_estimate = sum(self._expected.values())
+
+    def start_phase(self, phase: str):
+        self._phase_started.setdefault(phase, time.monotonic())
+
+    def finish_phase(self, phase: str) -> float:
+        """Wall time of a phase, including overlapped nodes."""
+        started = self._phase_started.get(phase)
+        duration = 0.0 if started is None else time.monotonic() - started
+        self.phase_durations[phase] = round(duration, 4)
+        return self.phase_durations[phase]
+
+    def start_node(self, node: str):
+        self._running[node] = time.monotonic()
+        phase = NODE_PHASES.get(node)
+        if phase:
+            self.start_phase(phase)
+
+    def finish_node(self, node: str) -> float:
+        started = self._running.pop(node, None)
+        if started is None:
+            return 0.0
+        duration = time.monotonic() - started
+        first_run = node not in self.node_durations
+        self.node_durations[node] = round(self.node_durations.get(node, 0.0) + duration, 4)
+        self.history.record(node, duration)
+        if first_run:
+            self._count_done(node)
+        return duration
+
+    def abort_node(self, node: str):
+        """Stop timing a node that raised; it does not count towards progress."""
+        self._running.pop(node, None)
+
+    def skip_node(self, node: str):
+        """Count a node as done without timing it."""
+        if node not in self.node_durations:
+            self.node_durations[node] = 0.0
+            self._count_done(node)
+
+    def _count_done(self, node: str):
+        phase = NODE_PHASES.get(node)
+        if phase:
+            self._phase_done[phase] += 1
+            self._progress += PHASE_WEIGHTS[phase] * 100 / len(PHASE_NODES[phase])
+            self._remaining_estimate -= self._expected[node]
+
+    @property
+    def progress(self) -> float:
+        return min(round(self._progress, 4), 100.0)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def estimated_remaining(self) -> float:
+        """Seconds left: median history of unfinished nodes, less time already spent on running ones."""
+        now = time.monotonic()
+        credit = sum(
+            min(now - started, self._expected.get(node, 0.0))
+            for node, started in self._running.items()
+        )
+        return max(0.0, self._remaining_estimate - credit)
+
+    def apply(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Write progress, timing and the completion estimate into the state."""
+        state["progress_percentage"] = self.progress
+        state["total_execution_time"] = round(self.elapsed, 4)
+        state["estimated_completion"] = datetime.utcnow() + timedelta(seconds=self.estimated_remaining())
+        state["metadata"]["node_timings"] = dict(self.node_durations)
+        state["metadata"]["phase_timings"] = dict(self.phase_durations)
+        return state
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "investigation_id": self.investigation_id,
+            "progress_percentage": self.progress,
+            "elapsed": round(self.elapsed, 4),
+            "estimated_remaining": round(self.estimated_remaining(), 4),
+            "running_nodes": list(self._running),
+            "node_timings": dict(self.node_durations),
+            "phase_timings": dict(self.phase_durations),
+        }
+
+
+_history: Optional[LatencyHistory] = None
+_active_trackers: Dict[str, ProgressTracker] = {}
+
+
+def get_latency_history() -> LatencyHistory:
+    global _history
+    if _history is None:
+        _history = LatencyHistory().load()
+    return _history
+
+
+def start_tracking(investigation_id: str) -> ProgressTracker:
+    tracker = ProgressTracker(investigation_id, get_latency_history())
+    _active_trackers[investigation_id] = tracker
+    return tracker
+
+
+def get_tracker(investigation_id: str) -> Optional[ProgressTracker]:
+    return _active_trackers.get(investigation_id)
+
+
+def stop_tracking(investigation_id: str, persist: bool = True) -> Optional[ProgressTracker]:
+    tracker = _active_trackers.pop(investigation_id, None)
+    if tracker is not None and persist:
+        tracker.history.save()
+    return tracker
@@ -0,0 +1,325 @@
+"""
+RDAP Client
+
+Registration data lookups routed to each TLD's own RDAP server using the
+IANA bootstrap registry (https://data.iana.org/rdap/dns.json), instead of
+sending every domain through one aggregator. The bootstrap file is cached
+on disk and refreshed when older than RDAP_BOOTSTRAP_MAX_AGE.
+
+Responses are kept in a persistent SQLite cache so registry data is
+fetched once per WHOIS_CACHE_MAX_AGE rather than once per investigation:
+
+- raw records are stored as zlib-compressed compact JSON;
+- "not found" answers are cached for WHOIS_NEGATIVE_MAX_AGE;
+- when a registry errors or rate-limits us, a stale entry is served
+  rather than nothing;
+- concurrent lookups of one domain share a request, and requests per RDAP
+  server are capped (RDAP_MAX_CONCURRENCY_PER_SERVER), since registry rate
+  limits are what bound bulk lookups.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from app.config import settings
+from app.services.dns_resolver import normalize_name
+
+logger = logging.getLogger(__name__)
+
+
+BOOTSTRAP_URL = "https://data.iana.org/rdap/dns.json"
+FALLBACK_RDAP_URL = "https://rdap.org/"
+
+# A failed bootstrap download is retried after this many seconds
+BOOTSTRAP_RETRY_SECONDS = 3600
+
+
+def _data_dir() -> Path:
+    return Path(__file__).parent.parent.parent / "data"
+
+
+def compact_json(data: Any) -> str:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+@dataclass
+class RDAPResult:
+    """An RDAP answer for one domain; ``data`` is None when not found."""
+    domain: str
+    status: int
+    data: Optional[Dict[str, Any]]
+    server: str
+    fetched_at: float
+    from_cache: bool = False
+    stale: bool = False
+
+    @property
+    def found(self) -> bool:
+        return self.status == 200 and self.data is not None
+
+    @property
+    def raw(self) -> str:
+        return compact_json(self.data) if self.data is not None else ""
+
+
+class RDAPBootstrap:
+    """TLD → RDAP base URL map from the IANA bootstrap registry."""
+
+    def __init__(self, storage_path: Optional[str] = None, max_age: int = 604800):
+        self.storage_path = Path(storage_path or _data_dir() / "rdap_bootstrap.json")
+        self.max_age = max_age
+        self.services: Dict[str, str] = {}
+        self.updated_at = 0.0
+        self._last_attempt = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def load(self) -> "RDAPBootstrap":
+        try:
+            with open(self.storage_path, 'r') as f:
+                stored = json.load(f)
+            self.update(stored["registry"], stored.get("updated_at", 0.0))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to load RDAP bootstrap: {e}")
+        return self
+
+    def update(self, registry: Dict[str, Any], updated_at: Optional[float] = None) -> int:
+        """Load a bootstrap document; returns the number of TLDs mapped."""
+        services = {}
+        for entry in registry.get("services", []):
+            if len(entry) < 2 or not entry[1]:
+                continue
+            tlds, urls = entry[0], entry[1]
+            # Prefer HTTPS servers
+            url = next((u for u in urls if u.startswith("https://")), urls[0])
+            for tld in tlds:
+                services[tld.lower()] = url if url.endswith("/") else url + "/"
+        if services:
+            self.services = services
+            self.updated_at = updated_at if updated_at is not None else time.time()
+        return len(services)
+
+    @property
+    def is_stale(self) -> bool:
+        return time.time() - self.updated_at > self.max_age
+
+    def base_url(self, domain: str) -> str:
+        labels = normalize_name(domain).split(".")
+        # Longest matching suffix wins
+        for i in range(len(labels)):
+            url = self.services.get(".".join(labels[i:]))
+            if url:
+                return url
+        return FALLBACK_RDAP_URL
+
+    def domain_url(self, domain: str) -> str:
+        return f"{self.base_url(domain)}domain/{normalize_name(domain)}"
+
+    async def ensure_fresh(self, session):
+        """Download the registry when stale (at most once per retry window)."""
+        if not self.is_stale or time.time() - self._last_attempt < BOOTSTRAP_RETRY_SECONDS:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self.is_stale or time.time() - self._last_attempt < BOOTSTRAP_RETRY_SECONDS:
+                return
+            self._last_attempt = time.time()
+            try:
+                async with session.get(BOOTSTRAP_URL) as response:
+                    if response.status != 200:
+                        return
+                    registry = await response.json(content_type=None)
+                if self.update(registry):
+                    self._save(registry)
+            except Exception as e:
+                logger.warning(f"RDAP bootstrap refresh failed: {e}")
+
+    def _save(self, registry: Dict[str, Any]):
+        try:
+            self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.storage_path.with_suffix(".tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump({"registry": registry, "updated_at": self.updated_at}, f, separators=(",", ":"))
+            tmp_path.replace(self.storage_path)
+        except Exception as e:
+            logger.warning(f"Failed to save RDAP bootstrap: {e}")
+
+
+class WhoisCache:
+    """Persistent RDAP response cache (SQLite, compressed compact JSON)."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or _data_dir() / "whois_cache.db")
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open (and create) the database on first use; call with the lock held."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS rdap_cache ("
+                "domain TEXT PRIMARY KEY, status INTEGER NOT NULL, server TEXT, "
+                "fetched_at REAL NOT NULL, raw BLOB)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, domain: str) -> Optional[RDAPResult]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT status, server, fetched_at, raw FROM rdap_cache WHERE domain = ?", (domain,)
+            ).fetchone()
+        if row is None:
+            return None
+        status, server, fetched_at, raw = row
+        data = json.loads(zlib.decompress(raw)) if raw else None
+        return RDAPResult(domain, status, data, server or "", fetched_at, from_cache=True)
+
+    def put(self, result: RDAPResult):
+        raw = zlib.compress(result.raw.encode("utf-8"), 6) if result.data is not None else None
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO rdap_cache (domain, status, server, fetched_at, raw) VALUES (?, ?, ?, ?, ?)",
+                (result.domain, result.status, result.server, result.fetched_at, raw)
+            )
+            conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM rdap_cache").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class RDAPClient:
+    """Cached, coalesced, bootstrap-routed RDAP domain lookups."""
+
+    def __init__(
+        self,
+        cache: Optional[WhoisCache] = None,
+        bootstrap: Optional[RDAPBootstrap] = None,
+        max_age: int = 604800,
+        negative_max_age: int = 86400,
+        max_per_server: int = 4
+    ):
+        # Explicit None checks: an empty cache is falsy (WhoisCache defines __len__)
+        self.cache = cache if cache is not None else WhoisCache()
+        self.bootstrap = bootstrap if bootstrap is not None else RDAPBootstrap().load()
+        self.max_age = max_age
+        self.negative_max_age = negative_max_age
+        self.max_per_server = max_per_server
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._server_limits: Dict[str, asyncio.Semaphore] = {}
+
+        self.stats = {"cache_hits": 0, "fetches": 0, "coalesced": 0, "stale_served": 0}
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._inflight = {}
+            self._server_limits = {}
+
+    def _is_fresh(self, result: RDAPResult) -> bool:
+        max_age = self.max_age if result.status == 200 else self.negative_max_age
+        return time.time() - result.fetched_at < max_age
+
+    async def _cache_call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    async def lookup(self, domain: str, session) -> RDAPResult:
+        """RDAP record for a domain, from cache when fresh."""
+        self._bind_loop()
+        domain = normalize_name(domain)
+
+        cached = await self._cache_call(self.cache.get, domain)
+        if cached is not None and self._is_fresh(cached):
+            self.stats["cache_hits"] += 1
+            return cached
+
+        task = self._inflight.get(domain)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            task = self._loop.create_task(self._fetch(domain, session, cached))
+            self._inflight[domain] = task
+            task.add_done_callback(lambda _: self._inflight.pop(domain, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, domain: str, session, stale: Optional[RDAPResult]) -> RDAPResult:
+        await self.bootstrap.ensure_fresh(session)
+        url = self.bootstrap.domain_url(domain)
+        server = urlparse(url).netloc
+        limit = self._server_limits.get(server)
+        if limit is None:
+            limit = self._server_limits[server] = asyncio.Semaphore(self.max_per_server)
+
+        try:
+            async with limit:
+                self.stats["fetches"] += 1
+                async with session.get(url, headers={"Accept": "application/rdap+json"}) as response:
+                    status = response.status
+                    data = await response.json(content_type=None) if status == 200 else None
+        except Exception:
+            if stale is not None:
+                return self._serve_stale(stale)
+            raise
+
+        if status not in (200, 404):
+            # Rate limited or registry error: don't cache it
+            if stale is not None:
+                return self._serve_stale(stale)
+            return RDAPResult(domain, status, None, server, time.time())
+
+        result = RDAPResult(domain, status, data, server, time.time())
+        await self._cache_call(self.cache.put, result)
+        return result
+
+    def _serve_stale(self, stale: RDAPResult) -> RDAPResult:
+        self.stats["stale_served"] += 1
+        stale.stale = True
+        return stale
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "bootstrap_tlds": len(self.bootstrap.services),
+            "inflight": len(self._inflight),
+        }
+
+
+_rdap_client: Optional[RDAPClient] = None
+
+
+def get_rdap_client() -> RDAPClient:
+    """Shared client configured from settings."""
+    global _rdap_client
+    if _rdap_client is None:
+        _rdap_client = RDAPClient(
+            cache=WhoisCache(settings.WHOIS_CACHE_PATH or None),
+            bootstrap=RDAPBootstrap(max_age=settings.RDAP_BOOTSTRAP_MAX_AGE).load(),
+            max_age=settings.WHOIS_CACHE_MAX_AGE,
+            negative_max_age=settings.WHOIS_NEGATIVE_MAX_AGE,
+            max_per_server=settings.RDAP_MAX_CONCURRENCY_PER_SERVER
+        )
+    return _rdap_client
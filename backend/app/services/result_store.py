@@ -0,0 +1,270 @@
+"""
+Columnar Search Result Storage
+
+Collection agents return lists of flat result dicts that all share the same
+handful of keys. Holding them as one list per key (with interned key names)
+instead of one dict per row cuts the per-result overhead, and the columnar
+form serializes without repeating every key for every row.
+
+``SearchResults`` is the ``InvestigationState.search_results`` container.
+Rows are materialized back to dicts lazily, on access, for agents that
+still expect ``Dict[str, List[Dict[str, Any]]]``. Those dicts are copies:
+changing one does not change the table (assign the row back instead), and
+anything returned over the API should go through ``materialize_results``.
+"""
+
+import sys
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+
+COLUMNAR_MARKER = "__columnar__"
+COLUMNAR_VERSION = 1
+
+
+class _Missing:
+    """Placeholder for keys a row does not have."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "<missing>"
+
+    def __reduce__(self):
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+
+class ResultTable(Sequence):
+    """
+    Column-oriented list of result dicts; indexing returns a fresh dict.
+
+    Rows are not stored as dicts, so edits to a returned row are lost;
+    write them back with ``table[index] = row``.
+    """
+
+    __slots__ = ("_columns", "_length")
+
+    def __init__(self, rows: Iterable[Dict[str, Any]] = ()):
+        self._columns: Dict[str, List[Any]] = {}
+        self._length = 0
+        self.extend(rows)
+
+    def append(self, row: Dict[str, Any]):
+        if not isinstance(row, dict):
+            raise TypeError(f"ResultTable rows must be dicts, not {type(row).__name__}")
+        for key in row:
+            if key not in self._columns:
+                name = sys.intern(key) if isinstance(key, str) else key
+                self._columns[name] = [MISSING] * self._length
+        for key, column in self._columns.items():
+            column.append(row.get(key, MISSING))
+        self._length += 1
+
+    def extend(self, rows: Iterable[Dict[str, Any]]):
+        for row in rows:
+            self.append(row)
+
+    def __setitem__(self, index: int, row: Dict[str, Any]):
+        """Replace one row; the way to persist changes made to a materialized row."""
+        if not isinstance(row, dict):
+            raise TypeError(f"ResultTable rows must be dicts, not {type(row).__name__}")
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("ResultTable index out of range")
+        for key in row:
+            if key not in self._columns:
+                name = sys.intern(key) if isinstance(key, str) else key
+                self._columns[name] = [MISSING] * self._length
+        for key, column in self._columns.items():
+            column[index] = row.get(key, MISSING)
+
+    def _row(self, index: int) -> Dict[str, Any]:
+        return {
+            key: column[index]
+            for key, column in self._columns.items()
+            if column[index] is not MISSING
+        }
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("ResultTable index out of range")
+        return self._row(index)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Yield rows as new dicts (see the class docstring about editing them)."""
+        for index in range(self._length):
+            yield self._row(index)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ResultTable, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ResultTable(rows={self._length}, columns={list(self._columns)})"
+
+    @property
+    def keys(self) -> List[str]:
+        return list(self._columns)
+
+    def column(self, key: str, default: Any = None) -> List[Any]:
+        """All values of one key without materializing rows."""
+        column = self._columns.get(key)
+        if column is None:
+            return [default] * self._length
+        return [default if value is MISSING else value for value in column]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [self._row(i) for i in range(self._length)]
+
+    def to_columns(self) -> Dict[str, Any]:
+        """
+        Serializable columnar form.
+
+        Sparse columns are stored as ``{row_index: value}`` maps so absent
+        keys survive the round trip.
+        """
+        columns: Dict[str, Any] = {}
+        for key, column in self._columns.items():
+            if any(value is MISSING for value in column):
+                columns[key] = {
+                    str(index): value for index, value in enumerate(column) if value is not MISSING
+                }
+            else:
+                columns[key] = column
+        return {COLUMNAR_MARKER: COLUMNAR_VERSION, "length": self._length, "columns": columns}
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type: Any, handler: Any):
+        """Let pydantic models (and FastAPI responses) hold tables; they serialize as lists of dicts."""
+        from pydantic_core import core_schema
+
+        from_rows = core_schema.no_info_after_validator_function(
+            cls, core_schema.list_schema(core_schema.dict_schema())
+        )
+        return core_schema.json_or_python_schema(
+            json_schema=from_rows,
+            python_schema=core_schema.union_schema([core_schema.is_instance_schema(cls), from_rows]),
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda table: table.to_dicts() if isinstance(table, ResultTable) else table
+            )
+        )
+
+    @classmethod
+    def from_columns(cls, payload: Dict[str, Any]) -> "ResultTable":
+        table = cls()
+        length = payload.get("length", 0)
+        for key, column in payload.get("columns", {}).items():
+            if isinstance(column, dict):
+                dense = [MISSING] * length
+                for index, value in column.items():
+                    dense[int(index)] = value
+                column = dense
+            table._columns[sys.intern(key)] = list(column)
+        table._length = length
+        return table
+
+
+class SearchResults(dict):
+    """
+    Mapping of source name to results, stored columnar where possible.
+
+    Lists of dicts assigned to a source are converted to ``ResultTable``;
+    anything else (e.g. lists of strings) is kept as is.
+    """
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, **kwargs):
+        super().__init__()
+        self.update(data or {}, **kwargs)
+
+    def __setitem__(self, source: str, results: Any):
+        super().__setitem__(source, _to_table(results))
+
+    def update(self, data: Any = (), **kwargs):
+        items = data.items() if hasattr(data, "items") else data
+        for source, results in items:
+            self[source] = results
+        for source, results in kwargs.items():
+            self[source] = results
+
+    def setdefault(self, source: str, default: Any = None):
+        if source not in self:
+            self[source] = default
+        return self[source]
+
+    def materialize(self) -> Dict[str, Any]:
+        """Plain ``Dict[str, List[Dict]]`` copy for consumers that need one."""
+        return materialize_results(self)
+
+    def to_columns(self) -> Dict[str, Any]:
+        return {
+            source: results.to_columns() if isinstance(results, ResultTable) else results
+            for source, results in self.items()
+        }
+
+    @classmethod
+    def from_columns(cls, payload: Dict[str, Any]) -> "SearchResults":
+        return cls({source: decode_compact(results) for source, results in payload.items()})
+
+    def to_msgpack(self) -> bytes:
+        if not MSGPACK_AVAILABLE:
+            raise RuntimeError("msgpack is not installed")
+        return msgpack.packb(self.to_columns(), use_bin_type=True, default=str)
+
+    @classmethod
+    def from_msgpack(cls, data: bytes) -> "SearchResults":
+        if not MSGPACK_AVAILABLE:
+            raise RuntimeError("msgpack is not installed")
+        return cls.from_columns(msgpack.unpackb(data, raw=False, strict_map_key=False))
+
+
+def _to_table(results: Any) -> Any:
+    if isinstance(results, ResultTable):
+        return results
+    if isinstance(results, dict) and results.get(COLUMNAR_MARKER):
+        return ResultTable.from_columns(results)
+    if isinstance(results, list) and all(isinstance(row, dict) for row in results):
+        return ResultTable(results)
+    return results
+
+
+def materialize_results(results: Any) -> Any:
+    """Convert columnar containers (at any nesting level of mappings and lists) back to dicts."""
+    if isinstance(results, ResultTable):
+        return results.to_dicts()
+    if isinstance(results, dict):
+        return {key: materialize_results(value) for key, value in results.items()}
+    if isinstance(results, list):
+        return [materialize_results(value) for value in results]
+    return results
+
+
+def encode_compact(obj: Any) -> Any:
+    """``json.dumps`` default hook that writes result tables in columnar form."""
+    if isinstance(obj, ResultTable):
+        return obj.to_columns()
+    return str(obj)
+
+
+def decode_compact(obj: Any) -> Any:
+    """``json.loads`` object hook that restores columnar result tables."""
+    if isinstance(obj, dict) and obj.get(COLUMNAR_MARKER) == COLUMNAR_VERSION and "columns" in obj:
+        return ResultTable.from_columns(obj)
+    return obj
@@ -0,0 +1,189 @@
+"""
+Serialization Layer
+
+One place to turn state, cache values and audit/sync payloads into bytes or
+text. Codecs are pluggable: orjson and msgpack are used when installed and
+the standard library ``json`` module otherwise. All codecs natively encode
+enums (by value), datetimes (ISO 8601), sets, dataclasses and columnar
+result tables, instead of the ``default=str`` fallback.
+
+Binary payloads (e.g. cache entries) carry a small versioned header naming
+the codec, so readers can decode entries written with any codec. Untagged
+payloads are treated as legacy JSON. Text payloads (database columns, log
+lines) are plain JSON.
+"""
+
+import dataclasses
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, Optional, Type
+from uuid import UUID
+
+from app.config import settings
+from app.services.result_store import ResultTable
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+
+# Header: magic byte (never the first byte of JSON text), format version, codec id
+MAGIC = 0x00
+FORMAT_VERSION = 1
+HEADER_SIZE = 3
+
+
+def encode_default(obj: Any) -> Any:
+    """Convert values the codecs don't handle natively into JSON-native ones."""
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, ResultTable):
+        return obj.to_columns()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, (UUID, Decimal)):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8", errors="replace")
+    return str(obj)
+
+
+class Codec:
+    """Encodes values to bytes and back."""
+
+    name = ""
+    codec_id = 0
+
+    def dumps(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class JsonCodec(Codec):
+    """Standard library JSON."""
+
+    name = "json"
+    codec_id = 1
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(
+            value, default=encode_default, separators=(",", ":"), ensure_ascii=False
+        ).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(Codec):
+    """orjson: enums, datetimes and dataclasses are encoded natively in C."""
+
+    name = "orjson"
+    codec_id = 2
+
+    def __init__(self):
+        if not ORJSON_AVAILABLE:
+            raise RuntimeError("orjson is not installed")
+        self.options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value, default=encode_default, option=self.options)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackCodec(Codec):
+    """msgpack: compact binary, for cache values."""
+
+    name = "msgpack"
+    codec_id = 3
+
+    def __init__(self):
+        if not MSGPACK_AVAILABLE:
+            raise RuntimeError("msgpack is not installed")
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=encode_default, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+_CODEC_TYPES: Dict[str, Type[Codec]] = {
+    "json": JsonCodec,
+    "orjson": OrjsonCodec,
+    "msgpack": MsgpackCodec,
+}
+_codecs: Dict[str, Codec] = {}
+
+
+def register_codec(codec_type: Type[Codec]):
+    """Register an additional codec; its ``codec_id`` must be unique."""
+    _CODEC_TYPES[codec_type.name] = codec_type
+    _codecs.pop(codec_type.name, None)
+
+
+def get_codec(name: Optional[str] = None) -> Codec:
+    """
+    Codec by name; ``None`` or "auto" uses the configured default.
+
+    "auto" picks orjson when installed and falls back to stdlib JSON.
+    """
+    name = name or settings.SERIALIZATION_CODEC
+    if name == "auto":
+        name = "orjson" if ORJSON_AVAILABLE else "json"
+    codec = _codecs.get(name)
+    if codec is None:
+        codec_type = _CODEC_TYPES.get(name)
+        if codec_type is None:
+            raise ValueError(f"Unknown serialization codec: {name}")
+        codec = _codecs[name] = codec_type()
+    return codec
+
+
+def _codec_by_id(codec_id: int) -> Codec:
+    for name, codec_type in _CODEC_TYPES.items():
+        if codec_type.codec_id == codec_id:
+            return get_codec(name)
+    raise ValueError(f"Unknown serialization codec id {codec_id}")
+
+
+def encode(value: Any, codec: Optional[str] = None) -> bytes:
+    """Serialize to bytes with a versioned codec header."""
+    selected = get_codec(codec)
+    return bytes((MAGIC, FORMAT_VERSION, selected.codec_id)) + selected.dumps(value)
+
+
+def decode(data: bytes) -> Any:
+    """Deserialize bytes written by ``encode`` or legacy untagged JSON."""
+    if isinstance(data, str):
+        return json.loads(data)
+    if len(data) >= HEADER_SIZE and data[0] == MAGIC:
+        version, codec_id = data[1], data[2]
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Unsupported serialization format version {version}")
+        return _codec_by_id(codec_id).loads(data[HEADER_SIZE:])
+    return json.loads(data)
+
+
+def dumps_text(value: Any) -> str:
+    """Serialize to a JSON string (for text columns, logs and HTTP payloads)."""
+    if ORJSON_AVAILABLE and settings.SERIALIZATION_CODEC != "json":
+        return get_codec("orjson").dumps(value).decode("utf-8")
+    return json.dumps(value, default=encode_default, separators=(",", ":"), ensure_ascii=False)
@@ -0,0 +1,417 @@
+"""
+Structured URL Discovery
+
+Finds a domain's URLs from what the site publishes about itself, so
+domain-scoped discovery doesn't need an LLM prompt or a search engine.
+
+- Sitemaps come from robots.txt ``Sitemap:`` lines and the usual
+  /sitemap.xml and /sitemap_index.xml; sitemap indexes are followed up to
+  ``max_sitemaps`` documents.
+- RSS and Atom feeds come from the homepage's ``<link rel="alternate">``
+  tags and the common feed paths.
+- Documents are streamed through an incremental XML parser (gzip'd ones
+  are inflated on the fly, a bounded piece at a time), so memory stays flat
+  and reading stops as soon as ``max_urls`` is reached.
+- Only sitemaps and feeds on the domain or its subdomains are fetched.
+- Results are cached per domain for SITEMAP_DISCOVERY_CACHE_TTL, and
+  domains that publish nothing for SITEMAP_DISCOVERY_EMPTY_TTL; concurrent
+  lookups of one domain share a single discovery.
+"""
+
+import asyncio
+import logging
+import re
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import urldefrag, urljoin, urlparse
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+from app.config import settings
+
+# Optional imports for HTTP fetching
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+USER_AGENT = "Mozilla/5.0 (compatible; ScrapeCraft-Discovery/1.0)"
+
+DEFAULT_SITEMAP_PATHS = ["/sitemap.xml", "/sitemap_index.xml"]
+DEFAULT_FEED_PATHS = ["/feed", "/rss.xml", "/atom.xml", "/feed.xml", "/index.xml"]
+
+FEED_TYPES = ("application/rss+xml", "application/atom+xml")
+
+# Sitemaps are capped at 50 MB uncompressed by the protocol
+MAX_DOCUMENT_BYTES = 50 * 1024 * 1024
+
+# Most bytes inflated from a gzip'd document in one step
+INFLATE_CHUNK = 64 * 1024
+
+_FEED_LINK = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+_ATTRIBUTE = re.compile(r'([a-z-]+)\s*=\s*["\']([^"\']*)["\']', re.IGNORECASE)
+
+
+@dataclass
+class DiscoveredURL:
+    """One URL found in a sitemap or feed."""
+    url: str
+    source: str
+    title: str = ""
+    lastmod: str = ""
+    document: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "source": self.source,
+            "title": self.title,
+            "lastmod": self.lastmod,
+            "document": self.document,
+        }
+
+
+@dataclass
+class DiscoveryResult:
+    """Everything found for one domain."""
+    domain: str
+    urls: List[DiscoveredURL] = field(default_factory=list)
+    sitemaps: List[str] = field(default_factory=list)
+    feeds: List[str] = field(default_factory=list)
+    discovered_at: float = field(default_factory=time.time)
+    from_cache: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "domain": self.domain,
+            "urls": [url.to_dict() for url in self.urls],
+            "sitemaps": self.sitemaps,
+            "feeds": self.feeds,
+        }
+
+
+def _local(tag: str) -> str:
+    """Element name without its XML namespace."""
+    return tag.rsplit("}", 1)[-1].lower()
+
+
+def _iso_date(value: str) -> str:
+    """W3C dates pass through; RFC 822 feed dates are converted so dates sort as strings."""
+    value = (value or "").strip()
+    if not value or value[:4].isdigit():
+        return value
+    try:
+        return parsedate_to_datetime(value).isoformat()
+    except (TypeError, ValueError):
+        return value
+
+
+class _DocumentParser:
+    """Incremental parser for sitemaps, sitemap indexes, RSS and Atom."""
+
+    def __init__(self, document: str, max_bytes: int = MAX_DOCUMENT_BYTES, max_urls: Optional[int] = None):
+        self.document = document
+        self.max_bytes = max_bytes
+        self.max_urls = max_urls
+        self.kind = ""
+        self.urls: List[DiscoveredURL] = []
+        self.sitemaps: List[str] = []
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._inflater = None
+        self._root = None
+        self._first = True
+        self.size = 0
+
+    @property
+    def done(self) -> bool:
+        """The document is not worth reading further."""
+        return (
+            self.kind == "unknown"
+            or self.size >= self.max_bytes
+            or (self.max_urls is not None and len(self.urls) >= self.max_urls)
+        )
+
+    def feed(self, chunk: bytes):
+        if self._first:
+            self._first = False
+            if chunk[:2] == b"\x1f\x8b":
+                self._inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self._inflater is None:
+            self._consume(chunk)
+            return
+        # Inflate in bounded steps so a small compressed chunk can't expand past max_bytes
+        while chunk and not self.done:
+            self._consume(self._inflater.decompress(chunk, min(INFLATE_CHUNK, self.max_bytes - self.size)))
+            chunk = self._inflater.unconsumed_tail
+
+    def _consume(self, data: bytes):
+        self.size += len(data)
+        self._parser.feed(data)
+        self._drain()
+
+    def _drain(self):
+        for event, element in self._parser.read_events():
+            name = _local(element.tag)
+            if event == "start":
+                if self._root is None:
+                    self._root = element
+                    self.kind = {"urlset": "sitemap", "sitemapindex": "sitemapindex", "rss": "rss", "feed": "atom"}.get(name, "unknown")
+                continue
+            if name in ("url", "sitemap", "item", "entry"):
+                self._record(name, element)
+                element.clear()
+                if self.kind in ("sitemap", "sitemapindex"):
+                    # Entries are children of the root; drop them so memory stays flat
+                    self._root.clear()
+
+    def _record(self, name: str, element):
+        fields: Dict[str, str] = {}
+        link = ""
+        for child in element:
+            child_name = _local(child.tag)
+            if child_name == "link" and child.get("href"):
+                # Atom: prefer rel="alternate" (the default) over other relations
+                if child.get("rel", "alternate") == "alternate" or not link:
+                    link = child.get("href")
+            elif child.text:
+                fields.setdefault(child_name, child.text.strip())
+
+        if name == "sitemap":
+            if fields.get("loc"):
+                self.sitemaps.append(fields["loc"])
+            return
+        if name == "url":
+            url, source = fields.get("loc", ""), "sitemap"
+        else:
+            url, source = link or fields.get("link", "") or fields.get("guid", ""), self.kind
+        if url:
+            self.urls.append(DiscoveredURL(
+                url=url,
+                source=source,
+                title=fields.get("title", ""),
+                lastmod=_iso_date(fields.get("lastmod") or fields.get("updated") or fields.get("pubdate") or fields.get("published", "")),
+                document=self.document
+            ))
+
+
+class SitemapDiscovery:
+    """Domain-scoped URL discovery from sitemaps and feeds."""
+
+    def __init__(
+        self,
+        timeout: float = 15.0,
+        max_urls: int = 5000,
+        max_sitemaps: int = 20,
+        cache_ttl: int = 3600,
+        empty_ttl: int = 300,
+        cache_size: int = 1000,
+        max_document_bytes: int = MAX_DOCUMENT_BYTES,
+        transport=None
+    ):
+        if not HTTPX_AVAILABLE:
+            raise ImportError("httpx is required for sitemap discovery. Install with: pip install httpx")
+        self.timeout = timeout
+        self.max_urls = max_urls
+        self.max_sitemaps = max_sitemaps
+        self.cache_ttl = cache_ttl
+        self.empty_ttl = empty_ttl
+        self.cache_size = cache_size
+        self.max_document_bytes = max_document_bytes
+        self.transport = transport
+
+        self._cache: "OrderedDict[str, DiscoveryResult]" = OrderedDict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        self.stats = {"lookups": 0, "cache_hits": 0, "coalesced": 0, "documents": 0, "bytes": 0, "urls": 0}
+
+    async def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            previous = self._client
+            self._loop = loop
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                headers={"User-Agent": USER_AGENT},
+                transport=self.transport
+            )
+            self._inflight = {}
+            if previous is not None:
+                # The previous loop's client would otherwise leak its connections
+                try:
+                    await previous.aclose()
+                except Exception as e:
+                    logger.debug(f"Closing previous sitemap client failed: {e}")
+
+    async def discover(self, domain: str) -> DiscoveryResult:
+        """URLs published by a domain's sitemaps and feeds, from cache when fresh."""
+        await self._bind_loop()
+        domain = domain.strip().lower().rstrip(".")
+        self.stats["lookups"] += 1
+
+        cached = self._cache.get(domain)
+        if cached is not None:
+            ttl = self.cache_ttl if cached.urls else self.empty_ttl
+            if time.time() - cached.discovered_at < ttl:
+                self._cache.move_to_end(domain)
+                self.stats["cache_hits"] += 1
+                return DiscoveryResult(**{**cached.__dict__, "from_cache": True})
+            del self._cache[domain]
+
+        task = self._inflight.get(domain)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            task = self._loop.create_task(self._discover(domain))
+            self._inflight[domain] = task
+            task.add_done_callback(lambda _: self._inflight.pop(domain, None))
+        return await asyncio.shield(task)
+
+    async def _discover(self, domain: str) -> DiscoveryResult:
+        result = DiscoveryResult(domain=domain)
+        origin = f"https://{domain}"
+        robots_sitemaps, feed_links = await asyncio.gather(
+            self._robots_sitemaps(origin), self._homepage_feeds(origin)
+        )
+
+        # Declared locations, or the conventional ones when a site declares none
+        robots_sitemaps = [url for url in robots_sitemaps if self._in_scope(url, domain)]
+        feed_links = [url for url in feed_links if self._in_scope(url, domain)]
+        sitemap_queue = list(dict.fromkeys(robots_sitemaps or [origin + path for path in DEFAULT_SITEMAP_PATHS]))
+        feeds = list(dict.fromkeys(feed_links or [origin + path for path in DEFAULT_FEED_PATHS]))
+        seen = set()
+
+        def collect(parser: _DocumentParser):
+            for found in parser.urls:
+                url = urldefrag(found.url.strip())[0]
+                if url not in seen and self._in_scope(url, domain) and len(seen) < self.max_urls:
+                    seen.add(url)
+                    found.url = url
+                    result.urls.append(found)
+
+        fetched = set()
+        while sitemap_queue and len(fetched) < self.max_sitemaps and len(seen) < self.max_urls:
+            batch = []
+            while sitemap_queue and len(fetched) + len(batch) < self.max_sitemaps:
+                url = sitemap_queue.pop(0)
+                if url not in fetched and url not in batch:
+                    batch.append(url)
+            fetched.update(batch)
+            for url, parser in zip(batch, await asyncio.gather(*(self._read(url) for url in batch))):
+                if parser is None or parser.kind not in ("sitemap", "sitemapindex"):
+                    continue
+                result.sitemaps.append(url)
+                sitemap_queue.extend(
+                    child for child in parser.sitemaps if child not in fetched and self._in_scope(child, domain)
+                )
+                collect(parser)
+
+        if len(seen) < self.max_urls:
+            for url, parser in zip(feeds, await asyncio.gather(*(self._read(url) for url in feeds))):
+                if parser is not None and parser.kind in ("rss", "atom"):
+                    result.feeds.append(url)
+                    collect(parser)
+
+        self.stats["urls"] += len(result.urls)
+        # Empty results are kept too (for empty_ttl), so sites without sitemaps aren't re-probed on every query
+        self._store(result)
+        return result
+
+    async def _robots_sitemaps(self, origin: str) -> List[str]:
+        try:
+            response = await self._client.get(f"{origin}/robots.txt")
+            if response.status_code != 200:
+                return []
+            return [
+                line.split(":", 1)[1].strip()
+                for line in response.text.splitlines()
+                if line.lower().startswith("sitemap:")
+            ]
+        except Exception as e:
+            logger.debug(f"robots.txt unavailable for {origin}: {e}")
+            return []
+
+    async def _homepage_feeds(self, origin: str) -> List[str]:
+        try:
+            response = await self._client.get(origin + "/")
+            if response.status_code != 200 or "html" not in response.headers.get("content-type", ""):
+                return []
+            feeds = []
+            for tag in _FEED_LINK.findall(response.text[:200_000]):
+                attributes = {name.lower(): value for name, value in _ATTRIBUTE.findall(tag)}
+                if "alternate" in attributes.get("rel", "").lower() and attributes.get("type", "").lower() in FEED_TYPES:
+                    if attributes.get("href"):
+                        feeds.append(urljoin(origin + "/", attributes["href"]))
+            return feeds
+        except Exception as e:
+            logger.debug(f"Homepage unavailable for {origin}: {e}")
+            return []
+
+    async def _read(self, url: str) -> Optional[_DocumentParser]:
+        """Stream one document through the parser, stopping early at the URL limit."""
+        parser = _DocumentParser(url, self.max_document_bytes, self.max_urls)
+        try:
+            async with self._client.stream("GET", url) as response:
+                if response.status_code != 200:
+                    return None
+                self.stats["documents"] += 1
+                async for chunk in response.aiter_bytes():
+                    self.stats["bytes"] += len(chunk)
+                    parser.feed(chunk)
+                    if parser.done:
+                        break
+        except ParseError as e:
+            # Truncated or non-XML documents keep whatever parsed before the error
+            logger.debug(f"Stopped parsing {url}: {e}")
+        except Exception as e:
+            logger.debug(f"Could not read {url}: {e}")
+            return None
+        return parser
+
+    @staticmethod
+    def _in_scope(url: str, domain: str) -> bool:
+        """The domain, its subdomains, and its bare form when given as www.<domain>."""
+        host = (urlparse(url).hostname or "").lower()
+        bare = domain[4:] if domain.startswith("www.") else domain
+        return host == bare or host.endswith("." + bare)
+
+    def _store(self, result: DiscoveryResult):
+        self._cache[result.domain] = result
+        self._cache.move_to_end(result.domain)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "cached_domains": len(self._cache), "inflight": len(self._inflight)}
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+
+_sitemap_discovery: Optional[SitemapDiscovery] = None
+
+
+def get_sitemap_discovery() -> SitemapDiscovery:
+    """Shared discovery configured from settings."""
+    global _sitemap_discovery
+    if _sitemap_discovery is None:
+        _sitemap_discovery = SitemapDiscovery(
+            timeout=settings.SITEMAP_DISCOVERY_TIMEOUT,
+            max_urls=settings.SITEMAP_DISCOVERY_MAX_URLS,
+            max_sitemaps=settings.SITEMAP_DISCOVERY_MAX_SITEMAPS,
+            cache_ttl=settings.SITEMAP_DISCOVERY_CACHE_TTL,
+            empty_ttl=settings.SITEMAP_DISCOVERY_EMPTY_TTL
+        )
+    return _sitemap_discovery
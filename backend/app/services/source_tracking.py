@@ -0,0 +1,196 @@
+"""
+Source Tracking Collections
+
+Ordered, de-duplicating collections for the investigation state's
+``sources_used``, ``tools_utilized`` and ``agents_participated`` fields.
+They are ``list`` subclasses, so existing code that iterates, indexes,
+appends or serializes them keeps working, but membership tests and appends
+are O(1) instead of scanning the list.
+
+``UrlSet`` additionally canonicalizes URLs (scheme and host case, default
+ports, fragments) and keeps a per-domain index and per-scheme counts.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(value: str) -> str:
+    """
+    Canonical form of a URL; strings that are not absolute URLs are only stripped.
+
+    Lowercases scheme and host, drops default ports, fragments and a bare
+    trailing ``?``, and normalizes an empty path to ``/``.
+    """
+    value = value.strip()
+    if "://" not in value:
+        return value
+    try:
+        parts = urlsplit(value)
+        host = (parts.hostname or "").lower()
+        port = parts.port
+    except ValueError:
+        return value
+    if not host:
+        return value
+
+    scheme = parts.scheme.lower()
+    netloc = host
+    if parts.username:
+        userinfo = parts.username + (f":{parts.password}" if parts.password else "")
+        netloc = f"{userinfo}@{netloc}"
+    if port and _DEFAULT_PORTS.get(scheme) != port:
+        netloc = f"{netloc}:{port}"
+    return urlunsplit((scheme, netloc, parts.path or "/", parts.query, ""))
+
+
+def url_domain(url: str) -> Optional[str]:
+    """Registrable-looking host of a URL (without a leading ``www.``)."""
+    if "://" not in url:
+        return None
+    try:
+        host = (urlsplit(url).hostname or "").lower()
+    except ValueError:
+        return None
+    if host.startswith("www."):
+        host = host[4:]
+    return host or None
+
+
+class OrderedSet(list):
+    """
+    Insertion-ordered list without duplicates and with O(1) membership.
+
+    Appending an item that is already present is a no-op. Values are stored
+    in their normalized form (see ``normalize``).
+    """
+
+    def __init__(self, items: Iterable[Any] = ()):
+        super().__init__()
+        self._members: set = set()
+        self.extend(items)
+
+    def normalize(self, item: Any) -> Any:
+        return item
+
+    def _on_add(self, item: Any):
+        pass
+
+    def _rebuild(self):
+        items = list(self)
+        super().clear()
+        self._members = set()
+        self._reset_indexes()
+        self.extend(items)
+
+    def _reset_indexes(self):
+        pass
+
+    def add(self, item: Any) -> bool:
+        """Add an item; returns False if it was already present."""
+        item = self.normalize(item)
+        if item in self._members:
+            return False
+        self._members.add(item)
+        super().append(item)
+        self._on_add(item)
+        return True
+
+    def append(self, item: Any):
+        self.add(item)
+
+    def extend(self, items: Iterable[Any]):
+        for item in items:
+            self.add(item)
+
+    def __iadd__(self, items: Iterable[Any]):
+        self.extend(items)
+        return self
+
+    def __contains__(self, item: Any) -> bool:
+        try:
+            return self.normalize(item) in self._members
+        except (TypeError, AttributeError):
+            return False
+
+    def insert(self, index: int, item: Any):
+        if item not in self:
+            super().insert(index, self.normalize(item))
+            self._rebuild()
+
+    def remove(self, item: Any):
+        super().remove(self.normalize(item))
+        self._rebuild()
+
+    def pop(self, index: int = -1):
+        item = super().pop(index)
+        self._rebuild()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._members = set()
+        self._reset_indexes()
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._rebuild()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._rebuild()
+
+    def __reduce__(self):
+        # Rebuild through __init__ so copies and pickles keep their indexes
+        return (self.__class__, (list(self),))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list.__repr__(self)})"
+
+
+class UrlSet(OrderedSet):
+    """Ordered set of canonicalized URLs with per-domain and per-scheme indexes."""
+
+    def __init__(self, items: Iterable[str] = ()):
+        self._by_domain: Dict[str, List[str]] = {}
+        self._scheme_counts: Dict[str, int] = {}
+        super().__init__(items)
+
+    def normalize(self, item: str) -> str:
+        return canonicalize_url(item) if isinstance(item, str) else item
+
+    def _on_add(self, item: str):
+        if not isinstance(item, str):
+            return
+        domain = url_domain(item)
+        if domain:
+            self._by_domain.setdefault(domain, []).append(item)
+        scheme = item.split("://", 1)[0] if "://" in item else ""
+        self._scheme_counts[scheme] = self._scheme_counts.get(scheme, 0) + 1
+
+    def _reset_indexes(self):
+        self._by_domain = {}
+        self._scheme_counts = {}
+
+    def count_scheme(self, scheme: str) -> int:
+        """Number of URLs with the given scheme ("https", "http"), in O(1)."""
+        return self._scheme_counts.get(scheme.lower(), 0)
+
+    def by_domain(self, domain: str) -> List[str]:
+        domain = domain.lower()
+        if domain.startswith("www."):
+            domain = domain[4:]
+        return list(self._by_domain.get(domain, ()))
+
+    def domain_counts(self) -> Dict[str, int]:
+        return {domain: len(urls) for domain, urls in self._by_domain.items()}
+
+
+def ensure_ordered_set(value: Any, factory: Callable[[Iterable[Any]], OrderedSet] = OrderedSet) -> OrderedSet:
+    """Wrap a plain list (e.g. from a restored checkpoint) in the tracking type."""
+    if isinstance(value, OrderedSet) and type(value) is factory:
+        return value
+    return factory(value or ())
@@ -9,6 +9,10 @@ from typing import TypedDict, List, Dict, Any, Optional
 from datetime import datetime
 from enum import Enum
 
+from .source_tracking import OrderedSet, UrlSet, ensure_ordered_set
+from .result_store import SearchResults
+from .progress_tracker import get_tracker
+
 
 class InvestigationPhase(Enum):
     """Phases of an OSINT investigation"""
@@ -71,8 +75,8 @@ class InvestigationState(TypedDict):
     # Search coordination results
     search_coordination_results: Dict[str, Any]
     
-    # Raw data collected from various sources
-    search_results: Dict[str, List[Dict[str, Any]]]
+    # Raw data collected from various sources (columnar, see result_store)
+    search_results: SearchResults
     
     # Consolidated raw data
     raw_data: Dict[str, Any]
@@ -152,14 +156,14 @@ class InvestigationState(TypedDict):
     # List of warnings encountered
     warnings: List[Dict[str, Any]]
     
-    # Sources used during investigation
-    sources_used: List[str]
+    # Sources used during investigation (canonicalized, de-duplicated)
+    sources_used: UrlSet
     
     # Tools and agents utilized
-    tools_utilized: List[str]
+    tools_utilized: OrderedSet
     
     # Agents that participated
-    agents_participated: List[str]
+    agents_participated: OrderedSet
     
     # Overall confidence level
     confidence_level: float
@@ -207,7 +211,7 @@ def create_initial_state(
         "planning_status": InvestigationStatus.PENDING,
         "planning_metadata": {},
         "search_coordination_results": {},
-        "search_results": {},
+        "search_results": SearchResults(),
         "raw_data": {},
         "collection_status": {},
         "collection_metadata": {},
@@ -233,9 +237,9 @@ def create_initial_state(
         "total_execution_time": 0.0,
         "errors": [],
         "warnings": [],
-        "sources_used": [],
-        "tools_utilized": [],
-        "agents_participated": [],
+        "sources_used": UrlSet(),
+        "tools_utilized": OrderedSet(),
+        "agents_participated": OrderedSet(),
         "confidence_level": 0.0,
         "resource_costs": {},
         "metadata": {
@@ -296,12 +300,19 @@ def calculate_progress(state: InvestigationState) -> float:
     """
     Calculate overall investigation progress based on completed phases.
     
+    Running investigations read the incremental counters of their progress
+    tracker; otherwise the status dicts are scanned.
+    
     Args:
         state: Current investigation state
     
     Returns:
         Progress percentage (0-100)
     """
+    tracker = get_tracker(state.get("investigation_id"))
+    if tracker is not None:
+        return tracker.progress
+    
     phase_weights = {
         InvestigationPhase.PLANNING: 0.15,
         InvestigationPhase.COLLECTION: 0.35,
@@ -437,4 +448,22 @@ def update_resource_costs(
         else:
             state["resource_costs"][category] = cost
     
-    return state
\ No newline at end of file
+    return state
+
+def ensure_tracking_sets(state: InvestigationState) -> InvestigationState:
+    """
+    Make sure the source/tool/agent fields use the set-backed collections.
+    
+    States restored from JSON carry plain lists; this re-wraps them so that
+    membership checks stay O(1) and URLs are canonicalized.
+    
+    Args:
+        state: Current investigation state
+    
+    Returns:
+        Updated investigation state
+    """
+    state["sources_used"] = ensure_ordered_set(state.get("sources_used"), UrlSet)
+    state["tools_utilized"] = ensure_ordered_set(state.get("tools_utilized"))
+    state["agents_participated"] = ensure_ordered_set(state.get("agents_participated"))
+    return state
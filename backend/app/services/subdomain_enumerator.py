@@ -0,0 +1,194 @@
+"""
+Subdomain Enumeration
+
+Resolves a wordlist of candidate labels under a domain through the shared
+async resolver, keeping a fixed window of queries in flight, and streams
+hits as they resolve instead of returning once the whole list is done.
+
+Domains with wildcard DNS answer every name, so before enumerating we
+resolve a few random labels; hits whose addresses all fall inside that
+wildcard answer set are dropped as false positives.
+"""
+
+import asyncio
+import logging
+import secrets
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from app.config import settings
+from app.services.dns_resolver import DNSResolver, get_dns_resolver, normalize_name
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_WORDLIST = (
+    "www", "mail", "api", "blog", "shop", "store", "admin", "dev", "staging",
+    "test", "app", "news", "support", "help", "docs", "files", "media",
+    "assets", "cdn", "ftp", "ssh", "vpn", "remote", "portal", "dashboard",
+    "m", "mobile", "beta", "demo", "status", "static", "img", "images",
+    "video", "webmail", "smtp", "pop", "imap", "mx", "ns1", "ns2", "dns",
+    "auth", "login", "sso", "id", "accounts", "secure", "pay", "payments",
+    "billing", "checkout", "cart", "search", "git", "gitlab", "jenkins", "ci",
+    "jira", "confluence", "wiki", "intranet", "internal", "corp", "office",
+    "exchange", "owa", "autodiscover", "crm", "erp", "hr", "partners",
+    "developer", "developers", "sandbox", "uat", "qa", "preprod", "prod",
+    "stage", "backup", "db", "mysql", "redis", "grafana", "kibana",
+    "monitor", "metrics", "logs", "s3", "storage", "download", "downloads",
+    "upload", "forum", "community", "events", "careers", "jobs", "investors",
+)
+
+# Random labels resolved to detect wildcard DNS
+WILDCARD_PROBES = 3
+
+SubdomainCallback = Callable[["SubdomainResult"], Awaitable[None]]
+
+
+@dataclass
+class SubdomainResult:
+    """A candidate that resolved."""
+    name: str
+    addresses: List[str]
+
+
+@dataclass
+class EnumerationStats:
+    candidates: int = 0
+    resolved: int = 0
+    wildcard_suppressed: int = 0
+    failed: int = 0
+    wildcard_addresses: Set[str] = field(default_factory=set)
+    started_at: float = field(default_factory=time.perf_counter)
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Candidates resolved per second."""
+        return self.candidates / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "candidates": self.candidates,
+            "resolved": self.resolved,
+            "wildcard_suppressed": self.wildcard_suppressed,
+            "failed": self.failed,
+            "wildcard": sorted(self.wildcard_addresses),
+            "elapsed": round(self.elapsed, 3),
+            "rate": round(self.rate, 1),
+        }
+
+
+def load_wordlist(path: Optional[str] = None) -> List[str]:
+    """Labels from a file (one per line, ``#`` comments), or the built-in list."""
+    if not path:
+        return list(DEFAULT_WORDLIST)
+    words = []
+    seen = set()
+    with open(Path(path), encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            word = line.split("#", 1)[0].strip().lower().rstrip(".")
+            if word and word not in seen:
+                seen.add(word)
+                words.append(word)
+    return words
+
+
+class SubdomainEnumerator:
+    """Concurrent wordlist enumeration with wildcard suppression."""
+
+    def __init__(self, resolver: Optional[DNSResolver] = None, concurrency: Optional[int] = None):
+        self.resolver = resolver or get_dns_resolver()
+        self.concurrency = concurrency or settings.SUBDOMAIN_CONCURRENCY
+        self.last_stats: Optional[EnumerationStats] = None
+
+    async def detect_wildcard(self, domain: str, probes: int = WILDCARD_PROBES) -> Set[str]:
+        """Addresses that random, non-existent labels resolve to (empty if none)."""
+        names = [f"{secrets.token_hex(8)}.{domain}" for _ in range(probes)]
+        responses = await self.resolver.query_batch(names, "A", cache_negative=False)
+        addresses = set()
+        for response in responses.values():
+            addresses.update(response.values)
+        return addresses
+
+    async def enumerate(
+        self,
+        domain: str,
+        words: Optional[Iterable[str]] = None,
+        detect_wildcard: bool = True
+    ) -> AsyncIterator[SubdomainResult]:
+        """Yield resolving subdomains as they are found."""
+        domain = normalize_name(domain)
+        stats = self.last_stats = EnumerationStats()
+        if detect_wildcard:
+            stats.wildcard_addresses = await self.detect_wildcard(domain)
+            if stats.wildcard_addresses:
+                logger.info(f"Wildcard DNS on {domain}: {sorted(stats.wildcard_addresses)}")
+
+        # Workers share one iterator, so a wordlist of any size is never materialized
+        candidates = iter(words if words is not None else DEFAULT_WORDLIST)
+        found: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def worker():
+            for word in candidates:
+                name = f"{word}.{domain}"
+                stats.candidates += 1
+                try:
+                    # Misses are the bulk of a brute force; keep them out of the shared cache
+                    response = await self.resolver.query(name, "A", cache_negative=False)
+                except ValueError:
+                    # Not a valid DNS name (e.g. an over-long label in the wordlist)
+                    stats.failed += 1
+                    continue
+                if response.rcode == "TIMEOUT":
+                    stats.failed += 1
+                if not response.records:
+                    continue
+                addresses = response.values
+                if stats.wildcard_addresses and set(addresses) <= stats.wildcard_addresses:
+                    stats.wildcard_suppressed += 1
+                    continue
+                stats.resolved += 1
+                found.put_nowait(SubdomainResult(name, addresses))
+
+        async def run_workers():
+            try:
+                await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+            finally:
+                found.put_nowait(done)
+
+        runner = asyncio.ensure_future(run_workers())
+        try:
+            while True:
+                result = await found.get()
+                if result is done:
+                    break
+                yield result
+            await runner
+        finally:
+            if not runner.done():
+                runner.cancel()
+            stats.elapsed = time.perf_counter() - stats.started_at
+
+    async def enumerate_all(
+        self,
+        domain: str,
+        words: Optional[Iterable[str]] = None,
+        on_result: Optional[SubdomainCallback] = None,
+        limit: Optional[int] = None
+    ) -> List[SubdomainResult]:
+        """Collect hits (up to ``limit``), passing each to ``on_result`` as it arrives."""
+        results = []
+        stream = self.enumerate(domain, words)
+        try:
+            async for result in stream:
+                results.append(result)
+                if on_result is not None:
+                    await on_result(result)
+                if limit is not None and len(results) >= limit:
+                    break
+        finally:
+            await stream.aclose()
+        return results
@@ -0,0 +1,443 @@
+"""
+Technology Fingerprinting
+
+Identifies the server software, CMS, frameworks and analytics behind a web
+page from a compiled signature database.
+
+Signatures (header, cookie, ``<meta>``, ``<script src>`` and HTML patterns)
+are compiled once into a database keyed by literal anchors. Each page,
+headers included, is lower-cased once and scanned for every anchor in a
+single multi-pattern pass; only the few patterns whose anchor occurs run
+their regular expression. This replaces a substring check (and a fresh
+``html.lower()``) per signature. Version patterns run only for signatures
+that matched.
+
+The fingerprinter works on pages that have already been fetched, so the
+scraping layer can pass its responses in rather than fetching twice.
+Extra signatures can be loaded from a JSON file (TECH_SIGNATURES_PATH)
+using the same fields as DEFAULT_SIGNATURES.
+"""
+
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from app.config import settings
+
+# Optional: one-pass multi-pattern search
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+# Fields: name, categories, and any of
+#   headers  {header name: regex on its value}
+#   cookies  [cookie name regex]
+#   meta     {meta name: regex on its content}
+#   scripts  [regex on <script src>]
+#   html     [regex on the page source]
+#   version  regex with one group, applied to the matched text
+#   implies  [technology names]
+DEFAULT_SIGNATURES: List[Dict[str, Any]] = [
+    # Web servers and proxies
+    {"name": "Nginx", "categories": ["Web servers"], "headers": {"server": r"nginx"}, "version": r"nginx/([\d.]+)"},
+    {"name": "Apache", "categories": ["Web servers"], "headers": {"server": r"apache"}, "version": r"apache/([\d.]+)"},
+    {"name": "IIS", "categories": ["Web servers"], "headers": {"server": r"microsoft-iis"}, "version": r"iis/([\d.]+)",
+     "implies": ["Windows Server"]},
+    {"name": "LiteSpeed", "categories": ["Web servers"], "headers": {"server": r"litespeed"}},
+    {"name": "Caddy", "categories": ["Web servers"], "headers": {"server": r"caddy"}},
+    {"name": "OpenResty", "categories": ["Web servers"], "headers": {"server": r"openresty"}, "implies": ["Nginx"]},
+    {"name": "Envoy", "categories": ["Reverse proxies"], "headers": {"server": r"envoy", "x-envoy-upstream-service-time": r""}},
+    {"name": "Varnish", "categories": ["Caching"], "headers": {"via": r"varnish", "x-varnish": r""}},
+    {"name": "Cloudflare", "categories": ["CDN"], "headers": {"server": r"cloudflare", "cf-ray": r""}},
+    {"name": "Amazon CloudFront", "categories": ["CDN"], "headers": {"via": r"cloudfront", "x-amz-cf-id": r""}},
+    {"name": "Fastly", "categories": ["CDN"], "headers": {"x-served-by": r"cache-", "fastly-debug-digest": r""}},
+    {"name": "Akamai", "categories": ["CDN"], "headers": {"x-akamai-transformed": r"", "server": r"akamaighost"}},
+    {"name": "Vercel", "categories": ["PaaS"], "headers": {"server": r"vercel", "x-vercel-id": r""}},
+    {"name": "Netlify", "categories": ["PaaS"], "headers": {"server": r"netlify", "x-nf-request-id": r""}},
+    {"name": "GitHub Pages", "categories": ["PaaS"], "headers": {"server": r"github\.com"}},
+
+    # Languages and application frameworks
+    {"name": "PHP", "categories": ["Programming languages"], "headers": {"x-powered-by": r"php"},
+     "cookies": [r"PHPSESSID"], "version": r"php/([\d.]+)"},
+    {"name": "ASP.NET", "categories": ["Web frameworks"], "headers": {"x-powered-by": r"asp\.net", "x-aspnet-version": r""},
+     "cookies": [r"ASP\.NET_SessionId"], "html": [r"<input[^>]+name=\"__VIEWSTATE\""]},
+    {"name": "Express", "categories": ["Web frameworks"], "headers": {"x-powered-by": r"express"}, "implies": ["Node.js"]},
+    {"name": "Django", "categories": ["Web frameworks"], "cookies": [r"csrftoken", r"django_language"],
+     "html": [r"name=\"csrfmiddlewaretoken\""], "implies": ["Python"]},
+    {"name": "Flask", "categories": ["Web frameworks"], "headers": {"server": r"werkzeug"}, "implies": ["Python"]},
+    {"name": "Ruby on Rails", "categories": ["Web frameworks"], "cookies": [r"_[a-z0-9_]+_session"],
+     "meta": {"csrf-param": r"authenticity_token"}, "implies": ["Ruby"]},
+    {"name": "Laravel", "categories": ["Web frameworks"], "cookies": [r"laravel_session"], "implies": ["PHP"]},
+    {"name": "Java", "categories": ["Programming languages"], "cookies": [r"JSESSIONID"]},
+    {"name": "Next.js", "categories": ["Web frameworks"], "headers": {"x-powered-by": r"next\.js"},
+     "html": [r"<script[^>]+id=\"__NEXT_DATA__\""], "scripts": [r"/_next/static/"], "implies": ["React"]},
+    {"name": "Nuxt.js", "categories": ["Web frameworks"], "html": [r"window\.__NUXT__", r"<div[^>]+id=\"__nuxt\""],
+     "scripts": [r"/_nuxt/"], "implies": ["Vue.js"]},
+    {"name": "Gatsby", "categories": ["Static site generators"], "html": [r"<div[^>]+id=\"___gatsby\""],
+     "meta": {"generator": r"gatsby"}, "implies": ["React"]},
+    {"name": "Hugo", "categories": ["Static site generators"], "meta": {"generator": r"hugo"},
+     "version": r"hugo ([\d.]+)"},
+    {"name": "Jekyll", "categories": ["Static site generators"], "meta": {"generator": r"jekyll"},
+     "version": r"jekyll v([\d.]+)"},
+
+    # CMS and e-commerce
+    {"name": "WordPress", "categories": ["CMS", "Blogs"], "meta": {"generator": r"wordpress"},
+     "html": [r"/wp-content/", r"/wp-includes/"], "version": r"wordpress ([\d.]+)", "implies": ["PHP", "MySQL"]},
+    {"name": "Drupal", "categories": ["CMS"], "headers": {"x-generator": r"drupal", "x-drupal-cache": r""},
+     "meta": {"generator": r"drupal"}, "html": [r"drupal-settings-json", r"/sites/default/files/"],
+     "version": r"drupal (\d+)", "implies": ["PHP"]},
+    {"name": "Joomla", "categories": ["CMS"], "meta": {"generator": r"joomla"}, "html": [r"/media/jui/"],
+     "version": r"joomla! ([\d.]+)", "implies": ["PHP"]},
+    {"name": "Ghost", "categories": ["CMS", "Blogs"], "meta": {"generator": r"ghost"}, "headers": {"x-ghost-cache-status": r""},
+     "version": r"ghost ([\d.]+)", "implies": ["Node.js"]},
+    {"name": "Shopify", "categories": ["Ecommerce"], "headers": {"x-shopid": r"", "x-shopify-stage": r""},
+     "html": [r"cdn\.shopify\.com", r"Shopify\.theme"]},
+    {"name": "WooCommerce", "categories": ["Ecommerce"], "html": [r"/wp-content/plugins/woocommerce/"],
+     "implies": ["WordPress"]},
+    {"name": "Magento", "categories": ["Ecommerce"], "cookies": [r"frontend", r"X-Magento-Vary"],
+     "html": [r"Mage\.Cookies", r"/static/version\d+/frontend/"], "implies": ["PHP"]},
+    {"name": "Squarespace", "categories": ["CMS"], "html": [r"static\.squarespace\.com", r"Static\.SQUARESPACE_CONTEXT"]},
+    {"name": "Wix", "categories": ["CMS"], "headers": {"x-wix-request-id": r""}, "html": [r"static\.wixstatic\.com"]},
+    {"name": "Webflow", "categories": ["CMS"], "html": [r"<html[^>]+data-wf-page="], "meta": {"generator": r"webflow"}},
+
+    # JavaScript frameworks and libraries
+    {"name": "React", "categories": ["JavaScript frameworks"],
+     "html": [r"data-reactroot", r"data-reactid", r"__REACT_DEVTOOLS_GLOBAL_HOOK__"],
+     "scripts": [r"react(?:-dom)?(?:\.production)?(?:\.min)?\.js"]},
+    {"name": "Vue.js", "categories": ["JavaScript frameworks"], "html": [r"<[^>]+\sdata-v-[0-9a-f]{8}", r"<div[^>]+id=\"app\"[^>]+v-cloak"],
+     "scripts": [r"vue(?:\.runtime)?(?:\.global)?(?:\.min)?\.js"]},
+    {"name": "Angular", "categories": ["JavaScript frameworks"], "html": [r"<[^>]+\sng-version=\"", r"<app-root"],
+     "version": r"ng-version=\"([\d.]+)"},
+    {"name": "AngularJS", "categories": ["JavaScript frameworks"], "html": [r"<[^>]+\sng-app"],
+     "scripts": [r"angular(?:\.min)?\.js"]},
+    {"name": "Svelte", "categories": ["JavaScript frameworks"], "html": [r"\bsvelte-[a-z0-9]{6,}\b"]},
+    {"name": "jQuery", "categories": ["JavaScript libraries"], "scripts": [r"jquery[.-]?(?:[\d.]+)?(?:\.min)?\.js"],
+     "version": r"jquery[.-]([\d.]+\d)"},
+    {"name": "Bootstrap", "categories": ["UI frameworks"], "html": [r"bootstrap(?:\.min)?\.css"],
+     "scripts": [r"bootstrap(?:\.bundle)?(?:\.min)?\.js"]},
+    {"name": "Tailwind CSS", "categories": ["UI frameworks"], "html": [r"tailwind(?:css)?(?:\.min)?\.css"]},
+
+    # Analytics, tag managers and widgets
+    {"name": "Google Analytics", "categories": ["Analytics"],
+     "html": [r"google-analytics\.com/(?:ga|analytics|urchin)\.js", r"gtag\(\s*'config'\s*,\s*'(?:UA|G)-"],
+     "scripts": [r"googletagmanager\.com/gtag/js"]},
+    {"name": "Google Tag Manager", "categories": ["Tag managers"], "html": [r"googletagmanager\.com/gtm\.js", r"GTM-[A-Z0-9]{4,}"]},
+    {"name": "Facebook Pixel", "categories": ["Analytics"], "html": [r"connect\.facebook\.net/[^\"']*/fbevents\.js", r"fbq\(\s*'init'"]},
+    {"name": "Hotjar", "categories": ["Analytics"], "html": [r"static\.hotjar\.com", r"hjSiteSettings"]},
+    {"name": "Matomo", "categories": ["Analytics"], "html": [r"matomo\.js", r"piwik\.js", r"_paq\.push"]},
+    {"name": "Plausible", "categories": ["Analytics"], "scripts": [r"plausible\.io/js/"]},
+    {"name": "Google reCAPTCHA", "categories": ["Security"], "scripts": [r"google\.com/recaptcha/"]},
+    {"name": "hCaptcha", "categories": ["Security"], "scripts": [r"hcaptcha\.com/1/api\.js"]},
+    {"name": "Intercom", "categories": ["Live chat"], "html": [r"widget\.intercom\.io", r"intercomSettings"]},
+    {"name": "HubSpot", "categories": ["Marketing automation"], "scripts": [r"js\.hs-scripts\.com", r"js\.hsforms\.net"]},
+    {"name": "Stripe", "categories": ["Payment processors"], "scripts": [r"js\.stripe\.com"]},
+    {"name": "Font Awesome", "categories": ["Font scripts"], "html": [r"font-?awesome(?:\.min)?\.css", r"kit\.fontawesome\.com"]},
+    {"name": "Google Fonts", "categories": ["Font scripts"], "html": [r"fonts\.googleapis\.com"]},
+]
+
+# Technologies known only through "implies"
+IMPLIED_CATEGORIES = {
+    "Node.js": ["Programming languages"],
+    "Python": ["Programming languages"],
+    "Ruby": ["Programming languages"],
+    "MySQL": ["Databases"],
+    "Windows Server": ["Operating systems"],
+}
+
+
+@dataclass
+class Page:
+    """A fetched page: final URL, status, headers (lower-cased names) and body."""
+    url: str
+    html: str = ""
+    headers: Dict[str, str] = field(default_factory=dict)
+    status: int = 200
+
+    @classmethod
+    def from_response(cls, response) -> "Page":
+        """Build from an httpx response (or anything shaped like one)."""
+        headers = getattr(response, "headers", {}) or {}
+        cookies = headers.get_list("set-cookie") if hasattr(headers, "get_list") else None
+        page_headers = {str(name).lower(): str(value) for name, value in headers.items()}
+        if cookies:
+            page_headers["set-cookie"] = "\n".join(cookies)
+        return cls(
+            url=str(getattr(response, "url", "")),
+            html=getattr(response, "text", "") or "",
+            headers=page_headers,
+            status=getattr(response, "status_code", getattr(response, "status", 200))
+        )
+
+
+@dataclass
+class TechnologyMatch:
+    """A detected technology and what gave it away."""
+    name: str
+    categories: List[str] = field(default_factory=list)
+    version: str = ""
+    evidence: List[str] = field(default_factory=list)
+    implied: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "categories": self.categories,
+            "version": self.version,
+            "evidence": self.evidence,
+            "implied": self.implied,
+        }
+
+
+@dataclass
+class _Pattern:
+    signature: int
+    source: str
+    regex: "re.Pattern[str]"
+    anchor: Optional[str]
+
+
+def literal_anchor(regex: str) -> Optional[str]:
+    """Longest literal run every match of ``regex`` must contain (lower-cased).
+
+    Only top-level text counts: groups, classes and optional characters end
+    a run, and a top-level alternation means there is no single anchor.
+    """
+    runs: List[str] = []
+    run: List[str] = []
+    depth = 0
+    i = 0
+
+    def end_run():
+        if run:
+            runs.append("".join(run))
+            run.clear()
+
+    while i < len(regex):
+        char = regex[i]
+        if char == "\\" and i + 1 < len(regex):
+            escaped = regex[i + 1]
+            i += 2
+            if depth == 0 and not escaped.isalnum():
+                run.append(escaped)
+            else:
+                end_run()
+            continue
+        i += 1
+        if char == "(":
+            depth += 1
+            end_run()
+        elif char == ")":
+            depth -= 1
+        elif char == "[":
+            # Skip the class (a leading ']' is literal)
+            i = regex.find("]", i + 1 if regex[i:i + 1] == "]" else i) + 1 or len(regex)
+            end_run()
+        elif char == "|":
+            if depth == 0:
+                return None
+        elif char in "?*{":
+            # The previous character was optional (or repeated a variable number of times)
+            if run:
+                run.pop()
+            end_run()
+            if char == "{":
+                i = regex.find("}", i) + 1 or len(regex)
+        elif char in "+.^$":
+            end_run()
+        elif depth == 0:
+            run.append(char)
+    end_run()
+
+    anchor = max(runs, key=len, default="").lower()
+    return anchor if len(anchor) >= 3 else None
+
+
+class SignatureDatabase:
+    """Signatures compiled for a single scan per page.
+
+    Every pattern has a literal anchor it cannot match without. A page is
+    lower-cased once and scanned for all anchors together (one Aho-Corasick
+    pass when pyahocorasick is installed, else one substring search per
+    distinct anchor); only patterns whose anchor occurs run their regex.
+    """
+
+    def __init__(self, signatures: Iterable[Mapping[str, Any]]):
+        self.signatures: List[Mapping[str, Any]] = []
+        self._versions: List[Optional["re.Pattern[str]"]] = []
+        self._patterns: List[_Pattern] = []
+
+        for signature in signatures:
+            index = len(self.signatures)
+            try:
+                patterns = self._compile(index, signature)
+                version = re.compile(signature["version"], re.I) if signature.get("version") else None
+            except (re.error, KeyError, TypeError, AttributeError) as e:
+                logger.warning(f"Skipping invalid signature {signature.get('name', '?')}: {e}")
+                continue
+            self.signatures.append(signature)
+            self._versions.append(version)
+            self._patterns.extend(patterns)
+
+        self._by_name = {signature["name"]: signature for signature in self.signatures}
+        self._by_anchor: Dict[str, List[_Pattern]] = {}
+        self._unanchored: List[_Pattern] = []
+        for pattern in self._patterns:
+            if pattern.anchor:
+                self._by_anchor.setdefault(pattern.anchor, []).append(pattern)
+            else:
+                self._unanchored.append(pattern)
+
+        self._automaton = None
+        if AHOCORASICK_AVAILABLE and self._by_anchor:
+            self._automaton = ahocorasick.Automaton()
+            for anchor in self._by_anchor:
+                self._automaton.add_word(anchor, anchor)
+            self._automaton.make_automaton()
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    @staticmethod
+    def _compile(index: int, signature: Mapping[str, Any]) -> List[_Pattern]:
+        # (source, regex, text the anchor is taken from, fallback anchor)
+        specs = []
+        for header, value in signature.get("headers", {}).items():
+            # Headers are matched against "name: value" lines
+            header = header.lower()
+            specs.append((f"header {header}", rf"^{re.escape(header)}:[^\n]*?(?:{value})", value, f"{header}:"))
+        for cookie in signature.get("cookies", []):
+            specs.append(("cookie", rf"^set-cookie:[ \t]*(?:{cookie})=", cookie, None))
+        for name, content in signature.get("meta", {}).items():
+            escaped = re.escape(name)
+            specs.append((
+                f"meta {name}",
+                rf"<meta[^>]+(?:name=[\"']?{escaped}[\"']?[^>]+content=[\"']?[^\"'>]*?(?:{content})"
+                rf"|content=[\"']?[^\"'>]*?(?:{content})[^>]+name=[\"']?{escaped}[\"'\s>/])",
+                content, name
+            ))
+        for script in signature.get("scripts", []):
+            specs.append(("script", rf"<script[^>]+src=[\"']?[^\"'>]*?(?:{script})", script, None))
+        for html in signature.get("html", []):
+            specs.append(("html", html, html, None))
+
+        patterns = []
+        for source, regex, anchor_source, fallback in specs:
+            anchor = literal_anchor(anchor_source) or (fallback.lower() if fallback else None)
+            patterns.append(_Pattern(index, source, re.compile(regex, re.I | re.M), anchor))
+        return patterns
+
+    def _candidates(self, lowered: str) -> List[_Pattern]:
+        if self._automaton is not None:
+            anchors = {anchor for _, anchor in self._automaton.iter(lowered)}
+        else:
+            anchors = [anchor for anchor in self._by_anchor if anchor in lowered]
+        candidates = list(self._unanchored)
+        for anchor in anchors:
+            candidates.extend(self._by_anchor[anchor])
+        return candidates
+
+    def match(self, page: Page) -> List[TechnologyMatch]:
+        # Multi-valued headers (Set-Cookie) arrive newline-joined: one line per value
+        header_text = "\n".join(
+            f"{name}: {value}" for name, values in page.headers.items() for value in str(values).split("\n")
+        )
+        # Header lines first, so header and body anchors share one scan
+        text = f"{header_text}\n\n{page.html}"
+        body_start = len(header_text) + 2
+
+        found: Dict[int, TechnologyMatch] = {}
+        for pattern in sorted(self._candidates(text.lower()), key=lambda p: (p.signature, p.source)):
+            is_header = pattern.source.startswith(("header", "cookie"))
+            hit = pattern.regex.search(text, 0 if is_header else body_start, body_start if is_header else len(text))
+            if hit is None:
+                continue
+            signature = self.signatures[pattern.signature]
+            match = found.get(pattern.signature)
+            if match is None:
+                match = found[pattern.signature] = TechnologyMatch(signature["name"], list(signature.get("categories", [])))
+            if pattern.source not in match.evidence:
+                match.evidence.append(pattern.source)
+            version = self._versions[pattern.signature]
+            if version is not None and not match.version:
+                # Header values and meta content are short; otherwise look around the hit
+                version_hit = version.search(text[max(0, hit.start() - 100):hit.end() + 100])
+                if version_hit:
+                    match.version = version_hit.group(1)
+        return self._with_implied([found[index] for index in sorted(found)])
+
+    def _with_implied(self, matches: List[TechnologyMatch]) -> List[TechnologyMatch]:
+        by_name = {match.name: match for match in matches}
+        pending = list(matches)
+        while pending:
+            match = pending.pop()
+            for implied in self._by_name.get(match.name, {}).get("implies", []):
+                if implied in by_name:
+                    continue
+                known = self._by_name.get(implied)
+                categories = list(known.get("categories", [])) if known else IMPLIED_CATEGORIES.get(implied, [])
+                by_name[implied] = TechnologyMatch(implied, categories, evidence=[f"implied by {match.name}"], implied=True)
+                pending.append(by_name[implied])
+        return list(by_name.values())
+
+
+class TechnologyFingerprinter:
+    """Detects technologies on fetched pages; results accumulate per site."""
+
+    def __init__(self, database: Optional[SignatureDatabase] = None):
+        self.database = database or SignatureDatabase(DEFAULT_SIGNATURES)
+        self.stats = {"pages": 0, "bytes": 0, "matches": 0}
+
+    def fingerprint(self, page: Page) -> List[TechnologyMatch]:
+        self.stats["pages"] += 1
+        self.stats["bytes"] += len(page.html)
+        matches = self.database.match(page)
+        self.stats["matches"] += len(matches)
+        return matches
+
+    def fingerprint_pages(self, pages: Iterable[Page]) -> List[TechnologyMatch]:
+        """Merge detections across several pages of one site."""
+        merged: Dict[str, TechnologyMatch] = {}
+        for page in pages:
+            for match in self.fingerprint(page):
+                existing = merged.get(match.name)
+                if existing is None:
+                    merged[match.name] = match
+                    continue
+                existing.version = existing.version or match.version
+                existing.implied = existing.implied and match.implied
+                existing.evidence.extend(e for e in match.evidence if e not in existing.evidence)
+        return list(merged.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "signatures": len(self.database)}
+
+
+def load_signatures(path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Built-in signatures plus any from a JSON list file (same name overrides)."""
+    signatures = {signature["name"]: signature for signature in DEFAULT_SIGNATURES}
+    if path:
+        try:
+            with open(path, "r") as f:
+                for signature in json.load(f):
+                    signatures[signature["name"]] = signature
+        except Exception as e:
+            logger.warning(f"Failed to load technology signatures from {path}: {e}")
+    return list(signatures.values())
+
+
+_fingerprinter: Optional[TechnologyFingerprinter] = None
+
+
+def get_fingerprinter() -> TechnologyFingerprinter:
+    """Shared fingerprinter configured from settings."""
+    global _fingerprinter
+    if _fingerprinter is None:
+        _fingerprinter = TechnologyFingerprinter(SignatureDatabase(load_signatures(settings.TECH_SIGNATURES_PATH or None)))
+    return _fingerprinter
@@ -15,11 +15,13 @@ from datetime import datetime, date
 from urllib.parse import urljoin, urlparse
 import logging
 
-import dns.resolver
-import dns.exception
 from bs4 import BeautifulSoup
 
+from app.services.dns_resolver import get_dns_resolver
 from app.services.error_handling import handle_errors, RetryConfig
+from app.services.ip_intelligence import get_ip_intelligence
+from app.services.rdap_client import get_rdap_client
+from app.services.tls_certificates import TLSResult, get_certificate_grabber
 from app.services.llm_integration import LLMIntegrationService
 
 logger = logging.getLogger(__name__)
@@ -149,10 +151,17 @@ class TechnicalIntelligenceService:
         self.session = None
         self.retry_config = RetryConfig(max_retries=3, base_delay=2.0)
         
-        # DNS resolver configuration
-        self.dns_resolver = dns.resolver.Resolver()
-        self.dns_resolver.timeout = 10
-        self.dns_resolver.lifetime = 30
+        # Shared async DNS resolver (cached, bounded)
+        self.dns_resolver = get_dns_resolver()
+        
+        # Shared RDAP client (bootstrap routing, persistent cache)
+        self.rdap_client = get_rdap_client()
+        
+        # Local IP -> ASN/org/country index (remote APIs are the fallback)
+        self.ip_intelligence = get_ip_intelligence()
+        
+        # Shared TLS certificate grabber (cached per host, deduplicated by fingerprint)
+        self.certificate_grabber = get_certificate_grabber()
         
         # Public intelligence APIs
         self.intelligence_apis = {
@@ -182,90 +191,89 @@ class TechnicalIntelligenceService:
         """Perform WHOIS lookup for a domain"""
         
         try:
-            # Use RDAP (Registration Data Access Protocol) for modern WHOIS
-            rdap_url = f"{self.intelligence_apis['whois']}{domain}"
-            
-            async with self.session.get(rdap_url) as response:
-                if response.status == 200:
-                    rdap_data = await response.json()
-                    
-                    record = WHOISRecord(
-                        domain=domain,
-                        source="RDAP",
-                        confidence=0.9,
-                        raw_whois=json.dumps(rdap_data, indent=2)
-                    )
-                    
-                    # Extract entities and events from RDAP data
-                    entities = rdap_data.get('entities', [])
-                    events = rdap_data.get('events', [])
-                    status = rdap_data.get('status', [])
-                    remarks = rdap_data.get('remarks', [])
-                    
-                    # Parse status
-                    record.status = status
-                    
-                    # Parse events (creation, expiration, etc.)
-                    for event in events:
-                        event_action = event.get('eventAction', '')
-                        event_date = event.get('eventDate', '')
-                        
-                        if event_date:
-                            try:
-                                parsed_date = datetime.fromisoformat(event_date.replace('Z', '+00:00')).date()
-                                
-                                if event_action == 'registration':
-                                    record.creation_date = parsed_date
-                                elif event_action == 'expiration':
-                                    record.expiration_date = parsed_date
-                                elif event_action == 'last changed':
-                                    record.updated_date = parsed_date
-                            except ValueError:
-                                pass
-                    
-                    # Parse entities for contact information
-                    for entity in entities:
-                        vcard_array = entity.get('vcardArray', [])
-                        roles = entity.get('roles', [])
-                        
-                        if vcard_array and len(vcard_array) > 1:
-                            for prop in vcard_array[1]:
-                                if prop and len(prop) >= 4:
-                                    prop_name = prop[0]
-                                    prop_value = prop[3]
-                                    
-                                    if prop_name == 'fn':
-                                        name = prop_value
-                                        if 'registrant' in roles or not record.registrant_name:
-                                            record.registrant_name = name
-                                    elif prop_name == 'org':
-                                        org = prop_value
-                                        if 'registrant' in roles or not record.registrant_org:
-                                            record.registrant_org = org
-                                    elif prop_name == 'email':
-                                        email = prop_value
-                                        if 'registrant' in roles:
-                                            record.registrant_email = email
-                                        elif 'administrative' in roles:
-                                            record.admin_email = email
-                                        elif 'technical' in roles:
-                                            record.tech_email = email
-                                    elif prop_name == 'tel':
-                                        if 'registrant' in roles:
-                                            record.registrant_phone = prop_value
-                    
-                    # Parse nameservers
-                    secure_dns = rdap_data.get('secureDNS', {})
-                    delegation_keys = secure_dns.get('delegationKeys', [])
-                    record.dnssec = len(delegation_keys) > 0
-                    
-                    # Extract nameservers from remarks or links
-                    for remark in remarks:
-                        if remark.get('title') == 'Nameservers':
-                            nameserver_list = remark.get('description', [])
-                            record.name_servers.extend(nameserver_list)
-                    
-                    return record
+            # Use RDAP (Registration Data Access Protocol) for modern WHOIS,
+            # routed to the TLD's registry and cached between investigations
+            result = await self.rdap_client.lookup(domain, self.session)
+            if result.found:
+                rdap_data = result.data
+                
+                record = WHOISRecord(
+                    domain=domain,
+                    source="RDAP",
+                    confidence=0.9,
+                    raw_whois=result.raw
+                )
+                
+                # Extract entities and events from RDAP data
+                entities = rdap_data.get('entities', [])
+                events = rdap_data.get('events', [])
+                status = rdap_data.get('status', [])
+                remarks = rdap_data.get('remarks', [])
+                
+                # Parse status
+                record.status = status
+                
+                # Parse events (creation, expiration, etc.)
+                for event in events:
+                    event_action = event.get('eventAction', '')
+                    event_date = event.get('eventDate', '')
+                
+                    if event_date:
+                        try:
+                            parsed_date = datetime.fromisoformat(event_date.replace('Z', '+00:00')).date()
+                
+                            if event_action == 'registration':
+                                record.creation_date = parsed_date
+                            elif event_action == 'expiration':
+                                record.expiration_date = parsed_date
+                            elif event_action == 'last changed':
+                                record.updated_date = parsed_date
+                        except ValueError:
+                            pass
+                
+                # Parse entities for contact information
+                for entity in entities:
+                    vcard_array = entity.get('vcardArray', [])
+                    roles = entity.get('roles', [])
+                
+                    if vcard_array and len(vcard_array) > 1:
+                        for prop in vcard_array[1]:
+                            if prop and len(prop) >= 4:
+                                prop_name = prop[0]
+                                prop_value = prop[3]
+                
+                                if prop_name == 'fn':
+                                    name = prop_value
+                                    if 'registrant' in roles or not record.registrant_name:
+                                        record.registrant_name = name
+                                elif prop_name == 'org':
+                                    org = prop_value
+                                    if 'registrant' in roles or not record.registrant_org:
+                                        record.registrant_org = org
+                                elif prop_name == 'email':
+                                    email = prop_value
+                                    if 'registrant' in roles:
+                                        record.registrant_email = email
+                                    elif 'administrative' in roles:
+                                        record.admin_email = email
+                                    elif 'technical' in roles:
+                                        record.tech_email = email
+                                elif prop_name == 'tel':
+                                    if 'registrant' in roles:
+                                        record.registrant_phone = prop_value
+                
+                # Parse nameservers
+                secure_dns = rdap_data.get('secureDNS', {})
+                delegation_keys = secure_dns.get('delegationKeys', [])
+                record.dnssec = len(delegation_keys) > 0
+                
+                # Extract nameservers from remarks or links
+                for remark in remarks:
+                    if remark.get('title') == 'Nameservers':
+                        nameserver_list = remark.get('description', [])
+                        record.name_servers.extend(nameserver_list)
+                
+                return record
                     
         except Exception as e:
             logger.debug(f"RDAP lookup failed for {domain}: {str(e)}")
@@ -281,43 +289,24 @@ class TechnicalIntelligenceService:
             record_types = ['A', 'AAAA', 'MX', 'NS', 'TXT', 'SOA', 'CNAME', 'SRV']
             
         records = []
+        answers_by_type = await self.dns_resolver.resolve_many(domain, record_types)
         
-        for record_type in record_types:
-            try:
-                answers = self.dns_resolver.resolve(domain, record_type)
-                
-                for answer in answers:
-                    record = DNSRecord(
-                        domain=domain,
-                        record_type=record_type,
-                        value=str(answer),
-                        ttl=answers.ttl,
-                        timestamp=datetime.now(),
-                        confidence=0.95,
-                        source="DNS Resolver"
-                    )
-                    
-                    # Extract additional information for specific record types
-                    if record_type == 'MX' and hasattr(answer, 'preference'):
-                        record.priority = answer.preference
-                        record.value = str(answer.exchange)
-                    elif record_type == 'SRV' and hasattr(answer, 'priority'):
-                        record.priority = answer.priority
-                        record.value = f"{answer.target}:{answer.port}"
-                    elif record_type in ['A', 'AAAA']:
-                        record.value = str(answer)
-                    elif record_type == 'TXT':
-                        record.value = str(answer).strip('"')
-                    
-                    records.append(record)
-                    
-            except dns.exception.NXDOMAIN:
-                logger.debug(f"Domain {domain} does not exist for {record_type} records")
-            except dns.exception.NoAnswer:
+        for record_type, answers in answers_by_type.items():
+            if not answers:
                 logger.debug(f"No {record_type} records for {domain}")
-            except Exception as e:
-                logger.debug(f"Error resolving {record_type} for {domain}: {str(e)}")
-                continue
+            
+            for answer in answers:
+                # MX/SRV answers carry their preference/priority separately
+                records.append(DNSRecord(
+                    domain=domain,
+                    record_type=record_type,
+                    value=answer.value,
+                    ttl=answer.ttl,
+                    priority=answer.priority,
+                    timestamp=datetime.now(),
+                    confidence=0.95,
+                    source="DNS Resolver"
+                ))
                 
         return records
 
@@ -329,11 +318,7 @@ class TechnicalIntelligenceService:
         
         # Resolve domain to IP if needed
         if not self._is_ip_address(target):
-            try:
-                answers = self.dns_resolver.resolve(target, 'A')
-                ip_addresses = [str(answer) for answer in answers]
-            except:
-                ip_addresses = []
+            ip_addresses = [answer.value for answer in await self.dns_resolver.resolve(target, 'A')]
         else:
             ip_addresses = [target]
             
@@ -357,6 +342,9 @@ class TechnicalIntelligenceService:
         
         certificates = []
         
+        # Live handshake runs alongside the certificate transparency lookup
+        live = asyncio.ensure_future(self.certificate_grabber.grab(domain))
+        
         try:
             # Search certificate transparency logs
             crt_url = f"https://crt.sh/?q={domain}&output=json"
@@ -390,6 +378,12 @@ class TechnicalIntelligenceService:
                             
         except Exception as e:
             logger.debug(f"SSL certificate analysis failed for {domain}: {str(e)}")
+        
+        handshake = await live
+        if handshake.leaf is not None:
+            certificates.insert(0, self._certificate_from_handshake(domain, handshake))
+        elif handshake.error:
+            logger.debug(f"TLS handshake with {domain} failed: {handshake.error}")
             
         # Remove duplicates and sort by confidence
         unique_certs = self._deduplicate_certificates(certificates)
@@ -465,8 +459,10 @@ class TechnicalIntelligenceService:
         
         try:
             # Try to get basic DNS information as fallback
-            answers = self.dns_resolver.resolve(domain, 'NS')
-            record.name_servers = [str(answer) for answer in answers]
+            response = await self.dns_resolver.query(domain, 'NS')
+            if not response.records:
+                raise LookupError(f"no NS records ({response.rcode})")
+            record.name_servers = response.values
             
             # Set some basic information
             record.status = ["active"]
@@ -481,6 +477,10 @@ class TechnicalIntelligenceService:
     async def _analyze_ip_address(self, ip: str) -> Optional[NetworkNode]:
         """Analyze individual IP address"""
         
+        ip_range = self.ip_intelligence.lookup(ip)
+        if ip_range is not None:
+            return await self._node_from_ip_range(ip, ip_range)
+        
         try:
             # Get IP information from ipinfo.io
             ip_url = f"https://ipinfo.io/{ip}/json"
@@ -507,9 +507,9 @@ class TechnicalIntelligenceService:
                     
                     # Get additional ASN information
                     asn_info = await self._get_asn_info(ip)
-                    if asn_info:
-                        node.asn = asn_info.get('as_number', node.asn)
-                        node.asn_org = asn_info.get('as_name', node.asn_org)
+                    if asn_info and asn_info.get('as_number'):
+                        node.asn = f"AS{asn_info['as_number']}"
+                        node.asn_org = asn_info.get('as_description', node.asn_org)
                     
                     return node
                     
@@ -518,9 +518,37 @@ class TechnicalIntelligenceService:
             
         return None
 
+    async def _node_from_ip_range(self, ip: str, ip_range) -> NetworkNode:
+        """Build a node from the local IP index, with the PTR record as hostname"""
+        
+        hostname = ""
+        try:
+            pointer = ipaddress.ip_address(ip).reverse_pointer
+            answers = await self.dns_resolver.resolve(pointer, 'PTR')
+            if answers:
+                hostname = answers[0].value.rstrip('.')
+        except Exception as e:
+            logger.debug(f"Reverse lookup failed for {ip}: {str(e)}")
+        
+        return NetworkNode(
+            ip_address=ip,
+            hostname=hostname,
+            asn=ip_range.asn_label,
+            asn_org=ip_range.organization,
+            country=ip_range.country,
+            isp=ip_range.organization,
+            organization=ip_range.organization,
+            source="IP intelligence index",
+            confidence=0.85
+        )
+
     async def _get_asn_info(self, ip: str) -> Optional[Dict[str, Any]]:
         """Get ASN information for IP"""
         
+        ip_range = self.ip_intelligence.lookup(ip)
+        if ip_range is not None:
+            return ip_range.to_dict()
+        
         try:
             asn_url = f"https://api.iptoasn.com/v1/as/ip/{ip}"
             
@@ -544,20 +572,15 @@ class TechnicalIntelligenceService:
                 # Check common subdomains
                 common_subdomains = ['www', 'mail', 'ftp', 'api', 'blog', 'shop', 'admin', 'test']
                 
-                for subdomain in common_subdomains[:5]:  # Limit to prevent too many requests
-                    full_domain = f"{subdomain}.{target}"
-                    
-                    try:
-                        answers = self.dns_resolver.resolve(full_domain, 'A')
-                        for answer in answers:
-                            ip = str(answer)
-                            node = await self._analyze_ip_address(ip)
-                            if node:
-                                node.hostname = full_domain
-                                nodes.append(node)
-                                
-                    except:
-                        continue
+                candidates = [f"{subdomain}.{target}" for subdomain in common_subdomains[:5]]  # Limit to prevent too many requests
+                responses = await self.dns_resolver.query_batch(candidates, 'A')
+                
+                for full_domain in candidates:
+                    for ip in responses[full_domain].values:
+                        node = await self._analyze_ip_address(ip)
+                        if node:
+                            node.hostname = full_domain
+                            nodes.append(node)
                         
         except Exception as e:
             logger.debug(f"Additional node discovery failed: {str(e)}")
@@ -651,14 +674,37 @@ class TechnicalIntelligenceService:
                 
         return unique_nodes
 
+    def _certificate_from_handshake(self, domain: str, handshake: TLSResult) -> SSLCertificate:
+        """SSL certificate record for the leaf certificate a server presented"""
+        leaf = handshake.leaf
+        return SSLCertificate(
+            domain=domain,
+            certificate_issuer=", ".join(f"{key}={value}" for key, value in leaf.issuer.items()),
+            certificate_subject=", ".join(f"{key}={value}" for key, value in leaf.subject.items()),
+            serial_number=leaf.serial_number,
+            signature_algorithm=leaf.signature_algorithm,
+            key_size=leaf.key_size,
+            valid_from=leaf.not_before.date() if leaf.not_before else None,
+            valid_until=leaf.not_after.date() if leaf.not_after else None,
+            alternative_names=list(leaf.subject_alt_names),
+            revocation_status="unknown",
+            source="TLS handshake",
+            confidence=0.95 if handshake.verified else 0.7
+        )
+
     def _deduplicate_certificates(self, certificates: List[SSLCertificate]) -> List[SSLCertificate]:
         """Remove duplicate certificates"""
         seen_serials = set()
         unique_certs = []
         
         for cert in certificates:
-            if cert.serial_number not in seen_serials:
-                seen_serials.add(cert.serial_number)
+            # crt.sh and the ssl module disagree on hex case
+            serial = (cert.serial_number or "").lower()
+            if not serial:
+                # Nothing to match on; keep it rather than merge unrelated certificates
+                unique_certs.append(cert)
+            elif serial not in seen_serials:
+                seen_serials.add(serial)
                 unique_certs.append(cert)
                 
         return unique_certs
@@ -764,6 +810,22 @@ class TechnicalIntelligenceService:
             
         return analysis
 
+    async def profile_domains(
+        self,
+        domains: List[str],
+        stages: Optional[List[str]] = None,
+        workers: Optional[Dict[str, int]] = None
+    ):
+        """
+        Profile many domains concurrently, yielding a DomainProfile per domain
+        as it completes. Must run inside ``async with`` (for the HTTP session).
+        """
+        from app.services.domain_profile_pipeline import DEFAULT_STAGES, DomainProfilePipeline
+        
+        pipeline = DomainProfilePipeline(self, stages or DEFAULT_STAGES, workers)
+        async for profile in pipeline.run(domains):
+            yield profile
+
 
 # Convenience function for quick technical intelligence
 async def gather_technical_intelligence(target: str) -> Dict[str, Any]:
@@ -0,0 +1,373 @@
+"""
+TLS Certificate Collection
+
+Handshakes run on the event loop (``asyncio.open_connection`` with TLS) with
+a timeout, instead of blocking ``socket.create_connection`` + ``wrap_socket``
+calls inside coroutines, and many hosts can be handshaken concurrently.
+
+- The full chain the server presents is parsed, not just the leaf. Hosts
+  whose chain doesn't verify are handshaken again without verification so
+  their certificates are still collected, with the verification error.
+- Results are cached per (host, port) until TLS_CACHE_TTL or the leaf's
+  expiry, whichever comes first; concurrent grabs of one endpoint share a
+  handshake.
+- Certificates are de-duplicated by SHA-256 fingerprint across hosts and
+  investigations: every result references the one shared
+  ``CertificateInfo``, which records where it has been seen.
+
+Certificates are parsed with ``cryptography`` when installed (adds key size
+and signature algorithm) and with the ssl module's decoder otherwise.
+"""
+
+import asyncio
+import hashlib
+import logging
+import ssl
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.config import settings
+
+try:
+    from cryptography import x509
+    from cryptography.x509.oid import ExtensionOID
+    CRYPTOGRAPHY_AVAILABLE = True
+except ImportError:
+    CRYPTOGRAPHY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+# Failed handshakes, and endpoints serving an expired leaf, are retried after this many seconds
+ERROR_CACHE_TTL = 60
+
+_CERT_TIME_FORMAT = "%b %d %H:%M:%S %Y %Z"
+
+
+@dataclass
+class CertificateInfo:
+    """One parsed certificate, shared by every endpoint that presents it."""
+    fingerprint_sha256: str
+    subject: Dict[str, str]
+    issuer: Dict[str, str]
+    serial_number: str
+    not_before: Optional[datetime]
+    not_after: Optional[datetime]
+    subject_alt_names: List[str] = field(default_factory=list)
+    signature_algorithm: str = ""
+    key_size: int = 0
+    version: Optional[int] = None
+    seen_on: Set[str] = field(default_factory=set)
+    first_seen: float = field(default_factory=time.time)
+
+    @property
+    def is_self_signed(self) -> bool:
+        return self.subject == self.issuer
+
+    @property
+    def is_expired(self) -> bool:
+        return self.not_after is not None and self.not_after < datetime.now(timezone.utc)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fingerprint_sha256": self.fingerprint_sha256,
+            "subject": self.subject,
+            "issuer": self.issuer,
+            "serial_number": self.serial_number,
+            "not_before": self.not_before.isoformat() if self.not_before else None,
+            "not_after": self.not_after.isoformat() if self.not_after else None,
+            "subject_alt_names": self.subject_alt_names,
+            "signature_algorithm": self.signature_algorithm,
+            "key_size": self.key_size,
+            "version": self.version,
+            "is_self_signed": self.is_self_signed,
+            "is_expired": self.is_expired,
+        }
+
+
+@dataclass
+class TLSResult:
+    """Outcome of a handshake with one endpoint; ``chain[0]`` is the leaf."""
+    host: str
+    port: int
+    chain: List[CertificateInfo] = field(default_factory=list)
+    verified: bool = False
+    verification_error: Optional[str] = None
+    tls_version: Optional[str] = None
+    cipher: Optional[str] = None
+    error: Optional[str] = None
+    fetched_at: float = field(default_factory=time.time)
+
+    @property
+    def leaf(self) -> Optional[CertificateInfo]:
+        return self.chain[0] if self.chain else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "host": self.host,
+            "port": self.port,
+            "verified": self.verified,
+            "verification_error": self.verification_error,
+            "tls_version": self.tls_version,
+            "cipher": self.cipher,
+            "error": self.error,
+            "chain": [certificate.to_dict() for certificate in self.chain],
+        }
+
+
+def _name_to_dict(name) -> Dict[str, str]:
+    # ssl-module form: ((('commonName', 'example.com'),), ...)
+    return {key: value for rdn in name for key, value in rdn}
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.strptime(value, _CERT_TIME_FORMAT).replace(tzinfo=timezone.utc)
+
+
+def parse_certificate(der: bytes, info: Optional[Dict[str, Any]] = None) -> CertificateInfo:
+    """
+    Parse a DER certificate. ``info`` is the ssl module's decoded form of the
+    same certificate, used when ``cryptography`` isn't installed.
+    """
+    fingerprint = hashlib.sha256(der).hexdigest()
+
+    if CRYPTOGRAPHY_AVAILABLE:
+        cert = x509.load_der_x509_certificate(der)
+        try:
+            san = cert.extensions.get_extension_for_oid(ExtensionOID.SUBJECT_ALTERNATIVE_NAME)
+            alt_names = san.value.get_values_for_type(x509.DNSName)
+        except x509.ExtensionNotFound:
+            alt_names = []
+        public_key = cert.public_key()
+        return CertificateInfo(
+            fingerprint_sha256=fingerprint,
+            subject={attribute.oid._name: attribute.value for attribute in cert.subject},
+            issuer={attribute.oid._name: attribute.value for attribute in cert.issuer},
+            serial_number=format(cert.serial_number, "X"),
+            not_before=getattr(cert, "not_valid_before_utc", None) or cert.not_valid_before.replace(tzinfo=timezone.utc),
+            not_after=getattr(cert, "not_valid_after_utc", None) or cert.not_valid_after.replace(tzinfo=timezone.utc),
+            subject_alt_names=list(alt_names),
+            signature_algorithm=cert.signature_algorithm_oid._name,
+            key_size=getattr(public_key, "key_size", 0),
+            version=cert.version.value + 1
+        )
+
+    info = info or {}
+    return CertificateInfo(
+        fingerprint_sha256=fingerprint,
+        subject=_name_to_dict(info.get("subject", ())),
+        issuer=_name_to_dict(info.get("issuer", ())),
+        serial_number=info.get("serialNumber", ""),
+        not_before=_parse_time(info.get("notBefore")),
+        not_after=_parse_time(info.get("notAfter")),
+        subject_alt_names=[value for kind, value in info.get("subjectAltName", ()) if kind == "DNS"],
+        version=info.get("version")
+    )
+
+
+def peer_chain(ssl_object) -> List[Tuple[bytes, Optional[Dict[str, Any]]]]:
+    """
+    (DER, decoded info) for each certificate the peer sent, leaf first.
+
+    The full chain comes from ``get_unverified_chain`` (Python 3.13+, or the
+    private low-level object before that); where neither is usable, only
+    the leaf is returned.
+    """
+    low_level = getattr(ssl_object, "_sslobj", None)
+    getter = getattr(low_level, "get_unverified_chain", None) or getattr(ssl_object, "get_unverified_chain", None)
+    encoding = getattr(getattr(ssl, "_ssl", None), "ENCODING_DER", None)
+    if getter is not None:
+        chain = []
+        try:
+            for entry in getter() or []:
+                if isinstance(entry, bytes):
+                    chain.append((entry, None))
+                elif encoding is not None and hasattr(entry, "public_bytes") and hasattr(entry, "get_info"):
+                    # The low-level object's chain entries carry both DER and decoded forms
+                    chain.append((entry.public_bytes(encoding), entry.get_info()))
+                else:
+                    chain = []
+                    break
+        except Exception as e:
+            # Private API: any change in its behaviour falls back to the leaf
+            logger.debug(f"Could not read the peer certificate chain: {e}")
+            chain = []
+        if chain:
+            return chain
+    leaf = ssl_object.getpeercert(binary_form=True)
+    return [(leaf, ssl_object.getpeercert() or None)] if leaf else []
+
+
+class CertificateRegistry:
+    """Certificates by fingerprint, shared across hosts and investigations."""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._certificates: "OrderedDict[str, CertificateInfo]" = OrderedDict()
+        self.dedup_hits = 0
+
+    def intern(self, der: bytes, info: Optional[Dict[str, Any]], endpoint: str) -> CertificateInfo:
+        fingerprint = hashlib.sha256(der).hexdigest()
+        certificate = self._certificates.get(fingerprint)
+        if certificate is None:
+            certificate = self._certificates[fingerprint] = parse_certificate(der, info)
+            while len(self._certificates) > self.max_size:
+                self._certificates.popitem(last=False)
+        else:
+            self.dedup_hits += 1
+            self._certificates.move_to_end(fingerprint)
+        certificate.seen_on.add(endpoint)
+        return certificate
+
+    def get(self, fingerprint: str) -> Optional[CertificateInfo]:
+        return self._certificates.get(fingerprint.lower())
+
+    def __len__(self) -> int:
+        return len(self._certificates)
+
+
+class CertificateGrabber:
+    """Concurrent, cached TLS handshakes for certificate collection."""
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        max_concurrency: int = 50,
+        cache_ttl: int = 3600,
+        cafile: Optional[str] = None,
+        registry: Optional[CertificateRegistry] = None,
+        cache_size: int = 10000
+    ):
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        # An empty registry is falsy (it defines __len__), so test against None
+        self.registry = registry if registry is not None else CertificateRegistry()
+
+        # Contexts are built once; loading the CA store per handshake is expensive
+        self._verify_context = ssl.create_default_context(cafile=cafile)
+        self._insecure_context = ssl.create_default_context()
+        self._insecure_context.check_hostname = False
+        self._insecure_context.verify_mode = ssl.CERT_NONE
+
+        self._cache: "OrderedDict[Tuple[str, int], Tuple[float, TLSResult]]" = OrderedDict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[Tuple[str, int], asyncio.Task] = {}
+
+        self.handshakes = 0
+        self.cache_hits = 0
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._inflight = {}
+
+    async def grab(self, host: str, port: int = 443) -> TLSResult:
+        """Certificate chain of one endpoint, from cache when fresh."""
+        self._bind_loop()
+        key = (host.strip().rstrip(".").lower(), port)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return cached[1]
+            del self._cache[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._loop.create_task(self._grab(*key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def grab_many(self, targets: Iterable[Any], default_port: int = 443) -> List[TLSResult]:
+        """Handshake many hosts (or (host, port) pairs) concurrently."""
+        endpoints = [target if isinstance(target, tuple) else (target, default_port) for target in targets]
+        return await asyncio.gather(*(self.grab(host, port) for host, port in endpoints))
+
+    async def _grab(self, host: str, port: int) -> TLSResult:
+        async with self._semaphore:
+            result = TLSResult(host, port)
+            try:
+                await self._handshake(host, port, self._verify_context, result)
+                result.verified = True
+            except ssl.SSLCertVerificationError as e:
+                # Collect the chain anyway, recording why it didn't verify
+                result.verification_error = e.verify_message or str(e)
+                try:
+                    await self._handshake(host, port, self._insecure_context, result)
+                except (OSError, asyncio.TimeoutError) as e:
+                    result.error = str(e) or type(e).__name__
+                except ValueError as e:
+                    result.error = f"Malformed certificate: {e}"
+            except (OSError, asyncio.TimeoutError) as e:
+                result.error = str(e) or type(e).__name__
+            except ValueError as e:
+                # One host's unparseable certificate must not fail the whole batch
+                result.error = f"Malformed certificate: {e}"
+
+        ttl = ERROR_CACHE_TTL if result.error else self.cache_ttl
+        if result.leaf is not None and result.leaf.not_after is not None:
+            remaining = (result.leaf.not_after - datetime.now(timezone.utc)).total_seconds()
+            # Don't serve a certificate past its expiry, but don't re-handshake an expired one on every call
+            ttl = min(ttl, remaining if remaining > 0 else ERROR_CACHE_TTL)
+        self._cache[(host, port)] = (time.monotonic() + ttl, result)
+        self._cache.move_to_end((host, port))
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    async def _handshake(self, host: str, port: int, context: ssl.SSLContext, result: TLSResult):
+        self.handshakes += 1
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port, ssl=context, server_hostname=host),
+            self.timeout
+        )
+        try:
+            ssl_object = writer.get_extra_info("ssl_object")
+            endpoint = f"{host}:{port}"
+            result.chain = [self.registry.intern(der, info, endpoint) for der, info in peer_chain(ssl_object)]
+            result.tls_version = ssl_object.version()
+            cipher = ssl_object.cipher()
+            result.cipher = cipher[0] if cipher else None
+        finally:
+            writer.close()
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "handshakes": self.handshakes,
+            "cache_hits": self.cache_hits,
+            "cached_endpoints": len(self._cache),
+            "unique_certificates": len(self.registry),
+            "certificate_dedup_hits": self.registry.dedup_hits,
+            "inflight": len(self._inflight),
+        }
+
+
+_certificate_grabber: Optional[CertificateGrabber] = None
+
+
+def get_certificate_grabber() -> CertificateGrabber:
+    """Shared grabber configured from settings."""
+    global _certificate_grabber
+    if _certificate_grabber is None:
+        _certificate_grabber = CertificateGrabber(
+            timeout=settings.TLS_TIMEOUT,
+            max_concurrency=settings.TLS_MAX_CONCURRENCY,
+            cache_ttl=settings.TLS_CACHE_TTL
+        )
+    return _certificate_grabber
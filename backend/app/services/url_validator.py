@@ -0,0 +1,264 @@
+"""
+URL Validation
+
+One validator shared by the agents, tools and API, instead of each opening
+its own session and downloading whole pages to learn whether a URL works.
+
+- Probes are HEAD requests. Servers that reject HEAD (403/405/501) get a
+  ranged GET for the first byte, and the body is never read.
+- Redirects are followed by hand up to ``max_redirects``; loops and
+  over-long chains are reported instead of followed.
+- Results are cached per URL for URL_VALIDATION_CACHE_TTL (invalid URLs
+  for a shorter ERROR_CACHE_TTL); concurrent checks of one URL share a
+  probe.
+- Probes are bounded overall and per host, so a batch of links into one
+  site doesn't hammer it.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urldefrag, urljoin, urlparse
+
+from app.config import settings
+
+# Optional imports for HTTP probing
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+# Statuses after which a HEAD is retried as a ranged GET
+HEAD_REJECTED = {403, 405, 501}
+
+# Invalid URLs are re-probed sooner than valid ones are refreshed
+ERROR_CACHE_TTL = 60
+
+USER_AGENT = "Mozilla/5.0 (compatible; ScrapeCraft-URLValidator/1.0)"
+
+
+@dataclass
+class URLCheck:
+    """The outcome of validating one URL."""
+    url: str
+    valid: bool
+    status_code: Optional[int] = None
+    final_url: str = ""
+    content_type: str = ""
+    content_length: Optional[int] = None
+    redirects: List[str] = field(default_factory=list)
+    method: str = "HEAD"
+    error: Optional[str] = None
+    checked_at: float = field(default_factory=time.time)
+    from_cache: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            "url": self.url,
+            "valid": self.valid,
+            "status_code": self.status_code,
+            "final_url": self.final_url or self.url,
+            "content_type": self.content_type,
+            "content_length": self.content_length,
+            "redirects": len(self.redirects),
+            "method": self.method,
+        }
+        if self.error:
+            result["error"] = self.error
+        return result
+
+
+class URLValidator:
+    """Concurrent, cached URL reachability checks."""
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        max_redirects: int = 5,
+        concurrency: int = 50,
+        per_host: int = 6,
+        cache_ttl: int = 900,
+        cache_size: int = 10000,
+        transport=None
+    ):
+        if not HTTPX_AVAILABLE:
+            raise ImportError("httpx is required for URL validation. Install with: pip install httpx")
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.transport = transport
+
+        self._cache: "OrderedDict[str, URLCheck]" = OrderedDict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        self.stats = {"checks": 0, "cache_hits": 0, "coalesced": 0, "requests": 0, "ranged_gets": 0}
+
+    async def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            previous = self._client
+            self._loop = loop
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=False,
+                headers={"User-Agent": USER_AGENT},
+                limits=httpx.Limits(max_connections=self.concurrency),
+                transport=self.transport
+            )
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._host_limits = {}
+            self._inflight = {}
+            if previous is not None:
+                # The previous loop's client would otherwise leak its connections
+                try:
+                    await previous.aclose()
+                except Exception as e:
+                    logger.debug(f"Closing previous validator client failed: {e}")
+
+    def _cached(self, url: str) -> Optional[URLCheck]:
+        check = self._cache.get(url)
+        if check is None:
+            return None
+        ttl = self.cache_ttl if check.valid else min(self.cache_ttl, ERROR_CACHE_TTL)
+        if time.time() - check.checked_at >= ttl:
+            del self._cache[url]
+            return None
+        self._cache.move_to_end(url)
+        return check
+
+    def _store(self, check: URLCheck):
+        self._cache[check.url] = check
+        self._cache.move_to_end(check.url)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def validate(self, url: str) -> URLCheck:
+        """Check one URL, from cache when fresh."""
+        await self._bind_loop()
+        url = urldefrag(url.strip())[0]
+        self.stats["checks"] += 1
+
+        cached = self._cached(url)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return URLCheck(**{**cached.__dict__, "from_cache": True})
+
+        task = self._inflight.get(url)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            task = self._loop.create_task(self._probe(url))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        return await asyncio.shield(task)
+
+    async def validate_many(self, urls: Iterable[str]) -> List[URLCheck]:
+        """Check a batch concurrently; results are in input order."""
+        return list(await asyncio.gather(*(self.validate(url) for url in urls)))
+
+    async def _probe(self, url: str) -> URLCheck:
+        if urlparse(url).scheme not in ("http", "https"):
+            check = URLCheck(url, False, final_url=url, error="Unsupported URL scheme")
+            self._store(check)
+            return check
+
+        redirects: List[str] = []
+        current = url
+        try:
+            while True:
+                response, method = await self._request(current)
+                location = response.headers.get("location")
+                if response.is_redirect and location:
+                    redirects.append(current)
+                    current = urldefrag(urljoin(current, location))[0]
+                    if current in redirects:
+                        check = URLCheck(url, False, response.status_code, current, redirects=redirects,
+                                         method=method, error="Redirect loop")
+                        break
+                    if len(redirects) > self.max_redirects:
+                        check = URLCheck(url, False, response.status_code, current, redirects=redirects,
+                                         method=method, error=f"More than {self.max_redirects} redirects")
+                        break
+                    continue
+
+                length = response.headers.get("content-length")
+                if response.status_code == 206:
+                    # "Content-Range: bytes 0-0/12345" carries the full size
+                    length = response.headers.get("content-range", "").rpartition("/")[2]
+                check = URLCheck(
+                    url,
+                    valid=response.status_code < 400,
+                    status_code=response.status_code,
+                    final_url=current,
+                    content_type=response.headers.get("content-type", ""),
+                    content_length=int(length) if length and length.isdigit() else None,
+                    redirects=redirects,
+                    method=method
+                )
+                break
+        except Exception as e:
+            check = URLCheck(url, False, final_url=current, redirects=redirects, error=str(e) or type(e).__name__)
+
+        self._store(check)
+        return check
+
+    async def _request(self, url: str):
+        """HEAD, or a one-byte ranged GET where HEAD is refused; the body is never read."""
+        host = urlparse(url).netloc.lower()
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self.per_host)
+
+        # Host slot first: requests queued behind a busy host must not hold global slots
+        async with limit, self._semaphore:
+            self.stats["requests"] += 1
+            response = await self._client.head(url)
+            if response.status_code not in HEAD_REJECTED:
+                return response, "HEAD"
+
+            self.stats["requests"] += 1
+            self.stats["ranged_gets"] += 1
+            request = self._client.build_request("GET", url, headers={"Range": "bytes=0-0"})
+            response = await self._client.send(request, stream=True)
+            await response.aclose()
+            return response, "GET"
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "cached": len(self._cache), "inflight": len(self._inflight)}
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+
+_url_validator: Optional[URLValidator] = None
+
+
+def get_url_validator() -> URLValidator:
+    """Shared validator configured from settings."""
+    global _url_validator
+    if _url_validator is None:
+        _url_validator = URLValidator(
+            timeout=settings.URL_VALIDATION_TIMEOUT,
+            max_redirects=settings.URL_VALIDATION_MAX_REDIRECTS,
+            concurrency=settings.URL_VALIDATION_CONCURRENCY,
+            per_host=settings.URL_VALIDATION_PER_HOST,
+            cache_ttl=settings.URL_VALIDATION_CACHE_TTL
+        )
+    return _url_validator
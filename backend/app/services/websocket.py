@@ -5,13 +5,16 @@ import asyncio
 import logging
 from datetime import datetime
 from app.config import settings
+from app.services.connection_registry import ConnectionRegistry
+from app.services.progress_channel import ProgressChannel, MODE_DELTA, MODE_SNAPSHOT
+from app.services.websocket_backplane import Backplane, BackplaneMessage, create_backplane
 
 logger = logging.getLogger(__name__)
 
 class ConnectionManager:
     """Manages WebSocket connections for real-time communication."""
     
-    def __init__(self):
+    def __init__(self, backplane: Optional[Backplane] = None):
         # Initialize database persistence service
         try:
             from .database import DatabasePersistenceService
@@ -22,69 +25,65 @@ class ConnectionManager:
             logger.error(f"Failed to initialize WebSocket database persistence: {e}")
             self.db_persistence = None
         
-        # Fallback to in-memory storage if database fails
+        # Authoritative connection registry; the database is an optional
+        # shared copy persisted in batches
+        self.registry = ConnectionRegistry(store=self.db_persistence)
         # Store active connections by pipeline_id
         self.active_connections: Dict[str, List[WebSocket]] = {}
         # Store pipeline states
         self.pipeline_states: Dict[str, Dict] = {}
-        # Store connection metadata using connection IDs as strings
-        self.connection_metadata: Dict[str, Dict] = {}
+        # Connection metadata by connection ID (the registry's own mapping)
+        self.connection_metadata: Dict[str, Dict] = self.registry.entries
         # Health status
         self.is_healthy = True
         self.last_health_check = datetime.utcnow()
+        # Fan-out of broadcasts to clients attached to other workers
+        self.backplane = backplane or create_backplane("pipeline")
+        # Delta-encoded workflow progress; connections opt in by id(websocket)
+        self.progress = ProgressChannel(self._emit_progress)
+        self.delta_subscribers: set = set()
+    
+    async def _ensure_backplane(self):
+        """Subscribe to broadcasts from other workers (idempotent)."""
+        if not self.backplane.started:
+            await self.backplane.start(self._on_backplane_message)
+    
+    async def _on_backplane_message(self, message: BackplaneMessage):
+        """Deliver a broadcast published by another worker to local sockets."""
+        if message.audience == MODE_DELTA:
+            # Mirror the stream so clients attached here can resync
+            self.progress.observe(message.pipeline_id, json.loads(message.data))
+        await self._deliver_local(message.pipeline_id, message.data, message.audience)
+    
+    async def _deliver_local(self, pipeline_id: str, data: str, audience: Optional[str] = None):
+        """Send an already-serialized message to this worker's sockets."""
+        connections = self.active_connections.get(pipeline_id)
+        if not connections:
+            return
+        if audience:
+            connections = [
+                c for c in connections
+                if (MODE_DELTA if id(c) in self.delta_subscribers else MODE_SNAPSHOT) == audience
+            ]
+        await asyncio.gather(
+            *(connection.send_text(data) for connection in list(connections)),
+            return_exceptions=True
+        )
     
     async def _store_websocket_connection(self, connection_id: str, pipeline_id: str, metadata: Dict[str, Any]) -> bool:
-        """Store WebSocket connection data using database persistence with fallback."""
-        if self.db_persistence:
-            try:
-                success = await self.db_persistence.store_websocket_connection(connection_id, pipeline_id, metadata)
-                if success:
-                    return True
-            except Exception as e:
-                logger.error(f"WebSocket database persistence failed, using fallback: {e}")
-        
-        # Fallback to in-memory storage
-        self.connection_metadata[connection_id] = metadata
+        """Register a WebSocket connection; the database is updated write-behind."""
+        self.registry.register(connection_id, pipeline_id, metadata)
         return True
     
     async def _get_websocket_connections(self, pipeline_id: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get WebSocket connections using database persistence with fallback."""
-        if self.db_persistence:
-            try:
-                connections = await self.db_persistence.get_websocket_connections(pipeline_id)
-                if connections:
-                    return connections
-            except Exception as e:
-                logger.error(f"WebSocket database retrieval failed, using fallback: {e}")
-        
-        # Fallback to in-memory storage
+        """Get this worker's WebSocket connections from the in-memory registry."""
         if pipeline_id:
-            return [
-                {"connection_id": conn_id, "metadata": metadata}
-                for conn_id, metadata in self.connection_metadata.items()
-                if metadata.get("pipeline_id") == pipeline_id
-            ]
-        return [
-            {"connection_id": conn_id, "metadata": metadata}
-            for conn_id, metadata in self.connection_metadata.items()
-        ]
+            return self.registry.for_pipeline(pipeline_id)
+        return self.registry.all()
     
     async def _remove_websocket_connection(self, connection_id: str) -> bool:
-        """Remove WebSocket connection data using database persistence with fallback."""
-        if self.db_persistence:
-            try:
-                success = await self.db_persistence.remove_websocket_connection(connection_id)
-                if success:
-                    # Also remove from fallback memory
-                    if connection_id in self.connection_metadata:
-                        del self.connection_metadata[connection_id]
-                    return True
-            except Exception as e:
-                logger.error(f"WebSocket database deletion failed, using fallback: {e}")
-        
-        # Fallback to in-memory storage
-        if connection_id in self.connection_metadata:
-            del self.connection_metadata[connection_id]
+        """Unregister a WebSocket connection; the database is updated write-behind."""
+        self.registry.unregister(connection_id)
         return True
     
     async def health_check(self) -> Dict[str, Any]:
@@ -110,6 +109,7 @@ class ConnectionManager:
                 "total_connections": total_connections,
                 "active_pipelines": active_pipelines,
                 "stale_connections": stale_connections,
+                "registry": self.registry.get_stats(),
                 "last_health_check": self.last_health_check.isoformat()
             }
             
@@ -157,6 +157,7 @@ class ConnectionManager:
     async def connect(self, websocket: WebSocket, pipeline_id: str):
         """Accept and store a new WebSocket connection."""
         await websocket.accept()
+        await self._ensure_backplane()
         
         if pipeline_id not in self.active_connections:
             self.active_connections[pipeline_id] = []
@@ -184,7 +185,8 @@ class ConnectionManager:
             "type": "connection",
             "message": "Connected to pipeline",
             "pipeline_id": pipeline_id,
-            "state": self.pipeline_states[pipeline_id]
+            "state": self.pipeline_states[pipeline_id],
+            "progress_seq": self.progress.current_seq(pipeline_id)
         }, websocket)
     
     async def disconnect(self, websocket: WebSocket, pipeline_id: str):
@@ -198,6 +200,7 @@ class ConnectionManager:
             # Clean up connection metadata using persistence layer
             connection_id = f"{pipeline_id}_{id(websocket)}"
             await self._remove_websocket_connection(connection_id)
+            self.delta_subscribers.discard(id(websocket))
             
             # Clean up if no more connections
             if not self.active_connections[pipeline_id]:
@@ -212,25 +215,60 @@ class ConnectionManager:
             "timestamp": datetime.utcnow().isoformat()
         })
     
-    async def broadcast(self, message: Dict, pipeline_id: str):
-        """Broadcast a message to all connections for a pipeline."""
-        if pipeline_id in self.active_connections:
-            # Create tasks for all connections
-            tasks = []
-            for connection in self.active_connections[pipeline_id]:
-                tasks.append(connection.send_json({
-                    **message,
-                    "timestamp": datetime.utcnow().isoformat()
-                }))
-            
-            # Send to all connections concurrently
-            await asyncio.gather(*tasks, return_exceptions=True)
+    async def broadcast(self, message: Dict, pipeline_id: str, audience: Optional[str] = None):
+        """
+        Broadcast a message to all connections for a pipeline on every worker.
+        
+        An audience restricts delivery to connections in that progress mode.
+        """
+        await self._ensure_backplane()
+        # Serialize once for every local socket and for the backplane
+        data = json.dumps(
+            {**message, "timestamp": datetime.utcnow().isoformat()},
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=str
+        )
+        await self._deliver_local(pipeline_id, data, audience)
+        await self.backplane.publish(BackplaneMessage(pipeline_id=pipeline_id, data=data, audience=audience))
+    
+    async def publish_progress(self, pipeline_id: str, kind: str, state: Dict):
+        """
+        Publish the latest progress of one kind (e.g. "workflow_update").
+        
+        Delta subscribers receive throttled, sequenced patches; other clients
+        keep receiving full ``{"type": kind, ...}`` messages at the same rate.
+        """
+        await self.progress.publish(pipeline_id, kind, state)
     
-    async def process_message(self, pipeline_id: str, data: Dict) -> Dict:
+    async def _emit_progress(self, pipeline_id: str, patch: Dict, state: Dict, changed: List[str]):
+        await self.broadcast(patch, pipeline_id, audience=MODE_DELTA)
+        for kind in changed:
+            if kind in state:
+                await self.broadcast({"type": kind, **state[kind]}, pipeline_id, audience=MODE_SNAPSHOT)
+    
+    def touch_connection(self, websocket: WebSocket, pipeline_id: str):
+        """Record client activity (e.g. a ping) for stale-connection cleanup."""
+        self.registry.touch(f"{pipeline_id}_{id(websocket)}", last_ping=datetime.utcnow())
+    
+    async def shutdown(self):
+        """Stop receiving broadcasts from other workers and flush the registry."""
+        await self.backplane.stop()
+        await self.registry.close()
+    
+    async def process_message(self, pipeline_id: str, data: Dict, websocket: Optional[WebSocket] = None) -> Dict:
         """Process incoming WebSocket messages."""
         message_type = data.get("type", "chat")
         
-        if message_type == "chat":
+        if message_type == "progress_subscribe" and websocket is not None:
+            # Switch this connection from full workflow updates to deltas
+            self.delta_subscribers.add(id(websocket))
+            return self.progress.resync(pipeline_id, data.get("since_seq"))
+        
+        elif message_type == "progress_resync":
+            return self.progress.resync(pipeline_id, data.get("since_seq"))
+        
+        elif message_type == "chat":
             # Process through the workflow manager
             from app.services.workflow_manager import get_workflow_manager
             
@@ -0,0 +1,250 @@
+"""
+WebSocket Backplane
+
+WebSocket managers only know about the sockets attached to their own
+process. When the API runs with several uvicorn workers or pods, a broadcast
+from the worker running an investigation has to reach clients attached to
+the other workers. The backplane carries already-serialized messages between
+processes:
+
+- ``RedisBackplane`` uses Redis pub/sub, one channel per pipeline
+- ``InProcessBackplane`` is a stand-in for single-process deployments and
+  tests; backplanes sharing an ``InProcessBus`` behave like separate workers
+
+Messages are delivered to local sockets directly by the sender and published
+once; receivers ignore messages that originated from themselves.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+try:
+    import redis.asyncio as redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class BackplaneMessage:
+    """A serialized WebSocket message travelling between processes."""
+    pipeline_id: str
+    data: str
+    exclude: Optional[str] = None       # user id that must not receive it
+    coalesce_key: Optional[str] = None  # newer messages with this key supersede it
+    audience: Optional[str] = None      # restrict to connections in this progress mode
+    origin: str = ""
+
+
+BackplaneHandler = Callable[[BackplaneMessage], Awaitable[None]]
+
+
+def encode_envelope(message: BackplaneMessage) -> str:
+    """Wrap a serialized message for transport across processes."""
+    return json.dumps({
+        "o": message.origin,
+        "x": message.exclude,
+        "k": message.coalesce_key,
+        "a": message.audience,
+        "d": message.data
+    }, separators=(",", ":"))
+
+
+def decode_envelope(pipeline_id: str, raw: str) -> BackplaneMessage:
+    envelope = json.loads(raw)
+    return BackplaneMessage(
+        pipeline_id=pipeline_id,
+        data=envelope["d"],
+        exclude=envelope.get("x"),
+        coalesce_key=envelope.get("k"),
+        audience=envelope.get("a"),
+        origin=envelope["o"]
+    )
+
+
+class Backplane(ABC):
+    """Base class for cross-process message fan-out."""
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self.instance_id = uuid.uuid4().hex
+        self.handler: Optional[BackplaneHandler] = None
+        self.published = 0
+        self.received = 0
+
+    @property
+    def started(self) -> bool:
+        return self.handler is not None
+
+    async def start(self, handler: BackplaneHandler):
+        """Subscribe to the namespace; calling start again is a no-op."""
+        if self.started:
+            return
+        self.handler = handler
+        await self._subscribe()
+
+    async def stop(self):
+        self.handler = None
+        await self._unsubscribe()
+
+    async def publish(self, message: BackplaneMessage):
+        """Publish a serialized message to the other processes."""
+        message.origin = self.instance_id
+        try:
+            await self._publish(message.pipeline_id, encode_envelope(message))
+            self.published += 1
+        except Exception as e:
+            # Local delivery already happened; remote clients miss this message
+            logger.warning(f"Backplane publish failed for pipeline {message.pipeline_id}: {e}")
+
+    async def _dispatch(self, pipeline_id: str, raw: str):
+        try:
+            message = decode_envelope(pipeline_id, raw)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Dropping malformed backplane message: {e}")
+            return
+        if message.origin == self.instance_id or self.handler is None:
+            return
+        self.received += 1
+        try:
+            await self.handler(message)
+        except Exception as e:
+            logger.error(f"Backplane handler failed for pipeline {pipeline_id}: {e}")
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "backend": type(self).__name__,
+            "namespace": self.namespace,
+            "started": self.started,
+            "published": self.published,
+            "received": self.received,
+        }
+
+    @abstractmethod
+    async def _subscribe(self):
+        ...
+
+    @abstractmethod
+    async def _unsubscribe(self):
+        ...
+
+    @abstractmethod
+    async def _publish(self, pipeline_id: str, envelope: str):
+        ...
+
+
+class InProcessBus:
+    """Shared medium for in-process backplanes."""
+
+    def __init__(self):
+        self.subscribers: Dict[str, List["InProcessBackplane"]] = {}
+
+    async def publish(self, namespace: str, pipeline_id: str, envelope: str):
+        for backplane in list(self.subscribers.get(namespace, [])):
+            await backplane._dispatch(pipeline_id, envelope)
+
+
+default_bus = InProcessBus()
+
+
+class InProcessBackplane(Backplane):
+    """Backplane that only reaches managers in the current process."""
+
+    def __init__(self, namespace: str, bus: Optional[InProcessBus] = None):
+        super().__init__(namespace)
+        self.bus = bus or default_bus
+
+    async def _subscribe(self):
+        self.bus.subscribers.setdefault(self.namespace, []).append(self)
+
+    async def _unsubscribe(self):
+        subscribers = self.bus.subscribers.get(self.namespace, [])
+        if self in subscribers:
+            subscribers.remove(self)
+
+    async def _publish(self, pipeline_id: str, envelope: str):
+        await self.bus.publish(self.namespace, pipeline_id, envelope)
+
+
+class RedisBackplane(Backplane):
+    """Backplane over Redis pub/sub with one channel per pipeline."""
+
+    def __init__(
+        self,
+        namespace: str,
+        redis_url: Optional[str] = None,
+        prefix: Optional[str] = None,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0
+    ):
+        if not REDIS_AVAILABLE:
+            raise ImportError("redis package is required for RedisBackplane")
+        super().__init__(namespace)
+        self.redis_url = redis_url or settings.REDIS_URL
+        self.channel_prefix = f"{prefix or settings.WEBSOCKET_BACKPLANE_PREFIX}:{namespace}:"
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.client: Optional["redis.Redis"] = None
+        self.listener_task: Optional[asyncio.Task] = None
+
+    async def _subscribe(self):
+        self.client = redis.from_url(self.redis_url, decode_responses=True)
+        self.listener_task = asyncio.create_task(self._listen())
+
+    async def _unsubscribe(self):
+        if self.listener_task:
+            self.listener_task.cancel()
+            try:
+                await self.listener_task
+            except asyncio.CancelledError:
+                pass
+            self.listener_task = None
+        if self.client:
+            await self.client.close()
+            self.client = None
+
+    async def _publish(self, pipeline_id: str, envelope: str):
+        if self.client is None:
+            raise RuntimeError("backplane not started")
+        await self.client.publish(self.channel_prefix + pipeline_id, envelope)
+
+    async def _listen(self):
+        delay = self.reconnect_delay
+        prefix_length = len(self.channel_prefix)
+        while self.handler is not None:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.psubscribe(self.channel_prefix + "*")
+                delay = self.reconnect_delay
+                async for message in pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    await self._dispatch(message["channel"][prefix_length:], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Backplane subscription lost ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+
+def create_backplane(namespace: str) -> Backplane:
+    """Create the backplane configured by WEBSOCKET_BACKPLANE."""
+    if settings.WEBSOCKET_BACKPLANE == "redis":
+        if REDIS_AVAILABLE:
+            return RedisBackplane(namespace)
+        logger.warning("WEBSOCKET_BACKPLANE=redis but redis is not installed; using in-process backplane")
+    return InProcessBackplane(namespace)
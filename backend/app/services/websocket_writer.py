@@ -0,0 +1,177 @@
+"""
+Per-Connection WebSocket Writers
+
+Each WebSocket gets a writer task draining a bounded outbound queue, so a
+broadcast only enqueues and never waits on a slow client. Progress messages
+carry a coalescing key; while one is still queued, a newer message with the
+same key replaces it in place, so a client only ever receives the latest
+progress of each stream.
+
+When a queue is full the slow-consumer policy applies:
+
+- ``downgrade``: further non-progress messages are dropped (progress keeps
+  coalescing) until the queue drains to half, then the client is told how
+  many messages it missed so it can refresh its state
+- ``drop``: the connection is closed
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+POLICY_DOWNGRADE = "downgrade"
+POLICY_DROP = "drop"
+
+# Close code sent to consumers dropped for falling behind ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class ConnectionWriter:
+    """Bounded outbound queue and writer task for one WebSocket."""
+
+    def __init__(
+        self,
+        websocket: Any,
+        max_queue: Optional[int] = None,
+        policy: Optional[str] = None,
+        send_timeout: Optional[float] = None,
+        on_close: Optional[Callable[["ConnectionWriter", str], None]] = None,
+        name: str = ""
+    ):
+        self.websocket = websocket
+        self.max_queue = max_queue or settings.WEBSOCKET_SEND_QUEUE_SIZE
+        self.policy = policy or settings.WEBSOCKET_SLOW_CONSUMER_POLICY
+        self.send_timeout = send_timeout or settings.WEBSOCKET_SEND_TIMEOUT
+        self.on_close = on_close
+        self.name = name
+
+        # Entries are (coalesce_key, data); keyed entries read their data from latest
+        self.queue: Deque[Tuple[Optional[str], Optional[str]]] = deque()
+        self.latest: Dict[str, str] = {}
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.closed = False
+        self.downgraded = False
+        self.dropped_since_downgrade = 0
+
+        # Metrics
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.send_errors = 0
+        self.max_depth = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self.queue)
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
+
+    def enqueue(self, data: str, coalesce_key: Optional[str] = None) -> bool:
+        """
+        Queue a serialized message without waiting for the socket.
+
+        Returns:
+            False if the message was dropped
+        """
+        if self.closed:
+            return False
+
+        if coalesce_key is not None and coalesce_key in self.latest:
+            self.latest[coalesce_key] = data
+            self.coalesced += 1
+            return True
+
+        if len(self.queue) >= self.max_queue or (self.downgraded and coalesce_key is None):
+            if self.policy == POLICY_DROP:
+                self.close("slow consumer")
+                return False
+            if not self.downgraded:
+                self.downgraded = True
+                logger.warning(f"WebSocket {self.name} is falling behind, downgrading to progress-only")
+            if coalesce_key is None or len(self.queue) >= self.max_queue:
+                self.dropped += 1
+                self.dropped_since_downgrade += 1
+                return False
+
+        if coalesce_key is None:
+            self.queue.append((None, data))
+        else:
+            self.latest[coalesce_key] = data
+            self.queue.append((coalesce_key, None))
+        self.max_depth = max(self.max_depth, len(self.queue))
+        self.wakeup.set()
+        return True
+
+    def close(self, reason: str = "closed"):
+        """Stop the writer; pending messages are discarded."""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.clear()
+        self.latest.clear()
+        if self.task and self.task is not asyncio.current_task():
+            self.task.cancel()
+        if self.on_close:
+            try:
+                self.on_close(self, reason)
+            except Exception as e:
+                logger.error(f"WebSocket writer close callback failed: {e}")
+
+    async def _run(self):
+        try:
+            while not self.closed:
+                if not self.queue:
+                    self.wakeup.clear()
+                    await self.wakeup.wait()
+                    continue
+
+                key, data = self.queue.popleft()
+                if key is not None:
+                    data = self.latest.pop(key)
+
+                try:
+                    await asyncio.wait_for(self.websocket.send_text(data), self.send_timeout)
+                    self.sent += 1
+                except Exception as e:
+                    self.send_errors += 1
+                    logger.warning(f"Error sending message to WebSocket {self.name}: {e}")
+                    self.close("send failed")
+                    return
+
+                if self.downgraded and len(self.queue) <= self.max_queue // 2:
+                    self._restore()
+        except asyncio.CancelledError:
+            pass
+
+    def _restore(self):
+        """Leave downgraded mode and tell the client what it missed."""
+        missed = self.dropped_since_downgrade
+        self.downgraded = False
+        self.dropped_since_downgrade = 0
+        if missed:
+            self.queue.append((None, (
+                '{"type":"warning","reason":"slow_consumer",'
+                f'"dropped_messages":{missed},'
+                '"message":"Some updates were dropped; refresh state to resync"}'
+            )))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.depth,
+            "max_queue_depth": self.max_depth,
+            "queue_limit": self.max_queue,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "send_errors": self.send_errors,
+            "downgraded": self.downgraded,
+            "closed": self.closed,
+        }
@@ -10,9 +10,11 @@ from app.models.workflow import (
     WorkflowState, WorkflowPhase, URLInfo, SchemaField, 
     ApprovalRequest, WorkflowTransition
 )
-from app.agents.legacy.langgraph_agent import ScrapeCraftAgent
+from app.utils.lazy_import import lazy_attribute
 from app.services.websocket import ConnectionManager
 
+ScrapeCraftAgent = lazy_attribute("app.agents.legacy.langgraph_agent", "ScrapeCraftAgent")
+
 
 class WorkflowManager:
     """Manages workflow states and coordinates between agent and frontend."""
@@ -30,10 +32,17 @@ class WorkflowManager:
         
         # Fallback to in-memory storage if database fails
         self.workflows: Dict[str, WorkflowState] = {}
-        self.agent = ScrapeCraftAgent()
+        self._agent = None
         self.connection_manager = connection_manager
         self.approval_callbacks: Dict[str, asyncio.Event] = {}
     
+    @property
+    def agent(self):
+        """LangGraph agent, created (and LangChain imported) on first message."""
+        if self._agent is None:
+            self._agent = ScrapeCraftAgent()
+        return self._agent
+    
     async def _store_workflow_state(self, pipeline_id: str, workflow: WorkflowState) -> bool:
         """Store workflow state using database persistence with fallback."""
         workflow_data = workflow.model_dump(mode='json')
@@ -361,11 +370,10 @@ class WorkflowManager:
     
     async def _broadcast_workflow_update(self, workflow: WorkflowState):
         """Broadcast workflow state update to connected clients."""
-        await self.connection_manager.broadcast({
-            "type": "workflow_update",
+        await self.connection_manager.publish_progress(workflow.pipeline_id, "workflow_update", {
             "workflow": workflow.model_dump(mode='json'),
             "progress": workflow.get_phase_progress()
-        }, workflow.pipeline_id)
+        })
     
     async def get_workflow_summary(self, pipeline_id: str) -> Dict[str, Any]:
         """Get a summary of the workflow state."""
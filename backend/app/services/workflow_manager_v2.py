@@ -214,11 +214,10 @@ class EnhancedWorkflowManager:
     
     async def _broadcast_workflow_update(self, workflow: WorkflowState):
         """Broadcast workflow state update to connected clients."""
-        await self.connection_manager.broadcast({
-            "type": "workflow_update",
+        await self.connection_manager.publish_progress(workflow.pipeline_id, "workflow_update", {
             "workflow": workflow.model_dump(mode='json'),
             "progress": workflow.get_phase_progress()
-        }, workflow.pipeline_id)
+        })
     
     # Additional helper methods for the tool-based approach
     
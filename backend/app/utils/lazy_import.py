@@ -0,0 +1,170 @@
+"""
+Lazy Import Utilities
+
+Heavy agent and tool modules (LangChain, Playwright, ScrapeGraphAI, ...)
+should not load until an investigation actually needs them; otherwise
+every worker pays for them at startup, even for health checks.
+
+- ``lazy_exports`` gives a package PEP 562 ``__getattr__`` re-exports, so
+  ``from app.services import OSINTWorkflow`` keeps working without importing
+  the workflow when the package is imported.
+- ``lazy_attribute`` / ``LazyModule`` defer an import to first use.
+- ``load_module_from_path`` replaces ad-hoc ``spec_from_file_location``
+  loading; a file is executed once per process and then shared.
+
+Load times of everything deferred this way are recorded and reported by
+``get_import_profile``.
+"""
+
+import importlib
+import importlib.util
+import logging
+import os
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.RLock()
+_path_modules: Dict[str, ModuleType] = {}
+_load_times: Dict[str, float] = {}
+
+
+def _timed_import(name: str, loader: Callable[[], ModuleType]) -> ModuleType:
+    start = time.perf_counter()
+    module = loader()
+    elapsed = time.perf_counter() - start
+    _load_times[name] = elapsed
+    logger.debug(f"Lazily loaded {name} in {elapsed * 1000:.1f}ms")
+    return module
+
+
+def import_module(name: str) -> ModuleType:
+    """``importlib.import_module`` that records the first load time."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    with _lock:
+        return _timed_import(name, lambda: importlib.import_module(name))
+
+
+def load_module_from_path(name: str, path: str) -> ModuleType:
+    """Execute a module file once and return the shared module object."""
+    key = os.path.realpath(path)
+    module = _path_modules.get(key)
+    if module is not None:
+        return module
+    with _lock:
+        module = _path_modules.get(key)
+        if module is not None:
+            return module
+
+        def _load() -> ModuleType:
+            spec = importlib.util.spec_from_file_location(name, key)
+            if spec is None or spec.loader is None:
+                raise ImportError(f"Could not load {name} from {path}")
+            loaded = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(loaded)
+            return loaded
+
+        module = _timed_import(f"{name} ({os.path.basename(key)})", _load)
+        _path_modules[key] = module
+        return module
+
+
+class LazyModule:
+    """Module proxy that imports on first attribute access."""
+
+    def __init__(self, name: str, path: Optional[str] = None):
+        self._lazy_name = name
+        self._lazy_path = path
+        self._lazy_module: Optional[ModuleType] = None
+
+    def _load(self) -> ModuleType:
+        if self._lazy_module is None:
+            if self._lazy_path is not None:
+                self._lazy_module = load_module_from_path(self._lazy_name, self._lazy_path)
+            else:
+                self._lazy_module = import_module(self._lazy_name)
+        return self._lazy_module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._lazy_module is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<LazyModule {self._lazy_name} ({state})>"
+
+
+def lazy_module_from_path(name: str, path: str) -> LazyModule:
+    return LazyModule(name, path)
+
+
+class LazyAttribute:
+    """Stand-in for a class or function that is imported when first used."""
+
+    def __init__(self, module: str, attr: str):
+        self._lazy_module = module
+        self._lazy_attr = attr
+        self._lazy_target: Any = None
+
+    def _resolve(self) -> Any:
+        if self._lazy_target is None:
+            self._lazy_target = getattr(import_module(self._lazy_module), self._lazy_attr)
+        return self._lazy_target
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._resolve(), attr)
+
+    def __repr__(self) -> str:
+        return f"<LazyAttribute {self._lazy_module}.{self._lazy_attr}>"
+
+
+def lazy_attribute(module: str, attr: str) -> LazyAttribute:
+    return LazyAttribute(module, attr)
+
+
+def lazy_exports(
+    package: str,
+    exports: Dict[str, str],
+    namespace: Dict[str, Any]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Build ``__getattr__``/``__dir__`` for a package with lazy re-exports.
+
+    ``exports`` maps exported names to (relative) module names. Resolved
+    names are cached in the package namespace, so ``__getattr__`` runs once
+    per name.
+    """
+
+    def __getattr__(name: str) -> Any:
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        absolute = importlib.util.resolve_name(module_name, package)
+        value = getattr(import_module(absolute), name)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
+
+
+def get_import_profile() -> List[Dict[str, Any]]:
+    """Modules loaded through this layer, slowest first."""
+    return [
+        {"module": name, "seconds": round(seconds, 4)}
+        for name, seconds in sorted(_load_times.items(), key=lambda item: item[1], reverse=True)
+    ]
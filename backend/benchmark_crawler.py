@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark the crawl engine against a local test site.
+
+Starts an HTTP server on 127.0.0.1 that serves a generated site (every page
+links to a handful of others, plus a robots.txt) with a configurable
+per-response latency, then crawls it at several concurrency levels and
+reports pages per second. Concurrency 1 is the one-page-at-a-time baseline.
+The per-host delay is disabled and the per-host limit raised so the numbers
+measure the pipeline, not politeness.
+
+Usage:
+    python benchmark_crawler.py [pages] [latency_ms] [concurrency,...]
+"""
+
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent))
+
+from app.services.crawler import CrawlEngine
+
+ROBOTS = b"User-agent: *\nDisallow: /private/\n"
+
+
+class TestSite:
+    """Minimal HTTP/1.1 keep-alive server for /robots.txt and /page/<n>."""
+
+    def __init__(self, pages: int, latency: float, links: int = 8):
+        self.pages = pages
+        self.latency = latency
+        rng = random.Random(0)
+        filler = "<p>" + "lorem ipsum dolor sit amet " * 40 + "</p>"
+        self.bodies = []
+        for n in range(pages):
+            targets = {(n + 1) % pages} | {rng.randrange(pages) for _ in range(links)}
+            anchors = "".join(f'<a href="/page/{t}">Page {t}</a>' for t in sorted(targets))
+            self.bodies.append(
+                f"<html><head><title>Page {n}</title></head><body>{anchors}{filler}"
+                f'<a href="/private/{n}">private</a></body></html>'.encode()
+            )
+        self.requests = 0
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                self.requests += 1
+                path = request_line.split()[1].decode()
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                status, content_type, body = self.route(path)
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                    f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+        except (ConnectionError, IndexError):
+            pass
+        finally:
+            writer.close()
+
+    def route(self, path):
+        if path == "/robots.txt":
+            return "200 OK", "text/plain", ROBOTS
+        if path.startswith("/page/"):
+            n = path[len("/page/"):]
+            if n.isdigit() and int(n) < self.pages:
+                return "200 OK", "text/html; charset=utf-8", self.bodies[int(n)]
+        return "404 Not Found", "text/plain", b"not found"
+
+
+async def run(pages: int, latency: float, levels):
+    site = TestSite(pages, latency)
+    server = await asyncio.start_server(site.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    start_url = f"http://127.0.0.1:{port}/page/0"
+
+    print(f"{pages} pages, {latency * 1000:.0f} ms latency per response\n")
+    print(f"{'concurrency':>11} {'pages':>7} {'blocked':>8} {'requests':>9} {'time':>8} {'rate':>10}")
+    print("-" * 58)
+    async with server:
+        for concurrency in levels:
+            engine = CrawlEngine(concurrency=concurrency, per_host=concurrency, delay=0.0)
+            site.requests = 0
+            started = time.perf_counter()
+            result = await engine.crawl(start_url, max_depth=pages, max_pages=pages)
+            elapsed = time.perf_counter() - started
+            await engine.close()
+            print(
+                f"{concurrency:>11} {len(result.urls):>7} {result.blocked_by_robots:>8} {site.requests:>9} "
+                f"{elapsed:>7.2f}s {len(result.urls) / elapsed:>8.0f}/s"
+            )
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.02
+    levels = [int(level) for level in sys.argv[3].split(",")] if len(sys.argv) > 3 else [1, 4, 8, 16]
+    asyncio.run(run(pages, latency, levels))
+
+
+if __name__ == "__main__":
+    main()
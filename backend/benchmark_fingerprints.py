@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark technology fingerprinting against saved pages.
+
+Runs three detectors over every page and reports pages per second and
+throughput: the previous substring checks (kept here for comparison), the
+signature database with each pattern scanned separately, and the anchored
+single-pass matcher. Pages are read from a directory of saved ``*.html``
+files, each with an optional ``<name>.headers.json`` holding the response
+headers; without a directory a synthetic set is generated.
+
+Usage:
+    python benchmark_fingerprints.py [pages_dir] [rounds]
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent))
+
+from app.services.tech_fingerprint import AHOCORASICK_AVAILABLE, Page, TechnologyFingerprinter
+
+
+def legacy_detect(headers, html):
+    """The per-signature substring checks _detect_technologies used to run."""
+    technologies = []
+    server = headers.get('server', '').lower()
+    if 'nginx' in server:
+        technologies.append('Nginx')
+    elif 'apache' in server:
+        technologies.append('Apache')
+    elif 'iis' in server:
+        technologies.append('IIS')
+    if 'wp-content' in html or 'wordpress' in html.lower():
+        technologies.append('WordPress')
+    elif 'drupal' in html.lower():
+        technologies.append('Drupal')
+    elif 'joomla' in html.lower():
+        technologies.append('Joomla')
+    if 'react' in html.lower() or 'reactjs' in html.lower():
+        technologies.append('React')
+    elif 'vue' in html.lower() or 'vuejs' in html.lower():
+        technologies.append('Vue.js')
+    elif 'angular' in html.lower():
+        technologies.append('Angular')
+    if 'google-analytics' in html or 'ga.js' in html:
+        technologies.append('Google Analytics')
+    elif 'facebook-pixel' in html or 'fbq(' in html:
+        technologies.append('Facebook Pixel')
+    return technologies
+
+
+def per_pattern_detect(database, page):
+    """Every pattern of the database run over the page on its own (no anchor prefilter)."""
+    header_text = "\n".join(f"{name}: {value}" for name, value in page.headers.items())
+    found = set()
+    for pattern in database._patterns:
+        text = header_text if pattern.source.startswith(("header", "cookie")) else page.html
+        if pattern.signature not in found and pattern.regex.search(text):
+            found.add(pattern.signature)
+    return found
+
+
+def load_pages(directory: Path):
+    pages = []
+    for path in sorted(directory.glob("*.html")):
+        headers_path = path.with_suffix(".headers.json")
+        headers = json.loads(headers_path.read_text()) if headers_path.exists() else {}
+        pages.append(Page(
+            url=path.name,
+            html=path.read_text(encoding="utf-8", errors="replace"),
+            headers={name.lower(): value for name, value in headers.items()}
+        ))
+    return pages
+
+
+def synthetic_pages(count: int = 200):
+    filler = "".join(
+        f'<div class="card c{i}"><a href="/articles/{i}">Article {i}</a><p>{"lorem ipsum dolor sit amet " * 8}</p></div>\n'
+        for i in range(400)
+    )
+    heads = [
+        ('nginx/1.25.3', '<meta name="generator" content="WordPress 6.4.2"><link href="/wp-content/themes/t/style.css">'),
+        ('Apache/2.4.58', '<script src="/_next/static/chunks/main.js"></script><script id="__NEXT_DATA__">{}</script>'),
+        ('cloudflare', '<script src="https://code.jquery.com/jquery-3.7.1.min.js"></script>'),
+        ('Microsoft-IIS/10.0', '<input type="hidden" name="__VIEWSTATE" value="x">'),
+    ]
+    pages = []
+    for i in range(count):
+        server, head = heads[i % len(heads)]
+        html = f"<html><head>{head}</head><body>{filler}</body></html>"
+        pages.append(Page(url=f"synthetic-{i}", html=html, headers={"server": server}))
+    return pages
+
+
+def measure(label, pages, rounds, detect):
+    total_bytes = sum(len(page.html) for page in pages) * rounds
+    start = time.perf_counter()
+    found = 0
+    for _ in range(rounds):
+        for page in pages:
+            found += len(detect(page))
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<22} {len(pages) * rounds:>7} {found // rounds:>8} {elapsed:>8.2f}s "
+        f"{len(pages) * rounds / elapsed:>9.0f}/s {total_bytes / elapsed / 1e6:>8.1f} MB/s"
+    )
+
+
+def main():
+    directory = Path(sys.argv[1]) if len(sys.argv) > 1 else None
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    pages = load_pages(directory) if directory else synthetic_pages()
+    if not pages:
+        print(f"No *.html pages in {directory}")
+        return
+
+    fingerprinter = TechnologyFingerprinter()
+    size = sum(len(page.html) for page in pages) / len(pages) / 1024
+    scanner = "Aho-Corasick" if AHOCORASICK_AVAILABLE else "substring search per anchor (install pyahocorasick for one pass)"
+    print(f"{len(pages)} pages, {size:.0f} KiB average, {len(fingerprinter.database)} signatures")
+    print(f"anchor scan: {scanner}\n")
+    print(f"{'detector':<22} {'pages':>7} {'matches':>8} {'time':>9} {'rate':>11} {'throughput':>13}")
+    print("-" * 75)
+    measure("substring checks", pages, rounds, lambda page: legacy_detect(page.headers, page.html))
+    measure("per-pattern scans", pages, rounds, lambda page: per_pattern_detect(fingerprinter.database, page))
+    measure("anchored signatures", pages, rounds, fingerprinter.fingerprint)
+
+
+if __name__ == "__main__":
+    main()
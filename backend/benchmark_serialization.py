@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark serialization of investigation state with each available codec.
+
+Compares the old ``json.dumps(..., default=str)`` path with the codecs in
+app.services.serialization on a state shaped like a finished investigation.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent))
+
+from app.services import serialization
+from app.services.result_store import SearchResults
+from app.services.state import InvestigationStatus, create_initial_state
+
+
+def build_state(results_per_source: int = 200):
+    state = create_initial_state("Benchmark investigation of example.com", "bench-1")
+    state["search_results"] = SearchResults({
+        source: [
+            {
+                "title": f"Result {i}",
+                "url": f"https://{source}.example.com/page/{i}",
+                "snippet": "Lorem ipsum dolor sit amet " * 4,
+                "relevance_score": i / results_per_source,
+                "timestamp": state["initiated_at"],
+            }
+            for i in range(results_per_source)
+        ]
+        for source in ("surface_web", "social_media", "public_records", "dark_web")
+    })
+    state["collection_status"] = {
+        f"node_{i}": InvestigationStatus.COMPLETED for i in range(10)
+    }
+    return state
+
+
+def bench(label: str, fn, rounds: int = 50):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        size = len(fn())
+    elapsed = (time.perf_counter() - start) / rounds * 1000
+    print(f"{label:<28} {elapsed:8.2f} ms/op {size / 1024:10.1f} KiB")
+
+
+def main():
+    state = build_state()
+    print(f"{'codec':<28} {'time':>14} {'size':>14}")
+    print("-" * 58)
+    # The old path stored search results as lists of dicts
+    legacy_state = dict(state, search_results=state["search_results"].materialize())
+    bench("json.dumps(default=str)", lambda: json.dumps(legacy_state, default=str))
+    bench("dumps_text", lambda: serialization.dumps_text(state))
+    for name in ("json", "orjson", "msgpack"):
+        try:
+            serialization.get_codec(name)
+        except RuntimeError:
+            print(f"{name:<28} {'not installed':>14}")
+            continue
+        bench(f"encode[{name}]", lambda name=name: serialization.encode(state, name))
+
+
+if __name__ == "__main__":
+    main()
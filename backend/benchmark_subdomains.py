@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark subdomain enumeration against a local stub DNS server.
+
+Resolves a synthetic wordlist under a plain zone and under a wildcard zone
+and reports candidates per second, hits and wildcard suppression. No real
+DNS traffic is sent.
+
+Usage:
+    python benchmark_subdomains.py [candidates] [concurrency]
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.append(str(Path(__file__).parent))
+
+from app.services.dns_resolver import DNSResolver, StubDNSServer
+from app.services.subdomain_enumerator import SubdomainEnumerator
+
+
+async def run(domain: str, words, server: StubDNSServer, concurrency: int):
+    resolver = DNSResolver([server.address], timeout=2.0, max_inflight=concurrency, cache_size=len(words) + 100)
+    enumerator = SubdomainEnumerator(resolver, concurrency=concurrency)
+    hits = 0
+    async for _ in enumerator.enumerate(domain, words):
+        hits += 1
+    await resolver.close()
+    stats = enumerator.last_stats.to_dict()
+    print(
+        f"{domain:<22} {stats['candidates']:>8} {hits:>6} {stats['wildcard_suppressed']:>10} "
+        f"{stats['failed']:>6} {stats['elapsed']:>8.2f}s {stats['rate']:>10.0f}/s"
+    )
+
+
+async def main():
+    candidates = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+    words = [f"host{i}" for i in range(candidates)]
+
+    async with StubDNSServer() as server:
+        # Roughly 1% of candidates exist in each zone
+        for i in range(0, candidates, 100):
+            server.add(f"host{i}.example.com", "A", f"10.0.{i // 25600 % 256}.{i // 100 % 256}")
+            server.add(f"host{i}.wild.example.com", "A", f"10.1.{i // 25600 % 256}.{i // 100 % 256}")
+        server.add("*.wild.example.com", "A", "203.0.113.1")
+
+        print(f"{'zone':<22} {'queried':>8} {'hits':>6} {'suppressed':>10} {'failed':>6} {'time':>9} {'rate':>12}")
+        print("-" * 79)
+        await run("example.com", words, server, concurrency)
+        await run("wild.example.com", words, server, concurrency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
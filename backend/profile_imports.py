@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Import-time profiler report for API startup.
+
+Runs ``python -X importtime`` on a target module (``app.main`` by default)
+in a fresh interpreter and prints the slowest top-level packages, the
+slowest individual modules, and whether any of the heavy agent/tool stacks
+were loaded eagerly.
+
+Usage:
+    python profile_imports.py [module] [--top N]
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+# Packages that should only load on first use
+HEAVY_PACKAGES = ("langchain", "langchain_core", "langgraph", "playwright", "selenium", "scrapegraph_py", "scrapegraphai")
+
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile(module: str):
+    """Return (module, self_us, cumulative_us, depth) rows from -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=Path(__file__).parent,
+        capture_output=True,
+        text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    if result.returncode != 0:
+        print(f"⚠️  import {module} failed:\n{result.stderr.splitlines()[-1] if result.stderr else ''}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("module", nargs="?", default="app.main")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = profile(args.module)
+    if not rows:
+        print("No import timings collected")
+        return
+
+    total_us = sum(self_us for _, self_us, _, _ in rows)
+    by_package = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+
+    print(f"📦 import {args.module}: {total_us / 1000:.1f} ms, {len(rows)} modules")
+    print("=" * 60)
+
+    print(f"\nSlowest top-level packages (self time):")
+    for package, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:9.1f} ms  {package}")
+
+    print(f"\nSlowest modules (cumulative):")
+    for name, _, cumulative_us, _ in sorted(rows, key=lambda row: row[2], reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:9.1f} ms  {name}")
+
+    eager = sorted({package for package in by_package if package in HEAVY_PACKAGES})
+    print()
+    if eager:
+        print(f"❌ Heavy packages loaded at import time: {', '.join(eager)}")
+    else:
+        print("✅ No heavy agent/tool packages loaded at import time")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,15 +22,42 @@ from app.services.technical_intelligence_service import (
     SSLCertificate,
     gather_technical_intelligence
 )
+from app.services.dns_resolver import DNSAnswer, DNSResponse
+from app.services.ip_intelligence import IPIntelligence
+from app.services.rdap_client import RDAPBootstrap, RDAPClient, WhoisCache
+from app.services.tls_certificates import TLSResult
+
+
+def dns_answer(value, ttl=3600):
+    """side_effect for DNSResolver.query answering every name with one record"""
+    def query(name, record_type="A"):
+        return DNSResponse(name, record_type, "NOERROR", [DNSAnswer(name, record_type, value, ttl)], ttl)
+    return query
+
+
+def isolated_service(tmp_path):
+    """Service whose RDAP cache and IP index live under tmp_path, not backend/data"""
+    service = TechnicalIntelligenceService()
+    # Keep RDAP responses from leaking between tests through the persistent cache
+    service.rdap_client = RDAPClient(
+        cache=WhoisCache(str(tmp_path / "whois_cache.db")),
+        bootstrap=RDAPBootstrap(str(tmp_path / "rdap_bootstrap.json"))
+    )
+    # No local IP dataset: IP analysis goes to the (mocked) remote APIs
+    service.ip_intelligence = IPIntelligence(
+        dataset_path=str(tmp_path / "ip2asn.tsv"),
+        index_path=str(tmp_path / "ip2asn.idx")
+    )
+    return service
 
 
 class TestTechnicalIntelligenceService:
     """Test suite for TechnicalIntelligenceService"""
     
     @pytest.fixture
-    def service(self):
+    def service(self, tmp_path):
         """Create service instance for testing"""
-        return TechnicalIntelligenceService()
+        return isolated_service(tmp_path)
     
     @pytest.fixture
     def mock_session(self):
@@ -186,12 +213,8 @@ class TestTechnicalIntelligenceService:
         """Test DNS record analysis"""
         
         # Mock DNS resolver response
-        with patch('dns.resolver.Resolver.resolve') as mock_resolve:
-            mock_answer = Mock()
-            mock_answer.ttl = 3600
-            mock_answer.__str__ = lambda: "192.0.2.1"
-            
-            mock_resolve.return_value = [mock_answer]
+        with patch('app.services.dns_resolver.DNSResolver.query') as mock_resolve:
+            mock_resolve.side_effect = dns_answer("192.0.2.1", ttl=3600)
             
             async with service:
                 results = await service.analyze_dns_records("example.com", ["A"])
@@ -209,13 +232,11 @@ class TestTechnicalIntelligenceService:
         """Test network infrastructure mapping"""
         
         # Mock DNS resolver for IP resolution
-        with patch('dns.resolver.Resolver.resolve') as mock_resolve, \
+        with patch('app.services.dns_resolver.DNSResolver.query') as mock_resolve, \
              patch('aiohttp.ClientSession.get') as mock_get:
             
             # Mock DNS A record
-            mock_answer = Mock()
-            mock_answer.__str__ = lambda: "192.0.2.1"
-            mock_resolve.return_value = [mock_answer]
+            mock_resolve.side_effect = dns_answer("192.0.2.1", ttl=3600)
             
             # Mock IP info response
             mock_ip_data = {
@@ -258,7 +279,9 @@ class TestTechnicalIntelligenceService:
             }
         ]
         
-        with patch('aiohttp.ClientSession.get') as mock_get:
+        with patch('aiohttp.ClientSession.get') as mock_get, \
+             patch('app.services.tls_certificates.CertificateGrabber.grab') as mock_grab:
+            mock_grab.return_value = TLSResult("example.com", 443, error="offline")
             mock_response = Mock()
             mock_response.status = 200
             mock_response.text = AsyncMock(return_value=json.dumps(mock_cert_data))
@@ -342,14 +365,35 @@ class TestTechnicalIntelligenceService:
                 assert result.latitude == 37.7749
                 assert result.longitude == -122.4194
 
+    @pytest.mark.asyncio
+    async def test_ip_analysis_from_local_index(self, service, tmp_path):
+        """Test IP analysis answered by the local index without remote APIs"""
+        
+        dataset = tmp_path / "ip2asn.tsv"
+        dataset.write_text("192.0.2.0\t192.0.2.255\t12345\tUS\tEXAMPLE-ISP\n")
+        service.ip_intelligence.load()
+        
+        with patch('app.services.dns_resolver.DNSResolver.query') as mock_resolve, \
+             patch('aiohttp.ClientSession.get') as mock_get:
+            mock_resolve.side_effect = dns_answer("host.example.com.", ttl=3600)
+            
+            async with service:
+                result = await service._analyze_ip_address("192.0.2.1")
+                asn_info = await service._get_asn_info("192.0.2.1")
+            
+            assert not mock_get.called
+            assert result.asn == "AS12345"
+            assert result.asn_org == "EXAMPLE-ISP"
+            assert result.country == "US"
+            assert result.hostname == "host.example.com"
+            assert asn_info["as_number"] == 12345
+
     @pytest.mark.asyncio
     async def test_fallback_whois(self, service):
         """Test fallback WHOIS functionality"""
         
-        with patch('dns.resolver.Resolver.resolve') as mock_resolve:
-            mock_ns = Mock()
-            mock_ns.__str__ = lambda: "ns1.example.com"
-            mock_resolve.return_value = [mock_ns]
+        with patch('app.services.dns_resolver.DNSResolver.query') as mock_resolve:
+            mock_resolve.side_effect = dns_answer("ns1.example.com", ttl=3600)
             
             result = await service._fallback_whois("example.com")
             
@@ -363,13 +407,11 @@ class TestTechnicalIntelligenceService:
     async def test_additional_node_discovery(self, service):
         """Test additional network node discovery"""
         
-        with patch('dns.resolver.Resolver.resolve') as mock_resolve, \
+        with patch('app.services.dns_resolver.DNSResolver.query') as mock_resolve, \
              patch.object(service, '_analyze_ip_address') as mock_analyze:
             
             # Mock subdomain resolution
-            mock_ip = Mock()
-            mock_ip.__str__ = lambda: "192.0.2.2"
-            mock_resolve.return_value = [mock_ip]
+            mock_resolve.side_effect = dns_answer("192.0.2.2", ttl=3600)
             
             # Mock IP analysis
             mock_node = NetworkNode(ip_address="192.0.2.2", hostname="www.example.com")
@@ -672,14 +714,14 @@ class TestTechnicalIntelligencePerformance:
     """Performance tests for technical intelligence service"""
     
     @pytest.mark.asyncio
-    async def test_analysis_performance(self):
+    async def test_analysis_performance(self, tmp_path):
         """Test analysis performance benchmarks"""
         
-        service = TechnicalIntelligenceService()
+        service = isolated_service(tmp_path)
         
         # Mock quick responses
         with patch('aiohttp.ClientSession.get') as mock_get, \
-             patch('dns.resolver.Resolver.resolve') as mock_resolve:
+             patch('app.services.dns_resolver.DNSResolver.query') as mock_resolve:
             
             mock_response = Mock()
             mock_response.status = 200
@@ -687,10 +729,7 @@ class TestTechnicalIntelligencePerformance:
             mock_response.text = AsyncMock(return_value="[]")
             mock_get.return_value.__aenter__.return_value = mock_response
             
-            mock_answer = Mock()
-            mock_answer.__str__ = lambda: "192.0.2.1"
-            mock_answer.ttl = 3600
-            mock_resolve.return_value = [mock_answer]
+            mock_resolve.side_effect = dns_answer("192.0.2.1", ttl=3600)
             
             start_time = asyncio.get_event_loop().time()
             
@@ -705,14 +744,14 @@ class TestTechnicalIntelligencePerformance:
             assert duration < 30.0
 
     @pytest.mark.asyncio
-    async def test_concurrent_analysis(self):
+    async def test_concurrent_analysis(self, tmp_path):
         """Test concurrent analysis capability"""
         
-        service = TechnicalIntelligenceService()
+        service = isolated_service(tmp_path)
         
         # Mock responses
         with patch('aiohttp.ClientSession.get') as mock_get, \
-             patch('dns.resolver.Resolver.resolve') as mock_resolve:
+             patch('app.services.dns_resolver.DNSResolver.query') as mock_resolve:
             
             mock_response = Mock()
             mock_response.status = 200
@@ -720,10 +759,7 @@ class TestTechnicalIntelligencePerformance:
             mock_response.text = AsyncMock(return_value="[]")
             mock_get.return_value.__aenter__.return_value = mock_response
             
-            mock_answer = Mock()
-            mock_answer.__str__ = lambda: "192.0.2.1"
-            mock_answer.ttl = 3600
-            mock_resolve.return_value = [mock_answer]
+            mock_resolve.side_effect = dns_answer("192.0.2.1", ttl=3600)
             
             async with service:
                 # Run multiple analyses concurrently
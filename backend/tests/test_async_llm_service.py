@@ -20,7 +20,10 @@ from backend.app.services.async_llm_service import (
     AsyncLLMProvider,
     CircuitBreaker,
     RateLimiter,
+    AdaptiveConcurrencyLimiter,
+    ConcurrencyLimitStore,
     get_async_llm_service,
+    shutdown_async_llm_service,
     async_llm_invoke
 )
 
@@ -105,6 +108,59 @@ class TestRateLimiter:
         # Should have waited some time (though may be very fast in test)
         assert end_time - start_time >= 0
 
+class TestAdaptiveConcurrencyLimiter:
+    """Test adaptive concurrency limit functionality."""
+    
+    @pytest.mark.asyncio
+    async def test_limit_grows_while_latency_stable(self):
+        """Test limit increases when saturated with stable latency."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=8)
+        
+        async def request():
+            async with limiter:
+                await asyncio.sleep(0.001)
+                limiter.on_success(0.01)
+        
+        for _ in range(20):
+            await asyncio.gather(*[request() for _ in range(10)])
+        
+        assert limiter.current_limit == 8
+        assert limiter.in_flight == 0
+    
+    def test_limit_backs_off_on_throttle(self):
+        """Test multiplicative decrease on 429 responses."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+        limiter.on_throttle()
+        assert limiter.current_limit == 4
+        
+        for _ in range(10):
+            limiter.on_throttle()
+        assert limiter.current_limit == limiter.min_limit
+    
+    def test_limit_backs_off_on_latency_inflation(self):
+        """Test limit decreases when latency inflates past tolerance."""
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=10)
+        limiter.on_success(0.1)
+        for _ in range(20):
+            limiter.on_success(1.0)
+        assert limiter.current_limit < 10
+    
+    def test_limits_persist(self, tmp_path):
+        """Test limits survive a save/restore round trip."""
+        store = ConcurrencyLimitStore(str(tmp_path / "limits.json"))
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=12, max_limit=32)
+        store.save({"custom": limiter.snapshot()})
+        
+        restored = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=32)
+        restored.restore(store.load()["custom"])
+        assert restored.current_limit == 12
+    
+    def test_failed_save_leaves_no_partial_file(self, tmp_path):
+        """Test that a save that fails mid-write removes its temporary file."""
+        store = ConcurrencyLimitStore(str(tmp_path / "limits.json"))
+        assert store.save({"custom": {"limit": object()}}) == False
+        assert list(tmp_path.iterdir()) == []
+
 class TestAsyncLLMProvider:
     """Test async LLM provider functionality."""
     
@@ -145,18 +201,18 @@ class TestAsyncLLMService:
     """Test async LLM service functionality."""
     
     @pytest.mark.asyncio
-    async def test_service_initialization(self):
+    async def test_service_initialization(self, tmp_path):
         """Test service initializes with providers."""
         with patch('backend.app.services.async_llm_service.settings'):
-            service = AsyncLLMService()
+            service = AsyncLLMService(limit_store=ConcurrencyLimitStore(str(tmp_path / "limits.json")))
             assert len(service.providers) > 0
             assert service._shutdown == False
     
     @pytest.mark.asyncio
-    async def test_service_start_stop(self):
+    async def test_service_start_stop(self, tmp_path):
         """Test service start and stop."""
         with patch('backend.app.services.async_llm_service.settings'):
-            service = AsyncLLMService()
+            service = AsyncLLMService(limit_store=ConcurrencyLimitStore(str(tmp_path / "limits.json")))
             
             # Start service
             await service.start()
@@ -169,10 +225,10 @@ class TestAsyncLLMService:
             assert len(service.worker_tasks) == 0
     
     @pytest.mark.asyncio
-    async def test_invoke_basic(self):
+    async def test_invoke_basic(self, tmp_path):
         """Test basic LLM invocation."""
         with patch('backend.app.services.async_llm_service.settings'):
-            service = AsyncLLMService()
+            service = AsyncLLMService(limit_store=ConcurrencyLimitStore(str(tmp_path / "limits.json")))
             await service.start()
             
             # Mock provider response
@@ -189,10 +245,10 @@ class TestAsyncLLMService:
                 await service.stop()
     
     @pytest.mark.asyncio
-    async def test_get_health_status(self):
+    async def test_get_health_status(self, tmp_path):
         """Test health status reporting."""
         with patch('backend.app.services.async_llm_service.settings'):
-            service = AsyncLLMService()
+            service = AsyncLLMService(limit_store=ConcurrencyLimitStore(str(tmp_path / "limits.json")))
             
             # Mock provider health
             for provider in service.providers.values():
@@ -265,16 +321,22 @@ class TestGlobalServiceFunctions:
     """Test global service convenience functions."""
     
     @pytest.mark.asyncio
-    async def test_get_async_llm_service(self):
+    async def test_get_async_llm_service(self, tmp_path):
         """Test global service getter."""
-        with patch('backend.app.services.async_llm_service.settings'):
+        import backend.app.services.async_llm_service as service_module
+        store = ConcurrencyLimitStore(str(tmp_path / "limits.json"))
+        with patch('backend.app.services.async_llm_service.settings'), \
+             patch.object(service_module, 'ConcurrencyLimitStore', return_value=store):
             # Reset global instance
-            import backend.app.services.async_llm_service as service_module
             service_module._async_llm_service = None
             
             service = await get_async_llm_service()
-            assert service is not None
-            assert isinstance(service, AsyncLLMService)
+            try:
+                assert service is not None
+                assert isinstance(service, AsyncLLMService)
+                assert service.limit_store is store
+            finally:
+                await shutdown_async_llm_service()
     
     @pytest.mark.asyncio
     async def test_async_llm_invoke_convenience(self):
@@ -294,10 +356,10 @@ class TestLLMServiceIntegration:
     """Integration tests for LLM service."""
     
     @pytest.mark.asyncio
-    async def test_service_with_real_mock(self):
+    async def test_service_with_real_mock(self, tmp_path):
         """Test service with more realistic mocking."""
         with patch('backend.app.services.async_llm_service.settings'):
-            service = AsyncLLMService()
+            service = AsyncLLMService(limit_store=ConcurrencyLimitStore(str(tmp_path / "limits.json")))
             await service.start()
             
             try:
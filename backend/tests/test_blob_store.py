@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from app.services.blob_store import (
+    BlobBackend,
+    BlobStore,
+    FilesystemBlobBackend,
+    InMemoryBlobBackend,
+    is_blob_ref
+)
+
+
+def _page(seed: str) -> str:
+    return (f"{seed} " * 2000).strip()
+
+
+class TestBlobStore:
+    """Test cases for the content-addressed blob store."""
+
+    def test_offload_replaces_large_fields_with_refs(self):
+        """Test that state keeps small references and agents can resolve them."""
+        store = BlobStore(InMemoryBlobBackend(), min_size=1024)
+        results = {
+            "surface_web": [
+                {"url": "https://a.example", "snippet": "short", "content": _page("alpha")},
+                {"url": "https://b.example", "content": "tiny page"},
+            ]
+        }
+        original_size = len(json.dumps(results))
+
+        store.offload(results)
+
+        first = results["surface_web"][0]
+        assert is_blob_ref(first["content"])
+        assert results["surface_web"][1]["content"] == "tiny page"
+        assert len(json.dumps(results)) < original_size / 20
+        assert store.resolve(first["content"]) == _page("alpha")
+        assert store.hydrate(results)["surface_web"][0]["content"] == _page("alpha")
+
+    def test_identical_content_is_stored_once(self):
+        """Test deduplication across investigations."""
+        backend = InMemoryBlobBackend()
+        store = BlobStore(backend, min_size=10)
+        first = store.offload({"content": _page("same")})
+        second = store.offload({"content": _page("same")})
+
+        assert first["content"] == second["content"]
+        assert len(backend.blobs) == 1
+        assert store.get_stats()["dedup_hits"] == 1
+
+    def test_filesystem_backend_reads_ranges(self, tmp_path):
+        """Test that the filesystem backend persists blobs and serves slices."""
+        store = BlobStore(FilesystemBlobBackend(tmp_path), min_size=10)
+        ref = store.put(_page("gamma"))
+
+        reopened = BlobStore(FilesystemBlobBackend(tmp_path))
+        assert reopened.read_text(ref) == _page("gamma")
+        assert reopened.read_text(ref, max_bytes=5) == "gamma"
+        assert store.put(b"").length == 0
+        assert reopened.read_bytes(store.put(b"")) == b""
+
+    def test_min_size_counts_bytes(self):
+        """Test that the offload threshold is measured in UTF-8 bytes, not characters."""
+        store = BlobStore(InMemoryBlobBackend(), min_size=1024)
+        results = {"cyrillic": {"content": "ж" * 600}, "ascii": {"content": "a" * 600}}
+
+        store.offload(results)
+
+        assert is_blob_ref(results["cyrillic"]["content"])
+        assert results["cyrillic"]["content"]["length"] == 1200
+        assert results["ascii"]["content"] == "a" * 600
+
+    @pytest.mark.asyncio
+    async def test_hydrate_async_reads_off_the_event_loop(self):
+        """Test that async hydration reads blobs in a worker thread."""
+        readers = []
+
+        class RecordingBackend(InMemoryBlobBackend):
+            def read(self, digest, start=0, end=None):
+                readers.append(threading.get_ident())
+                return super().read(digest, start, end)
+
+        store = BlobStore(RecordingBackend(), min_size=10)
+        results = store.offload({"web": [{"content": _page("delta")}]})
+
+        hydrated = await store.hydrate_async(results)
+
+        assert hydrated["web"][0]["content"] == _page("delta")
+        assert readers and threading.get_ident() not in readers
+
+    def test_sweep_bounds_age_and_size(self, tmp_path):
+        """Test that the sweep drops stale blobs, then the least recently used."""
+        backend = FilesystemBlobBackend(tmp_path)
+        store = BlobStore(backend, max_bytes=1500, max_age=3600)
+        stale, old, recent = store.put("s" * 1000), store.put("o" * 1000), store.put("r" * 1000)
+        now = time.time()
+        os.utime(backend._path(stale.digest), (now - 7200, now - 7200))
+        os.utime(backend._path(old.digest), (now - 60, now - 60))
+        os.utime(backend._path(recent.digest), (now - 60, now - 60))
+        # A dedup hit counts as use
+        store.put("r" * 1000)
+
+        assert store.sweep(now) == 2
+        assert [info.digest for info in backend.entries()] == [recent.digest]
+        assert store.hydrate({"content": old.to_dict()}) == {"content": ""}
+
+    def test_backends_must_implement_the_interface(self):
+        """Test that an incomplete backend cannot be instantiated."""
+        class ReadOnly(BlobBackend):
+            def exists(self, digest):
+                return False
+
+        with pytest.raises(TypeError):
+            ReadOnly()
@@ -0,0 +1,84 @@
+import pytest
+
+from app.services.connection_registry import ConnectionRegistry
+
+
+class RecordingStore:
+    """Connection store double that records batch calls."""
+
+    def __init__(self, fail: bool = False):
+        self.upserts = []
+        self.deletes = []
+        self.fail = fail
+
+    async def store_websocket_connections_batch(self, connections):
+        if self.fail:
+            return False
+        self.upserts.append([conn_id for conn_id, _, _ in connections])
+        return True
+
+    async def remove_websocket_connections_batch(self, connection_ids):
+        if self.fail:
+            return False
+        self.deletes.append(list(connection_ids))
+        return True
+
+
+class TestConnectionRegistry:
+    """Test cases for the write-behind WebSocket connection registry."""
+
+    def test_pipeline_index(self):
+        """Test lookups by pipeline through the secondary index."""
+        registry = ConnectionRegistry()
+        registry.register("a", "p1", {})
+        registry.register("b", "p1", {})
+        registry.register("c", "p2", {})
+        registry.unregister("a")
+
+        assert [c["connection_id"] for c in registry.for_pipeline("p1")] == ["b"]
+        assert registry.count("p2") == 1
+        registry.unregister("c")
+        assert "p2" not in registry.by_pipeline
+
+    @pytest.mark.asyncio
+    async def test_storm_is_persisted_in_batches(self):
+        """Test that many connects become a few batched writes."""
+        store = RecordingStore()
+        registry = ConnectionRegistry(store=store, flush_interval=60, batch_size=100)
+        for i in range(250):
+            registry.register(f"c{i}", "p1", {"n": i})
+
+        assert store.upserts == []  # nothing written synchronously
+        await registry.close()
+
+        assert [len(batch) for batch in store.upserts] == [100, 100, 50]
+
+    @pytest.mark.asyncio
+    async def test_short_lived_connections_never_hit_store(self):
+        """Test that connect+disconnect before a flush collapses to nothing."""
+        store = RecordingStore()
+        registry = ConnectionRegistry(store=store, flush_interval=60)
+        registry.register("a", "p1", {})
+        registry.unregister("a")
+        await registry.flush()
+
+        assert store.upserts == [] and store.deletes == []
+
+        registry.register("b", "p1", {})
+        await registry.flush()
+        registry.unregister("b")
+        await registry.close()
+        assert store.deletes == [["b"]]
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_is_retried(self):
+        """Test that pending writes survive a store failure."""
+        store = RecordingStore(fail=True)
+        registry = ConnectionRegistry(store=store, flush_interval=60)
+        registry.register("a", "p1", {})
+
+        assert await registry.flush() is False
+        store.fail = False
+        assert await registry.flush() is True
+        assert store.upserts == [["a"]]
+        await registry.close()
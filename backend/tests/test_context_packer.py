@@ -0,0 +1,106 @@
+import json
+from unittest.mock import patch
+
+from app.agents.base import context_packer
+from app.agents.base.context_packer import (
+    ContextPacker,
+    TokenCounter,
+    compact_json,
+    get_context_budget,
+    DEFAULT_CONTEXT_BUDGET
+)
+
+
+def _packer(budget: int) -> ContextPacker:
+    """Packer with the length-based counter, so results don't depend on tiktoken downloads."""
+    return ContextPacker(budget=budget, counter=TokenCounter(use_tiktoken=False))
+
+
+class TestContextPacker:
+    """Test cases for token-budget-aware agent context packing."""
+
+    def _input(self, count: int = 50):
+        return {
+            "task_type": "data_fusion",
+            "user_request": "investigate acme corp executives",
+            "search_results": {
+                "surface_web": [
+                    {
+                        "url": f"https://site{i}.example",
+                        "content": ("acme corp board " if i % 5 == 0 else "unrelated weather ") * 300,
+                        "relevance_score": 0.5
+                    }
+                    for i in range(count)
+                ]
+            }
+        }
+
+    def test_small_input_is_compact_and_untouched(self):
+        """Test that inputs under budget are only compacted."""
+        data = {"task_type": "general", "user_request": "example"}
+        packed = _packer(1000).pack(data)
+
+        assert packed.text == compact_json(data)
+        assert "\n" not in packed.text
+        assert json.loads(packed.text) == data
+        assert packed.items_dropped == 0
+
+    def test_large_input_fits_budget(self):
+        """Test that oversized evidence is trimmed to fit the budget."""
+        packed = _packer(2000).pack(self._input())
+
+        assert packed.original_token_count > 2000
+        assert packed.token_count <= 2000
+        assert packed.items_kept < packed.items_total
+        assert packed.truncated_fields > 0
+
+    def test_relevant_evidence_ranked_first(self):
+        """Test that evidence matching the request survives truncation."""
+        packed = _packer(2000).pack(self._input())
+        kept = json.loads(packed.text)["search_results"]["surface_web"]
+
+        assert kept
+        assert all("acme" in item["content"] for item in kept)
+
+    def test_non_evidence_fields_are_kept(self):
+        """Test that request and task metadata are never dropped."""
+        packed = _packer(500).pack(self._input())
+        data = json.loads(packed.text)
+
+        assert data["task_type"] == "data_fusion"
+        assert data["user_request"] == "investigate acme corp executives"
+
+    def test_prompt_stats(self):
+        """Test that prompt size stats are reported."""
+        stats = _packer(2000).pack(self._input()).to_stats()
+
+        assert stats["prompt_tokens"] <= stats["budget_tokens"]
+        assert stats["original_tokens"] > stats["prompt_tokens"]
+        assert stats["prompt_chars"] > 0
+
+    def test_model_budget_lookup(self):
+        """Test per-model budget resolution including tagged variants."""
+        assert get_context_budget("gpt-4-turbo") == get_context_budget("gpt-4-turbo-2024-04-09")
+        assert get_context_budget("unknown-model") == DEFAULT_CONTEXT_BUDGET
+        assert get_context_budget(None) == DEFAULT_CONTEXT_BUDGET
+
+    def test_token_counter(self):
+        """Test that the local token counter is monotonic in text length."""
+        counter = TokenCounter()
+        assert counter.count("") == 0
+        assert counter.count("a" * 400) > counter.count("a" * 40)
+
+    def test_token_counter_falls_back_offline(self):
+        """Test that a failing tiktoken encoding download falls back to the estimate."""
+        class OfflineTiktoken:
+            def encoding_for_model(self, model):
+                raise KeyError(model)
+
+            def get_encoding(self, name):
+                raise ConnectionError("network unreachable")
+
+        with patch.object(context_packer, "TIKTOKEN_AVAILABLE", True), \
+                patch.object(context_packer, "tiktoken", OfflineTiktoken(), create=True):
+            counter = TokenCounter("unknown-model")
+
+        assert counter.count("a" * 400) == 100
@@ -0,0 +1,177 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.services.crawler import BloomFilter, CrawlEngine, normalize_url
+
+ROBOTS = "User-agent: *\nDisallow: /private/\n"
+
+
+class FakeSite:
+    """Mock transport serving a small linked site; records (path, time) per request."""
+
+    def __init__(self, robots=ROBOTS, delay=0.0):
+        self.robots = robots
+        self.delay = delay
+        self.requests = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.requests.append((path, time.monotonic()))
+        await asyncio.sleep(self.delay)
+        if path == "/robots.txt":
+            return httpx.Response(200, text=self.robots) if self.robots is not None else httpx.Response(404)
+        if path == "/":
+            return self.html(
+                "Home",
+                '<a href="/a">A</a><a href="/b#top">B</a><a href="https://EXAMPLE.com:443/a">A again</a>'
+                '<a href="/private/x">P</a><a href="/report.pdf">PDF</a><a href="https://other.example/">Off</a>'
+                '<a rel="nofollow" href="/nofollow">N</a>'
+            )
+        if path in ("/a", "/b"):
+            return self.html(path, '<a href="/">Home</a><a href="/c">C</a>')
+        if path == "/c":
+            return self.html("C", '<a href="/d">D</a>')
+        return httpx.Response(404)
+
+    @staticmethod
+    def html(title, body):
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/html; charset=utf-8"},
+            text=f"<html><head><title>{title}</title></head><body>{body}</body></html>"
+        )
+
+    def paths(self):
+        return [path for path, _ in self.requests]
+
+
+def make_engine(site, **kwargs):
+    kwargs.setdefault("delay", 0.0)
+    return CrawlEngine(transport=httpx.MockTransport(site), **kwargs)
+
+
+class TestCrawlEngine:
+    """Test cases for the crawl engine."""
+
+    def test_bloom_filter(self):
+        """Test that added items are always found and the false-positive rate stays low."""
+        seen = BloomFilter(capacity=5000, error_rate=0.01)
+        added = sum(seen.add(f"https://example.com/{i}") for i in range(5000))
+        assert added > 4900
+        assert not seen.add("https://example.com/42")
+        assert all(f"https://example.com/{i}" in seen for i in range(5000))
+
+        false_positives = sum(f"https://other.example/{i}" in seen for i in range(5000))
+        assert false_positives < 150
+        assert len(seen) == added and seen.nbytes < 8000
+
+    def test_normalize_url(self):
+        """Test URL canonicalisation used for de-duplication."""
+        assert normalize_url("HTTP://Example.COM:80#x") == "http://example.com/"
+        assert normalize_url("https://example.com:8443/a?q=1") == "https://example.com:8443/a?q=1"
+        assert normalize_url("mailto:someone@example.com") is None
+
+    @pytest.mark.asyncio
+    async def test_crawl_depth_dedup_and_robots(self):
+        """Test that each page is fetched once, within depth, scope and robots.txt."""
+        site = FakeSite()
+        engine = make_engine(site)
+
+        result = await engine.crawl("https://example.com/", max_depth=2, max_pages=20)
+
+        assert sorted(result.urls) == [
+            "https://example.com/", "https://example.com/a", "https://example.com/b", "https://example.com/c"
+        ]
+        assert result.pages[0].title == "Home" and result.pages[0].depth == 0
+        assert result.blocked_by_robots == 1
+        # /d is three links away; robots.txt is fetched once; no page is fetched twice
+        assert "/d" not in site.paths() and "/private/x" not in site.paths()
+        assert site.paths().count("/robots.txt") == 1
+        assert len(site.paths()) == len(set(site.paths()))
+
+    @pytest.mark.asyncio
+    async def test_page_budget_and_politeness(self):
+        """Test the page budget and the minimum gap between requests to one host."""
+        site = FakeSite()
+        engine = make_engine(site, concurrency=8, per_host=4, delay=0.05)
+
+        result = await engine.crawl("https://example.com/", max_depth=3, max_pages=3)
+
+        assert len(result.pages) == 3
+        starts = [at for path, at in site.requests if path != "/robots.txt"]
+        gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+        assert all(gap >= 0.045 for gap in gaps)
+
+    @pytest.mark.asyncio
+    async def test_unreachable_robots_and_errors(self):
+        """Test that a missing robots.txt allows crawling and fetch errors are recorded."""
+        async def handler(request):
+            if request.url.path == "/":
+                return FakeSite.html("Home", '<a href="/down">Down</a>')
+            if request.url.path == "/down":
+                raise httpx.ConnectError("connection refused", request=request)
+            return httpx.Response(404)
+
+        engine = CrawlEngine(transport=httpx.MockTransport(handler), delay=0.0)
+
+        result = await engine.crawl("example.com", max_depth=1, max_pages=5)
+
+        assert result.urls == ["https://example.com/"]
+        assert "refused" in result.pages[1].error
+        assert engine.get_stats()["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_redirects_are_checked_like_links(self):
+        """Test that same-host redirects are crawled and off-site redirects are not followed."""
+        requested = []
+
+        async def handler(request):
+            requested.append(str(request.url))
+            if request.url.path == "/":
+                return FakeSite.html("Home", '<a href="/moved">Moved</a><a href="/away">Away</a>')
+            if request.url.path == "/moved":
+                return httpx.Response(301, headers={"location": "/new"})
+            if request.url.path == "/away":
+                return httpx.Response(302, headers={"location": "https://other.example/landing"})
+            if request.url.path == "/new":
+                return FakeSite.html("New", "")
+            return httpx.Response(404)
+
+        engine = CrawlEngine(transport=httpx.MockTransport(handler), delay=0.0)
+
+        result = await engine.crawl("https://example.com/", max_depth=1, max_pages=3)
+
+        assert sorted(result.urls) == ["https://example.com/", "https://example.com/new"]
+        redirects = {page.url: page.redirect for page in result.pages if page.redirect}
+        assert redirects["https://example.com/away"] == "https://other.example/landing"
+        assert not any("other.example" in url for url in requested)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_crawls_share_host_politeness(self):
+        """Test that two crawls of one host at the same time are spaced as one."""
+        site = FakeSite()
+        engine = make_engine(site, per_host=1, delay=0.05)
+
+        first, second = await asyncio.gather(
+            engine.crawl("https://example.com/a", max_depth=0, max_pages=1),
+            engine.crawl("https://example.com/b", max_depth=0, max_pages=1)
+        )
+
+        assert first.urls == ["https://example.com/a"] and second.urls == ["https://example.com/b"]
+        starts = sorted(at for path, at in site.requests if path != "/robots.txt")
+        assert starts[1] - starts[0] >= 0.045
+
+    @pytest.mark.asyncio
+    async def test_keep_html_documents(self):
+        """Test that crawled bodies are kept for extraction only when asked for."""
+        engine = make_engine(FakeSite())
+
+        kept = await engine.crawl("https://example.com/", max_depth=0, max_pages=1, keep_html=True)
+        dropped = await engine.crawl("https://example.com/", max_depth=0, max_pages=1)
+
+        assert [url for url, _ in kept.documents] == ["https://example.com/"]
+        assert "<title>Home</title>" in kept.documents[0][1]
+        assert dropped.documents == [] and "html" not in kept.pages[0].to_dict()
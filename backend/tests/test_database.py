@@ -0,0 +1,59 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.services.database import SerializedStaticPool
+
+
+def make_engine():
+    return create_engine("sqlite://", poolclass=SerializedStaticPool, connect_args={"check_same_thread": False})
+
+
+class TestSharedSQLiteConnection:
+    """Test cases for sharing the StaticPool SQLite connection across threads."""
+
+    def test_threads_take_turns_on_the_connection(self):
+        """Test that sessions in several threads never use the connection at once."""
+        Session = sessionmaker(bind=make_engine())
+        with Session() as db:
+            db.execute(text("CREATE TABLE rows (id INTEGER PRIMARY KEY, writer INTEGER)"))
+            db.commit()
+
+        active, overlaps = [], []
+        guard = threading.Lock()
+
+        def write(writer):
+            for _ in range(20):
+                with Session() as db:
+                    # The connection is checked out from the first execute until commit
+                    db.execute(text("INSERT INTO rows (writer) VALUES (:writer)"), {"writer": writer})
+                    with guard:
+                        active.append(writer)
+                        overlaps.append(len(active))
+                    db.execute(text("SELECT COUNT(*) FROM rows"))
+                    with guard:
+                        active.remove(writer)
+                    db.commit()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(write, range(8)))
+
+        with Session() as db:
+            assert db.execute(text("SELECT COUNT(*) FROM rows")).scalar() == 160
+        assert max(overlaps) == 1
+
+    def test_nested_sessions_on_one_thread(self):
+        """Test that the lock is reentrant for nested sessions."""
+        engine = make_engine()
+        Session = sessionmaker(bind=engine)
+
+        with Session() as outer:
+            outer.execute(text("SELECT 1"))
+            with Session() as inner:
+                assert inner.execute(text("SELECT 2")).scalar() == 2
+
+        # Released once every session returned the connection
+        assert engine.pool._use_lock.acquire(blocking=False)
+        engine.pool._use_lock.release()
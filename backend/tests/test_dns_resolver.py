@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from app.services.dns_resolver import DNSResolver, StubDNSServer, build_query, parse_response
+
+
+def make_server(**kwargs):
+    server = StubDNSServer(**kwargs)
+    server.add("example.com", "A", "93.184.216.34", ttl=300)
+    server.add("example.com", "AAAA", "2606:2800:220:1:248:1893:25c8:1946")
+    server.add("example.com", "MX", "10 mail.example.com")
+    server.add("example.com", "NS", "ns1.example.com")
+    server.add("example.com", "TXT", "v=spf1 -all")
+    server.add("_sip._tcp.example.com", "SRV", "5 0 5060 sip.example.com")
+    server.add("*.wild.example.com", "A", "10.0.0.1")
+    return server
+
+
+class TestDNSResolver:
+    """Test cases for the async DNS resolver against a local stub server."""
+
+    @pytest.mark.asyncio
+    async def test_multi_type_lookup(self):
+        """Test that record types are decoded and queried together."""
+        async with make_server() as server:
+            resolver = DNSResolver([server.address], timeout=1.0)
+
+            records = await resolver.resolve_many("example.com", ["A", "AAAA", "MX", "NS", "TXT"])
+            srv = await resolver.resolve("_sip._tcp.example.com", "SRV")
+            await resolver.close()
+
+        assert records["A"][0].value == "93.184.216.34"
+        assert records["A"][0].ttl == 300
+        assert records["AAAA"][0].value == "2606:2800:220:1:248:1893:25c8:1946"
+        assert (records["MX"][0].value, records["MX"][0].priority) == ("mail.example.com", 10)
+        assert records["NS"][0].value == "ns1.example.com"
+        assert records["TXT"][0].value == "v=spf1 -all"
+        assert (srv[0].value, srv[0].priority) == ("sip.example.com:5060", 5)
+
+    @pytest.mark.asyncio
+    async def test_positive_and_negative_caching(self):
+        """Test that answers and NXDOMAIN are cached, using the SOA negative TTL."""
+        async with make_server(negative_ttl=30) as server:
+            resolver = DNSResolver([server.address], timeout=1.0)
+
+            first = await resolver.query("example.com")
+            missing = await resolver.query("nope.example.com")
+            await resolver.query("EXAMPLE.com.")
+            await resolver.query("nope.example.com")
+            await resolver.close()
+
+        assert first.exists and not missing.exists
+        assert missing.rcode == "NXDOMAIN"
+        assert missing.ttl == 30
+        assert server.queries == 2
+        assert resolver.get_stats()["cache_hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_wildcard_and_concurrent_coalescing(self):
+        """Test that identical concurrent queries share one request."""
+        async with make_server(delay=0.05) as server:
+            resolver = DNSResolver([server.address], timeout=1.0, max_inflight=4)
+
+            results = await asyncio.gather(*(resolver.query("anything.wild.example.com") for _ in range(20)))
+            await resolver.close()
+
+        assert all(result.values == ["10.0.0.1"] for result in results)
+        assert server.queries == 1
+        assert resolver.get_stats()["coalesced"] == 19
+
+    @pytest.mark.asyncio
+    async def test_timeout_is_not_cached(self):
+        """Test that an unreachable nameserver yields TIMEOUT without blocking."""
+        async with make_server(delay=1.0) as server:
+            resolver = DNSResolver([server.address], timeout=0.05, attempts=1)
+
+            response = await resolver.query("example.com")
+            await resolver.close()
+
+        assert response.rcode == "TIMEOUT"
+        assert len(resolver.cache) == 0
+
+    def test_wire_format_round_trip(self):
+        """Test that a query parses back with its id and question."""
+        parsed = parse_response(build_query(4242, "Example.COM", "MX"))
+
+        assert parsed["id"] == 4242
+        assert parsed["question"] == ("example.com", "MX")
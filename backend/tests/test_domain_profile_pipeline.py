@@ -0,0 +1,113 @@
+import asyncio
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.domain_profile_pipeline import DomainProfilePipeline
+
+
+@dataclass
+class Node:
+    ip_address: str
+    hostname: str = ""
+    asn: str = ""
+
+
+class FakeService:
+    """Stands in for TechnicalIntelligenceService with instant lookups."""
+
+    def __init__(self, addresses):
+        self.addresses = addresses
+        self.ip_calls = []
+        self.active = 0
+        self.max_active = 0
+        self.certificate_grabber = SimpleNamespace(grab=self._grab)
+
+    async def analyze_dns_records(self, domain, record_types):
+        return [SimpleNamespace(record_type="A", value=ip) for ip in self.addresses.get(domain, [])]
+
+    async def _analyze_ip_address(self, ip):
+        self.ip_calls.append(ip)
+        await asyncio.sleep(0.01)
+        return Node(ip, asn="AS64500")
+
+    async def perform_whois_lookup(self, domain):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if domain == "broken.example":
+            raise RuntimeError("registry unavailable")
+        return {"domain": domain}
+
+    async def _grab(self, domain):
+        return SimpleNamespace(leaf=None, error="offline")
+
+
+class TestDomainProfilePipeline:
+    """Test cases for bulk domain profiling."""
+
+    @pytest.mark.asyncio
+    async def test_profiles_stream_with_shared_ip_lookups(self):
+        """Test that every domain is profiled and shared IPs are looked up once."""
+        service = FakeService({
+            "a.example": ["192.0.2.1"],
+            "b.example": ["192.0.2.1"],
+            "c.example": ["192.0.2.2", "192.0.2.1"],
+        })
+        pipeline = DomainProfilePipeline(service, stages=["dns", "network", "whois"], workers={"whois": 2})
+
+        profiles = {profile.domain: profile async for profile in pipeline.run(["a.example", "B.example.", "c.example", "a.example"])}
+
+        assert sorted(profiles) == ["a.example", "b.example", "c.example"]
+        assert sorted(service.ip_calls) == ["192.0.2.1", "192.0.2.2"]
+        assert [node.hostname for node in profiles["c.example"].network_nodes] == ["c.example", "c.example"]
+        assert profiles["a.example"].whois == {"domain": "a.example"}
+        assert pipeline.stats["ip_lookups_shared"] == 2
+
+    @pytest.mark.asyncio
+    async def test_stage_errors_and_worker_pools(self):
+        """Test that stage failures are recorded per domain and pools bound concurrency."""
+        domains = [f"d{i}.example" for i in range(20)] + ["broken.example"]
+        service = FakeService({})
+        pipeline = DomainProfilePipeline(service, workers={"whois": 3})
+
+        profiles = await pipeline.run_all(domains)
+
+        assert len(profiles) == 21
+        broken = next(profile for profile in profiles if profile.domain == "broken.example")
+        assert broken.errors["whois"] == "registry unavailable"
+        assert all(profile.errors.get("tls") == "offline" for profile in profiles)
+        assert service.max_active == 3
+
+    def test_unknown_stage_is_rejected(self):
+        """Test that a typo in the stage list fails fast."""
+        with pytest.raises(ValueError):
+            DomainProfilePipeline(FakeService({}), stages=["dns", "whos"])
+
+    @pytest.mark.asyncio
+    async def test_bad_input_is_raised_not_hung(self):
+        """Test that a failing domain source or entry ends the run with its error."""
+        def domains():
+            yield "a.example"
+            raise RuntimeError("source went away")
+
+        pipeline = DomainProfilePipeline(FakeService({}), stages=["whois"])
+        with pytest.raises(RuntimeError, match="source went away"):
+            await asyncio.wait_for(pipeline.run_all(domains()), 2)
+
+        pipeline = DomainProfilePipeline(FakeService({}), stages=["whois"])
+        with pytest.raises(AttributeError):
+            await asyncio.wait_for(pipeline.run_all(["a.example", None]), 2)
+
+    @pytest.mark.asyncio
+    async def test_network_stage_adds_dns(self):
+        """Test that selecting the network stage alone still resolves addresses first."""
+        service = FakeService({"a.example": ["192.0.2.1"]})
+        pipeline = DomainProfilePipeline(service, stages=["network"])
+
+        profiles = await pipeline.run_all(["a.example"])
+
+        assert pipeline.stages == ["dns", "network"]
+        assert [node.ip_address for node in profiles[0].network_nodes] == ["192.0.2.1"]
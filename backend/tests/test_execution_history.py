@@ -0,0 +1,66 @@
+from datetime import datetime
+
+from app.agents.base.execution_history import (
+    ExecutionHistory,
+    ExecutionRecord,
+    JsonlSpillHandler,
+    LatencySketch
+)
+
+
+def _record(success: bool = True, execution_time: float = 1.0) -> ExecutionRecord:
+    return ExecutionRecord(
+        timestamp=datetime.utcnow(),
+        success=success,
+        execution_time=execution_time
+    )
+
+
+class TestExecutionHistory:
+    """Test cases for the bounded agent execution history."""
+
+    def test_buffer_is_bounded(self):
+        """Test that only the most recent records are retained."""
+        history = ExecutionHistory(max_records=5)
+        for i in range(50):
+            history.append(_record(execution_time=float(i)))
+
+        assert len(history) == 5
+        assert history[-1].execution_time == 49.0
+        assert [r.execution_time for r in history.recent(2)] == [48.0, 49.0]
+
+    def test_aggregates_cover_lifetime(self):
+        """Test that aggregates include evicted records."""
+        history = ExecutionHistory(max_records=3)
+        for i in range(10):
+            history.append(_record(success=i % 2 == 0, execution_time=2.0))
+
+        summary = history.summary()
+        assert summary["execution_count"] == 10
+        assert summary["success_rate"] == 0.5
+        assert summary["average_execution_time"] == 2.0
+
+    def test_latency_percentiles(self):
+        """Test streaming percentiles stay within the sketch accuracy."""
+        sketch = LatencySketch(relative_accuracy=0.01)
+        for i in range(1, 1001):
+            sketch.add(i / 100)
+
+        assert abs(sketch.quantile(0.5) - 5.0) / 5.0 < 0.03
+        assert abs(sketch.quantile(0.99) - 9.9) / 9.9 < 0.03
+
+    def test_error_messages_are_truncated(self):
+        """Test that compact records cap error message size."""
+        record = ExecutionRecord(datetime.utcnow(), False, 0.1, error_message="x" * 10000)
+        assert len(record.error_message) <= 300
+
+    def test_spill_evicted_records(self, tmp_path):
+        """Test that evicted records are spilled to the JSONL handler."""
+        path = tmp_path / "history.jsonl"
+        history = ExecutionHistory(max_records=2, spill_handler=JsonlSpillHandler(str(path), "agent-1"))
+        for _ in range(5):
+            history.append(_record())
+
+        lines = path.read_text().splitlines()
+        assert len(lines) == 3
+        assert '"agent_id":"agent-1"' in lines[0]
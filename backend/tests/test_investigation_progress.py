@@ -0,0 +1,37 @@
+import sys
+from types import ModuleType
+
+import pytest
+
+from app.services.graph import _investigation_progress_sink
+
+
+class FakeManager:
+    """Records publish_progress calls, keeping the state as it was published."""
+
+    def __init__(self):
+        self.published = []
+
+    async def publish_progress(self, stream_id, kind, state):
+        self.published.append((stream_id, kind, dict(state, items=list(state["items"]))))
+
+
+class TestInvestigationProgressSink:
+    """Test cases for streaming collector findings to the investigation."""
+
+    @pytest.mark.asyncio
+    async def test_findings_accumulate_on_the_investigation_stream(self, monkeypatch):
+        """Test that each hit is published with every earlier hit of its kind."""
+        manager = FakeManager()
+        module = ModuleType("app.services.enhanced_websocket")
+        module.enhanced_manager = manager
+        monkeypatch.setitem(sys.modules, "app.services.enhanced_websocket", module)
+
+        sink = _investigation_progress_sink("inv-1")
+        await sink("subdomain_found", {"subdomain": "www.example.com"})
+        await sink("subdomain_found", {"subdomain": "mail.example.com"})
+
+        stream_id, kind, state = manager.published[-1]
+        assert (stream_id, kind) == ("investigation_inv-1", "subdomain_found")
+        assert state["count"] == 2
+        assert [item["subdomain"] for item in state["items"]] == ["www.example.com", "mail.example.com"]
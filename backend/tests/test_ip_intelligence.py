@@ -0,0 +1,158 @@
+import gzip
+
+import pytest
+
+from app.services import ip_intelligence
+from app.services.ip_intelligence import IPIndex, IPIntelligence, build_index
+
+SNAPSHOT = "\n".join([
+    "1.0.0.0\t1.0.0.255\t13335\tUS\tCLOUDFLARENET",
+    "1.0.1.0\t1.0.3.255\t0\tNone\tNot routed",
+    "8.8.4.0\t8.8.4.255\t15169\tUS\tGOOGLE",
+    "8.8.5.0\t8.8.8.255\t15169\tUS\tGOOGLE",
+    "81.2.69.0\t81.2.69.255\t20712\tGB\tANDREWS-AS Andrews & Arnold Ltd",
+    "2001:4860::\t2001:4860:ffff:ffff:ffff:ffff:ffff:ffff\t15169\tUS\tGOOGLE",
+    "2a00:1450::\t2a00:1450:ffff:ffff:ffff:ffff:ffff:ffff\t15169\tIE\tGOOGLE",
+    "malformed line",
+]) + "\n"
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = tmp_path / "ip2asn-combined.tsv.gz"
+    with gzip.open(path, "wt") as f:
+        f.write(SNAPSHOT)
+    return path
+
+
+class TestIPIntelligence:
+    """Test cases for the local IP → ASN index."""
+
+    def test_lookups(self, snapshot, tmp_path):
+        """Test IPv4/IPv6 lookups, range boundaries and unrouted space."""
+        ranges = build_index(snapshot, tmp_path / "ip2asn.idx")
+        index = IPIndex(tmp_path / "ip2asn.idx")
+
+        # The two adjacent GOOGLE rows are merged
+        assert ranges == len(index) == 5
+        assert index.record_count == 4
+
+        google = index.lookup("8.8.8.8")
+        assert (google.asn_label, google.country, google.organization) == ("AS15169", "US", "GOOGLE")
+        assert (google.first_ip, google.last_ip) == ("8.8.4.0", "8.8.8.255")
+        assert index.lookup("1.0.0.0").asn == 13335
+        assert index.lookup("1.0.0.255").asn == 13335
+        assert index.lookup("1.0.1.1") is None
+        assert index.lookup("0.0.0.1") is None
+        assert index.lookup("255.255.255.255") is None
+        assert index.lookup("81.2.69.160").organization == "ANDREWS-AS Andrews & Arnold Ltd"
+
+        assert index.lookup("2a00:1450:4001::1").country == "IE"
+        assert index.lookup("2001:4860:4860::8888").country == "US"
+        assert index.lookup("2001:4861::1") is None
+        assert index.lookup("::ffff:8.8.8.8").asn == 15169
+        assert index.lookup("not an ip") is None
+        index.close()
+
+    @pytest.mark.asyncio
+    async def test_snapshot_reload(self, snapshot, tmp_path):
+        """Test that a new snapshot is swapped in and an unchanged one is skipped."""
+        intelligence = IPIntelligence(str(snapshot), str(tmp_path / "ip2asn.idx")).load()
+        await intelligence.wait_ready()
+        assert intelligence.lookup("81.2.69.1").country == "GB"
+
+        assert await intelligence.load_snapshot() is False
+
+        updated = tmp_path / "update.tsv"
+        updated.write_text("81.2.69.0\t81.2.69.255\t64500\tNL\tEXAMPLE-NET\n")
+        old_index = intelligence.index
+        lookups = [intelligence.lookup("81.2.69.1") for _ in range(3)]
+        assert await intelligence.load_snapshot(str(updated)) is True
+
+        assert all(result.asn == 20712 for result in lookups)
+        assert intelligence.index is not old_index
+        assert intelligence.lookup("81.2.69.1").asn == 64500
+        assert intelligence.lookup("8.8.8.8") is None
+        stats = intelligence.get_stats()
+        assert stats["snapshots_loaded"] == 2 and stats["snapshots_skipped"] == 1
+
+        # A restart maps the compiled index without reparsing the dataset
+        reopened = IPIntelligence(str(tmp_path / "missing.tsv"), str(tmp_path / "ip2asn.idx")).load()
+        assert reopened.lookup("81.2.69.1").country == "NL"
+
+    def test_missing_dataset(self, tmp_path):
+        """Test that the index is simply unavailable without a dataset."""
+        intelligence = IPIntelligence(str(tmp_path / "none.tsv"), str(tmp_path / "none.idx")).load()
+
+        assert not intelligence.available
+        assert intelligence.lookup("8.8.8.8") is None
+
+    def test_nested_ranges(self, tmp_path):
+        """Test that a more specific range inside a covering one keeps its own ASN."""
+        source = tmp_path / "nested.tsv"
+        source.write_text(
+            "8.8.0.0\t8.8.255.255\t64500\tUS\tCOVERING-NET\n"
+            "8.8.8.0\t8.8.8.255\t15169\tUS\tGOOGLE\n"
+            "8.8.8.128\t8.8.8.129\t64501\tUS\tINNER-NET\n"
+        )
+        build_index(source, tmp_path / "nested.idx")
+        index = IPIndex(tmp_path / "nested.idx")
+
+        assert index.lookup("8.8.8.8").asn == 15169
+        assert (index.lookup("8.8.8.8").first_ip, index.lookup("8.8.8.8").last_ip) == ("8.8.8.0", "8.8.8.127")
+        assert index.lookup("8.8.8.128").asn == 64501
+        assert index.lookup("8.8.8.130").asn == 15169
+        assert index.lookup("8.8.7.255").asn == 64500
+        assert index.lookup("8.8.9.1").asn == 64500
+        assert (index.lookup("8.8.9.1").first_ip, index.lookup("8.8.9.1").last_ip) == ("8.8.9.0", "8.8.255.255")
+        index.close()
+
+    @pytest.mark.asyncio
+    async def test_first_load_compiles_in_background(self, snapshot, tmp_path):
+        """Test that load() inside the event loop does not compile the dataset inline."""
+        intelligence = IPIntelligence(str(snapshot), str(tmp_path / "ip2asn.idx")).load()
+
+        assert not intelligence.available
+        assert intelligence.lookup("8.8.8.8") is None
+
+        await intelligence.wait_ready()
+        assert intelligence.lookup("8.8.8.8").asn == 15169
+
+    @pytest.mark.asyncio
+    async def test_deltas_without_recompiling(self, snapshot, tmp_path, monkeypatch):
+        """Test that deltas update lookups through the overlay and are compacted at the threshold."""
+        intelligence = IPIntelligence(str(snapshot), str(tmp_path / "ip2asn.idx"))
+        await intelligence.load_snapshot()
+        index = intelligence.index
+
+        delta = tmp_path / "delta-1.tsv"
+        delta.write_text(
+            "8.8.8.0\t8.8.8.255\t64500\tNL\tEXAMPLE-NET\n"
+            "1.0.0.0\t1.0.0.255\t0\tNone\tNot routed\n"
+        )
+        assert await intelligence.apply_delta(str(delta)) == 2
+
+        assert intelligence.index is index
+        assert intelligence.lookup("8.8.8.8").asn == 64500
+        assert intelligence.lookup("8.8.7.1").asn == 15169
+        assert intelligence.lookup("1.0.0.1") is None
+        assert intelligence.lookup("81.2.69.1").asn == 20712
+
+        monkeypatch.setattr(ip_intelligence, "DELTA_COMPACT_RANGES", 2)
+        second = tmp_path / "delta-2.tsv"
+        second.write_text("8.8.8.128\t8.8.8.255\t15169\tUS\tGOOGLE\n")
+        await intelligence.apply_delta(str(second))
+
+        assert intelligence.index is not index
+        assert intelligence.get_stats()["overlay_ranges"] == 0
+        assert intelligence.lookup("8.8.8.8").asn == 64500
+        assert intelligence.lookup("8.8.8.200").asn == 15169
+        assert intelligence.lookup("8.8.4.1").asn == 15169
+        assert intelligence.lookup("1.0.0.1") is None
+        stats = intelligence.get_stats()
+        assert stats["deltas_applied"] == 2 and stats["compactions"] == 1
+
+        # The original snapshot differs from the compacted index, so it is reloaded
+        assert await intelligence.load_snapshot() is True
+        assert intelligence.lookup("8.8.8.8").asn == 15169
+        intelligence.close()
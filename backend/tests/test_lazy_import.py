@@ -0,0 +1,56 @@
+import sys
+
+import pytest
+
+from app.utils import lazy_import
+
+
+class TestLazyImport:
+    """Test cases for deferred module loading."""
+
+    def test_module_from_path_executes_once(self, tmp_path):
+        """Test that a module file is executed once and shared between callers."""
+        module_file = tmp_path / "counted_tools.py"
+        module_file.write_text("import builtins\nbuiltins._lazy_loads = getattr(builtins, '_lazy_loads', 0) + 1\n")
+        import builtins
+
+        first = lazy_import.load_module_from_path("counted_tools", str(module_file))
+        second = lazy_import.load_module_from_path("counted_tools", str(tmp_path / "." / "counted_tools.py"))
+
+        assert first is second
+        assert builtins._lazy_loads == 1
+        assert any(entry["module"].startswith("counted_tools") for entry in lazy_import.get_import_profile())
+        del builtins._lazy_loads
+
+    def test_lazy_module_defers_until_attribute_access(self, tmp_path):
+        """Test that LazyModule doesn't execute the file until it is used."""
+        module_file = tmp_path / "deferred_tools.py"
+        module_file.write_text("VALUE = 42\n")
+
+        proxy = lazy_import.lazy_module_from_path("deferred_tools", str(module_file))
+
+        assert not proxy.is_loaded
+        assert proxy.VALUE == 42
+        assert proxy.is_loaded
+
+    def test_lazy_attribute_resolves_on_call(self):
+        """Test that LazyAttribute imports its target on first call."""
+        sys.modules.pop("colorsys", None)
+        factory = lazy_import.lazy_attribute("colorsys", "rgb_to_hsv")
+
+        assert "colorsys" not in sys.modules
+        assert factory(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+        assert "colorsys" in sys.modules
+
+    def test_lazy_exports(self):
+        """Test that package re-exports resolve on access and are cached."""
+        namespace = {}
+        getattr_, dir_ = lazy_import.lazy_exports("json", {"JSONDecoder": ".decoder"}, namespace)
+
+        decoder = getattr_("JSONDecoder")
+
+        assert decoder.__module__ == "json.decoder"
+        assert namespace["JSONDecoder"] is decoder
+        assert "JSONDecoder" in dir_()
+        with pytest.raises(AttributeError):
+            getattr_("missing")
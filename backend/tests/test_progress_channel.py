@@ -0,0 +1,137 @@
+import asyncio
+import copy
+import json
+
+import pytest
+
+from app.services.progress_channel import (
+    ProgressChannel,
+    apply_patch,
+    diff_json,
+    PROGRESS_REPLAY,
+    PROGRESS_SNAPSHOT
+)
+
+
+class Recorder:
+    """Collects emitted patch messages."""
+
+    def __init__(self):
+        self.patches = []
+        self.changed = []
+
+    async def __call__(self, stream_id, patch, state, changed):
+        self.patches.append(json.loads(json.dumps(patch)))
+        self.changed.append(changed)
+
+
+def _investigation(evidence: int, percent: float):
+    return {
+        "status": "running",
+        "progress_percentage": percent,
+        "phases_completed": ["planning"],
+        "evidence": [{"url": f"https://e{i}.example", "content": "x" * 200} for i in range(evidence)],
+    }
+
+
+class TestJsonDiff:
+    """Test cases for the JSON-patch style diff."""
+
+    def test_round_trip(self):
+        """Test that applying a diff reproduces the new document."""
+        old = {"a": 1, "b": [1, 2], "c": {"d": "x", "e/f": 1}, "gone": True}
+        new = {"a": 2, "b": [1, 2, 3], "c": {"d": "y", "e/f": 2}, "new": None}
+
+        ops = diff_json(old, new)
+
+        assert apply_patch(copy.deepcopy(old), ops) == new
+        assert {"op": "add", "path": "/b/-", "value": 3} in ops
+        assert {"op": "remove", "path": "/gone"} in ops
+
+    def test_identical_documents(self):
+        """Test that identical documents produce no operations."""
+        assert diff_json({"a": [1, {"b": 2}]}, {"a": [1, {"b": 2}]}) == []
+
+
+class TestProgressChannel:
+    """Test cases for throttled, sequenced progress deltas."""
+
+    @pytest.mark.asyncio
+    async def test_deltas_are_sequenced_and_small(self):
+        """Test that updates after the first carry only what changed."""
+        recorder = Recorder()
+        channel = ProgressChannel(recorder, max_rate=0)
+
+        for step in range(1, 21):
+            await channel.publish("inv", "investigation:updated", _investigation(step, step * 5.0))
+
+        assert [p["seq"] for p in recorder.patches] == list(range(1, 21))
+        assert recorder.changed[-1] == ["investigation:updated"]
+        stats = channel.get_stats()
+        assert stats["compression_ratio"] > 5
+
+    @pytest.mark.asyncio
+    async def test_throttle_delivers_latest_state(self):
+        """Test that bursts are folded into one trailing delta."""
+        recorder = Recorder()
+        channel = ProgressChannel(recorder, max_rate=20)
+
+        for percent in range(10):
+            await channel.publish("inv", "scraping_progress", {"percent": percent})
+        assert len(recorder.patches) == 1
+
+        await asyncio.sleep(0.1)
+
+        assert len(recorder.patches) == 2
+        state = {}
+        for patch in recorder.patches:
+            state = apply_patch(state, patch["ops"])
+        assert state == {"scraping_progress": {"percent": 9}}
+        assert channel.get_stats()["updates_throttled"] == 9
+
+    @pytest.mark.asyncio
+    async def test_resync_by_replay_and_snapshot(self):
+        """Test that clients resync from a replay or, if too far behind, a snapshot."""
+        recorder = Recorder()
+        channel = ProgressChannel(recorder, max_rate=0, history_size=5)
+        for step in range(10):
+            await channel.publish("inv", "progress", {"step": step})
+
+        replay = channel.resync("inv", since_seq=8)
+        assert replay["type"] == PROGRESS_REPLAY
+        assert [p["seq"] for p in replay["patches"]] == [9, 10]
+
+        snapshot = channel.resync("inv", since_seq=1)
+        assert snapshot["type"] == PROGRESS_SNAPSHOT
+        assert snapshot["seq"] == 10
+        assert snapshot["state"] == {"progress": {"step": 9}}
+
+    @pytest.mark.asyncio
+    async def test_mirror_follows_remote_stream(self):
+        """Test that another worker can rebuild the state from observed deltas."""
+        recorder = Recorder()
+        owner = ProgressChannel(recorder, max_rate=0)
+        mirror = ProgressChannel(Recorder(), max_rate=0)
+        for step in range(5):
+            await owner.publish("inv", "investigation:updated", _investigation(step, step * 10.0))
+            mirror.observe("inv", recorder.patches[-1])
+
+        assert mirror.resync("inv")["state"] == owner.resync("inv")["state"]
+
+    @pytest.mark.asyncio
+    async def test_mirror_history_replays_to_live_state(self):
+        """Test that a mirror's history is not rewritten by later patches."""
+        recorder = Recorder()
+        owner = ProgressChannel(recorder, max_rate=0)
+        mirror = ProgressChannel(Recorder(), max_rate=0)
+        for count in range(1, 4):
+            await owner.publish("inv", "progress", {"items": list(range(1, count + 1)), "meta": {"count": count}})
+            mirror.observe("inv", recorder.patches[-1])
+
+        replay = mirror.resync("inv", since_seq=0)
+        rebuilt = {}
+        for patch in replay["patches"]:
+            rebuilt = apply_patch(rebuilt, copy.deepcopy(patch["ops"]))
+
+        assert rebuilt == mirror.resync("inv")["state"] == owner.resync("inv")["state"]
+        assert rebuilt["progress"]["items"] == [1, 2, 3]
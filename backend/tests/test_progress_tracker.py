@@ -0,0 +1,64 @@
+import time
+
+from app.services.progress_tracker import (
+    DEFAULT_NODE_SECONDS,
+    PHASE_NODES,
+    LatencyHistory,
+    ProgressTracker
+)
+
+
+def _history(tmp_path) -> LatencyHistory:
+    return LatencyHistory(storage_path=str(tmp_path / "node_latency.json"))
+
+
+class TestProgressTracker:
+    """Test cases for measured node timings and incremental progress."""
+
+    def test_progress_counts_finished_nodes(self, tmp_path):
+        """Test that progress follows phase weights as nodes finish."""
+        tracker = ProgressTracker("inv-1", _history(tmp_path))
+        for node in PHASE_NODES["planning"]:
+            tracker.start_node(node)
+            tracker.finish_node(node)
+
+        assert tracker.progress == 15.0
+
+        tracker.start_node("search_coordination")
+        tracker.abort_node("search_coordination")
+        assert tracker.progress == 15.0
+
+        for phase in ("collection", "analysis", "synthesis"):
+            for node in PHASE_NODES[phase]:
+                tracker.start_node(node)
+                tracker.finish_node(node)
+        assert tracker.progress == 100.0
+        assert tracker.estimated_remaining() == 0.0
+
+    def test_durations_are_measured(self, tmp_path):
+        """Test that node and phase durations come from the clock."""
+        tracker = ProgressTracker("inv-1", _history(tmp_path))
+        tracker.start_node("data_fusion")
+        time.sleep(0.02)
+        tracker.finish_node("data_fusion")
+
+        assert tracker.node_durations["data_fusion"] >= 0.02
+        assert tracker.finish_phase("analysis") >= 0.02
+
+        state = tracker.apply({"metadata": {}})
+        assert state["metadata"]["node_timings"]["data_fusion"] >= 0.02
+        assert state["estimated_completion"] is not None
+
+    def test_estimate_uses_history(self, tmp_path):
+        """Test that remaining time comes from persisted per-node latency."""
+        history = _history(tmp_path)
+        for node in PHASE_NODES["synthesis"]:
+            history.record(node, 2.0)
+        history.save()
+
+        restored = LatencyHistory(storage_path=history.storage_path).load()
+        tracker = ProgressTracker("inv-2", restored)
+        nodes_without_history = sum(len(nodes) for nodes in PHASE_NODES.values()) - 3
+
+        assert restored.quantile("quality_assurance") == 2.0
+        assert tracker.estimated_remaining() == nodes_without_history * DEFAULT_NODE_SECONDS + 6.0
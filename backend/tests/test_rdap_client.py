@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from app.services.rdap_client import FALLBACK_RDAP_URL, RDAPBootstrap, RDAPClient, WhoisCache
+
+BOOTSTRAP = {
+    "services": [
+        [["com", "net"], ["http://rdap.verisign.com/com/v1/", "https://rdap.verisign.com/com/v1/"]],
+        [["uk", "co.uk"], ["https://rdap.nominet.uk/uk"]],
+    ]
+}
+
+
+class FakeResponse:
+    def __init__(self, status, payload, delay=0.0):
+        self.status = status
+        self.payload = payload
+        self.delay = delay
+
+    async def __aenter__(self):
+        await asyncio.sleep(self.delay)
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self, content_type=None):
+        return self.payload
+
+
+class FakeSession:
+    """Records requested URLs; answers from a {url: (status, payload)} map."""
+
+    def __init__(self, responses, delay=0.0):
+        self.responses = responses
+        self.delay = delay
+        self.urls = []
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        status, payload = self.responses.get(url, (404, None))
+        return FakeResponse(status, payload, self.delay)
+
+
+@pytest.fixture
+def client(tmp_path):
+    bootstrap = RDAPBootstrap(str(tmp_path / "bootstrap.json"))
+    return RDAPClient(cache=WhoisCache(str(tmp_path / "whois.db")), bootstrap=bootstrap, max_age=3600)
+
+
+class TestRDAPClient:
+    """Test cases for bootstrap routing and the persistent RDAP cache."""
+
+    def test_bootstrap_routing(self, tmp_path):
+        """Test that the longest TLD suffix picks the server, preferring HTTPS."""
+        bootstrap = RDAPBootstrap(str(tmp_path / "bootstrap.json"))
+        bootstrap.update(BOOTSTRAP)
+
+        assert bootstrap.domain_url("Example.COM") == "https://rdap.verisign.com/com/v1/domain/example.com"
+        assert bootstrap.base_url("shop.example.co.uk") == "https://rdap.nominet.uk/uk/"
+        assert bootstrap.base_url("example.dev") == FALLBACK_RDAP_URL
+
+    @pytest.mark.asyncio
+    async def test_cache_survives_restart_and_coalesces(self, client, tmp_path):
+        """Test that concurrent lookups share a request and the cache persists."""
+        url = "https://rdap.verisign.com/com/v1/domain/example.com"
+        session = FakeSession({
+            "https://data.iana.org/rdap/dns.json": (200, BOOTSTRAP),
+            url: (200, {"ldhName": "EXAMPLE.COM", "status": ["active"]}),
+        }, delay=0.02)
+
+        results = await asyncio.gather(*(client.lookup("example.com", session) for _ in range(5)))
+
+        assert all(result.found for result in results)
+        assert session.urls.count(url) == 1
+        assert client.get_stats()["coalesced"] == 4
+        assert results[0].raw == '{"ldhName":"EXAMPLE.COM","status":["active"]}'
+
+        restarted = RDAPClient(cache=WhoisCache(str(tmp_path / "whois.db")), bootstrap=client.bootstrap)
+        cached = await restarted.lookup("example.com", FakeSession({}))
+        assert cached.from_cache and cached.data["ldhName"] == "EXAMPLE.COM"
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_served_when_rate_limited(self, client):
+        """Test that a 429 falls back to the stale record and isn't cached."""
+        client.bootstrap.update(BOOTSTRAP)
+        url = "https://rdap.verisign.com/com/v1/domain/example.net"
+        await client.lookup("example.net", FakeSession({url: (200, {"ldhName": "EXAMPLE.NET"})}))
+        client.max_age = 0
+
+        result = await client.lookup("example.net", FakeSession({url: (429, None)}))
+
+        assert result.stale and result.found
+        assert client.cache.get("example.net").status == 200
+
+    @pytest.mark.asyncio
+    async def test_not_found_is_cached_negatively(self, client):
+        """Test that 404s are cached for the negative max age."""
+        client.bootstrap.update(BOOTSTRAP)
+        session = FakeSession({})
+
+        first = await client.lookup("missing.com", session)
+        second = await client.lookup("missing.com", session)
+
+        assert not first.found and first.status == 404
+        assert second.from_cache
+        assert len(session.urls) == 1
@@ -0,0 +1,118 @@
+import copy
+import json
+
+import pytest
+
+from app.services.result_store import (
+    MSGPACK_AVAILABLE,
+    ResultTable,
+    SearchResults,
+    decode_compact,
+    encode_compact,
+    materialize_results
+)
+
+
+def _rows(count: int):
+    return [
+        {"title": f"Result {i}", "url": f"https://example.com/{i}", "snippet": "text", "rank": i}
+        for i in range(count)
+    ]
+
+
+class TestResultTable:
+    """Test cases for the columnar result table."""
+
+    def test_rows_materialize_lazily(self):
+        """Test that indexing and iteration return the original dicts."""
+        rows = _rows(5)
+        table = ResultTable(rows)
+
+        assert len(table) == 5
+        assert table[0] == rows[0]
+        assert table[-1] == rows[-1]
+        assert table[1:3] == rows[1:3]
+        assert list(table) == rows
+        assert table.column("rank") == [0, 1, 2, 3, 4]
+
+    def test_sparse_rows_round_trip(self):
+        """Test that rows with differing keys keep exactly their own keys."""
+        rows = [{"a": 1}, {"b": None}, {"a": 3, "c": [1]}]
+        table = ResultTable(rows)
+
+        restored = ResultTable.from_columns(json.loads(json.dumps(table.to_columns())))
+
+        assert restored.to_dicts() == rows
+        assert copy.deepcopy(table).to_dicts() == rows
+
+    def test_rejects_non_dict_rows(self):
+        """Test that only dict rows are accepted."""
+        with pytest.raises(TypeError):
+            ResultTable(["not a dict"])
+
+
+class TestSearchResults:
+    """Test cases for the InvestigationState search_results container."""
+
+    def test_state_serialization_is_compact(self):
+        """Test that checkpoints write keys once per column and restore tables."""
+        results = SearchResults()
+        results["surface_web"] = _rows(200)
+        results["notes"] = ["plain", "strings"]
+        state = {"investigation_id": "inv-1", "search_results": results}
+
+        compact = json.dumps(state, default=encode_compact)
+        plain = json.dumps({"investigation_id": "inv-1", "search_results": results.materialize()})
+        restored = json.loads(compact, object_hook=decode_compact)
+
+        assert len(compact) < len(plain) * 0.8
+        assert isinstance(restored["search_results"]["surface_web"], ResultTable)
+        assert materialize_results(restored["search_results"]) == results.materialize()
+        assert restored["search_results"]["notes"] == ["plain", "strings"]
+
+    @pytest.mark.skipif(not MSGPACK_AVAILABLE, reason="msgpack not installed")
+    def test_msgpack_round_trip(self):
+        """Test the msgpack encoding of the columnar form."""
+        results = SearchResults({"dark_web": _rows(10)})
+
+        restored = SearchResults.from_msgpack(results.to_msgpack())
+
+        assert restored.materialize() == results.materialize()
+
+
+class TestResultTableBoundaries:
+    """Test cases for handing result tables to code that expects plain rows."""
+
+    def test_row_edits_are_written_back(self):
+        """Test that rows are copies and assignment is how an edit is kept."""
+        table = ResultTable(_rows(3))
+
+        for row in table:
+            row["rank"] = -1
+        assert table.column("rank") == [0, 1, 2]
+
+        row = table[1]
+        row["verified"] = True
+        table[1] = row
+        assert table[1]["verified"] is True and "verified" not in table[0]
+        with pytest.raises(IndexError):
+            table[3] = row
+
+    def test_materialize_nested_lists(self):
+        """Test that tables inside lists of mappings are converted too."""
+        payload = {"batches": [{"surface_web": ResultTable(_rows(2))}]}
+
+        assert materialize_results(payload) == {"batches": [{"surface_web": _rows(2)}]}
+
+    def test_pydantic_serialization(self):
+        """Test that models holding a table validate rows and dump plain lists."""
+        pydantic = pytest.importorskip("pydantic")
+
+        class Payload(pydantic.BaseModel):
+            results: ResultTable
+
+        model = Payload(results=_rows(2))
+
+        assert isinstance(model.results, ResultTable)
+        assert Payload(results=ResultTable(_rows(2))).model_dump(mode="json") == {"results": _rows(2)}
+        assert Payload.model_validate_json(model.model_dump_json()).results == _rows(2)
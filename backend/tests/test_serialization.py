@@ -0,0 +1,60 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from app.services import serialization
+from app.services.result_store import ResultTable, SearchResults
+from app.services.state import InvestigationPhase, InvestigationStatus, create_initial_state
+
+
+class TestSerialization:
+    """Test cases for the pluggable serialization layer."""
+
+    def test_enums_and_datetimes_encode_by_value(self):
+        """Test that enums and datetimes don't go through str()."""
+        payload = {
+            "phase": InvestigationPhase.COLLECTION,
+            "status": {"data_collection": InvestigationStatus.COMPLETED},
+            "at": datetime(2024, 1, 2, 3, 4, 5),
+        }
+
+        decoded = json.loads(serialization.dumps_text(payload))
+
+        assert decoded == {
+            "phase": "collection",
+            "status": {"data_collection": "completed"},
+            "at": "2024-01-02T03:04:05",
+        }
+
+    @pytest.mark.parametrize("codec", ["json", "orjson", "msgpack"])
+    def test_round_trip_with_header(self, codec):
+        """Test that every installed codec round-trips through encode/decode."""
+        try:
+            serialization.get_codec(codec)
+        except RuntimeError:
+            pytest.skip(f"{codec} not installed")
+        value = {"a": [1, 2.5, None, True], "b": {"nested": "text"}}
+
+        data = serialization.encode(value, codec)
+
+        assert data[:2] == bytes((serialization.MAGIC, serialization.FORMAT_VERSION))
+        assert serialization.decode(data) == value
+
+    def test_legacy_and_future_payloads(self):
+        """Test that untagged JSON still decodes and newer versions are refused."""
+        assert serialization.decode(b'{"legacy": 1}') == {"legacy": 1}
+
+        with pytest.raises(ValueError):
+            serialization.decode(bytes((serialization.MAGIC, serialization.FORMAT_VERSION + 1, 1)) + b"{}")
+
+    def test_investigation_state(self):
+        """Test that a full investigation state serializes, including result tables."""
+        state = create_initial_state("find things", "inv-1")
+        state["search_results"] = SearchResults({"surface_web": [{"url": "https://a.example"}]})
+
+        decoded = json.loads(serialization.dumps_text(state))
+
+        assert decoded["overall_status"] == "pending"
+        assert decoded["search_results"]["surface_web"]["length"] == 1
+        assert isinstance(ResultTable.from_columns(decoded["search_results"]["surface_web"]), ResultTable)
@@ -0,0 +1,195 @@
+import asyncio
+import gzip
+
+import httpx
+import pytest
+
+from app.services.sitemap_discovery import SitemapDiscovery, _DocumentParser
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def urlset(urls, lastmod="2024-05-01"):
+    entries = "".join(f"<url><loc>{url}</loc><lastmod>{lastmod}</lastmod></url>" for url in urls)
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>{entries}</urlset>'.encode()
+
+
+RSS = b"""<?xml version="1.0"?><rss version="2.0"><channel><title>Blog</title><link>https://blog.example.com/</link>
+<item><title>Launch notes</title><link>https://blog.example.com/launch</link><pubDate>Tue, 07 May 2024 10:00:00 GMT</pubDate></item>
+<item><title>Elsewhere</title><link>https://other.example/post</link></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom"><title>News</title>
+<entry><title>Pricing update</title><link rel="alternate" href="https://blog.example.com/pricing"/><updated>2024-06-01T00:00:00Z</updated></entry>
+</feed>"""
+
+
+class FakeSite:
+    """Mock transport mapping URLs to (status, headers, body); records requested URLs."""
+
+    def __init__(self, routes, delay=0.0):
+        self.routes = routes
+        self.delay = delay
+        self.requests = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        self.requests.append(url)
+        await asyncio.sleep(self.delay)
+        if url not in self.routes:
+            return httpx.Response(404)
+        body, content_type = self.routes[url]
+        return httpx.Response(200, headers={"content-type": content_type}, content=body)
+
+
+def make_discovery(site, **kwargs):
+    return SitemapDiscovery(transport=httpx.MockTransport(site), **kwargs)
+
+
+class TestSitemapDiscovery:
+    """Test cases for sitemap and feed discovery."""
+
+    @pytest.mark.asyncio
+    async def test_sitemap_index_and_gzip(self):
+        """Test robots.txt sitemaps, sitemap indexes and gzip'd children."""
+        index = (
+            f'<sitemapindex {NS}><sitemap><loc>https://example.com/posts.xml.gz</loc></sitemap>'
+            f'<sitemap><loc>https://example.com/pages.xml</loc></sitemap></sitemapindex>'
+        ).encode()
+        site = FakeSite({
+            "https://example.com/robots.txt": (b"User-agent: *\nSitemap: https://example.com/index.xml\n", "text/plain"),
+            "https://example.com/index.xml": (index, "application/xml"),
+            "https://example.com/posts.xml.gz": (gzip.compress(urlset([f"https://example.com/post/{i}" for i in range(3)])), "application/x-gzip"),
+            "https://example.com/pages.xml": (urlset(["https://example.com/about#team", "https://example.com/post/0", "https://cdn.other.net/x"]), "text/xml"),
+        })
+
+        result = await make_discovery(site).discover("example.com")
+
+        assert [found.url for found in result.urls] == [
+            "https://example.com/post/0", "https://example.com/post/1", "https://example.com/post/2", "https://example.com/about"
+        ]
+        assert result.urls[0].lastmod == "2024-05-01" and result.urls[0].source == "sitemap"
+        assert result.sitemaps == [
+            "https://example.com/index.xml", "https://example.com/posts.xml.gz", "https://example.com/pages.xml"
+        ]
+        assert result.feeds == []
+
+    @pytest.mark.asyncio
+    async def test_feeds_from_homepage(self):
+        """Test RSS and Atom feeds linked from the homepage when there is no sitemap."""
+        homepage = (
+            b'<html><head><link rel="alternate" type="application/rss+xml" href="/rss">'
+            b'<link type="application/atom+xml" rel="alternate" href="https://blog.example.com/atom"></head></html>'
+        )
+        site = FakeSite({
+            "https://blog.example.com/": (homepage, "text/html"),
+            "https://blog.example.com/rss": (RSS, "application/rss+xml"),
+            "https://blog.example.com/atom": (ATOM, "application/atom+xml"),
+        })
+
+        result = await make_discovery(site).discover("blog.example.com")
+
+        found = {url.url: url for url in result.urls}
+        assert set(found) == {"https://blog.example.com/launch", "https://blog.example.com/pricing"}
+        assert found["https://blog.example.com/launch"].lastmod == "2024-05-07T10:00:00+00:00"
+        assert found["https://blog.example.com/pricing"].source == "atom"
+        assert found["https://blog.example.com/pricing"].title == "Pricing update"
+        # No declared sitemap and none at the default paths; only the linked feeds are read
+        assert "https://blog.example.com/feed" not in site.requests
+
+    @pytest.mark.asyncio
+    async def test_streaming_stops_at_url_limit(self):
+        """Test that a large sitemap is read only until max_urls entries are found."""
+        body = urlset([f"https://example.com/item/{i}" for i in range(50000)])
+
+        async def handler(request):
+            if request.url.path != "/sitemap.xml":
+                return httpx.Response(404)
+            chunks = [body[i:i + 16384] for i in range(0, len(body), 16384)]
+            served.append(0)
+
+            async def stream():
+                for chunk in chunks:
+                    served[-1] += len(chunk)
+                    yield chunk
+
+            return httpx.Response(200, headers={"content-type": "application/xml"}, content=stream())
+
+        served = []
+        discovery = SitemapDiscovery(transport=httpx.MockTransport(handler), max_urls=100)
+
+        result = await discovery.discover("example.com")
+
+        assert len(result.urls) == 100
+        assert served[0] < len(body) / 10
+
+    @pytest.mark.asyncio
+    async def test_cache_and_coalescing(self):
+        """Test that concurrent and repeated lookups of a domain share one discovery."""
+        site = FakeSite({"https://example.com/sitemap.xml": (urlset(["https://example.com/a"]), "application/xml")}, delay=0.01)
+        discovery = make_discovery(site)
+
+        first, second = await asyncio.gather(discovery.discover("example.com"), discovery.discover("EXAMPLE.com"))
+        third = await discovery.discover("example.com")
+
+        assert [url.url for url in first.urls] == [url.url for url in second.urls] == ["https://example.com/a"]
+        assert third.from_cache
+        assert site.requests.count("https://example.com/sitemap.xml") == 1
+        stats = discovery.get_stats()
+        assert stats["coalesced"] == 1 and stats["cache_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_empty_results_cached_briefly(self):
+        """Test that a domain without sitemaps or feeds is cached, for empty_ttl only."""
+        site = FakeSite({})
+        discovery = make_discovery(site, empty_ttl=60)
+
+        first = await discovery.discover("example.com")
+        second = await discovery.discover("example.com")
+
+        assert first.urls == [] and second.from_cache
+        assert site.requests.count("https://example.com/sitemap.xml") == 1
+
+        discovery._cache["example.com"].discovered_at -= 61
+        await discovery.discover("example.com")
+        assert site.requests.count("https://example.com/sitemap.xml") == 2
+
+    @pytest.mark.asyncio
+    async def test_out_of_scope_sitemaps_are_not_fetched(self):
+        """Test that sitemaps and feeds on other hosts are never requested."""
+        index = f'<sitemapindex {NS}><sitemap><loc>https://evil.example/child.xml</loc></sitemap></sitemapindex>'.encode()
+        site = FakeSite({
+            "https://example.com/robots.txt": (
+                b"Sitemap: https://internal.test/sitemap.xml\nSitemap: https://example.com/index.xml\n", "text/plain"
+            ),
+            "https://example.com/index.xml": (index, "application/xml"),
+            "https://example.com/": (
+                b'<link rel="alternate" type="application/rss+xml" href="https://tracker.example/rss">', "text/html"
+            ),
+        })
+
+        result = await make_discovery(site).discover("example.com")
+
+        assert result.sitemaps == ["https://example.com/index.xml"]
+        assert not any(host in url for url in site.requests for host in ("internal.test", "evil.example", "tracker.example"))
+
+    def test_client_from_previous_loop_is_closed(self):
+        """Test that rebinding to a new event loop closes the old loop's client."""
+        discovery = make_discovery(FakeSite({}))
+
+        asyncio.run(discovery.discover("example.com"))
+        first = discovery._client
+        asyncio.run(discovery.discover("other.example"))
+
+        assert first.is_closed and discovery._client is not first
+        assert not discovery._client.is_closed
+
+    def test_gzip_inflation_is_bounded(self):
+        """Test that a highly compressed document is inflated only up to the byte cap."""
+        bomb = gzip.compress(b"<urlset>" + b" " * (20 * 1024 * 1024))
+        parser = _DocumentParser("https://example.com/bomb.xml.gz", max_bytes=1024 * 1024)
+
+        parser.feed(bomb)
+
+        assert parser.done
+        assert parser.size <= 1024 * 1024
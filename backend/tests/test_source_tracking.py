@@ -0,0 +1,71 @@
+import copy
+import json
+import pickle
+
+from app.services.source_tracking import OrderedSet, UrlSet, canonicalize_url
+from app.services.state import create_initial_state, ensure_tracking_sets
+
+
+class TestUrlSet:
+    """Test cases for the canonicalized, ordered URL set."""
+
+    def test_canonical_duplicates_are_merged(self):
+        """Test that equivalent spellings of a URL are stored once."""
+        urls = UrlSet([
+            "HTTPS://Example.com:443/a#section",
+            "https://example.com/a",
+            "https://example.com:8443/a",
+        ])
+
+        assert list(urls) == ["https://example.com/a", "https://example.com:8443/a"]
+        assert "https://EXAMPLE.com/a#other" in urls
+        assert canonicalize_url("http://Foo.org") == "http://foo.org/"
+
+    def test_indexes(self):
+        """Test the per-domain index and per-scheme counts."""
+        urls = UrlSet(["https://www.foo.org/x", "http://foo.org/y", "https://bar.net/", "google"])
+
+        assert urls.by_domain("foo.org") == ["https://www.foo.org/x", "http://foo.org/y"]
+        assert urls.count_scheme("https") == 2
+        assert urls.domain_counts() == {"foo.org": 2, "bar.net": 1}
+
+        urls.remove("https://bar.net")
+        assert urls.count_scheme("https") == 1
+        assert "https://bar.net/" not in urls
+
+    def test_serialization_and_copies(self):
+        """Test that JSON, deepcopy and pickle keep order and indexes."""
+        urls = UrlSet(["https://b.com/", "https://a.com/"])
+
+        assert json.dumps(urls) == '["https://b.com/", "https://a.com/"]'
+        for clone in (copy.deepcopy(urls), pickle.loads(pickle.dumps(urls))):
+            assert isinstance(clone, UrlSet)
+            assert list(clone) == list(urls)
+            assert clone.count_scheme("https") == 2
+
+
+class TestOrderedSet:
+    """Test cases for the plain ordered set used for tools and agents."""
+
+    def test_list_compatibility(self):
+        """Test that list-style appends keep insertion order without duplicates."""
+        agents = OrderedSet()
+        agents.append("PlannerAgent")
+        agents.append("CollectorAgent")
+        agents.append("PlannerAgent")
+        agents += ["SynthesisAgent"]
+
+        assert agents == ["PlannerAgent", "CollectorAgent", "SynthesisAgent"]
+        assert isinstance(agents, list)
+        assert agents[0] == "PlannerAgent"
+
+    def test_restored_state_is_rewrapped(self):
+        """Test that plain lists from a restored state get the set types back."""
+        state = create_initial_state("find things", "inv-1")
+        restored = json.loads(json.dumps(state, default=str))
+        assert type(restored["sources_used"]) is list
+
+        ensure_tracking_sets(restored)
+
+        assert isinstance(restored["sources_used"], UrlSet)
+        assert isinstance(restored["agents_participated"], OrderedSet)
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+
+import pytest
+
+from app.services import graph as graph_module
+from app.services.graph import OSINTWorkflow, reconcile_speculative_strategy
+from app.services.state import create_initial_state
+
+SURFACE_STRATEGY = {"data_sources": {"primary_sources": [{"type": "surface_web", "specific_sources": []}]}}
+
+
+def make_workflow():
+    """Workflow without its agents; the planning nodes are patched per test."""
+    workflow = OSINTWorkflow.__new__(OSINTWorkflow)
+    workflow.config = {}
+    workflow.logger = logging.getLogger("test_speculative_planning")
+    return workflow
+
+
+def patch_nodes(monkeypatch, objectives, draft, calls):
+    """Replace the LLM-backed planning nodes with instant fakes recording their calls."""
+    async def objective_definition_node(state):
+        calls.append("objective_definition")
+        state["objectives"] = objectives
+        return state
+
+    async def draft_strategy_node(state):
+        calls.append("draft_strategy")
+        return draft
+
+    async def strategy_formulation_node(state):
+        calls.append("strategy_formulation")
+        state["strategy"] = {"reformulated": True, **SURFACE_STRATEGY}
+        return state
+
+    monkeypatch.setattr(graph_module, "objective_definition_node", objective_definition_node)
+    monkeypatch.setattr(graph_module, "draft_strategy_node", draft_strategy_node)
+    monkeypatch.setattr(graph_module, "strategy_formulation_node", strategy_formulation_node)
+
+
+class TestSpeculativePlanning:
+    """Test cases for overlapping objective definition with strategy drafting."""
+
+    def test_reconcile_rules(self):
+        """Test that a draft stands unless the objectives add source categories."""
+        accepted = reconcile_speculative_strategy({"goal": "surface web search"}, SURFACE_STRATEGY)
+        rejected = reconcile_speculative_strategy({"goal": "social_media accounts"}, SURFACE_STRATEGY)
+        empty = reconcile_speculative_strategy({}, {})
+
+        assert accepted == {"accepted": True, "draft_categories": ["surface_web_sources"], "added_categories": []}
+        assert not rejected["accepted"] and rejected["added_categories"] == ["social_media_sources"]
+        assert not empty["accepted"]
+
+    @pytest.mark.asyncio
+    async def test_draft_accepted(self, monkeypatch):
+        """Test that a matching draft becomes the strategy and search coordination runs early."""
+        calls = []
+        patch_nodes(monkeypatch, {"goal": "surface web search"}, SURFACE_STRATEGY, calls)
+        state = create_initial_state("Find the company's website")
+
+        state = await make_workflow()._run_speculative_planning(state)
+
+        assert "strategy_formulation" not in calls
+        assert state["strategy"] == SURFACE_STRATEGY
+        assert state["search_coordination_results"]["surface_web_sources"]
+        assert state["planning_metadata"]["speculative_planning"]["accepted"]
+
+    @pytest.mark.asyncio
+    async def test_draft_discarded_on_mismatch(self, monkeypatch):
+        """Test that a draft missing a category the objectives need is reformulated."""
+        calls = []
+        patch_nodes(monkeypatch, {"goal": "social_media accounts"}, SURFACE_STRATEGY, calls)
+        state = create_initial_state("Find their social accounts")
+
+        state = await make_workflow()._run_speculative_planning(state)
+
+        assert calls.count("strategy_formulation") == 1
+        assert state["strategy"]["reformulated"]
+        report = state["planning_metadata"]["speculative_planning"]
+        assert not report["accepted"] and report["added_categories"] == ["social_media_sources"]
+
+    @pytest.mark.asyncio
+    async def test_failed_draft_falls_back(self, monkeypatch):
+        """Test that a draft that failed (None) falls back to sequential formulation."""
+        calls = []
+        patch_nodes(monkeypatch, {"goal": "surface web search"}, None, calls)
+        state = create_initial_state("Find the company's website")
+
+        state = await make_workflow()._run_speculative_planning(state)
+
+        assert calls.count("strategy_formulation") == 1
+        assert state["planning_metadata"]["speculative_planning"] == {"accepted": False, "reason": "draft_failed"}
+
+    @pytest.mark.asyncio
+    async def test_draft_cancelled_when_objectives_fail(self, monkeypatch):
+        """Test that the speculative draft is cancelled if objective definition raises."""
+        started, cancelled = asyncio.Event(), asyncio.Event()
+
+        async def objective_definition_node(state):
+            await started.wait()
+            raise RuntimeError("objective agent down")
+
+        async def draft_strategy_node(state):
+            started.set()
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        monkeypatch.setattr(graph_module, "objective_definition_node", objective_definition_node)
+        monkeypatch.setattr(graph_module, "draft_strategy_node", draft_strategy_node)
+
+        with pytest.raises(RuntimeError):
+            await make_workflow()._run_speculative_planning(create_initial_state("Anything"))
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1.0)
@@ -0,0 +1,95 @@
+import pytest
+
+from app.agents.base.structured_output import (
+    StructuredOutputParser,
+    StructuredOutputError,
+    extract_json_text,
+    parse_json_lenient
+)
+
+
+class TestStructuredOutput:
+    """Test cases for JSON extraction and repair of LLM output."""
+
+    def test_valid_json_is_not_repaired(self):
+        """Test that valid JSON is parsed as-is."""
+        parsed = parse_json_lenient('{"a": 1, "b": [1, 2]}')
+        assert parsed.data == {"a": 1, "b": [1, 2]}
+        assert parsed.repaired is False
+
+    def test_markdown_fences_and_prose(self):
+        """Test extraction from fenced output with surrounding text."""
+        raw = 'Here is the result:\n```json\n{"a": 1}\n```\nLet me know!'
+        assert extract_json_text(raw) == '{"a": 1}'
+        assert parse_json_lenient(raw).data == {"a": 1}
+
+    def test_common_syntax_errors(self):
+        """Test repair of trailing commas, quotes, literals and comments."""
+        raw = "{'a': True, b: None, 'c': [1, 2,], // note\n 'd': 'it\"s',}"
+        parsed = parse_json_lenient(raw)
+        assert parsed.data == {"a": True, "b": None, "c": [1, 2], "d": 'it"s'}
+        assert parsed.repaired is True
+        assert parsed.truncated is False
+
+    def test_truncated_output(self):
+        """Test that cut-off output keeps every complete member."""
+        raw = '{"found_urls": [{"url": "https://a.example"}, {"url": "https://b.ex'
+        parsed = parse_json_lenient(raw)
+        assert parsed.truncated is True
+        assert parsed.data["found_urls"][0] == {"url": "https://a.example"}
+
+    def test_escaped_quote_in_single_quoted_string(self):
+        """Test that an escaped quote inside a single-quoted string is repaired."""
+        parsed = parse_json_lenient("{'a': 'it\\'s', 'b': 'say \\\"hi\\\"'}")
+        assert parsed.data == {"a": "it's", "b": 'say "hi"'}
+        assert parsed.repaired is True
+
+    def test_bracketed_prose_is_not_json(self):
+        """Test that prose with brackets is left alone unless JSON was asked for."""
+        citations = "The report is based on public filings [1] and press coverage [2]. Risk is moderate."
+        with pytest.raises(StructuredOutputError):
+            parse_json_lenient(citations)
+        with pytest.raises(StructuredOutputError):
+            parse_json_lenient("Findings: the company [Acme] has 3 offices.")
+        assert extract_json_text(citations) == citations
+
+        assert parse_json_lenient('Result: {"a": 1}', expect_json=True).data == {"a": 1}
+
+    @pytest.mark.asyncio
+    async def test_parser_leaves_prose_unrepaired(self):
+        """Test that an agent without declared JSON output keeps its prose answer."""
+        parser = StructuredOutputParser()
+        with pytest.raises(StructuredOutputError):
+            await parser.parse_and_complete("Findings: the company [Acme] has 3 offices.")
+
+    def test_no_json(self):
+        """Test that plain text raises a structured output error."""
+        with pytest.raises(StructuredOutputError):
+            parse_json_lenient("no structured data here")
+
+    @pytest.mark.asyncio
+    async def test_fragment_completion(self):
+        """Test that only the missing keys are requested and merged."""
+        prompts = []
+
+        async def ask(prompt):
+            prompts.append(prompt)
+            return '{"search_summary": {"total_found": 1}, "recommendations": []}'
+
+        parser = StructuredOutputParser(["found_urls", "search_summary", "recommendations"])
+        parsed = await parser.parse_and_complete('{"found_urls": [{"url": "https://a.example"}', ask)
+
+        assert len(prompts) == 1
+        assert "search_summary" in prompts[0]
+        assert parsed.missing_keys == []
+        assert parsed.completed_keys == ["search_summary", "recommendations"]
+
+    @pytest.mark.asyncio
+    async def test_valid_output_does_not_trigger_requests(self):
+        """Test that complete, valid output never calls the model again."""
+        async def ask(prompt):
+            raise AssertionError("should not be called")
+
+        parser = StructuredOutputParser(["a", "b"])
+        parsed = await parser.parse_and_complete('{"a": 1}', ask)
+        assert parsed.missing_keys == ["b"]
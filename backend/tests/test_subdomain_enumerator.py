@@ -0,0 +1,70 @@
+import pytest
+
+from app.services.dns_resolver import DNSResolver, StubDNSServer
+from app.services.subdomain_enumerator import SubdomainEnumerator, load_wordlist
+
+
+class TestSubdomainEnumerator:
+    """Test cases for concurrent subdomain enumeration."""
+
+    @pytest.mark.asyncio
+    async def test_streams_hits_from_large_wordlist(self):
+        """Test that only resolving candidates are yielded, with their addresses."""
+        async with StubDNSServer() as server:
+            server.add("www.example.com", "A", "192.0.2.1")
+            server.add("api.example.com", "A", "192.0.2.2")
+            enumerator = SubdomainEnumerator(DNSResolver([server.address], timeout=1.0), concurrency=50)
+            words = ["www", "api"] + [f"missing{i}" for i in range(500)]
+
+            hits = [hit async for hit in enumerator.enumerate("example.com", words)]
+            await enumerator.resolver.close()
+
+        assert sorted((hit.name, hit.addresses[0]) for hit in hits) == [
+            ("api.example.com", "192.0.2.2"),
+            ("www.example.com", "192.0.2.1"),
+        ]
+        assert enumerator.last_stats.candidates == 502
+        assert enumerator.last_stats.wildcard_addresses == set()
+
+    @pytest.mark.asyncio
+    async def test_wildcard_answers_are_suppressed(self):
+        """Test that names matching only the wildcard answer are dropped."""
+        async with StubDNSServer() as server:
+            server.add("*.wild.example.com", "A", "203.0.113.9")
+            server.add("real.wild.example.com", "A", "192.0.2.10")
+            enumerator = SubdomainEnumerator(DNSResolver([server.address], timeout=1.0), concurrency=10)
+            seen = []
+
+            async def on_result(hit):
+                seen.append(hit.name)
+
+            hits = await enumerator.enumerate_all("wild.example.com", ["real", "fake", "www"], on_result=on_result)
+            await enumerator.resolver.close()
+
+        assert [hit.name for hit in hits] == seen == ["real.wild.example.com"]
+        assert enumerator.last_stats.wildcard_suppressed == 2
+
+    def test_load_wordlist(self, tmp_path):
+        """Test that wordlist files are de-duplicated and comments stripped."""
+        wordlist = tmp_path / "words.txt"
+        wordlist.write_text("www\n# comment\nAPI\nwww\n\nmail # inline\n")
+
+        assert load_wordlist(str(wordlist)) == ["www", "api", "mail"]
+        assert "www" in load_wordlist()
+
+    @pytest.mark.asyncio
+    async def test_misses_are_not_cached(self):
+        """Test that brute-force NXDOMAIN answers stay out of the shared DNS cache."""
+        async with StubDNSServer() as server:
+            server.add("www.example.com", "A", "192.0.2.1")
+            resolver = DNSResolver([server.address], timeout=1.0)
+            enumerator = SubdomainEnumerator(resolver, concurrency=10)
+
+            hits = await enumerator.enumerate_all("example.com", ["www"] + [f"missing{i}" for i in range(50)])
+            missing = await resolver.query("missing0.example.com", "A")
+            await resolver.close()
+
+        assert [hit.name for hit in hits] == ["www.example.com"]
+        # Only the hit and the ordinary lookup afterwards were cached
+        assert missing.rcode == "NXDOMAIN"
+        assert len(resolver.cache) == 2
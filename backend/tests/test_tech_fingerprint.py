@@ -0,0 +1,94 @@
+import json
+
+from app.services.tech_fingerprint import (
+    DEFAULT_SIGNATURES,
+    Page,
+    SignatureDatabase,
+    TechnologyFingerprinter,
+    load_signatures,
+)
+
+WORDPRESS_PAGE = """<!DOCTYPE html>
+<html><head>
+<meta name="generator" content="WordPress 6.4.2" />
+<link rel="stylesheet" href="/wp-content/plugins/woocommerce/assets/css/woocommerce.css">
+<script src="https://code.jquery.com/jquery-3.7.1.min.js"></script>
+<script async src="https://www.googletagmanager.com/gtag/js?id=G-ABC123"></script>
+</head><body><p>Powered by react-ish marketing copy about Angular angles.</p></body></html>
+"""
+
+
+class FakeHeaders(dict):
+    """httpx.Headers stand-in: repeated Set-Cookie values via get_list."""
+
+    def __init__(self, items):
+        super().__init__((name, value) for name, value in items)
+        self._items = items
+
+    def get_list(self, name):
+        return [value for key, value in self._items if key.lower() == name]
+
+    def items(self):
+        return self._items
+
+
+class FakeResponse:
+    def __init__(self, text, headers, status_code=200, url="https://example.com/"):
+        self.text = text
+        self.headers = headers
+        self.status_code = status_code
+        self.url = url
+
+
+class TestTechnologyFingerprinter:
+    """Test cases for compiled technology signatures."""
+
+    def test_headers_and_body_in_one_pass(self):
+        """Test detection from headers, cookies, meta, scripts and HTML with versions."""
+        fingerprinter = TechnologyFingerprinter()
+        page = Page(
+            url="https://example.com/",
+            html=WORDPRESS_PAGE,
+            headers={"server": "nginx/1.25.3", "set-cookie": "sid=1; path=/\nPHPSESSID=abc; path=/", "cf-ray": "8a1b"}
+        )
+
+        matches = {match.name: match for match in fingerprinter.fingerprint(page)}
+
+        assert matches["Nginx"].version == "1.25.3"
+        assert matches["WordPress"].version == "6.4.2"
+        assert matches["jQuery"].version == "3.7.1"
+        assert matches["PHP"].evidence == ["cookie"]
+        assert set(matches["WordPress"].evidence) == {"meta generator", "html"}
+        assert {"Cloudflare", "WooCommerce", "Google Analytics"} <= set(matches)
+        assert matches["MySQL"].implied
+        # Plain words in page copy are not signatures
+        assert "React" not in matches and "Angular" not in matches
+
+    def test_from_response_and_site_merge(self):
+        """Test that fetched responses are accepted and pages of a site are merged."""
+        fingerprinter = TechnologyFingerprinter()
+        home = Page.from_response(FakeResponse(
+            '<div id="__next"></div><script id="__NEXT_DATA__" type="application/json">{}</script>',
+            FakeHeaders([("Server", "Vercel"), ("Set-Cookie", "a=1"), ("Set-Cookie", "JSESSIONID=2")])
+        ))
+        about = Page(url="https://example.com/about", html='<script src="https://js.stripe.com/v3/"></script>')
+
+        names = {match.name for match in fingerprinter.fingerprint_pages([home, about])}
+
+        assert home.headers["server"] == "Vercel"
+        assert {"Next.js", "React", "Vercel", "Java", "Stripe"} <= names
+        assert fingerprinter.get_stats()["pages"] == 2
+
+    def test_custom_signatures(self, tmp_path):
+        """Test that JSON signatures extend the built-ins and bad patterns are skipped."""
+        path = tmp_path / "signatures.json"
+        path.write_text(json.dumps([
+            {"name": "Acme CMS", "categories": ["CMS"], "html": [r"acme-cms/(\d+)"], "version": r"acme-cms/(\d+)"},
+            {"name": "Broken", "html": ["(unclosed"]},
+        ]))
+
+        database = SignatureDatabase(load_signatures(str(path)))
+        matches = TechnologyFingerprinter(database).fingerprint(Page("https://x", '<link href="/acme-cms/7/site.css">'))
+
+        assert len(database) == len(DEFAULT_SIGNATURES) + 1
+        assert [(match.name, match.version) for match in matches] == [("Acme CMS", "7")]
@@ -0,0 +1,175 @@
+import asyncio
+import shutil
+import ssl
+import subprocess
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import tls_certificates
+from app.services.tls_certificates import CertificateGrabber, CertificateInfo, CertificateRegistry, peer_chain
+
+pytestmark = pytest.mark.skipif(shutil.which("openssl") is None, reason="openssl CLI not available")
+
+
+def openssl(*args, cwd):
+    subprocess.run(["openssl", *args], cwd=cwd, check=True, capture_output=True)
+
+
+@pytest.fixture
+def cert_chain(tmp_path):
+    """A CA and a localhost leaf it signed; the server presents both."""
+    openssl("req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "2", "-subj", "/CN=Test CA",
+            "-keyout", "ca.key", "-out", "ca.pem", cwd=tmp_path)
+    openssl("req", "-newkey", "rsa:2048", "-nodes", "-subj", "/CN=localhost",
+            "-keyout", "leaf.key", "-out", "leaf.csr", cwd=tmp_path)
+    (tmp_path / "san.ext").write_text("subjectAltName=DNS:localhost,IP:127.0.0.1\n")
+    openssl("x509", "-req", "-in", "leaf.csr", "-CA", "ca.pem", "-CAkey", "ca.key", "-CAcreateserial",
+            "-days", "1", "-extfile", "san.ext", "-out", "leaf.pem", cwd=tmp_path)
+    (tmp_path / "chain.pem").write_text((tmp_path / "leaf.pem").read_text() + (tmp_path / "ca.pem").read_text())
+    return tmp_path
+
+
+async def start_server(cert_dir):
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_dir / "chain.pem", cert_dir / "leaf.key")
+
+    async def handle(reader, writer):
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0, ssl=context)
+    return server, server.sockets[0].getsockname()[1]
+
+
+class TestCertificateGrabber:
+    """Test cases for async TLS certificate collection."""
+
+    @pytest.mark.asyncio
+    async def test_verified_chain_is_parsed(self, cert_chain):
+        """Test that the leaf and CA are collected from a trusted server."""
+        server, port = await start_server(cert_chain)
+        grabber = CertificateGrabber(timeout=5.0, cafile=str(cert_chain / "ca.pem"))
+
+        async with server:
+            result = await grabber.grab("localhost", port)
+
+        assert result.error is None
+        assert result.verified
+        assert [certificate.subject["commonName"] for certificate in result.chain] == ["localhost", "Test CA"]
+        assert "localhost" in result.leaf.subject_alt_names
+        assert result.leaf.issuer["commonName"] == "Test CA"
+        assert result.chain[1].is_self_signed
+        assert not result.leaf.is_expired
+
+    @pytest.mark.asyncio
+    async def test_unverified_chain_is_still_collected(self, cert_chain):
+        """Test that an untrusted chain is collected with its verification error."""
+        server, port = await start_server(cert_chain)
+        grabber = CertificateGrabber(timeout=5.0)
+
+        async with server:
+            result = await grabber.grab("localhost", port)
+
+        assert not result.verified
+        assert result.verification_error
+        assert result.leaf.subject["commonName"] == "localhost"
+
+    @pytest.mark.asyncio
+    async def test_cache_and_fingerprint_dedupe(self, cert_chain):
+        """Test that endpoints are cached and shared certificates stored once."""
+        server, port = await start_server(cert_chain)
+        grabber = CertificateGrabber(timeout=5.0, cafile=str(cert_chain / "ca.pem"))
+
+        async with server:
+            first, second = await grabber.grab_many([("localhost", port), ("localhost", port)])
+            other = await grabber.grab("127.0.0.1", port)
+            await grabber.grab("localhost", port)
+
+        assert first is second
+        assert other.leaf is first.leaf
+        assert first.leaf.seen_on == {f"localhost:{port}", f"127.0.0.1:{port}"}
+        stats = grabber.get_stats()
+        assert stats["handshakes"] == 2
+        assert stats["cache_hits"] == 1
+        assert stats["unique_certificates"] == 2
+
+    @pytest.mark.asyncio
+    async def test_connection_errors_are_reported(self):
+        """Test that a closed port yields an error result instead of raising."""
+        grabber = CertificateGrabber(timeout=1.0)
+
+        result = await grabber.grab("127.0.0.1", 1)
+
+        assert result.error
+        assert result.chain == []
+
+    @pytest.mark.asyncio
+    async def test_injected_registry_is_shared(self, cert_chain):
+        """Test that grabbers given one (initially empty) registry dedupe across each other."""
+        server, port = await start_server(cert_chain)
+        registry = CertificateRegistry()
+        first = CertificateGrabber(timeout=5.0, registry=registry)
+        second = CertificateGrabber(timeout=5.0, registry=registry)
+
+        async with server:
+            one = await first.grab("localhost", port)
+            two = await second.grab("127.0.0.1", port)
+
+        assert first.registry is registry and second.registry is registry
+        assert two.leaf is one.leaf
+        assert len(registry) == 2 and registry.dedup_hits == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_leaf_and_cache_bound(self):
+        """Test that expired leaves are cached briefly and the endpoint cache is bounded."""
+        grabber = CertificateGrabber(cache_size=2)
+        expired = CertificateInfo(
+            fingerprint_sha256="00", subject={}, issuer={}, serial_number="01",
+            not_before=None, not_after=datetime.now(timezone.utc) - timedelta(days=1)
+        )
+
+        async def handshake(host, port, context, result):
+            grabber.handshakes += 1
+            result.chain = [expired]
+
+        grabber._handshake = handshake
+        await grabber.grab("expired.example")
+        await grabber.grab("expired.example")
+        for host in ("a.example", "b.example"):
+            await grabber.grab(host)
+
+        stats = grabber.get_stats()
+        assert stats["handshakes"] == 3 and stats["cache_hits"] == 1
+        assert stats["cached_endpoints"] == 2
+
+    @pytest.mark.asyncio
+    async def test_malformed_certificate_is_reported_per_host(self, cert_chain, monkeypatch):
+        """Test that an unparseable certificate becomes that host's error instead of raising."""
+        def malformed(der, info=None):
+            raise ValueError("error parsing asn1 value")
+
+        monkeypatch.setattr(tls_certificates, "parse_certificate", malformed)
+        server, port = await start_server(cert_chain)
+        grabber = CertificateGrabber(timeout=5.0)
+
+        async with server:
+            bad, closed = await grabber.grab_many([("localhost", port), ("127.0.0.1", 1)])
+
+        assert bad.error == "Malformed certificate: error parsing asn1 value"
+        assert bad.chain == []
+        assert closed.error and closed.error != bad.error
+
+    def test_chain_falls_back_to_leaf(self):
+        """Test that the leaf alone is used when the private chain API is missing or changed."""
+        def peer(low_level=None):
+            return SimpleNamespace(
+                _sslobj=low_level,
+                getpeercert=lambda binary_form=False: b"leaf-der" if binary_form else {"subject": ()}
+            )
+
+        assert peer_chain(peer()) == [(b"leaf-der", {"subject": ()})]
+        changed = SimpleNamespace(get_unverified_chain=lambda: [object()])
+        assert peer_chain(peer(changed)) == [(b"leaf-der", {"subject": ()})]
+        broken = SimpleNamespace(get_unverified_chain=lambda: 1 / 0)
+        assert peer_chain(peer(broken)) == [(b"leaf-der", {"subject": ()})]
@@ -0,0 +1,122 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.url_validator import URLValidator
+
+
+class FakeSite:
+    """Mock transport routes; records (method, url) per request."""
+
+    def __init__(self, delay=0.0):
+        self.requests = []
+        self.delay = delay
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append((request.method, str(request.url)))
+        await asyncio.sleep(self.delay)
+        path = request.url.path
+        if path == "/ok":
+            return httpx.Response(200, headers={"content-type": "text/html", "content-length": "5120"})
+        if path == "/no-head":
+            if request.method == "HEAD":
+                return httpx.Response(405)
+            assert request.headers["range"] == "bytes=0-0"
+            return httpx.Response(206, headers={"content-range": "bytes 0-0/777"}, content=b"x")
+        if path.startswith("/hop/"):
+            remaining = int(path.rsplit("/", 1)[1])
+            return httpx.Response(301, headers={"location": f"/hop/{remaining - 1}" if remaining else "/ok"})
+        if path == "/loop":
+            return httpx.Response(302, headers={"location": "/loop#again"})
+        return httpx.Response(404)
+
+
+def make_validator(site, **kwargs):
+    return URLValidator(transport=httpx.MockTransport(site), **kwargs)
+
+
+class TestURLValidator:
+    """Test cases for the shared URL validator."""
+
+    @pytest.mark.asyncio
+    async def test_head_then_ranged_get(self):
+        """Test HEAD probing with a ranged GET where HEAD is refused."""
+        site = FakeSite()
+        validator = make_validator(site)
+
+        ok, no_head, missing = await validator.validate_many([
+            "https://example.com/ok", "https://example.com/no-head", "https://example.com/missing"
+        ])
+
+        assert ok.valid and ok.method == "HEAD" and ok.content_length == 5120
+        assert no_head.valid and no_head.method == "GET" and no_head.status_code == 206
+        assert no_head.content_length == 777
+        assert not missing.valid and missing.status_code == 404
+        assert validator.get_stats()["ranged_gets"] == 1
+
+    @pytest.mark.asyncio
+    async def test_redirects_are_capped(self):
+        """Test redirect following, the redirect cap and loop detection."""
+        validator = make_validator(FakeSite(), max_redirects=3)
+
+        followed, too_long, loop = await validator.validate_many([
+            "https://example.com/hop/1", "https://example.com/hop/5", "https://example.com/loop"
+        ])
+
+        assert followed.valid and followed.final_url == "https://example.com/ok"
+        assert len(followed.redirects) == 2
+        assert not too_long.valid and "redirects" in too_long.error
+        assert not loop.valid and loop.error == "Redirect loop"
+
+    @pytest.mark.asyncio
+    async def test_cache_and_coalescing(self):
+        """Test that repeated and concurrent checks share one probe."""
+        site = FakeSite(delay=0.02)
+        validator = make_validator(site)
+
+        batch = await validator.validate_many(["https://example.com/ok"] * 5 + ["https://example.com/ok#section"])
+        again = await validator.validate("https://example.com/ok")
+
+        assert all(check.valid for check in batch)
+        assert again.from_cache
+        assert site.requests == [("HEAD", "https://example.com/ok")]
+        stats = validator.get_stats()
+        assert stats["coalesced"] == 5 and stats["cache_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_errors_are_reported(self):
+        """Test that unsupported schemes and transport errors become invalid results."""
+        async def refuse(request):
+            raise httpx.ConnectError("connection refused", request=request)
+
+        validator = URLValidator(transport=httpx.MockTransport(refuse))
+
+        ftp, refused = await validator.validate_many(["ftp://example.com/file", "https://down.example/"])
+
+        assert not ftp.valid and ftp.error == "Unsupported URL scheme"
+        assert not refused.valid and "refused" in refused.error
+
+    @pytest.mark.asyncio
+    async def test_busy_host_does_not_starve_others(self):
+        """Test that links queued on one host leave global slots for other hosts."""
+        site = FakeSite(delay=0.02)
+        validator = make_validator(site, concurrency=4, per_host=2)
+        urls = [f"https://busy.example/ok?page={i}" for i in range(20)] + ["https://other.example/ok"]
+
+        checks = await validator.validate_many(urls)
+
+        assert all(check.valid for check in checks)
+        started = [url for _, url in site.requests]
+        assert started.index("https://other.example/ok") < 4
+
+    def test_client_from_previous_loop_is_closed(self):
+        """Test that rebinding to a new event loop closes the old loop's client."""
+        validator = make_validator(FakeSite())
+
+        asyncio.run(validator.validate("https://example.com/ok"))
+        first = validator._client
+        asyncio.run(validator.validate("https://example.com/no-head"))
+
+        assert first.is_closed and validator._client is not first
+        assert not validator._client.is_closed
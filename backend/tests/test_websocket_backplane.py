@@ -0,0 +1,156 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services.enhanced_websocket import EnhancedWebSocketManager
+from app.services.websocket_backplane import Backplane, InProcessBackplane, InProcessBus
+
+
+class FakeWebSocket:
+    """Minimal WebSocket double that records sent text frames."""
+
+    def __init__(self):
+        self.sent = []
+        self.closed = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        self.sent.append(data)
+
+    async def send_json(self, data):
+        self.sent.append(json.dumps(data))
+
+    async def close(self, code: int = 1000):
+        self.closed = code
+
+    def messages(self, message_type=None):
+        decoded = [json.loads(item) for item in self.sent]
+        return [m for m in decoded if message_type is None or m.get("type") == message_type]
+
+
+async def _drain():
+    """Let the per-connection writer tasks flush their queues."""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def _workers(count: int = 2):
+    bus = InProcessBus()
+    return [
+        EnhancedWebSocketManager(backplane=InProcessBackplane("enhanced", bus=bus))
+        for _ in range(count)
+    ]
+
+
+class TestWebSocketBackplane:
+    """Test cases for cross-worker WebSocket fan-out."""
+
+    @pytest.mark.asyncio
+    async def test_broadcast_reaches_other_workers(self):
+        """Test that a broadcast reaches clients attached to another worker."""
+        worker_a, worker_b = _workers()
+        local, remote = FakeWebSocket(), FakeWebSocket()
+        await worker_a.connect(local, "p1", "alice")
+        await worker_b.connect(remote, "p1", "bob")
+
+        await worker_a.broadcast("p1", {"type": "info", "message": "hello"})
+        await _drain()
+
+        assert [m["message"] for m in local.messages("info")] == ["hello"]
+        assert [m["message"] for m in remote.messages("info")] == ["hello"]
+
+    @pytest.mark.asyncio
+    async def test_broadcast_without_local_clients(self):
+        """Test that a worker with no sockets for a pipeline still fans out."""
+        worker_a, worker_b = _workers()
+        remote = FakeWebSocket()
+        await worker_b.connect(remote, "p1", "bob")
+
+        await worker_a.stream_scraping_progress("p1", {"completed": 1, "total": 4})
+        await _drain()
+
+        progress = remote.messages("scraping_progress")
+        assert len(progress) == 1
+        assert progress[0]["percent_complete"] == 25
+
+    @pytest.mark.asyncio
+    async def test_broadcast_to_others_excludes_sender_everywhere(self):
+        """Test that the sender is excluded on every worker."""
+        worker_a, worker_b = _workers()
+        alice, bob = FakeWebSocket(), FakeWebSocket()
+        await worker_a.connect(alice, "p1", "alice")
+        await worker_b.connect(bob, "p1", "bob")
+
+        await worker_b.broadcast_to_others("p1", "bob", {"type": "pipeline_updated", "field": "urls"})
+        await _drain()
+
+        assert len(alice.messages("pipeline_updated")) == 1
+        assert bob.messages("pipeline_updated") == []
+
+    @pytest.mark.asyncio
+    async def test_no_echo_to_origin(self):
+        """Test that a worker does not deliver its own published message twice."""
+        worker_a, _ = _workers()
+        local = FakeWebSocket()
+        await worker_a.connect(local, "p1", "alice")
+
+        await worker_a.broadcast("p1", {"type": "info", "message": "once"})
+        await _drain()
+
+        assert len(local.messages("info")) == 1
+        assert worker_a.backplane.received == 0
+
+    @pytest.mark.asyncio
+    async def test_progress_deltas_only_reach_subscribers(self):
+        """Test that delta subscribers get patches and other clients full messages."""
+        worker_a, worker_b = _workers()
+        legacy, dashboard = FakeWebSocket(), FakeWebSocket()
+        await worker_a.connect(legacy, "p1", "alice")
+        await worker_b.connect(dashboard, "p1", "bob")
+        worker_b.subscribe_progress("p1", "bob")
+
+        await worker_a.publish_progress("p1", "investigation:updated", {"progress_percentage": 10.0})
+        await _drain()
+
+        assert legacy.messages("investigation:updated")[0]["progress_percentage"] == 10.0
+        assert legacy.messages("progress_patch") == []
+        patches = dashboard.messages("progress_patch")
+        assert [p["seq"] for p in patches] == [1]
+        assert dashboard.messages("investigation:updated") == []
+        assert worker_b.progress.resync("p1")["state"] == {
+            "investigation:updated": {"progress_percentage": 10.0}
+        }
+
+    @pytest.mark.asyncio
+    async def test_reconnect_replaces_previous_writer(self):
+        """Test that reconnecting with the same user_id stops the old socket's writer."""
+        worker, = _workers(1)
+        old, new = FakeWebSocket(), FakeWebSocket()
+        await worker.connect(old, "p1", "alice")
+        old_writer = worker.writers[id(old)]
+
+        await worker.connect(new, "p1", "alice")
+        await _drain()
+
+        assert id(old) not in worker.writers and old_writer.task.done()
+        assert old.closed == 1000
+        assert worker.pipeline_states["p1"]["collaborators"] == ["alice"]
+
+        # The old socket's handler disconnecting later leaves the new connection intact
+        worker.disconnect(old, "p1", "alice")
+        await worker.broadcast("p1", {"type": "info", "message": "still here"})
+        await _drain()
+        assert [m["message"] for m in new.messages("info")] == ["still here"]
+        assert "alice" in worker.user_info
+
+    def test_backplane_requires_transport_methods(self):
+        """Test that a backplane missing its transport cannot be instantiated."""
+        class Incomplete(Backplane):
+            async def _subscribe(self):
+                pass
+
+        with pytest.raises(TypeError):
+            Incomplete("enhanced")
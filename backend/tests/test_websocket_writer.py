@@ -0,0 +1,88 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services.websocket_writer import ConnectionWriter
+
+
+class BlockingWebSocket:
+    """WebSocket double whose sends wait until released."""
+
+    def __init__(self):
+        self.sent = []
+        self.release = asyncio.Event()
+
+    async def send_text(self, data: str):
+        await self.release.wait()
+        self.sent.append(data)
+
+
+async def _drain():
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+class TestConnectionWriter:
+    """Test cases for bounded per-connection WebSocket writers."""
+
+    @pytest.mark.asyncio
+    async def test_progress_messages_coalesce(self):
+        """Test that queued progress is replaced by newer progress."""
+        websocket = BlockingWebSocket()
+        writer = ConnectionWriter(websocket, max_queue=10, policy="downgrade", send_timeout=5)
+        writer.start()
+
+        writer.enqueue("first")
+        await _drain()  # writer is now blocked sending "first"
+        for percent in range(5):
+            writer.enqueue(json.dumps({"percent": percent}), coalesce_key="progress")
+
+        assert writer.depth == 1
+        assert writer.coalesced == 4
+
+        websocket.release.set()
+        await _drain()
+        assert websocket.sent == ["first", json.dumps({"percent": 4})]
+        writer.close()
+
+    @pytest.mark.asyncio
+    async def test_enqueue_never_blocks_on_slow_socket(self):
+        """Test that a full queue downgrades the consumer instead of blocking."""
+        websocket = BlockingWebSocket()
+        writer = ConnectionWriter(websocket, max_queue=3, policy="downgrade", send_timeout=5)
+        writer.start()
+
+        results = [writer.enqueue(f"m{i}") for i in range(6)]
+
+        assert results == [True, True, True, False, False, False]
+        assert writer.downgraded
+        assert writer.dropped == 3
+        assert writer.get_metrics()["max_queue_depth"] == 3
+
+        websocket.release.set()
+        await _drain()
+        assert not writer.downgraded
+        notice = json.loads(websocket.sent[-1])
+        assert notice["reason"] == "slow_consumer"
+        assert notice["dropped_messages"] == 3
+        writer.close()
+
+    @pytest.mark.asyncio
+    async def test_drop_policy_closes_connection(self):
+        """Test that the drop policy disconnects a consumer that falls behind."""
+        closed = []
+        writer = ConnectionWriter(
+            BlockingWebSocket(),
+            max_queue=2,
+            policy="drop",
+            send_timeout=5,
+            on_close=lambda w, reason: closed.append(reason)
+        )
+
+        writer.enqueue("a")
+        writer.enqueue("b")
+        assert writer.enqueue("c") is False
+
+        assert writer.closed
+        assert closed == ["slow consumer"]